@@ -2,13 +2,34 @@
 """
 QUANTCLAW DATA CLI
 Central dispatcher for all quantitative data modules
+
+Dispatch modes (QUANTCLAW_CLI_MODE or leading flag):
+  subprocess (default)  python3 modules/<file>.py per call
+  --in-process          run the module inside this interpreter
+  --daemon              serve commands over a Unix socket from one warm interpreter
+  --via-daemon          send the command to a running daemon (falls back to in-process)
 """
 
+import io
+import os
 import sys
+import json
+import re
+import socket
+import importlib.util
 import subprocess
+import contextlib
+import socketserver
 from pathlib import Path
 
-MODULES_DIR = Path(__file__).parent / "modules"
+PROJECT_ROOT = Path(__file__).parent
+MODULES_DIR = PROJECT_ROOT / "modules"
+# per-user socket: whoever can connect to it can run any command as the daemon's user
+DAEMON_SOCKET = os.environ.get("QUANTCLAW_CLI_SOCKET") or (
+    os.path.join(os.environ["XDG_RUNTIME_DIR"], "quantclaw-cli.sock") if os.environ.get("XDG_RUNTIME_DIR")
+    else f"/tmp/quantclaw-cli-{os.getuid()}.sock"
+)
+DAEMON_CONNECT_TIMEOUT = 5.0
 
 # Module registry
 MODULES = {
@@ -117,7 +138,7 @@ MODULES = {
     },
     'alert_backtest': {
         'file': 'alert_backtest.py',
-        'commands': ['alert-backtest', 'signal-quality', 'alert-potential']
+        'commands': ['alert-backtest', 'signal-quality', 'alert-potential', 'signal-scan']
     },
     'commodity_futures': {
         'file': 'commodity_futures.py',
@@ -905,32 +926,204 @@ MODULES = {
     },
 }
 
-def dispatch_command(args):
-    """Route command to appropriate module"""
+_COMMAND_INDEX = None
+_LOADED_MODULES = {}
+_COMPILED_SCRIPTS = {}
+# __main__ blocks that only call main(); anything else is re-run as a script
+_MAIN_ONLY_BLOCK = re.compile(
+    r"^if __name__ == ['\"]__main__['\"]:\s*\n\s+(sys\.exit\()?main\(\)\)?\s*$", re.M
+)
+
+
+def get_command_index():
+    """Map every command to its module entry (built once, first registration wins)"""
+    global _COMMAND_INDEX
+    if _COMMAND_INDEX is None:
+        index = {}
+        for module_key, module_info in MODULES.items():
+            for command in module_info['commands']:
+                index.setdefault(command, module_info)
+        _COMMAND_INDEX = index
+    return _COMMAND_INDEX
+
+
+def _load_entry_point(module_path):
+    """Import a module file once and return (module, main) if it exposes main()"""
+    key = str(module_path)
+    if key not in _LOADED_MODULES:
+        source = module_path.read_text()
+        entry = None
+        if _MAIN_ONLY_BLOCK.search(source):
+            spec = importlib.util.spec_from_file_location(f"qc_cli_{module_path.stem}", module_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            entry = getattr(module, 'main', None)
+        if entry is None:
+            # __main__-block scripts: keep the compiled code, re-run the body per call
+            _COMPILED_SCRIPTS[key] = compile(source, key, 'exec')
+        _LOADED_MODULES[key] = entry
+    return _LOADED_MODULES[key]
+
+
+def run_in_process(module_path, args):
+    """Run a module's CLI inside the current interpreter, returning its exit code"""
+    modules_dir = str(MODULES_DIR)
+    if modules_dir not in sys.path:
+        sys.path.insert(0, modules_dir)
+
+    saved_argv, saved_cwd = sys.argv, os.getcwd()
+    sys.argv = [str(module_path)] + list(args)
+    os.chdir(PROJECT_ROOT)
+    try:
+        entry = _load_entry_point(module_path)
+        if entry is not None:
+            result = entry()
+        else:
+            exec(_COMPILED_SCRIPTS[str(module_path)],
+                 {'__name__': '__main__', '__file__': str(module_path), '__builtins__': __builtins__})
+            result = 0
+        return result if isinstance(result, int) else 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    finally:
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    """One JSON request line in ({"args": [...]}), one JSON response line out"""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline() or b'{}')
+        except ValueError:
+            request = {}
+        args = request.get('args') or []
+
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                code = dispatch_command(args, mode='in-process')
+            except Exception as e:  # keep the daemon alive
+                print(f"Error: {e}", file=sys.stderr)
+                code = 1
+
+        response = {'returncode': code, 'stdout': out.getvalue(), 'stderr': err.getvalue()}
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+def _bind_daemon(socket_path):
+    """Unix socket server for the daemon; the socket file is created owner-only (0600)"""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    old_umask = os.umask(0o177)
+    try:
+        return socketserver.UnixStreamServer(socket_path, _DaemonHandler)
+    finally:
+        os.umask(old_umask)
+
+
+def serve_daemon(socket_path=DAEMON_SOCKET):
+    """Serve CLI commands from this interpreter until interrupted.
+
+    Requests are handled one at a time: module CLIs mutate sys.argv, cwd and stdout.
+    """
+    get_command_index()
+    with _bind_daemon(socket_path) as server:
+        print(f"QuantClaw CLI daemon listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+    return 0
+
+
+def send_to_daemon(args, socket_path=DAEMON_SOCKET, timeout=None):
+    """Run a command on the daemon; returns None if no daemon answers.
+
+    That covers a missing socket, a refused or timed-out connection and a daemon
+    that dies mid-request (no or garbled response); callers then run in-process.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(DAEMON_CONNECT_TIMEOUT if timeout is None else min(timeout, DAEMON_CONNECT_TIMEOUT))
+            sock.connect(socket_path)
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps({'args': list(args)}).encode() + b'\n')
+            with sock.makefile('rb') as reader:
+                response = json.loads(reader.readline())
+        stdout, stderr, code = response['stdout'], response['stderr'], response['returncode']
+    except (OSError, ValueError, KeyError, TypeError):  # socket.timeout is an OSError
+        return None
+
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    return code
+
+
+_MODE_FLAGS = {
+    '--in-process': 'in-process',
+    '--daemon': 'daemon',
+    '--via-daemon': 'via-daemon',
+    '--subprocess': 'subprocess',
+}
+
+
+def dispatch_command(args, mode=None):
+    """Route command to appropriate module
+
+    A leading mode flag (--daemon, --in-process, ...) is honoured only when no mode
+    is passed: the daemon handler fixes mode='in-process', so a client cannot make
+    it serve a nested daemon or run a subprocess outside the captured output.
+    """
+    args = list(args)
+    if mode is None and args and args[0] in _MODE_FLAGS:
+        mode = _MODE_FLAGS[args.pop(0)]
+    mode = mode or os.environ.get('QUANTCLAW_CLI_MODE', 'subprocess')
+
+    if mode == 'daemon':
+        return serve_daemon()
+
     if len(args) < 1:
         print_help()
         return 1
-    
+
+    if mode == 'via-daemon':
+        code = send_to_daemon(args)
+        if code is not None:
+            return code
+        mode = 'in-process'
+
     command = args[0]
-    
+
     # Find which module handles this command
-    for module_key, module_info in MODULES.items():
-        if command in module_info['commands']:
-            module_path = MODULES_DIR / module_info['file']
-            if not module_path.exists():
-                print(f"Error: Module {module_info['file']} not found", file=sys.stderr)
-                return 1
-            
-            # Execute the module with remaining args
-            result = subprocess.run(
-                ['python3', str(module_path)] + args,
-                cwd=Path(__file__).parent
-            )
-            return result.returncode
-    
-    print(f"Error: Unknown command '{command}'", file=sys.stderr)
-    print_help()
-    return 1
+    module_info = get_command_index().get(command)
+    if module_info is None:
+        print(f"Error: Unknown command '{command}'", file=sys.stderr)
+        print_help()
+        return 1
+
+    module_path = MODULES_DIR / module_info['file']
+    if not module_path.exists():
+        print(f"Error: Module {module_info['file']} not found", file=sys.stderr)
+        return 1
+
+    if mode == 'in-process':
+        return run_in_process(module_path, args)
+
+    # Execute the module with remaining args
+    result = subprocess.run(
+        ['python3', str(module_path)] + args,
+        cwd=PROJECT_ROOT
+    )
+    return result.returncode
 
 def print_help():
     """Print CLI help"""
@@ -1004,6 +1197,7 @@ def print_help():
     print("  python cli.py alert-backtest SYMBOL --condition 'CONDITION' [--period PERIOD]")
     print("  python cli.py signal-quality SYMBOL [--period PERIOD]")
     print("  python cli.py alert-potential SYMBOL [--period PERIOD]")
+    print("  python cli.py signal-scan SYMBOL[,SYMBOL...] [--conditions 'C1;C2'] [--period PERIOD] [--workers N]")
     
     print("\nOrder Book Depth (Phase 39):")
     print("  python cli.py order-book SYMBOL [--levels N]")
@@ -1697,67 +1891,6 @@ def print_help():
     print("  python cli.py ai-report TICKER [--json]         # Same as research command")
     print("  python cli.py company-report TICKER             # Alias for research command")
 
-@cli.command()
-@click.option('--ticker', required=True, help='Stock ticker')
-@click.option('--json-output', is_flag=True, help='JSON output')
-def stockanalysis_eps(ticker, json_output):
-    """StockAnalysis.com EPS estimates & analyst revisions"""
-    from modules.stockanalysis_eps import StockAnalysisEPS
-    scraper = StockAnalysisEPS()
-    data = scraper.get_eps_estimates(ticker)
-    
-    if json_output:
-        click.echo(json.dumps(data, indent=2))
-    else:
-        if 'error' in data:
-            click.echo(f"❌ Error: {data['error']}", err=True)
-            raise click.Abort()
-        
-        click.echo(f"\n📊 {data['ticker']} — EPS Estimates & Revisions\n")
-        
-        cq = data.get('current_quarter', {})
-        if cq.get('eps_estimate'):
-            click.echo(f"Current Quarter EPS: ${cq['eps_estimate']:.2f}")
-        if cq.get('num_analysts'):
-            click.echo(f"Analysts: {cq['num_analysts']}")
-        
-        revs = data.get('revisions_7d', {})
-        if revs:
-            click.echo(f"7D Revisions: ↑{revs.get('up', 0)} ↓{revs.get('down', 0)}")
-        
-        history = data.get('surprise_history', [])
-        if history:
-            click.echo(f"\nLast Surprise: {history[0].get('surprise_pct', 0):.1f}%")
-
-
-
-@cli.command()
-@click.option('--ticker', required=True, help='Stock ticker')
-@click.option('--json-output', is_flag=True, help='JSON output')
-def finviz_screen(ticker, json_output):
-    """Finviz comprehensive stock screener data"""
-    from modules.finviz_screener import FinvizScreener
-    screener = FinvizScreener()
-    data = screener.get_stock_data(ticker)
-    
-    if json_output:
-        click.echo(json.dumps(data, indent=2))
-    else:
-        if 'error' in data:
-            click.echo(f"❌ {data['error']}", err=True)
-            raise click.Abort()
-        
-        click.echo(f"\n📊 {data['ticker']} — Finviz Data\n")
-        fund = data.get('fundamentals', {})
-        if fund.get('pe'):
-            click.echo(f"P/E: {fund['pe']:.2f}")
-        if fund.get('eps_ttm'):
-            click.echo(f"EPS: ${fund['eps_ttm']:.2f}")
-
-
-if __name__ == '__main__':
-    sys.exit(dispatch_command(sys.argv[1:]))
-
     print("\nNighttime Lights Satellite (Phase 691):")
     print("  python cli.py lights-country <CODE> [--year YYYY] # Country nighttime lights intensity")
     print("  python cli.py lights-region --lat <LAT> --lon <LON> [--radius KM]")
@@ -1774,3 +1907,7 @@ if __name__ == '__main__':
 
     print("\nFINRA Short Interest (Phase 704):")
     print("  python cli.py finra-short TICKER                # Official FINRA short interest data (bi-weekly)")
+
+
+if __name__ == '__main__':
+    sys.exit(dispatch_command(sys.argv[1:]))
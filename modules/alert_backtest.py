@@ -2,19 +2,46 @@
 Alert Backtesting Module
 Test alert strategies historically, measure signal quality, false positive rates.
 Phase 41: Infrastructure
+
+Conditions are evaluated as boolean masks over the whole indicator frame
+(condition_mask), and the forward 1d/5d/20d returns are shifted columns of
+that frame, computed once per symbol. condition_stats() aggregates hit rates,
+win/loss, profit factor, Sharpe and drawdown for any number of conditions in
+one grouped pass over their signals, so signal_quality_analysis() fetches
+the data once instead of once per condition. scan_conditions() runs that for
+many symbols in parallel (the work per symbol is mostly the download).
 """
 
 import yfinance as yf
 import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import json
+import os
 import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+COMMON_CONDITIONS = [
+    "rsi<30",
+    "rsi>70",
+    "rsi<25",
+    "rsi>75",
+    "macd>macd_signal",
+    "macd<macd_signal",
+    "close<bb_lower",
+    "close>bb_upper",
+    "volume_ratio>2",
+    "volume_ratio>3",
+]
+
+METRICS = ['total_signals', 'hit_rate_1d', 'hit_rate_5d', 'hit_rate_20d', 'false_positive_rate',
+           'false_negative_rate', 'avg_win', 'avg_loss', 'profit_factor', 'signal_quality_score',
+           'sharpe_ratio', 'max_drawdown']
+
 
 @dataclass
 class AlertSignal:
@@ -60,47 +87,52 @@ def fetch_data_with_indicators(symbol: str, period: str = '1y') -> pd.DataFrame:
         if df.empty:
             raise ValueError(f"No data found for {symbol}")
         
-        # Calculate technical indicators
-        df['returns'] = df['Close'].pct_change()
-        
-        # RSI
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        exp1 = df['Close'].ewm(span=12, adjust=False).mean()
-        exp2 = df['Close'].ewm(span=26, adjust=False).mean()
-        df['macd'] = exp1 - exp2
-        df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        df['macd_hist'] = df['macd'] - df['macd_signal']
-        
-        # Bollinger Bands
-        df['sma_20'] = df['Close'].rolling(window=20).mean()
-        df['bb_std'] = df['Close'].rolling(window=20).std()
-        df['bb_upper'] = df['sma_20'] + (df['bb_std'] * 2)
-        df['bb_lower'] = df['sma_20'] - (df['bb_std'] * 2)
-        
-        # Moving averages
-        df['sma_50'] = df['Close'].rolling(window=50).mean()
-        df['sma_200'] = df['Close'].rolling(window=200).mean()
-        
-        # Volume indicators
-        df['volume_sma_20'] = df['Volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['Volume'] / df['volume_sma_20']
-        
-        # Forward returns for hit rate calculation
-        df['fwd_return_1d'] = df['Close'].pct_change(1).shift(-1)
-        df['fwd_return_5d'] = df['Close'].pct_change(5).shift(-5)
-        df['fwd_return_20d'] = df['Close'].pct_change(20).shift(-20)
-        
-        return df
+        return add_indicators(df)
     except Exception as e:
         raise Exception(f"Error fetching data for {symbol}: {str(e)}")
 
 
+def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the indicator and forward-return columns to an OHLCV frame (in place; returns it)"""
+    # Calculate technical indicators
+    df['returns'] = df['Close'].pct_change()
+
+    # RSI
+    delta = df['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    df['rsi'] = 100 - (100 / (1 + rs))
+
+    # MACD
+    exp1 = df['Close'].ewm(span=12, adjust=False).mean()
+    exp2 = df['Close'].ewm(span=26, adjust=False).mean()
+    df['macd'] = exp1 - exp2
+    df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
+    df['macd_hist'] = df['macd'] - df['macd_signal']
+
+    # Bollinger Bands
+    df['sma_20'] = df['Close'].rolling(window=20).mean()
+    df['bb_std'] = df['Close'].rolling(window=20).std()
+    df['bb_upper'] = df['sma_20'] + (df['bb_std'] * 2)
+    df['bb_lower'] = df['sma_20'] - (df['bb_std'] * 2)
+
+    # Moving averages
+    df['sma_50'] = df['Close'].rolling(window=50).mean()
+    df['sma_200'] = df['Close'].rolling(window=200).mean()
+
+    # Volume indicators
+    df['volume_sma_20'] = df['Volume'].rolling(window=20).mean()
+    df['volume_ratio'] = df['Volume'] / df['volume_sma_20']
+
+    # Forward returns for hit rate calculation
+    df['fwd_return_1d'] = df['Close'].pct_change(1).shift(-1)
+    df['fwd_return_5d'] = df['Close'].pct_change(5).shift(-5)
+    df['fwd_return_20d'] = df['Close'].pct_change(20).shift(-20)
+
+    return df
+
+
 def parse_condition(condition: str) -> Tuple[str, str, float]:
     """
     Parse alert condition string into components
@@ -209,171 +241,205 @@ def determine_direction(condition: str) -> str:
     return 'long'
 
 
-def backtest_alert(symbol: str, condition: str, period: str = '1y') -> BacktestResults:
+def condition_mask(df: pd.DataFrame, condition: str) -> pd.Series:
     """
-    Backtest an alert condition on historical data
+    Boolean mask of the rows where a condition holds: evaluate_condition over the whole
+    frame at once (a missing indicator column never triggers; NaN values never trigger)
     """
-    # Fetch data with indicators
-    df = fetch_data_with_indicators(symbol, period)
-    
-    # Parse condition
     indicator, operator, threshold = parse_condition(condition)
-    
-    # Determine expected direction
+    if indicator not in df.columns:
+        return pd.Series(False, index=df.index)
+
+    value = df[indicator]
+    if isinstance(threshold, str):
+        if threshold not in df.columns:
+            raise ValueError(f"Unknown column in condition: {threshold}")
+        threshold = df[threshold]
+    else:
+        threshold = pd.Series(threshold, index=df.index)
+
+    if operator == '==':
+        hit = (value - threshold).abs() < 1e-6
+    else:
+        hit = {'>': value > threshold, '<': value < threshold,
+               '>=': value >= threshold, '<=': value <= threshold}[operator]
+    return hit & value.notna() & threshold.notna()
+
+
+def condition_stats(df: pd.DataFrame, conditions: List[str]) -> pd.DataFrame:
+    """
+    Backtest metrics for every condition over one indicator frame, one row per condition
+    (the BacktestResults fields except symbol/condition/signals).
+
+    Each condition's signals are the rows of its mask with a 1d forward return; all
+    signals are stacked into one long table and the metrics are grouped aggregations.
+    """
+    fwd = df[['fwd_return_1d', 'fwd_return_5d', 'fwd_return_20d']].to_numpy(dtype=float)
+    tradable = ~np.isnan(fwd[:, 0])
+    masks = np.column_stack([condition_mask(df, c).to_numpy(dtype=bool) & tradable for c in conditions]) \
+        if conditions else np.zeros((len(df), 0), dtype=bool)
+    group, rows = np.nonzero(masks.T)   # grouped by condition, in date order within each
+    long = np.array([determine_direction(c) == 'long' for c in conditions], dtype=bool)[group]
+
+    move_1d = fwd[rows, 0] * 100
+    hit_1d = (fwd[rows, 0] > 0) == long
+    signals = pd.DataFrame({
+        'group': group,
+        'hit_1d': hit_1d,
+        'hit_5d': ((fwd[rows, 1] > 0) == long) & ~np.isnan(fwd[rows, 1]),
+        'hit_20d': ((fwd[rows, 2] > 0) == long) & ~np.isnan(fwd[rows, 2]),
+        'win': np.where(hit_1d, move_1d, np.nan),
+        'loss': np.where(hit_1d, np.nan, move_1d),
+        'ret': move_1d / 100,
+    })
+    grouped = signals.groupby('group')
+    stats = grouped.agg(total_signals=('hit_1d', 'size'), hit_rate_1d=('hit_1d', 'mean'),
+                        hit_rate_5d=('hit_5d', 'mean'), hit_rate_20d=('hit_20d', 'mean'),
+                        avg_win=('win', 'mean'), avg_loss=('loss', 'mean'), total_win=('win', 'sum'),
+                        total_loss=('loss', 'sum'), ret_mean=('ret', 'mean'))
+    stats['ret_std'] = grouped['ret'].std(ddof=0)
+    cumulative = grouped['ret'].cumsum()
+    stats['max_drawdown'] = (cumulative.groupby(group).cummax() - cumulative).groupby(group).max()
+    stats = stats.reindex(range(len(conditions)))
+
+    stats['false_positive_rate'] = 1 - stats['hit_rate_1d']
+    stats['false_negative_rate'] = 0.0  # Would need different analysis
+    total_loss = stats['total_loss'].abs()
+    stats['profit_factor'] = (stats['total_win'] / total_loss).where(total_loss > 0, 0.0)
+    # Weighted: 40% hit rate, 30% profit factor (capped at 3.0), 30% consistency
+    stats['signal_quality_score'] = (stats['hit_rate_1d'] * 40 + (stats['profit_factor'] / 3.0).clip(upper=1.0) * 30
+                                     + (1 - (stats['hit_rate_5d'] - stats['hit_rate_1d']).abs()) * 30)
+    sharpe = stats['ret_mean'] / stats['ret_std'] * np.sqrt(252)
+    stats['sharpe_ratio'] = sharpe.where((stats['total_signals'] > 1) & (stats['ret_std'] > 0), 0.0)
+
+    stats = stats[METRICS].fillna(0.0)
+    stats['total_signals'] = stats['total_signals'].astype(int)
+    stats.index = pd.Index(conditions, name='condition')
+    return stats
+
+
+def backtest_alert(symbol: str, condition: str, period: str = '1y',
+                   df: Optional[pd.DataFrame] = None) -> BacktestResults:
+    """
+    Backtest an alert condition on historical data (df: an add_indicators frame to reuse)
+    """
+    # Fetch data with indicators
+    if df is None:
+        df = fetch_data_with_indicators(symbol, period)
+
+    metrics = condition_stats(df, [condition]).iloc[0]
     direction = determine_direction(condition)
-    
-    # Find all dates where condition triggered
+    expected_positive = (direction == 'long')
+
+    hits = df[condition_mask(df, condition) & df['fwd_return_1d'].notna()]
     signals = []
-    
-    for idx, row in df.iterrows():
-        if evaluate_condition(row, indicator, operator, threshold):
-            # Check if we have forward return data
-            if pd.notna(row['fwd_return_1d']):
-                # Determine if signal was successful
-                expected_positive = (direction == 'long')
-                
-                hit_1d = (row['fwd_return_1d'] > 0) == expected_positive
-                hit_5d = (row['fwd_return_5d'] > 0) == expected_positive if pd.notna(row['fwd_return_5d']) else None
-                hit_20d = (row['fwd_return_20d'] > 0) == expected_positive if pd.notna(row['fwd_return_20d']) else None
-                
-                signal = AlertSignal(
-                    date=idx.strftime('%Y-%m-%d'),
-                    price=float(row['Close']),
-                    condition=condition,
-                    direction=direction,
-                    actual_move_1d=float(row['fwd_return_1d']) * 100,
-                    actual_move_5d=float(row['fwd_return_5d']) * 100 if pd.notna(row['fwd_return_5d']) else 0,
-                    actual_move_20d=float(row['fwd_return_20d']) * 100 if pd.notna(row['fwd_return_20d']) else 0,
-                    hit_1d=hit_1d,
-                    hit_5d=hit_5d if hit_5d is not None else False,
-                    hit_20d=hit_20d if hit_20d is not None else False
-                )
-                signals.append(signal)
-    
-    if len(signals) == 0:
-        return BacktestResults(
-            symbol=symbol,
+    for date, price, fwd_1d, fwd_5d, fwd_20d in zip(hits.index, hits['Close'], hits['fwd_return_1d'],
+                                                     hits['fwd_return_5d'], hits['fwd_return_20d']):
+        signals.append(AlertSignal(
+            date=date.strftime('%Y-%m-%d'),
+            price=float(price),
             condition=condition,
-            total_signals=0,
-            hit_rate_1d=0.0,
-            hit_rate_5d=0.0,
-            hit_rate_20d=0.0,
-            false_positive_rate=0.0,
-            false_negative_rate=0.0,
-            avg_win=0.0,
-            avg_loss=0.0,
-            profit_factor=0.0,
-            signal_quality_score=0.0,
-            sharpe_ratio=0.0,
-            max_drawdown=0.0,
-            signals=[]
-        )
-    
-    # Calculate metrics
-    total_signals = len(signals)
-    hit_rate_1d = sum(s.hit_1d for s in signals) / total_signals
-    hit_rate_5d = sum(s.hit_5d for s in signals) / total_signals
-    hit_rate_20d = sum(s.hit_20d for s in signals) / total_signals
-    
-    # False positive: signal fired but wrong direction
-    # False negative: should have fired but didn't (harder to measure)
-    false_positive_rate = 1 - hit_rate_1d
-    false_negative_rate = 0.0  # Would need different analysis
-    
-    # Win/loss analysis
-    wins = [s.actual_move_1d for s in signals if s.hit_1d]
-    losses = [s.actual_move_1d for s in signals if not s.hit_1d]
-    
-    avg_win = np.mean(wins) if wins else 0.0
-    avg_loss = np.mean(losses) if losses else 0.0
-    
-    # Profit factor: (sum of wins) / (abs(sum of losses))
-    total_win = sum(wins) if wins else 0.0
-    total_loss = abs(sum(losses)) if losses else 0.0
-    profit_factor = total_win / total_loss if total_loss > 0 else 0.0
-    
-    # Signal quality score (0-100)
-    # Weighted: 40% hit rate, 30% profit factor, 30% consistency
-    hit_rate_score = hit_rate_1d * 40
-    pf_score = min(profit_factor / 3.0, 1.0) * 30  # Cap at 3.0 for scoring
-    consistency_score = (1 - abs(hit_rate_5d - hit_rate_1d)) * 30
-    signal_quality_score = hit_rate_score + pf_score + consistency_score
-    
-    # Portfolio metrics
-    returns = [s.actual_move_1d / 100 for s in signals]
-    sharpe_ratio = (np.mean(returns) / np.std(returns) * np.sqrt(252)) if len(returns) > 1 and np.std(returns) > 0 else 0.0
-    
-    # Max drawdown
-    cumulative = np.cumsum(returns)
-    running_max = np.maximum.accumulate(cumulative)
-    drawdown = cumulative - running_max
-    max_drawdown = abs(np.min(drawdown)) if len(drawdown) > 0 else 0.0
-    
+            direction=direction,
+            actual_move_1d=float(fwd_1d) * 100,
+            actual_move_5d=float(fwd_5d) * 100 if pd.notna(fwd_5d) else 0,
+            actual_move_20d=float(fwd_20d) * 100 if pd.notna(fwd_20d) else 0,
+            hit_1d=bool((fwd_1d > 0) == expected_positive),
+            hit_5d=bool(pd.notna(fwd_5d) and (fwd_5d > 0) == expected_positive),
+            hit_20d=bool(pd.notna(fwd_20d) and (fwd_20d > 0) == expected_positive)
+        ))
+
     return BacktestResults(
         symbol=symbol,
         condition=condition,
-        total_signals=total_signals,
-        hit_rate_1d=hit_rate_1d,
-        hit_rate_5d=hit_rate_5d,
-        hit_rate_20d=hit_rate_20d,
-        false_positive_rate=false_positive_rate,
-        false_negative_rate=false_negative_rate,
-        avg_win=avg_win,
-        avg_loss=avg_loss,
-        profit_factor=profit_factor,
-        signal_quality_score=signal_quality_score,
-        sharpe_ratio=sharpe_ratio,
-        max_drawdown=max_drawdown,
-        signals=signals
+        signals=signals,
+        total_signals=int(metrics['total_signals']),
+        **{name: float(metrics[name]) for name in METRICS[1:]}
     )
 
 
-def signal_quality_analysis(symbol: str, period: str = '1y') -> Dict:
+def _quality_ranking(stats: pd.DataFrame) -> List[Dict]:
+    """signal_quality_analysis's top_conditions: conditions with signals, best quality first"""
+    stats = stats[stats['total_signals'] > 0].sort_values('signal_quality_score', ascending=False, kind='stable')
+    return [{
+        'condition': condition,
+        'signals': int(row['total_signals']),
+        'hit_rate_1d': float(row['hit_rate_1d']),
+        'profit_factor': float(row['profit_factor']),
+        'quality_score': float(row['signal_quality_score']),
+        'sharpe': float(row['sharpe_ratio'])
+    } for condition, row in stats.iterrows()]
+
+
+def _valid_conditions(df: pd.DataFrame, conditions: List[str]) -> List[str]:
+    """The conditions that can be evaluated on df (the others are skipped, as before)"""
+    valid = []
+    for condition in conditions:
+        try:
+            condition_mask(df, condition)
+            determine_direction(condition)
+        except Exception:
+            continue
+        valid.append(condition)
+    return valid
+
+
+def signal_quality_analysis(symbol: str, period: str = '1y', conditions: Optional[List[str]] = None) -> Dict:
     """
     Test multiple common alert conditions and rank by quality
     """
-    common_conditions = [
-        "rsi<30",
-        "rsi>70",
-        "rsi<25",
-        "rsi>75",
-        "macd>macd_signal",
-        "macd<macd_signal",
-        "close<bb_lower",
-        "close>bb_upper",
-        "volume_ratio>2",
-        "volume_ratio>3",
-    ]
-    
-    results = []
-    
-    for condition in common_conditions:
-        try:
-            backtest = backtest_alert(symbol, condition, period)
-            if backtest.total_signals > 0:
-                results.append({
-                    'condition': condition,
-                    'signals': backtest.total_signals,
-                    'hit_rate_1d': backtest.hit_rate_1d,
-                    'profit_factor': backtest.profit_factor,
-                    'quality_score': backtest.signal_quality_score,
-                    'sharpe': backtest.sharpe_ratio
-                })
-        except Exception as e:
-            continue
-    
-    # Sort by quality score
-    results.sort(key=lambda x: x['quality_score'], reverse=True)
-    
+    conditions = list(conditions or COMMON_CONDITIONS)
+    try:
+        df = fetch_data_with_indicators(symbol, period)
+        results = _quality_ranking(condition_stats(df, _valid_conditions(df, conditions)))
+    except Exception:
+        results = []
+
     return {
         'symbol': symbol,
         'period': period,
-        'conditions_tested': len(common_conditions),
+        'conditions_tested': len(conditions),
         'conditions_with_signals': len(results),
         'top_conditions': results
     }
 
 
+def _scan_symbol(symbol: str, period: str, conditions: List[str]) -> pd.DataFrame:
+    df = fetch_data_with_indicators(symbol, period)
+    stats = condition_stats(df, _valid_conditions(df, conditions)).reset_index()
+    stats.insert(0, 'symbol', symbol)
+    return stats
+
+
+def scan_conditions(symbols: List[str], conditions: Optional[List[str]] = None, period: str = '1y',
+                    workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Backtest every condition on every symbol: one row per (symbol, condition) with the
+    condition_stats metrics, in symbol then condition order. Symbols are fetched and
+    scored on a thread pool (the download dominates); ones whose data cannot be fetched
+    are reported on stderr and left out.
+    """
+    conditions = list(conditions or COMMON_CONDITIONS)
+    workers = min(workers or min(32, (os.cpu_count() or 1) * 4), len(symbols)) if symbols else 0
+
+    def scan(symbol):
+        try:
+            return _scan_symbol(symbol, period, conditions)
+        except Exception as e:
+            print(f"Warning: {symbol}: {e}", file=sys.stderr)
+            return None
+
+    if workers <= 1:
+        frames = [scan(symbol) for symbol in symbols]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(scan, symbols))
+
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        return pd.DataFrame(columns=['symbol', 'condition'] + METRICS)
+    return pd.concat(frames, ignore_index=True)
+
+
 def alert_stats_summary(symbol: str, period: str = '1y') -> Dict:
     """
     Summary statistics for alert potential on a symbol
@@ -414,11 +480,13 @@ def main():
         print("  python cli.py alert-backtest SYMBOL --condition 'CONDITION' [--period PERIOD]")
         print("  python cli.py signal-quality SYMBOL [--period PERIOD]")
         print("  python cli.py alert-potential SYMBOL [--period PERIOD]")
+        print("  python cli.py signal-scan SYMBOL[,SYMBOL...] [--conditions 'C1;C2'] [--period PERIOD] [--workers N]")
         print()
         print("Examples:")
         print("  python cli.py alert-backtest AAPL --condition 'rsi<30' --period 1y")
         print("  python cli.py signal-quality TSLA --period 2y")
         print("  python cli.py alert-potential NVDA")
+        print("  python cli.py signal-scan AAPL,MSFT,NVDA --conditions 'rsi<30;macd>macd_signal'")
         sys.exit(1)
     
     command = sys.argv[1]
@@ -537,6 +605,42 @@ def main():
             
             print("\n" + json.dumps(stats, indent=2))
         
+        elif command == 'signal-scan':
+            if len(sys.argv) < 3:
+                print("Error: SYMBOL required")
+                sys.exit(1)
+
+            symbols = [s.strip().upper() for s in sys.argv[2].split(',') if s.strip()]
+            conditions = None
+            period = '1y'
+            workers = None
+
+            i = 3
+            while i < len(sys.argv):
+                if sys.argv[i] == '--conditions' and i + 1 < len(sys.argv):
+                    conditions = [c.strip() for c in sys.argv[i + 1].split(';') if c.strip()]
+                    i += 2
+                elif sys.argv[i] == '--period' and i + 1 < len(sys.argv):
+                    period = sys.argv[i + 1]
+                    i += 2
+                elif sys.argv[i] == '--workers' and i + 1 < len(sys.argv):
+                    workers = int(sys.argv[i + 1])
+                    i += 2
+                else:
+                    i += 1
+
+            stats = scan_conditions(symbols, conditions, period, workers)
+            stats = stats[stats['total_signals'] > 0].sort_values('signal_quality_score', ascending=False)
+
+            print(f"\n🔍 Signal Scan: {len(symbols)} symbols")
+            print(f"Period: {period}")
+            print(f"\n🏆 Top Symbol/Condition Pairs:")
+            for row in stats.head(20).itertuples():
+                print(f"  {row.symbol:<6} {row.condition:<20} quality {row.signal_quality_score:5.1f}  "
+                      f"hit {row.hit_rate_1d:.0%}  PF {row.profit_factor:.2f}  signals {row.total_signals}")
+
+            print("\n" + json.dumps(stats.to_dict('records'), indent=2, default=float))
+
         else:
             print(f"Unknown command: {command}")
             sys.exit(1)
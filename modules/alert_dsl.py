@@ -7,365 +7,627 @@ Supports conditions like:
 - sma(20) crosses_above sma(50)
 - change_pct(5d) > 10
 - macd_signal == "bullish" OR rsi < 25
+- price > bb_upper() OR (rsi < 30 AND volume > 5M)
 
 Grammar:
-  expression := comparison (logical_op comparison)*
-  comparison := indicator operator value
-  indicator  := simple_indicator | function_indicator | cross_indicator
+  expression := conjunction (OR conjunction)*
+  conjunction:= condition (AND condition)*
+  condition  := "(" expression ")" | operand (operator | cross_op) operand
+  operand    := indicator ["(" [param ("," param)*] ")"] | value | "string"
   operator   := > | < | >= | <= | == | !=
-  logical_op := AND | OR
+  cross_op   := crosses_above | crosses_below
   value      := number [suffix]
   suffix     := M | B | K | % | d
+
+COMPILED EVALUATION:
+  compile_expression() parses a DSL string once into a tree of frozen nodes
+  (cached per string). Indicator parameters are filled in with their
+  defaults, so `rsi` and `rsi(14)` are the same node. A tree is evaluated
+  over a panel, {field: DataFrame of dates x tickers}, every node as one
+  vectorised pandas operation across all tickers; node values are memoised
+  per evaluation, so a sub-expression that appears several times (rsi in
+  `rsi < 25 OR rsi > 75`, the sma(20) inside bb_upper and bb_lower) is
+  computed once. Conditions give boolean panels; a ticker's alert is its
+  value at its last bar.
+
+  The panel's dates are the union of every ticker's sessions, so a ticker
+  has empty rows where it has no bar (listed later, a missing session).
+  Evaluation first moves each ticker's own bars, in order, to the bottom
+  rows of its column; rolling, ewm, diff and shift then run over the
+  ticker's own bars exactly as on its own history, and mask() scatters the
+  results back to the panel's dates.
+
+  scan_universe() loads one aligned panel for the whole universe from the
+  shared price store (only the history the expression needs) instead of
+  downloading 3 months of bars per ticker; tickers the store does not have
+  are downloaded into it first. DSLParser.evaluate() runs the same compiled
+  tree on one ticker's frame.
 """
 
+import functools
+import json
 import re
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 
+try:
+    from modules.price_store import FIELDS, get_price_store
+except ImportError:
+    from price_store import FIELDS, get_price_store
+
+SP500_CACHE = Path(__file__).resolve().parent.parent / "data" / "sp500_tickers.json"
+SP500_CACHE_DAYS = 7
+
+DEFAULT_HISTORY_DAYS = 92  # the 3 months of bars evaluate() downloads
+
+
+def parse_value(value_str: str) -> float:
+    """Parse value with suffix (M=million, B=billion, K=thousand, %=percent)."""
+    value_str = value_str.strip()
+
+    if value_str.endswith('M'):
+        return float(value_str[:-1]) * 1_000_000
+    elif value_str.endswith('B'):
+        return float(value_str[:-1]) * 1_000_000_000
+    elif value_str.endswith('K'):
+        return float(value_str[:-1]) * 1_000
+    elif value_str.endswith('%'):
+        return float(value_str[:-1])
+    else:
+        return float(value_str)
+
+
+def parse_period(period_str: str) -> int:
+    """Parse period string like '5d', '20d', etc."""
+    if period_str.endswith('d'):
+        return int(period_str[:-1])
+    return int(period_str)
+
+
+# ============================================================================
+# SYNTAX TREE
+# ============================================================================
+
+@dataclass(frozen=True)
+class Number:
+    value: float
+    text: str = field(default='', compare=False)
+
+    def label(self) -> str:
+        return self.text or f"{self.value:g}"
+
+
+@dataclass(frozen=True)
+class Text:
+    value: str
+
+    def label(self) -> str:
+        return f'"{self.value}"'
+
+
+@dataclass(frozen=True)
+class Indicator:
+    name: str
+    params: Tuple = ()
+    text: str = field(default='', compare=False)
+
+    def label(self) -> str:
+        return self.text or self.name
+
+
+@dataclass(frozen=True)
+class Compare:
+    op: str
+    left: Any
+    right: Any
+
+
+@dataclass(frozen=True)
+class Cross:
+    direction: str   # 'above' or 'below'
+    left: Any
+    right: Any
+
+
+@dataclass(frozen=True)
+class Logical:
+    op: str          # 'AND' or 'OR'
+    terms: Tuple
+
+
+Node = Union[Number, Text, Indicator, Compare, Cross, Logical]
+
+
+# ============================================================================
+# INDICATORS (vectorised over the ticker columns of a panel)
+# ============================================================================
+
+Frame = Union[pd.DataFrame, float, str]
+
+
+def _rsi(ev: "Evaluation", period: int) -> pd.DataFrame:
+    """Rolling-mean RSI; defined once a ticker has `period` bars, as on its own history"""
+    delta = ev.delta()
+    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rsi = 100 - (100 / (1 + gain / loss))
+    return rsi.where(ev.bars() >= period)
+
+
+def _macd(ev: "Evaluation", fast: int, slow: int) -> pd.DataFrame:
+    return ev(Indicator('ema', (fast,))) - ev(Indicator('ema', (slow,)))
+
+
+def _macd_signal(ev: "Evaluation", fast: int, slow: int, signal: int) -> pd.DataFrame:
+    macd = ev(Indicator('macd', (fast, slow)))
+    line = macd.ewm(span=signal).mean()
+    labels = np.where(macd.to_numpy() > line.to_numpy(), 'bullish', 'bearish').astype(object)
+    labels[macd.isna().to_numpy()] = None
+    return pd.DataFrame(labels, index=macd.index, columns=macd.columns)
+
+
+def _rolling_std(ev: "Evaluation", period: int) -> pd.DataFrame:
+    return ev.shared(('std', period), lambda: ev.field('Close').rolling(window=period).std())
+
+
+def _atr(ev: "Evaluation", period: int) -> pd.DataFrame:
+    high, low, prev_close = ev.field('High'), ev.field('Low'), ev.field('Close').shift()
+    true_range = np.fmax(np.fmax(high - low, (high - prev_close).abs()), (low - prev_close).abs())
+    return true_range.rolling(window=period).mean()
+
+
+def _obv(ev: "Evaluation") -> pd.DataFrame:
+    return (np.sign(ev.delta()) * ev.field('Volume')).fillna(0).cumsum()
+
+
+# name -> (function(evaluation, *params), default params, price fields used)
+INDICATORS: Dict[str, Tuple[Callable, Tuple, Tuple[str, ...]]] = {
+    'price': (lambda ev: ev.field('Close'), (), ('Close',)),
+    'volume': (lambda ev: ev.field('Volume'), (), ('Volume',)),
+    'rsi': (_rsi, (14,), ('Close',)),
+    'macd': (_macd, (12, 26), ('Close',)),
+    'macd_signal': (_macd_signal, (12, 26, 9), ('Close',)),
+    'sma': (lambda ev, period: ev.field('Close').rolling(window=period).mean(), (20,), ('Close',)),
+    'ema': (lambda ev, period: ev.field('Close').ewm(span=period).mean(), (20,), ('Close',)),
+    'change_pct': (lambda ev, period: (ev.field('Close') - ev.field('Close').shift(period))
+                   / ev.field('Close').shift(period) * 100, (1,), ('Close',)),
+    'bb_upper': (lambda ev, period, std_dev: ev(Indicator('sma', (period,))) + _rolling_std(ev, period) * std_dev,
+                 (20, 2), ('Close',)),
+    'bb_lower': (lambda ev, period, std_dev: ev(Indicator('sma', (period,))) - _rolling_std(ev, period) * std_dev,
+                 (20, 2), ('Close',)),
+    'atr': (_atr, (14,), ('High', 'Low', 'Close')),
+    'obv': (_obv, (), ('Close', 'Volume')),
+}
+
+OPERATORS = {
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+}
+
+
+# ============================================================================
+# COMPILER
+# ============================================================================
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<number>-?\d+(?:\.\d+)?[MBK%d]?(?![\w.]))
+    | (?P<string>"[^"]*"|'[^']*')
+    | (?P<logical>&&|\|\||\b(?:AND|OR|and|or)\b)
+    | (?P<op>>=|<=|==|!=|>|<)
+    | (?P<name>[A-Za-z_]\w*)
+    | (?P<punct>[(),])
+    )""", re.VERBOSE)
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str, int]]:
+    tokens, pos = [], 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = _TOKEN.match(expression, pos)
+        if match is None:
+            raise ValueError(f"Invalid expression: unexpected {expression[pos:].strip()[:20]!r} at {pos}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'logical':
+            value = {'&&': 'AND', '||': 'OR'}.get(value, value.upper())
+        tokens.append((kind, value, match.start(kind)))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive descent over the token list; one instance per expression"""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.pos = 0
+
+    def peek(self, kind: str, value: str = None) -> bool:
+        if self.pos >= len(self.tokens):
+            return False
+        token = self.tokens[self.pos]
+        return token[0] == kind and (value is None or token[1] == value)
+
+    def take(self, kind: str, value: str = None) -> str:
+        if not self.peek(kind, value):
+            found = repr(self.tokens[self.pos][1]) if self.pos < len(self.tokens) else 'end of expression'
+            raise ValueError(f"Invalid expression {self.expression!r}: expected {value or kind}, found {found}")
+        self.pos += 1
+        return self.tokens[self.pos - 1][1]
+
+    def parse(self) -> Node:
+        tree = self.expression_()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"Invalid expression {self.expression!r}: unexpected {self.tokens[self.pos][1]!r}")
+        return tree
+
+    def expression_(self) -> Node:
+        return self.logical('OR', self.conjunction)
+
+    def conjunction(self) -> Node:
+        return self.logical('AND', self.condition)
+
+    def logical(self, op: str, term: Callable[[], Node]) -> Node:
+        terms = [term()]
+        while self.peek('logical', op):
+            self.pos += 1
+            terms.append(term())
+        return terms[0] if len(terms) == 1 else Logical(op, tuple(terms))
+
+    def condition(self) -> Node:
+        if self.peek('punct', '('):
+            self.pos += 1
+            tree = self.expression_()
+            self.take('punct', ')')
+            return tree
+        left = self.operand()
+        if self.peek('name', 'crosses_above') or self.peek('name', 'crosses_below'):
+            direction = self.take('name').split('_')[1]
+            return Cross(direction, left, self.operand())
+        op = self.take('op')
+        return Compare(op, left, self.operand())
+
+    def operand(self) -> Node:
+        if self.peek('number'):
+            text = self.take('number')
+            return Number(parse_value(text.rstrip('d')), text)
+        if self.peek('string'):
+            return Text(self.take('string')[1:-1])
+        start = self.tokens[self.pos][2] if self.pos < len(self.tokens) else len(self.expression)
+        name = self.take('name')
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {name}")
+        params = []
+        if self.peek('punct', '('):
+            self.pos += 1
+            while not self.peek('punct', ')'):
+                if params:
+                    self.take('punct', ',')
+                value = self.take('number')
+                params.append(parse_period(value) if value.endswith('d') else parse_value(value))
+            self.take('punct', ')')
+        defaults = INDICATORS[name][1]
+        if len(params) > len(defaults):
+            raise ValueError(f"{name} takes at most {len(defaults)} parameters, got {len(params)}")
+        params = tuple(int(p) if float(p).is_integer() else p for p in params) + defaults[len(params):]
+        end = self.tokens[self.pos - 1][2] + len(self.tokens[self.pos - 1][1])
+        return Indicator(name, params, self.expression[start:end])
+
+
+class CompiledExpression:
+    """A parsed DSL expression, evaluated as boolean panels over dates x tickers"""
+
+    def __init__(self, expression: str, tree: Node):
+        if not isinstance(tree, (Compare, Cross, Logical)):
+            raise ValueError(f"Invalid expression {expression!r}: expected a comparison")
+        self.expression = expression
+        self.tree = tree
+        nodes = list(_walk(tree))
+        self.indicators = list(dict.fromkeys(n for n in nodes if isinstance(n, Indicator)))
+        fields = {f for n in self.indicators for f in INDICATORS[n.name][2]}
+        self.fields = [f for f in ('Open', 'High', 'Low', 'Close', 'Volume') if f in fields or f == 'Close']
+        # bars of history the slowest indicator needs (plus the previous bar for crosses)
+        self.lookback = max([sum(int(p) for p in n.params) + 1 for n in self.indicators] or [1]) + \
+            any(isinstance(n, Cross) for n in nodes)
+
+    def __repr__(self):
+        return f"CompiledExpression({self.expression!r})"
+
+    def evaluate(self, panel: Dict[str, pd.DataFrame], present: np.ndarray = None) -> "Evaluation":
+        """Evaluation of the tree over panel ({field: dates x tickers}); node values are kept for explain().
+
+        present: which panel cells are bars of the ticker (default: cells where any field has a value)
+        """
+        evaluation = Evaluation(panel, present)
+        evaluation(self.tree)
+        return evaluation
+
+    def mask(self, panel: Dict[str, pd.DataFrame], present: np.ndarray = None) -> pd.DataFrame:
+        """Boolean dates x tickers panel: True where the condition holds (False where a ticker has no bar)"""
+        evaluation = self.evaluate(panel, present)
+        return evaluation.by_date(evaluation.condition(self.tree))
+
+    def explain(self, evaluation: "Evaluation", row: int, column: int, node: Node = None) -> str:
+        """The condition at one panel cell in words, with the indicator values it compared"""
+        node = self.tree if node is None else node
+        if isinstance(node, Logical):
+            parts = [self.explain(evaluation, row, column, t) for t in node.terms]
+            parts = [f"({p})" if isinstance(t, Logical) else p for p, t in zip(parts, node.terms)]
+            return f"{node.op} condition: {f' {node.op} '.join(parts)}"
+        if isinstance(node, Cross):
+            left, right = node.left.label(), node.right.label()
+            values = [_format(evaluation.at(side, r, column)) for r in (row - 1, row) for side in (node.left, node.right)]
+            return (f"{left} crosses {node.direction} {right}: "
+                    f"prev({values[0]} vs {values[1]}), current({values[2]} vs {values[3]})")
+        left = f"{node.left.label()}={_format(evaluation.at(node.left, row, column))}" \
+            if isinstance(node.left, Indicator) else node.left.label()
+        right = f"{node.right.label()}={_format(evaluation.at(node.right, row, column))}" \
+            if isinstance(node.right, Indicator) else node.right.label()
+        return f"{left} {node.op} {right}"
+
+
+def _walk(node: Node):
+    yield node
+    for child in (node.terms if isinstance(node, Logical) else
+                  (node.left, node.right) if isinstance(node, (Compare, Cross)) else ()):
+        yield from _walk(child)
+
+
+def _format(value) -> str:
+    if value is None or isinstance(value, str):
+        return str(value)
+    return f"{value:.2f}"
+
+
+@functools.lru_cache(maxsize=256)
+def compile_expression(expression: str) -> CompiledExpression:
+    """Parse a DSL string into a CompiledExpression (cached per string). Raises ValueError."""
+    return CompiledExpression(expression, _Parser(expression).parse())
+
+
+class Evaluation:
+    """Node values over one panel, each computed once.
+
+    Values are in bar rows: each ticker's bars moved, in order, to the bottom
+    rows of its column (see the module docstring), so row -1 is every ticker's
+    last bar and the row above it is that ticker's previous bar.
+    """
+
+    def __init__(self, panel: Dict[str, pd.DataFrame], present: np.ndarray = None):
+        close = panel['Close']
+        self.index = close.index
+        self.columns = close.columns
+        if present is None:
+            present = np.logical_or.reduce([frame.notna().to_numpy() for frame in panel.values()])
+        self.present = np.asarray(present, dtype=bool)
+        self.order = None if self.present.all() else np.argsort(self.present, axis=0, kind='stable')
+        self.panel = {f: self._to_bars(frame) for f, frame in panel.items()}
+        self._values: Dict[Any, Frame] = {}
+        self._arrays: Dict[Any, np.ndarray] = {}
+
+    def _to_bars(self, frame: pd.DataFrame) -> pd.DataFrame:
+        if self.order is None:
+            return frame
+        return pd.DataFrame(np.take_along_axis(frame.to_numpy(), self.order, axis=0),
+                            index=frame.index, columns=frame.columns)
+
+    def by_date(self, mask: pd.DataFrame) -> pd.DataFrame:
+        """A boolean frame in bar rows scattered back to the panel's dates (False where there is no bar)"""
+        if self.order is None:
+            return mask
+        values = np.zeros(mask.shape, dtype=bool)
+        np.put_along_axis(values, self.order, mask.to_numpy(dtype=bool), axis=0)
+        values &= self.present
+        return pd.DataFrame(values, index=self.index, columns=self.columns)
+
+    def last_rows(self) -> np.ndarray:
+        """Bar row of each ticker's last bar (-1 for tickers with no bars)"""
+        return np.where(self.present.any(axis=0), len(self.index) - 1, -1)
+
+    def field(self, name: str) -> pd.DataFrame:
+        if name not in self.panel:
+            raise ValueError(f"No {name} data for this expression")
+        return self.panel[name]
+
+    def shared(self, key, compute: Callable[[], Frame]) -> Frame:
+        """compute() once per key for this panel"""
+        if key not in self._values:
+            self._values[key] = compute()
+        return self._values[key]
+
+    def delta(self) -> pd.DataFrame:
+        return self.shared(('delta',), lambda: self.field('Close').diff())
+
+    def bars(self) -> pd.DataFrame:
+        """Number of bars each ticker has up to each date"""
+        return self.shared(('bars',), lambda: self.field('Close').notna().cumsum())
+
+    def __call__(self, node: Node) -> Frame:
+        return self.shared(node, lambda: self._compute(node))
+
+    def _compute(self, node: Node) -> Frame:
+        if isinstance(node, (Number, Text)):
+            return node.value
+        if isinstance(node, Indicator):
+            return INDICATORS[node.name][0](self, *node.params)
+        if isinstance(node, Compare):
+            return OPERATORS[node.op](self(node.left), self(node.right))
+        if isinstance(node, Cross):
+            left, right = self(node.left), self(node.right)
+            prev_left, prev_right = _shift(left), _shift(right)
+            if node.direction == 'above':
+                return (prev_left <= prev_right) & (left > right)
+            return (prev_left >= prev_right) & (left < right)
+        masks = [self.condition(t) for t in node.terms]
+        return functools.reduce(lambda a, b: a & b if node.op == 'AND' else a | b, masks)
+
+    def condition(self, node: Node) -> pd.DataFrame:
+        """Boolean panel of a condition node in bar rows (constant conditions broadcast)"""
+        value = self(node)
+        if not isinstance(value, pd.DataFrame):
+            value = pd.DataFrame(bool(value), index=self.index, columns=self.columns)
+        return value.fillna(False).astype(bool)
+
+    def at(self, node: Node, row: int, column: int):
+        """Value of an operand node at one bar row (None before the first row)"""
+        value = self(node)
+        if not isinstance(value, pd.DataFrame):
+            return value
+        if row < 0:
+            return None
+        if node not in self._arrays:
+            self._arrays[node] = value.to_numpy()
+        cell = self._arrays[node][row, column]
+        return cell if isinstance(cell, str) or cell is None else float(cell)
+
+
+def _shift(value: Frame) -> Frame:
+    return value.shift() if isinstance(value, pd.DataFrame) else value
+
+
+def load_panel(tickers: List[str], fields: List[str], start=None, end=None, store=None) -> Dict[str, pd.DataFrame]:
+    """{field: dates x tickers} for start <= date < end from the shared price store"""
+    store = store or get_price_store()
+    frame = store.load(tickers, start, end, fields=fields)
+    return {f: frame[f] for f in fields}
+
 
 class DSLParser:
     """Parser for alert DSL expressions."""
-    
+
     def __init__(self):
-        self.indicators = {
-            'price': self._get_price,
-            'volume': self._get_volume,
-            'rsi': self._get_rsi,
-            'macd': self._get_macd,
-            'macd_signal': self._get_macd_signal,
-            'sma': self._get_sma,
-            'ema': self._get_ema,
-            'change_pct': self._get_change_pct,
-            'bb_upper': self._get_bb_upper,
-            'bb_lower': self._get_bb_lower,
-            'atr': self._get_atr,
-            'obv': self._get_obv,
-        }
-        
-        self.operators = {
-            '>': lambda a, b: a > b,
-            '<': lambda a, b: a < b,
-            '>=': lambda a, b: a >= b,
-            '<=': lambda a, b: a <= b,
-            '==': lambda a, b: a == b,
-            '!=': lambda a, b: a != b,
-        }
-        
+        self.indicators = INDICATORS
+        self.operators = OPERATORS
+
     def parse_value(self, value_str: str) -> float:
         """Parse value with suffix (M=million, B=billion, K=thousand, %=percent)."""
-        value_str = value_str.strip()
-        
-        if value_str.endswith('M'):
-            return float(value_str[:-1]) * 1_000_000
-        elif value_str.endswith('B'):
-            return float(value_str[:-1]) * 1_000_000_000
-        elif value_str.endswith('K'):
-            return float(value_str[:-1]) * 1_000
-        elif value_str.endswith('%'):
-            return float(value_str[:-1])
-        else:
-            return float(value_str)
-    
+        return parse_value(value_str)
+
     def parse_period(self, period_str: str) -> int:
         """Parse period string like '5d', '20d', etc."""
-        if period_str.endswith('d'):
-            return int(period_str[:-1])
-        return int(period_str)
-    
+        return parse_period(period_str)
+
+    def compile(self, expression: str) -> CompiledExpression:
+        return compile_expression(expression)
+
     def evaluate(self, expression: str, ticker: str, data: Optional[pd.DataFrame] = None) -> Tuple[bool, str]:
         """
         Evaluate DSL expression for given ticker.
-        
+
         Returns:
             Tuple of (result: bool, explanation: str)
         """
         try:
+            compiled = compile_expression(expression)
+
             # Fetch data if not provided
             if data is None:
                 data = self._fetch_data(ticker)
-            
-            # Handle cross operators (e.g., sma(20) crosses_above sma(50))
-            if 'crosses_above' in expression or 'crosses_below' in expression:
-                return self._evaluate_cross(expression, ticker, data)
-            
-            # Split by logical operators
-            expression = expression.replace('&&', 'AND').replace('||', 'OR')
-            
-            if ' OR ' in expression:
-                parts = expression.split(' OR ')
-                results = []
-                explanations = []
-                for part in parts:
-                    result, explanation = self._evaluate_simple(part.strip(), ticker, data)
-                    results.append(result)
-                    explanations.append(explanation)
-                final_result = any(results)
-                return final_result, f"OR condition: {' OR '.join(explanations)}"
-            
-            if ' AND ' in expression:
-                parts = expression.split(' AND ')
-                results = []
-                explanations = []
-                for part in parts:
-                    result, explanation = self._evaluate_simple(part.strip(), ticker, data)
-                    results.append(result)
-                    explanations.append(explanation)
-                final_result = all(results)
-                return final_result, f"AND condition: {' AND '.join(explanations)}"
-            
-            # Simple expression
-            return self._evaluate_simple(expression, ticker, data)
-            
+
+            panel = {f: data[[f]].set_axis([ticker], axis=1) for f in compiled.fields if f in data}
+            evaluation = compiled.evaluate(panel, present=np.ones((len(data), 1), dtype=bool))
+            row = len(data) - 1
+            result = bool(evaluation.condition(compiled.tree).iat[row, 0])
+            return result, compiled.explain(evaluation, row, 0)
+
         except Exception as e:
             return False, f"Error: {str(e)}"
-    
-    def _evaluate_simple(self, expression: str, ticker: str, data: pd.DataFrame) -> Tuple[bool, str]:
-        """Evaluate a simple comparison expression."""
-        # Parse expression: indicator operator value
-        pattern = r'(\w+(?:\([^)]+\))?)\s*([><=!]+)\s*([0-9.]+[MBK%]?|"[^"]*")'
-        match = re.match(pattern, expression)
-        
-        if not match:
-            raise ValueError(f"Invalid expression: {expression}")
-        
-        indicator_expr, operator, value_str = match.groups()
-        
-        # Get indicator value
-        indicator_value = self._get_indicator_value(indicator_expr, ticker, data)
-        
-        # Parse target value
-        if value_str.startswith('"') and value_str.endswith('"'):
-            target_value = value_str.strip('"')
-        else:
-            target_value = self.parse_value(value_str)
-        
-        # Apply operator
-        if operator not in self.operators:
-            raise ValueError(f"Unknown operator: {operator}")
-        
-        result = self.operators[operator](indicator_value, target_value)
-        
-        explanation = f"{indicator_expr}={indicator_value:.2f} {operator} {target_value}"
-        return result, explanation
-    
-    def _evaluate_cross(self, expression: str, ticker: str, data: pd.DataFrame) -> Tuple[bool, str]:
-        """Evaluate cross expressions like sma(20) crosses_above sma(50)."""
-        if 'crosses_above' in expression:
-            parts = expression.split('crosses_above')
-            cross_type = 'above'
-        else:
-            parts = expression.split('crosses_below')
-            cross_type = 'below'
-        
-        indicator1_expr = parts[0].strip()
-        indicator2_expr = parts[1].strip()
-        
-        # Get indicator values for last 2 periods
-        indicator1_current = self._get_indicator_value(indicator1_expr, ticker, data)
-        indicator2_current = self._get_indicator_value(indicator2_expr, ticker, data)
-        
-        # Get previous values
-        indicator1_prev = self._get_indicator_value(indicator1_expr, ticker, data, offset=1)
-        indicator2_prev = self._get_indicator_value(indicator2_expr, ticker, data, offset=1)
-        
-        if cross_type == 'above':
-            result = (indicator1_prev <= indicator2_prev) and (indicator1_current > indicator2_current)
-        else:  # below
-            result = (indicator1_prev >= indicator2_prev) and (indicator1_current < indicator2_current)
-        
-        explanation = (
-            f"{indicator1_expr} crosses {cross_type} {indicator2_expr}: "
-            f"prev({indicator1_prev:.2f} vs {indicator2_prev:.2f}), "
-            f"current({indicator1_current:.2f} vs {indicator2_current:.2f})"
-        )
-        
-        return result, explanation
-    
-    def _get_indicator_value(self, indicator_expr: str, ticker: str, data: pd.DataFrame, offset: int = 0) -> float:
-        """Get indicator value from expression (handles functions with params)."""
-        # Check if it's a function call
-        func_match = re.match(r'(\w+)\(([^)]+)\)', indicator_expr)
-        
-        if func_match:
-            func_name, params_str = func_match.groups()
-            if func_name not in self.indicators:
-                raise ValueError(f"Unknown indicator: {func_name}")
-            
-            # Parse parameters
-            params = [p.strip() for p in params_str.split(',')]
-            
-            # Call indicator function
-            return self.indicators[func_name](data, params, offset)
-        else:
-            # Simple indicator without parameters
-            if indicator_expr not in self.indicators:
-                raise ValueError(f"Unknown indicator: {indicator_expr}")
-            
-            return self.indicators[indicator_expr](data, [], offset)
-    
+
     def _fetch_data(self, ticker: str, period: str = '3mo') -> pd.DataFrame:
         """Fetch historical data for ticker."""
         stock = yf.Ticker(ticker)
         data = stock.history(period=period)
-        
+
         if data.empty:
             raise ValueError(f"No data available for {ticker}")
-        
+
         return data
-    
-    # Indicator implementations
-    
-    def _get_price(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> float:
-        """Get current price."""
-        return float(data['Close'].iloc[-1 - offset])
-    
-    def _get_volume(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> float:
-        """Get current volume."""
-        return float(data['Volume'].iloc[-1 - offset])
-    
-    def _get_rsi(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> float:
-        """Calculate RSI (default period=14)."""
-        period = int(params[0]) if params else 14
-        
-        delta = data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return float(rsi.iloc[-1 - offset])
-    
-    def _get_macd(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> float:
-        """Calculate MACD line."""
-        fast = int(params[0]) if len(params) > 0 else 12
-        slow = int(params[1]) if len(params) > 1 else 26
-        
-        ema_fast = data['Close'].ewm(span=fast).mean()
-        ema_slow = data['Close'].ewm(span=slow).mean()
-        macd = ema_fast - ema_slow
-        
-        return float(macd.iloc[-1 - offset])
-    
-    def _get_macd_signal(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> str:
-        """Get MACD signal (bullish/bearish)."""
-        fast = int(params[0]) if len(params) > 0 else 12
-        slow = int(params[1]) if len(params) > 1 else 26
-        signal = int(params[2]) if len(params) > 2 else 9
-        
-        ema_fast = data['Close'].ewm(span=fast).mean()
-        ema_slow = data['Close'].ewm(span=slow).mean()
-        macd = ema_fast - ema_slow
-        macd_signal = macd.ewm(span=signal).mean()
-        
-        current_macd = float(macd.iloc[-1 - offset])
-        current_signal = float(macd_signal.iloc[-1 - offset])
-        
-        return "bullish" if current_macd > current_signal else "bearish"
-    
-    def _get_sma(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> float:
-        """Calculate Simple Moving Average."""
-        period = int(params[0]) if params else 20
-        sma = data['Close'].rolling(window=period).mean()
-        return float(sma.iloc[-1 - offset])
-    
-    def _get_ema(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> float:
-        """Calculate Exponential Moving Average."""
-        period = int(params[0]) if params else 20
-        ema = data['Close'].ewm(span=period).mean()
-        return float(ema.iloc[-1 - offset])
-    
-    def _get_change_pct(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> float:
-        """Calculate percentage change over period."""
-        period_str = params[0] if params else '1d'
-        period = self.parse_period(period_str)
-        
-        current_price = data['Close'].iloc[-1 - offset]
-        prev_price = data['Close'].iloc[-1 - offset - period]
-        
-        change_pct = ((current_price - prev_price) / prev_price) * 100
-        return float(change_pct)
-    
-    def _get_bb_upper(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> float:
-        """Calculate Bollinger Band upper line."""
-        period = int(params[0]) if len(params) > 0 else 20
-        std_dev = int(params[1]) if len(params) > 1 else 2
-        
-        sma = data['Close'].rolling(window=period).mean()
-        std = data['Close'].rolling(window=period).std()
-        upper = sma + (std * std_dev)
-        
-        return float(upper.iloc[-1 - offset])
-    
-    def _get_bb_lower(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> float:
-        """Calculate Bollinger Band lower line."""
-        period = int(params[0]) if len(params) > 0 else 20
-        std_dev = int(params[1]) if len(params) > 1 else 2
-        
-        sma = data['Close'].rolling(window=period).mean()
-        std = data['Close'].rolling(window=period).std()
-        lower = sma - (std * std_dev)
-        
-        return float(lower.iloc[-1 - offset])
-    
-    def _get_atr(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> float:
-        """Calculate Average True Range."""
-        period = int(params[0]) if params else 14
-        
-        high_low = data['High'] - data['Low']
-        high_close = np.abs(data['High'] - data['Close'].shift())
-        low_close = np.abs(data['Low'] - data['Close'].shift())
-        
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        atr = true_range.rolling(window=period).mean()
-        
-        return float(atr.iloc[-1 - offset])
-    
-    def _get_obv(self, data: pd.DataFrame, params: List[str], offset: int = 0) -> float:
-        """Calculate On-Balance Volume."""
-        obv = (np.sign(data['Close'].diff()) * data['Volume']).fillna(0).cumsum()
-        return float(obv.iloc[-1 - offset])
-
-
-def scan_universe(expression: str, universe: List[str]) -> List[Dict[str, Any]]:
+
+
+def scan_universe(expression: str, universe: List[str], store=None, refresh: bool = False) -> List[Dict[str, Any]]:
     """
     Scan a universe of tickers against an alert expression.
-    
+
+    The expression is compiled once and evaluated over one panel of the
+    universe's stored bars, each ticker over its own bars; each ticker is
+    judged at its last stored bar.
+
     Args:
         expression: DSL expression to evaluate
         universe: List of ticker symbols
-        
+        store: PriceStore to read (default: the shared store)
+        refresh: bring every ticker up to date first (tickers the store
+            lacks are always downloaded, except ones a recent refresh found
+            no bars for: those are retried only with refresh, and otherwise
+            reported as no data)
+
     Returns:
         List of dicts with ticker, result, and explanation
     """
-    parser = DSLParser()
+    timestamp = datetime.now().isoformat()
+    try:
+        compiled = compile_expression(expression)
+    except ValueError as e:
+        return [{'ticker': t, 'match': False, 'explanation': f"Error: {str(e)}", 'timestamp': timestamp}
+                for t in universe]
+
+    store = store or get_price_store()
+    if refresh:
+        missing = universe
+    else:
+        missing = [t for t in universe if t not in store]
+        skip = set(store.unavailable(missing))
+        missing = [t for t in missing if t not in skip]
+    if missing:
+        store.refresh(missing)
+
+    days = max(DEFAULT_HISTORY_DAYS, compiled.lookback * 7 // 5 + 14)
+    start = pd.Timestamp.now().normalize() - pd.Timedelta(days=days)
+    # every field is loaded so a stored bar counts as one even where the expression's fields are NaN
+    panel = load_panel(universe, list(FIELDS), start=start, store=store)
+
     results = []
-    
-    for ticker in universe:
-        try:
-            result, explanation = parser.evaluate(expression, ticker)
-            results.append({
-                'ticker': ticker,
-                'match': result,
-                'explanation': explanation,
-                'timestamp': datetime.now().isoformat()
-            })
-        except Exception as e:
-            results.append({
-                'ticker': ticker,
-                'match': False,
-                'explanation': f"Error: {str(e)}",
-                'timestamp': datetime.now().isoformat()
-            })
-    
+    try:
+        evaluation = compiled.evaluate(panel)
+        matches = evaluation.condition(compiled.tree).to_numpy()
+    except Exception as e:
+        return [{'ticker': t, 'match': False, 'explanation': f"Error: {str(e)}", 'timestamp': timestamp}
+                for t in universe]
+
+    for column, (ticker, row) in enumerate(zip(universe, evaluation.last_rows())):
+        if row < 0:
+            results.append({'ticker': ticker, 'match': False,
+                            'explanation': f"Error: No data available for {ticker}", 'timestamp': timestamp})
+            continue
+        results.append({
+            'ticker': ticker,
+            'match': bool(matches[row, column]),
+            'explanation': compiled.explain(evaluation, row, column),
+            'timestamp': timestamp
+        })
+
     return results
 
 
 def get_sp500_tickers() -> List[str]:
-    """Get S&P 500 ticker list from Wikipedia."""
+    """Get S&P 500 ticker list from Wikipedia (cached on disk for a week)."""
+    try:
+        cached = json.loads(SP500_CACHE.read_text())
+        if datetime.now() - datetime.fromisoformat(cached['fetched']) < timedelta(days=SP500_CACHE_DAYS):
+            return cached['tickers']
+    except (OSError, ValueError, KeyError):
+        pass
     try:
         url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
         tables = pd.read_html(url)
@@ -373,6 +635,11 @@ def get_sp500_tickers() -> List[str]:
         tickers = sp500_table['Symbol'].tolist()
         # Clean up tickers (remove dots for BRK.B -> BRK-B format)
         tickers = [t.replace('.', '-') for t in tickers]
+        try:
+            SP500_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            SP500_CACHE.write_text(json.dumps({'fetched': datetime.now().isoformat(), 'tickers': tickers}))
+        except OSError:
+            pass
         return tickers
     except Exception:
         # Fallback to common S&P 500 stocks
@@ -406,11 +673,12 @@ Supported Indicators:
   obv()                  - On-Balance Volume
 
 Operators:
-  > < >= <= == !=        - Comparison operators
+  > < >= <= == !=        - Comparison operators (either side may be an indicator)
 
 Logical Operators:
   AND                    - Both conditions must be true
   OR                     - At least one condition must be true
+  ( )                    - Grouping (AND binds tighter than OR)
 
 Cross Operators:
   crosses_above          - First indicator crosses above second
@@ -426,56 +694,58 @@ Value Suffixes:
 Examples:
   price > 200 AND rsi < 30
       Stock price above $200 and RSI below 30 (oversold)
-  
+
   sma(20) crosses_above sma(50)
       Golden cross pattern
-  
+
   volume > 10M AND change_pct(1d) > 5
       High volume with 5%+ daily gain
-  
+
   rsi < 25 OR rsi > 75
       Oversold or overbought conditions
-  
+
   price > bb_upper() OR price < bb_lower()
       Price breaking out of Bollinger Bands
-  
+
   macd_signal == "bullish" AND volume > 5M
       Bullish MACD crossover with high volume
 
+Scans read the shared price store; tickers it lacks are downloaded first,
+--refresh brings every ticker up to date before scanning.
+
 Usage:
   python cli.py dsl-eval AAPL "price > 200 AND rsi < 30"
-  python cli.py dsl-scan "rsi < 25" --universe SP500
+  python cli.py dsl-scan "rsi < 25" --universe SP500 [--refresh]
   python cli.py dsl-help
 """
 
 
 if __name__ == '__main__':
     import sys
-    import json
-    
+
     if len(sys.argv) < 2:
         print("Usage: python alert_dsl.py COMMAND [ARGS...]")
         print("Commands: dsl-eval, dsl-scan, dsl-help")
         sys.exit(1)
-    
+
     command = sys.argv[1]
-    
+
     if command == 'dsl-help':
         print(help_text())
         sys.exit(0)
-    
+
     elif command == 'dsl-eval':
         if len(sys.argv) < 4:
             print("Usage: python cli.py dsl-eval SYMBOL \"EXPRESSION\"")
             print('Example: python cli.py dsl-eval AAPL "price > 200 AND rsi < 30"')
             sys.exit(1)
-        
+
         ticker = sys.argv[2]
         expression = sys.argv[3]
-        
+
         parser = DSLParser()
         result, explanation = parser.evaluate(expression, ticker)
-        
+
         print(json.dumps({
             'ticker': ticker,
             'expression': expression,
@@ -483,43 +753,44 @@ if __name__ == '__main__':
             'explanation': explanation,
             'timestamp': datetime.now().isoformat()
         }, indent=2))
-        
+
         sys.exit(0 if result else 1)
-    
+
     elif command == 'dsl-scan':
         if len(sys.argv) < 3:
-            print("Usage: python cli.py dsl-scan \"EXPRESSION\" [--universe SP500] [--limit N]")
+            print("Usage: python cli.py dsl-scan \"EXPRESSION\" [--universe SP500] [--limit N] [--refresh]")
             print('Example: python cli.py dsl-scan "rsi < 25" --universe SP500 --limit 10')
             sys.exit(1)
-        
+
         expression = sys.argv[2]
         universe_name = 'SP500'
         limit = None
-        
+        refresh = '--refresh' in sys.argv[3:]
+
         # Parse optional arguments
         for i in range(3, len(sys.argv)):
             if sys.argv[i] == '--universe' and i + 1 < len(sys.argv):
                 universe_name = sys.argv[i + 1]
             elif sys.argv[i] == '--limit' and i + 1 < len(sys.argv):
                 limit = int(sys.argv[i + 1])
-        
+
         # Get universe tickers
         if universe_name == 'SP500':
             tickers = get_sp500_tickers()
         else:
             # For custom universe, expect comma-separated tickers
             tickers = universe_name.split(',')
-        
+
         # Scan universe
-        results = scan_universe(expression, tickers)
-        
+        results = scan_universe(expression, tickers, refresh=refresh)
+
         # Filter for matches only
         matches = [r for r in results if r['match']]
-        
+
         # Apply limit
         if limit:
             matches = matches[:limit]
-        
+
         print(json.dumps({
             'expression': expression,
             'universe': universe_name,
@@ -527,9 +798,9 @@ if __name__ == '__main__':
             'matches_found': len(matches),
             'matches': matches
         }, indent=2))
-        
+
         sys.exit(0)
-    
+
     else:
         print(f"Unknown command: {command}")
         print("Available commands: dsl-eval, dsl-scan, dsl-help")
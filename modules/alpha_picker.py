@@ -28,10 +28,16 @@ import json
 import sys
 import os
 import sqlite3
-import pickle
 from pathlib import Path
 from tqdm import tqdm
 
+try:
+    from modules import indicators
+    from modules.price_store import get_price_store, import_pickle
+except ImportError:
+    import indicators
+    from price_store import get_price_store, import_pickle
+
 
 class AlphaPickerV3:
     """
@@ -59,30 +65,23 @@ class AlphaPickerV3:
         self.cache_db = self.cache_dir / 'yfinance_cache.db'
         self._init_cache_db()
         
-        # Load universe and price cache
+        # Load universe and price cache (a lazy view over the shared price store)
         self.data_dir = Path(__file__).parent.parent / 'data'
         self.universe_path = self.data_dir / 'us_stock_universe.txt'
-        self.price_cache_path = self.data_dir / 'price_history_cache.pkl'
+        self.price_cache_path = self.data_dir / 'price_history_cache.pkl'  # legacy pickle, imported once
+        self.price_store = get_price_store()
         self.universe = self._load_universe()
         self.price_cache = self._load_price_cache()
         
         # Download sector ETFs for thematic scoring
         self.sector_etfs = ['SPY', 'IWM', 'XLI', 'XLK', 'XLB', 'XLF', 'XLY', 'GLD']
         self._download_sector_etfs()
+        self._point_in_time = None
         
     def _init_cache_db(self):
         """Initialize SQLite cache database"""
         conn = sqlite3.connect(self.cache_db)
         cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS history_cache (
-                ticker TEXT,
-                period TEXT,
-                data BLOB,
-                updated TEXT,
-                PRIMARY KEY (ticker, period)
-            )
-        ''')
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS info_cache (
                 ticker TEXT PRIMARY KEY,
@@ -105,34 +104,13 @@ class AlphaPickerV3:
         print(f"Loaded {len(tickers)} tickers from universe", file=sys.stderr)
         return tickers
     
-    def _load_price_cache(self) -> dict:
-        """Load price history cache and convert to dict of DataFrames"""
-        if not self.price_cache_path.exists():
-            print(f"Warning: Price cache not found at {self.price_cache_path}", file=sys.stderr)
-            return {}
-        
-        with open(self.price_cache_path, 'rb') as f:
-            raw_cache = pickle.load(f)
-        
-        # Convert from (ticker, column) dict to ticker -> DataFrame dict
-        cache = {}
-        
-        # Group by ticker
-        tickers = set(k[0] for k in raw_cache.keys() if isinstance(k, tuple))
-        
-        for ticker in tickers:
-            # Extract all columns for this ticker
-            ticker_data = {}
-            for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                key = (ticker, col)
-                if key in raw_cache:
-                    ticker_data[col] = raw_cache[key]
-            
-            if ticker_data:
-                # Convert to DataFrame
-                df = pd.DataFrame(ticker_data)
-                cache[ticker] = df
+    def _load_price_cache(self):
+        """Open the price store as a {ticker: DataFrame} view; frames are read on access"""
+        if not self.price_store.tickers() and self.price_cache_path.exists():
+            imported = import_pickle(self.price_store, self.price_cache_path)
+            print(f"Imported {imported} tickers from {self.price_cache_path} into the price store", file=sys.stderr)
         
+        cache = self.price_store.frames()
         print(f"Loaded price cache with {len(cache)} tickers", file=sys.stderr)
         return cache
     
@@ -186,7 +164,7 @@ class AlphaPickerV3:
     
     def _get_history(self, ticker: str, period: str = '2y', as_of_date: Optional[datetime] = None) -> Optional[pd.DataFrame]:
         """
-        Get ticker history with 6-hour cache
+        Get ticker history from the price store (downloading tickers it does not have yet)
         If as_of_date is provided, return only data up to that date (for blind backtesting)
         """
         # Check price cache first
@@ -199,61 +177,31 @@ class AlphaPickerV3:
                 hist = hist[hist.index <= as_of_date]
             return hist if len(hist) > 0 else None
         
-        # Check SQLite cache
-        conn = sqlite3.connect(self.cache_db)
-        cursor = conn.cursor()
-        cursor.execute('SELECT data, updated FROM history_cache WHERE ticker = ? AND period = ?', 
-                      (ticker, period))
-        row = cursor.fetchone()
-        
-        if row:
-            updated = datetime.fromisoformat(row[1])
-            if datetime.now() - updated < timedelta(hours=6):
-                hist = pickle.loads(row[0])
-                conn.close()
-                if as_of_date:
-                    hist = hist[hist.index <= as_of_date]
-                return hist if len(hist) > 0 else None
-        
-        # Fetch from yfinance
-        try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period=period)
-            
-            if hist is None or len(hist) == 0:
-                conn.close()
-                return None
-            
-            # Cache it
-            cursor.execute('''
-                INSERT OR REPLACE INTO history_cache (ticker, period, data, updated)
-                VALUES (?, ?, ?, ?)
-            ''', (ticker, period, pickle.dumps(hist), datetime.now().isoformat()))
-            conn.commit()
-            conn.close()
-            
-            if as_of_date:
-                hist = hist[hist.index <= as_of_date]
-            
-            return hist if len(hist) > 0 else None
-        except Exception as e:
-            conn.close()
-            print(f"Error fetching history for {ticker}: {e}", file=sys.stderr)
+        # Not stored yet: download `period` of history into the price store
+        if not self.price_store.ensure(ticker, start=self._period_start(period)):
             return None
+        hist = self.price_store.read(ticker)
+        if as_of_date:
+            hist = hist[hist.index <= as_of_date]
+        return hist if len(hist) > 0 else None
+    
+    @staticmethod
+    def _period_start(period: str) -> Optional[datetime]:
+        """yfinance period string ('6mo', '2y', 'max') → start date (None for max)"""
+        if period == 'max':
+            return None
+        if period.endswith('mo'):
+            return datetime.now() - timedelta(days=31 * int(period[:-2]))
+        days = {'d': 1, 'y': 366}[period[-1]] * int(period[:-1])
+        return datetime.now() - timedelta(days=days)
     
     def _calc_rsi(self, prices: pd.Series, period: int = 14) -> float:
         """Calculate RSI indicator"""
         if len(prices) < period + 1:
             return 50.0
         
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50.0
+        rsi = indicators.rsi(prices, period)[-1]
+        return rsi if not np.isnan(rsi) else 50.0
     
     def _calc_sector_etf_momentum(self, sector: str, as_of_date: Optional[datetime] = None) -> float:
         """Calculate 3M momentum for sector ETF"""
@@ -272,6 +220,101 @@ class AlphaPickerV3:
         mom_3m = (close.iloc[-1] / close.iloc[-63] - 1)
         return mom_3m
     
+    def _info_points(self, info: dict, factors: dict) -> int:
+        """Layers 2-3 (max 25 points) from ticker info; adds each scoring factor to factors"""
+        points = 0
+        
+        # ============================================================
+        # LAYER 2: FUNDAMENTALS (max 15 points)
+        # ============================================================
+        
+        # Revenue growth (max +4)
+        rev_growth = info.get('revenueGrowth', 0) or 0
+        if rev_growth > 0.30:
+            points += 4; factors['rev_growth_high'] = 4
+        elif rev_growth > 0.15:
+            points += 3; factors['rev_growth_good'] = 3
+        elif rev_growth > 0.05:
+            points += 2; factors['rev_growth_ok'] = 2
+        
+        # Earnings positive (+2) or negative (-2)
+        net_income = info.get('netIncomeToCommon', 0) or 0
+        if net_income > 0:
+            points += 2; factors['earnings_positive'] = 2
+        elif net_income < 0:
+            points -= 2; factors['earnings_negative'] = -2
+        
+        # Gross margin (max +2)
+        gross_margin = info.get('grossMargins', 0) or 0
+        if gross_margin > 0.40:
+            points += 2; factors['margin_high'] = 2
+        elif gross_margin > 0.25:
+            points += 1; factors['margin_ok'] = 1
+        
+        # Forward P/E (max +4)
+        forward_pe = info.get('forwardPE', 0) or 0
+        if 0 < forward_pe < 15:
+            points += 4; factors['deep_value'] = 4
+        elif 0 < forward_pe < 25:
+            points += 3; factors['fair_value'] = 3
+        
+        # Debt/Equity < 1.0 (+1)
+        debt_equity = info.get('debtToEquity', 0) or 0
+        if debt_equity > 0:
+            debt_equity = debt_equity / 100  # yfinance returns as percentage
+        if 0 <= debt_equity < 1.0:
+            points += 1; factors['low_debt'] = 1
+        
+        # Free cash flow positive (+2)
+        free_cf = info.get('freeCashflow', 0) or 0
+        if free_cf > 0:
+            points += 2; factors['fcf_positive'] = 2
+        
+        # ============================================================
+        # LAYER 3: EARNINGS CATALYST (max 10 points)
+        # ============================================================
+        
+        # Earnings quarterly growth (proxy for surprise)
+        earnings_growth = info.get('earningsQuarterlyGrowth', 0) or 0
+        if earnings_growth > 0.10:
+            points += 4; factors['earnings_surprise_high'] = 4
+        elif earnings_growth > 0.05:
+            points += 3; factors['earnings_surprise_good'] = 3
+        elif earnings_growth > 0:
+            points += 2; factors['earnings_surprise_ok'] = 2
+        
+        # Revenue quarterly growth (proxy for revenue surprise)
+        if rev_growth > 0.05:
+            points += 3; factors['revenue_surprise_good'] = 3
+        elif rev_growth > 0:
+            points += 2; factors['revenue_surprise_ok'] = 2
+        
+        # Consecutive beats (approximated by earnings growth + revenue growth both positive)
+        if earnings_growth > 0 and rev_growth > 0:
+            points += 3; factors['consecutive_beats'] = 3
+        
+        return points
+    
+    def _info_penalties(self, info: dict, factors: dict) -> int:
+        """Market cap and energy penalties (layer 5) from ticker info; adds them to factors"""
+        points = 0
+        sector = info.get('sector', '')
+        
+        # Market cap penalties
+        mcap = info.get('marketCap', 0)
+        mcap_b = mcap / 1e9 if mcap else 0
+        
+        if mcap_b > 50:
+            points -= 5; factors['mega_cap_penalty'] = -5
+        elif mcap_b < 0.3:
+            points -= 3; factors['micro_cap_penalty'] = -3
+        
+        # Energy sector penalty
+        if sector == 'Energy':
+            points -= 3; factors['energy_penalty'] = -3
+        
+        return points
+    
     def score_stock(self, ticker: str, as_of_date: Optional[datetime] = None, verbose: bool = False) -> dict:
         """
         Score stock using 4-layer system
@@ -350,7 +393,7 @@ class AlphaPickerV3:
             score += 1; factors['rsi_ok'] = 1
         
         # Price vs 200MA (max +4)
-        ma200 = close.rolling(200).mean().iloc[-1]
+        ma200 = indicators.sma(close, 200)[-1]
         pct_above_200ma = (price / ma200 - 1) if ma200 > 0 else 0
         if pct_above_200ma > 0.50:
             score += 4; factors['above_200ma'] = 4
@@ -359,74 +402,10 @@ class AlphaPickerV3:
         elif pct_above_200ma > 0.15:
             score += 2; factors['above_200ma'] = 2
         
-        # ============================================================
-        # LAYER 2: FUNDAMENTALS (max 15 points)
-        # ============================================================
-        
-        # Revenue growth (max +4)
+        # LAYERS 2-3: FUNDAMENTALS, EARNINGS CATALYST (from ticker info)
+        score += self._info_points(info, factors)
         rev_growth = info.get('revenueGrowth', 0) or 0
-        if rev_growth > 0.30:
-            score += 4; factors['rev_growth_high'] = 4
-        elif rev_growth > 0.15:
-            score += 3; factors['rev_growth_good'] = 3
-        elif rev_growth > 0.05:
-            score += 2; factors['rev_growth_ok'] = 2
-        
-        # Earnings positive (+2) or negative (-2)
-        net_income = info.get('netIncomeToCommon', 0) or 0
-        if net_income > 0:
-            score += 2; factors['earnings_positive'] = 2
-        elif net_income < 0:
-            score -= 2; factors['earnings_negative'] = -2
-        
-        # Gross margin (max +2)
-        gross_margin = info.get('grossMargins', 0) or 0
-        if gross_margin > 0.40:
-            score += 2; factors['margin_high'] = 2
-        elif gross_margin > 0.25:
-            score += 1; factors['margin_ok'] = 1
-        
-        # Forward P/E (max +4)
         forward_pe = info.get('forwardPE', 0) or 0
-        if 0 < forward_pe < 15:
-            score += 4; factors['deep_value'] = 4
-        elif 0 < forward_pe < 25:
-            score += 3; factors['fair_value'] = 3
-        
-        # Debt/Equity < 1.0 (+1)
-        debt_equity = info.get('debtToEquity', 0) or 0
-        if debt_equity > 0:
-            debt_equity = debt_equity / 100  # yfinance returns as percentage
-        if 0 <= debt_equity < 1.0:
-            score += 1; factors['low_debt'] = 1
-        
-        # Free cash flow positive (+2)
-        free_cf = info.get('freeCashflow', 0) or 0
-        if free_cf > 0:
-            score += 2; factors['fcf_positive'] = 2
-        
-        # ============================================================
-        # LAYER 3: EARNINGS CATALYST (max 10 points)
-        # ============================================================
-        
-        # Earnings quarterly growth (proxy for surprise)
-        earnings_growth = info.get('earningsQuarterlyGrowth', 0) or 0
-        if earnings_growth > 0.10:
-            score += 4; factors['earnings_surprise_high'] = 4
-        elif earnings_growth > 0.05:
-            score += 3; factors['earnings_surprise_good'] = 3
-        elif earnings_growth > 0:
-            score += 2; factors['earnings_surprise_ok'] = 2
-        
-        # Revenue quarterly growth (proxy for revenue surprise)
-        if rev_growth > 0.05:
-            score += 3; factors['revenue_surprise_good'] = 3
-        elif rev_growth > 0:
-            score += 2; factors['revenue_surprise_ok'] = 2
-        
-        # Consecutive beats (approximated by earnings growth + revenue growth both positive)
-        if earnings_growth > 0 and rev_growth > 0:
-            score += 3; factors['consecutive_beats'] = 3
         
         # ============================================================
         # LAYER 4: THEMATIC / SECTOR TIMING (max 10 points)
@@ -472,19 +451,11 @@ class AlphaPickerV3:
         # LAYER 5: PENALTIES (max -15)
         # ============================================================
         
-        # Market cap penalties
+        # Market cap and energy penalties
+        score += self._info_penalties(info, factors)
         mcap = info.get('marketCap', 0)
         mcap_b = mcap / 1e9 if mcap else 0
         
-        if mcap_b > 50:
-            score -= 5; factors['mega_cap_penalty'] = -5
-        elif mcap_b < 0.3:
-            score -= 3; factors['micro_cap_penalty'] = -3
-        
-        # Energy sector penalty
-        if sector == 'Energy':
-            score -= 3; factors['energy_penalty'] = -3
-        
         # RSI too low
         if rsi < 35:
             score -= 3; factors['rsi_weak_penalty'] = -3
@@ -571,7 +542,7 @@ class AlphaPickerV3:
                     continue
                 
                 # 50MA check
-                ma50 = close.rolling(50).mean().iloc[-1]
+                ma50 = indicators.sma(close, 50)[-1]
                 price = close.iloc[-1]
                 
                 if price <= ma50:
@@ -631,6 +602,12 @@ class AlphaPickerV3:
         
         return results[:n]
     
+    def point_in_time(self) -> 'PointInTimeScorer':
+        """Panel scorer over the price cache for as-of-date scoring, built on first use"""
+        if self._point_in_time is None:
+            self._point_in_time = PointInTimeScorer(self)
+        return self._point_in_time
+    
     def run_blind_backtest(self, picks_csv: str, verbose: bool = True) -> dict:
         """
         Run blind backtest on historical pick dates
@@ -690,9 +667,12 @@ class AlphaPickerV3:
         algo_picks_all = []  # All algo picks across all dates
         overlap_count = 0
         
+        # Price factors for every date are computed once; each pick date is a panel lookup
+        scorer = self.point_in_time()
+        
         for i, pick_date in enumerate(tqdm(pick_dates, desc="Backtesting", file=sys.stderr)):
             # Get top 2 picks as of this date
-            top_picks = self.get_top_picks(n=2, as_of_date=pick_date, use_prefilter=True, verbose=False)
+            top_picks = scorer.top_picks(n=2, as_of_date=pick_date)
             
             if len(top_picks) == 0:
                 continue
@@ -859,6 +839,170 @@ class AlphaPickerV3:
         return result
 
 
+class PointInTimeScorer:
+    """
+    AlphaPickerV3 scores for any as-of date from one aligned date × ticker panel
+
+    score_stock re-slices a ticker's history and recomputes every indicator for
+    each (ticker, as-of date), so a blind backtest rescored the whole universe
+    at each of ~70 pick dates. This scorer loads the price cache once, computes
+    each price factor of layer 1 and the pre-filter (52w-high distance, 3M/6M
+    momentum, RSI, distance from the 200MA, 50MA) as one rolling series per
+    ticker over its own bars, and carries it forward over the shared date grid.
+    A ticker's factors as of a date are then the row of its last bar on or
+    before that date: scoring a date is one row lookup and a few threshold
+    selects across every ticker.
+
+    Ticker info (layers 2-3, cap and energy penalties, sector) is fetched once per
+    ticker on first use; the sector ETF, gold and small-cap themes come from each
+    ETF's momentum series, looked up per date. Scores equal
+    score_stock(ticker, as_of_date)['score'] for every stored ticker.
+    """
+
+    FACTORS = ('price', 'pct_from_high', 'mom_3m', 'mom_6m', 'rsi', 'pct_above_200ma', 'ma50')
+
+    def __init__(self, picker: AlphaPickerV3, tickers: Optional[List[str]] = None):
+        self.picker = picker
+        self.tickers = [t.upper() for t in (tickers if tickers is not None else picker.price_cache)]
+        self._column = {t: j for j, t in enumerate(self.tickers)}
+        self._info = {}  # ticker -> (info points, sector)
+
+        frame = picker.price_store.load(self.tickers, fields=['Close'])
+        self.dates = frame.index.to_numpy()
+        close = frame.to_numpy()
+        valid = ~np.isnan(close)
+        self.bars = np.cumsum(valid, axis=0)  # valid bars on or before each date
+
+        # Factors on each ticker's own bars, then carried forward from its last bar
+        rows = np.arange(len(self.dates))[:, None]
+        last = np.maximum.accumulate(np.where(valid, rows, 0), axis=0)
+        columns = np.arange(len(self.tickers))
+        self.factors = {}
+        for name in self.FACTORS:
+            panel = np.full(close.shape, np.nan)
+            for j in columns:
+                if valid[:, j].any():
+                    panel[valid[:, j], j] = self._series(close[valid[:, j], j])[name]
+            self.factors[name] = panel[last, columns]
+
+        self._etf_momentum = {etf: self._momentum_series(etf)
+                              for etf in set(self.picker.SECTOR_ETF_MAP.values()) | {'GLD', 'IWM', 'SPY'}}
+
+    @staticmethod
+    def _series(close: np.ndarray) -> Dict[str, np.ndarray]:
+        """Each factor at every bar, as score_stock computes it on the bars up to that one"""
+        high_52w = pd.Series(close).rolling(252, min_periods=1).max().to_numpy()
+        ma200 = indicators.sma(close, 200)
+        rsi = indicators.rsi(close, 14)
+        with np.errstate(invalid='ignore'):
+            return {
+                'price': close,
+                'pct_from_high': (high_52w - close) / high_52w,
+                'mom_3m': indicators.momentum(close, 62),
+                'mom_6m': indicators.momentum(close, 125),
+                'rsi': np.where(np.isnan(rsi), 50.0, rsi),
+                'pct_above_200ma': np.where(ma200 > 0, close / ma200 - 1, 0.0),
+                'ma50': indicators.sma(close, 50),
+            }
+
+    def _momentum_series(self, etf: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(dates, 3M momentum) of an ETF's bars; NaN before its 63rd bar"""
+        hist = self.picker._get_history(etf, period='1y')
+        if hist is None:
+            return np.empty(0, 'M8[ns]'), np.empty(0)
+        close = hist['Close'].dropna()
+        return close.index.to_numpy(), indicators.momentum(close.to_numpy(), 62)
+
+    def _etf_momentum_at(self, etf: str, as_of: np.ndarray) -> np.ndarray:
+        """ETF momentum as of each date (0 where it has fewer than 63 bars)"""
+        dates, momentum = self._etf_momentum[etf]
+        if len(dates) == 0:
+            return np.zeros(len(as_of))
+        at = np.searchsorted(dates, as_of, side='right') - 1
+        return np.nan_to_num(np.where(at >= 0, momentum[np.maximum(at, 0)], np.nan), nan=0.0)
+
+    def _ticker_info(self, ticker: str) -> Tuple[int, str]:
+        if ticker not in self._info:
+            info = self.picker._get_info(ticker)
+            points = self.picker._info_points(info, {}) + self.picker._info_penalties(info, {})
+            self._info[ticker] = (points, info.get('sector', ''))
+        return self._info[ticker]
+
+    def _as_of(self, as_of_dates) -> Tuple[np.ndarray, np.ndarray]:
+        """(as-of dates, row of the last panel date on or before each; -1 before the first)"""
+        as_of = np.array([np.datetime64('now', 'ns') if d is None else pd.Timestamp(d).to_datetime64()
+                          for d in as_of_dates], dtype='M8[ns]')
+        return as_of, np.searchsorted(self.dates, as_of, side='right') - 1
+
+    def sector(self, ticker: str) -> str:
+        return self._ticker_info(ticker.upper())[1]
+
+    def scores(self, as_of_dates, tickers: Optional[List[str]] = None) -> pd.DataFrame:
+        """as-of date × ticker frame of scores (-999 where a ticker has fewer than 200 bars)"""
+        tickers = self.tickers if tickers is None else [t.upper() for t in tickers]
+        columns = np.array([self._column[t] for t in tickers], dtype=int)
+        as_of, rows = self._as_of(as_of_dates)
+        scored = (rows >= 0)[:, None] & (self.bars[np.maximum(rows, 0)][:, columns] >= 200)
+
+        f = {name: panel[np.maximum(rows, 0)][:, columns] for name, panel in self.factors.items()}
+        p, m3, m6, rsi, above = f['pct_from_high'], f['mom_3m'], f['mom_6m'], f['rsi'], f['pct_above_200ma']
+        with np.errstate(invalid='ignore'):
+            score = (np.select([p <= 0.03, p <= 0.05, p <= 0.10], [5, 4, 2], 0)
+                     + np.select([m3 > 0.40, m3 > 0.25, m3 > 0.10, m3 > 0], [4, 3, 2, 1], 0)
+                     + np.select([m6 > 0.75, m6 > 0.50, m6 > 0.25], [4, 3, 2], 0)
+                     + np.select([rsi > 75, rsi > 65, rsi > 55], [3, 2, 1], 0)
+                     + np.select([above > 0.50, above > 0.30, above > 0.15], [4, 3, 2], 0)
+                     - 3 * ((rsi < 35).astype(int) + (above < -0.10) + (m6 < 0)))
+
+        # Ticker info and themes, only for tickers scored at some date
+        needed = scored.any(axis=0)
+        info = np.zeros(len(tickers), dtype=int)
+        sectors = np.full(len(tickers), '', dtype=object)
+        for k in np.flatnonzero(needed):
+            info[k], sectors[k] = self._ticker_info(tickers[k])
+        score += info
+
+        gold = self._etf_momentum_at('GLD', as_of) > 0.05
+        small_caps = self._etf_momentum_at('IWM', as_of) > self._etf_momentum_at('SPY', as_of)
+        score += np.where(gold[:, None] & (sectors == 'Materials'), 3, 0) + 2 * small_caps[:, None]
+        for sector, etf in self.picker.SECTOR_ETF_MAP.items():
+            in_sector = sectors == sector
+            if in_sector.any():
+                mom = self._etf_momentum_at(etf, as_of)[:, None]
+                score += in_sector * np.select([mom > 0.10, mom > 0.05, mom < -0.05], [5, 3, -3], 0)
+
+        return pd.DataFrame(np.where(scored, score, -999), index=pd.DatetimeIndex(as_of), columns=tickers)
+
+    def prefilter(self, as_of_date: Optional[datetime] = None, min_6m_return: float = 0.10) -> List[str]:
+        """prefilter_universe as of a date: 6M return > min_6m_return and price > 50MA"""
+        _, (row,) = self._as_of([as_of_date])
+        if row < 0:
+            return []
+        f = {name: panel[row] for name, panel in self.factors.items()}
+        with np.errstate(invalid='ignore'):
+            passed = (self.bars[row] >= 126) & (f['mom_6m'] > min_6m_return) & (f['price'] > f['ma50'])
+        return [t for t, ok in zip(self.tickers, passed) if ok and t not in self.picker.sector_etfs]
+
+    def top_picks(self, n: int = 10, as_of_date: Optional[datetime] = None,
+                  use_prefilter: bool = True) -> List[dict]:
+        """get_top_picks from the panel: the score_stock results of the n best scores"""
+        if use_prefilter:
+            universe = self.prefilter(as_of_date)
+            if len(universe) == 0 and len(self.picker.price_cache) > 0:
+                universe = [t for t in sorted(self.picker.price_cache.keys()) if t not in self.picker.sector_etfs][:100]
+        else:
+            universe = self.picker.universe
+
+        known = [t for t in universe if t.upper() in self._column]
+        scores = dict(zip(known, self.scores([as_of_date], known).iloc[0].tolist())) if known else {}
+        for ticker in universe:
+            if ticker not in scores:  # not in the price cache: score it directly
+                scores[ticker] = self.picker.score_stock(ticker, as_of_date=as_of_date)['score']
+
+        ranked = sorted((t for t in universe if scores[t] > -999), key=lambda t: scores[t], reverse=True)
+        return [self.picker.score_stock(t, as_of_date=as_of_date) for t in ranked[:n]]
+
+
 def main():
     """CLI interface"""
     import argparse
@@ -5,8 +5,9 @@ Complete framework for strategy development, historical testing, and walk-forwar
 Features:
 - Strategy base class with 6 built-in strategies
 - Full performance metrics (Sharpe, Sortino, Calmar, etc.)
-- Walk-forward optimization with rolling windows
+- Walk-forward optimization with rolling windows (parallel, resumable per-window cache)
 - Parameter optimization (grid search & random search)
+- Multi-asset portfolio backtests over a shared price panel and score matrix
 - Benchmark comparison (ticker + SPY)
 - SQLite storage for all runs
 - Commission & slippage modeling
@@ -14,7 +15,6 @@ Features:
 - Multiple timeframes
 """
 
-import yfinance as yf
 import numpy as np
 import sqlite3
 import json
@@ -23,13 +23,62 @@ from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass, field
 from pathlib import Path
 import itertools
+import os
 import random
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+try:
+    from modules import indicators
+    from modules.price_store import get_price_store
+    from modules.window_cache import WindowCache
+except ImportError:
+    import indicators
+    from price_store import get_price_store
+    from window_cache import WindowCache
 
 # ============================================================================
 # STRATEGY BASE CLASS
 # ============================================================================
 
+def _indicator_table(compute, keys) -> Dict:
+    """compute(key) once per distinct key; keys whose computation fails are left out"""
+    table = {}
+    for key in dict.fromkeys(keys):
+        try:
+            table[key] = compute(key)
+        except Exception:
+            continue
+    return table
+
+
+def _rows(table: Dict, keys: List, n_bars: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack table[key] per parameter set into (n_sets, n_bars); missing keys give NaN rows, valid=False"""
+    rows = np.full((len(keys), n_bars), np.nan)
+    valid = np.zeros(len(keys), dtype=bool)
+    for i, key in enumerate(keys):
+        if key in table:
+            rows[i] = table[key]
+            valid[i] = True
+    return rows, valid
+
+
+def _crossover(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """1 where a crosses above b, -1 where it crosses below (rows are parameter sets)"""
+    signals = np.zeros(a.shape, dtype=np.int8)
+    up = (a[:, 1:] > b[:, 1:]) & (a[:, :-1] <= b[:, :-1])
+    down = (a[:, 1:] < b[:, 1:]) & (a[:, :-1] >= b[:, :-1])
+    signals[:, 1:][up] = 1
+    signals[:, 1:][down] = -1
+    return signals
+
+
+def _warmup(signals: np.ndarray, first_bars: List[int]):
+    """No signal before each set's first tradable bar (next() returns 0 there)"""
+    signals[np.arange(signals.shape[1]) < np.asarray(first_bars)[:, None]] = 0
+
+
 class Strategy:
     """Base class for trading strategies"""
     
@@ -53,6 +102,32 @@ class Strategy:
         """
         return 0
     
+    @classmethod
+    def sweep_signals(cls, data: np.ndarray, param_sets: List[Dict]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Signals for many parameter sets at once (used by ParameterOptimizer)
+        Returns (signals, valid): signals shape (n_sets, n_bars) holding what next()
+        returns bar by bar; valid marks the sets whose indicators could be computed.
+        None means the strategy is stateful and needs the per-bar path.
+        """
+        return None
+    
+    @classmethod
+    def vectorised(cls) -> bool:
+        """Whether sweep_signals() stands for next(): overridden no higher in the MRO than next()"""
+        def owner(name):
+            return next(klass for klass in cls.__mro__ if name in vars(klass))
+        sweep = owner('sweep_signals')
+        return sweep is not Strategy and cls.__mro__.index(sweep) <= cls.__mro__.index(owner('next'))
+    
+    def signals(self, data: np.ndarray) -> Optional[np.ndarray]:
+        """Signal for every bar at once (what next() returns bar by bar), or None
+        when the strategy needs the per-bar path
+        """
+        if not self.vectorised():
+            return None
+        signals, valid = self.sweep_signals(data, [self.params])
+        return signals[0] if valid[0] else None
+    
     @property
     def name(self) -> str:
         return self.__class__.__name__
@@ -90,13 +165,21 @@ class SMA_Crossover(Strategy):
             return -1
         return 0
     
+    @classmethod
+    def sweep_signals(cls, data: np.ndarray, param_sets: List[Dict]):
+        closes = data[:, 3]
+        sma = _indicator_table(lambda p: cls._sma(closes, p),
+                               [ps[k] for ps in param_sets for k in ('fast_period', 'slow_period')])
+        fast, valid = _rows(sma, [ps['fast_period'] for ps in param_sets], len(closes))
+        slow, valid_slow = _rows(sma, [ps['slow_period'] for ps in param_sets], len(closes))
+        signals = _crossover(fast, slow)
+        _warmup(signals, [ps['slow_period'] for ps in param_sets])
+        return signals, valid & valid_slow
+    
     @staticmethod
     def _sma(prices: np.ndarray, period: int) -> np.ndarray:
         """Calculate simple moving average"""
-        sma = np.full(len(prices), np.nan)
-        for i in range(period - 1, len(prices)):
-            sma[i] = np.mean(prices[i - period + 1:i + 1])
-        return sma
+        return indicators.sma(prices, period)
 
 
 class RSI_MeanReversion(Strategy):
@@ -121,28 +204,21 @@ class RSI_MeanReversion(Strategy):
             return -1  # Sell overbought
         return 0
     
+    @classmethod
+    def sweep_signals(cls, data: np.ndarray, param_sets: List[Dict]):
+        closes = data[:, 3]
+        periods = [ps['rsi_period'] for ps in param_sets]
+        rsi, valid = _rows(_indicator_table(lambda p: cls._rsi(closes, p), periods), periods, len(closes))
+        oversold = np.array([[ps['oversold']] for ps in param_sets], dtype=float)
+        overbought = np.array([[ps['overbought']] for ps in param_sets], dtype=float)
+        signals = np.select([rsi < oversold, rsi > overbought], [1, -1], 0).astype(np.int8)
+        _warmup(signals, periods)
+        return signals, valid
+    
     @staticmethod
     def _rsi(prices: np.ndarray, period: int) -> np.ndarray:
-        """Calculate RSI"""
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        avg_gains = np.full(len(prices), np.nan)
-        avg_losses = np.full(len(prices), np.nan)
-        
-        # First average
-        avg_gains[period] = np.mean(gains[:period])
-        avg_losses[period] = np.mean(losses[:period])
-        
-        # Smoothed averages
-        for i in range(period + 1, len(prices)):
-            avg_gains[i] = (avg_gains[i-1] * (period - 1) + gains[i-1]) / period
-            avg_losses[i] = (avg_losses[i-1] * (period - 1) + losses[i-1]) / period
-        
-        rs = avg_gains / (avg_losses + 1e-10)
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        """Calculate RSI (Wilder smoothing)"""
+        return indicators.wilder_rsi(prices, period)
 
 
 class BollingerBand_Breakout(Strategy):
@@ -182,13 +258,24 @@ class BollingerBand_Breakout(Strategy):
             return 1
         return 0
     
+    @classmethod
+    def sweep_signals(cls, data: np.ndarray, param_sets: List[Dict]):
+        closes = data[:, 3]
+        periods = [ps['period'] for ps in param_sets]
+        sma, valid = _rows(_indicator_table(lambda p: SMA_Crossover._sma(closes, p), periods), periods, len(closes))
+        std, _ = _rows(_indicator_table(lambda p: cls._rolling_std(closes, p), periods), periods, len(closes))
+        num_std = np.array([[ps['num_std']] for ps in param_sets], dtype=float)
+        upper = sma + num_std * std
+        lower = sma - num_std * std
+        signals = np.select([closes > upper, closes < lower, closes > sma, closes < sma],
+                            [1, -1, -1, 1], 0).astype(np.int8)
+        _warmup(signals, periods)
+        return signals, valid
+    
     @staticmethod
     def _rolling_std(prices: np.ndarray, period: int) -> np.ndarray:
         """Calculate rolling standard deviation"""
-        std = np.full(len(prices), np.nan)
-        for i in range(period - 1, len(prices)):
-            std[i] = np.std(prices[i - period + 1:i + 1])
-        return std
+        return indicators.rolling_std(prices, period)
 
 
 class MACD_Signal(Strategy):
@@ -224,20 +311,24 @@ class MACD_Signal(Strategy):
             return -1
         return 0
     
+    @classmethod
+    def sweep_signals(cls, data: np.ndarray, param_sets: List[Dict]):
+        closes = data[:, 3]
+        ema = _indicator_table(lambda p: cls._ema(closes, p),
+                               [ps[k] for ps in param_sets for k in ('fast', 'slow')])
+        macd = _indicator_table(lambda fs: ema[fs[0]] - ema[fs[1]], [(ps['fast'], ps['slow']) for ps in param_sets])
+        triples = [(ps['fast'], ps['slow'], ps['signal']) for ps in param_sets]
+        signal_line = _indicator_table(lambda t: cls._ema(macd[t[:2]], t[2]), triples)
+        macd_rows, valid = _rows(macd, [t[:2] for t in triples], len(closes))
+        signal_rows, valid_signal = _rows(signal_line, triples, len(closes))
+        signals = _crossover(macd_rows, signal_rows)
+        _warmup(signals, [ps['slow'] + ps['signal'] for ps in param_sets])
+        return signals, valid & valid_signal
+    
     @staticmethod
     def _ema(prices: np.ndarray, period: int) -> np.ndarray:
-        """Calculate exponential moving average"""
-        ema = np.full(len(prices), np.nan)
-        multiplier = 2 / (period + 1)
-        
-        # Start with SMA
-        ema[period - 1] = np.mean(prices[:period])
-        
-        # Calculate EMA
-        for i in range(period, len(prices)):
-            ema[i] = (prices[i] - ema[i-1]) * multiplier + ema[i-1]
-        
-        return ema
+        """Calculate exponential moving average (seeded with the SMA of the first period bars)"""
+        return indicators.ema(prices, period)
 
 
 class Momentum(Strategy):
@@ -248,12 +339,7 @@ class Momentum(Strategy):
     
     def init(self, data: np.ndarray):
         closes = data[:, 3]
-        returns = np.full(len(closes), np.nan)
-        
-        for i in range(self.params['lookback_period'], len(closes)):
-            returns[i] = (closes[i] / closes[i - self.params['lookback_period']]) - 1
-        
-        self.indicators['momentum'] = returns
+        self.indicators['momentum'] = indicators.momentum(closes, self.params['lookback_period'])
     
     def next(self, bar_idx: int, data: np.ndarray) -> int:
         if bar_idx < self.params['lookback_period']:
@@ -266,6 +352,17 @@ class Momentum(Strategy):
         elif mom < -self.params['threshold']:
             return -1  # Strong downward momentum
         return 0
+    
+    @classmethod
+    def sweep_signals(cls, data: np.ndarray, param_sets: List[Dict]):
+        closes = data[:, 3]
+        lookbacks = [ps['lookback_period'] for ps in param_sets]
+        mom, valid = _rows(_indicator_table(lambda lb: indicators.momentum(closes, lb), lookbacks),
+                           lookbacks, len(closes))
+        threshold = np.array([[ps['threshold']] for ps in param_sets], dtype=float)
+        signals = np.select([mom > threshold, mom < -threshold], [1, -1], 0).astype(np.int8)
+        _warmup(signals, lookbacks)
+        return signals, valid
 
 
 class PairsTrading(Strategy):
@@ -283,13 +380,8 @@ class PairsTrading(Strategy):
         # This requires two tickers - simplified for single ticker backtest
         # In real implementation, would calculate spread and z-score
         closes = data[:, 3]
-        rolling_mean = np.full(len(closes), np.nan)
-        rolling_std = np.full(len(closes), np.nan)
-        
-        period = self.params['lookback']
-        for i in range(period - 1, len(closes)):
-            rolling_mean[i] = np.mean(closes[i - period + 1:i + 1])
-            rolling_std[i] = np.std(closes[i - period + 1:i + 1])
+        rolling_mean = indicators.sma(closes, self.params['lookback'])
+        rolling_std = indicators.rolling_std(closes, self.params['lookback'])
         
         z_score = (closes - rolling_mean) / (rolling_std + 1e-10)
         self.indicators['z_score'] = z_score
@@ -400,11 +492,13 @@ class BacktestEngine:
         initial_cash: float = 100000,
         commission: float = 0.0,
         slippage: float = 0.0005,
-        db_path: str = None
+        db_path: str = None,
+        vectorised: bool = True
     ):
         self.initial_cash = initial_cash
         self.commission_rate = commission
         self.slippage_rate = slippage
+        self.vectorised = vectorised  # simulate signal vectors as arrays (False: always bar by bar)
         
         if db_path is None:
             db_path = Path(__file__).parent.parent / "data" / "backtesting.db"
@@ -499,11 +593,31 @@ class BacktestEngine:
         if strategy_name not in STRATEGIES:
             raise ValueError(f"Unknown strategy: {strategy_name}")
         
-        strategy_class = STRATEGIES[strategy_name]
-        strategy = strategy_class(params)
-        
         # Download data
         data, dates = self._fetch_data(ticker, start_date, end_date)
+        benchmark = self._fetch_data('SPY', start_date, end_date)
+        
+        result = self.run_on_data(strategy_name, ticker, data, dates, start_date, end_date, params, benchmark)
+        
+        # Save to database
+        if save_to_db:
+            result.run_id = self._save_to_db(result)
+        
+        return result
+    
+    def run_on_data(
+        self,
+        strategy_name: str,
+        ticker: str,
+        data: np.ndarray,
+        dates: List[datetime],
+        start_date: str,
+        end_date: str,
+        params: Dict = None,
+        benchmark: Tuple[np.ndarray, List[datetime]] = None
+    ) -> BacktestResult:
+        """Run a backtest on already loaded OHLCV data (benchmark: SPY data and dates)"""
+        strategy = STRATEGIES[strategy_name](params)
         
         # Initialize strategy
         strategy.init(data)
@@ -515,32 +629,25 @@ class BacktestEngine:
         self._calculate_metrics(result, data, dates)
         
         # Benchmark comparison
-        benchmark_data, benchmark_dates = self._fetch_data('SPY', start_date, end_date)
-        self._calculate_alpha_beta(result, data, dates, benchmark_data, benchmark_dates)
-        
-        # Save to database
-        if save_to_db:
-            result.run_id = self._save_to_db(result)
+        if benchmark is not None:
+            self._calculate_alpha_beta(result, data, dates, *benchmark)
         
         return result
     
     def _fetch_data(self, ticker: str, start: str, end: str) -> Tuple[np.ndarray, List[datetime]]:
-        """Fetch OHLCV data from yfinance"""
-        df = yf.download(ticker, start=start, end=end, progress=False)
+        """Fetch OHLCV data from the shared price store (downloading only the bars it lacks)"""
+        store = get_price_store()
+        if not store.ensure(ticker, start, end):
+            raise ValueError(f"No data for {ticker}")
         
-        if df.empty:
+        ts, cols = store.columns(ticker, start, end)
+        if len(ts) == 0:
             raise ValueError(f"No data for {ticker}")
         
         # Extract OHLCV
-        data = np.column_stack([
-            df['Open'].values,
-            df['High'].values,
-            df['Low'].values,
-            df['Close'].values,
-            df['Volume'].values
-        ])
+        data = np.column_stack([cols[f] for f in ('Open', 'High', 'Low', 'Close', 'Volume')])
         
-        dates = df.index.to_pydatetime().tolist()
+        dates = ts.view('M8[ns]').astype('M8[us]').tolist()
         
         return data, dates
     
@@ -553,7 +660,12 @@ class BacktestEngine:
         start_date: str,
         end_date: str
     ) -> BacktestResult:
-        """Simulate trading"""
+        """Simulate trading
+        
+        Strategies that emit a whole signal vector are simulated with array operations
+        (simulate_signals); stateful strategies, and runs where a buy cannot be afforded,
+        walk the bars. Both give the same trades and equity curve.
+        """
         
         result = BacktestResult(
             strategy=strategy.name,
@@ -563,6 +675,47 @@ class BacktestEngine:
             params=strategy.params
         )
         
+        signals = strategy.signals(data) if self.vectorised else None
+        if signals is not None:
+            sweep = simulate_signals(data[:, 3], signals[None, :], self.initial_cash,
+                                     self.commission_rate, self.slippage_rate)
+            if not sweep.needs_per_bar[0]:
+                result.trades, result.equity_curve = self._replay(sweep, dates)
+                return result
+        
+        result.trades, result.equity_curve = self._walk_bars(strategy, data, dates)
+        return result
+    
+    def _replay(self, sweep: 'SignalSweep', dates: List[datetime]) -> Tuple[List[Trade], List[Tuple[datetime, float]]]:
+        """Trades and equity curve of a single-row SignalSweep, as _walk_bars records them"""
+        trades = [
+            Trade(
+                entry_date=dates[entry],
+                exit_date=dates[exit_],
+                side='long',
+                entry_price=entry_price,
+                exit_price=exit_price,
+                quantity=quantity,
+                pnl=pnl,
+                return_pct=return_pct,
+                commission=self.commission_rate,
+                slippage=quantity * exit_price * self.slippage_rate if exited else 0
+            )
+            for entry, exit_, entry_price, exit_price, quantity, pnl, return_pct, exited in zip(
+                sweep.entry_idx.tolist(), sweep.exit_idx.tolist(), sweep.entry_price.tolist(),
+                sweep.exit_price.tolist(), sweep.quantity.tolist(), sweep.pnl.tolist(),
+                sweep.return_pct.tolist(), sweep.exited.tolist())
+        ]
+        return trades, list(zip(dates, sweep.equity[0].tolist()))
+    
+    def _walk_bars(
+        self,
+        strategy: Strategy,
+        data: np.ndarray,
+        dates: List[datetime]
+    ) -> Tuple[List[Trade], List[Tuple[datetime, float]]]:
+        """Per-bar simulation: strategy.next() at every bar"""
+        
         cash = self.initial_cash
         position = 0  # shares held
         equity = []
@@ -669,10 +822,7 @@ class BacktestEngine:
                 slippage=0
             ))
         
-        result.trades = trades
-        result.equity_curve = equity
-        
-        return result
+        return trades, equity
     
     def _calculate_metrics(self, result: BacktestResult, data: np.ndarray, dates: List[datetime]):
         """Calculate all performance metrics"""
@@ -768,7 +918,7 @@ class BacktestEngine:
         # Monthly returns
         monthly_data = defaultdict(list)
         for date, equity in result.equity_curve:
-            month_key = date.strftime('%Y-%m')
+            month_key = f"{date.year:04d}-{date.month:02d}"
             monthly_data[month_key].append(equity)
         
         for month, equities in monthly_data.items():
@@ -942,11 +1092,279 @@ class BacktestEngine:
 # PARAMETER OPTIMIZATION
 # ============================================================================
 
+# ============================================================================
+# VECTORISED PARAMETER SWEEP
+# ============================================================================
+
+# BacktestResult metrics sweep_metrics() computes for a whole parameter sweep at once
+SWEEP_METRICS = (
+    'total_return', 'cagr', 'sharpe_ratio', 'sortino_ratio', 'calmar_ratio',
+    'max_drawdown', 'max_drawdown_duration', 'win_rate', 'avg_win', 'avg_loss',
+    'profit_factor', 'num_trades', 'avg_holding_period', 'exposure_time',
+    'alpha', 'beta', 'information_ratio', 'max_consecutive_wins', 'max_consecutive_losses',
+)
+
+_NS_PER_DAY = 86_400_000_000_000
+
+
+@dataclass
+class SignalSweep:
+    """Equity curves and trades for many parameter sets (one row per set)"""
+    equity: np.ndarray          # (n_sets, n_bars): equity at each bar before that bar's trade
+    needs_per_bar: np.ndarray   # sets where a buy could not be afforded (simulate per bar instead)
+    trade_set: np.ndarray       # per trade, ordered by set then entry bar
+    entry_idx: np.ndarray
+    exit_idx: np.ndarray
+    exited: np.ndarray          # closed by a sell signal (False: closed at the last bar)
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    quantity: np.ndarray
+    pnl: np.ndarray
+    return_pct: np.ndarray
+
+
+def _ffill_take(values: np.ndarray, events: np.ndarray, initial: float) -> np.ndarray:
+    """Per row, the value at the latest event at or before each bar (initial before the first)"""
+    bars = np.arange(values.shape[1])
+    last = np.maximum.accumulate(np.where(events, bars, -1), axis=1)
+    out = np.take_along_axis(values, np.maximum(last, 0), axis=1)
+    out[last < 0] = initial
+    return out
+
+
+def simulate_signals(
+    close: np.ndarray,
+    signals: np.ndarray,
+    initial_cash: float,
+    commission: float,
+    slippage: float
+) -> SignalSweep:
+    """BacktestEngine._simulate for every row of signals at once
+    
+    Same rules: a buy signal while flat invests 95% of cash at close * (1 + slippage),
+    a sell signal while long exits at close less slippage, an open position is closed
+    at the last bar. Trades are compounded in order (a loop over the k-th trade of
+    all sets), so cash and equity come out as the per-bar loop computes them.
+    """
+    n_sets, n_bars = signals.shape
+    bars = np.arange(n_bars)
+    
+    # Long after bar i iff the latest non-zero signal up to i was a buy
+    last = np.maximum.accumulate(np.where(signals != 0, bars, -1), axis=1)
+    long_after = (np.take_along_axis(signals, np.maximum(last, 0), axis=1) == 1) & (last >= 0)
+    long_before = np.zeros_like(long_after)
+    long_before[:, 1:] = long_after[:, :-1]
+    buys = long_after & ~long_before
+    sells = long_before & ~long_after
+    
+    trade_set, entry_idx = np.nonzero(buys)      # row-major: by set, then bar
+    sell_set, sell_idx = np.nonzero(sells)
+    n_buys = np.bincount(trade_set, minlength=n_sets)
+    n_sells = np.bincount(sell_set, minlength=n_sets)
+    rank = np.arange(len(trade_set)) - (np.cumsum(n_buys) - n_buys)[trade_set]
+    has_exit = rank < n_sells[trade_set]
+    exit_idx = np.full(len(trade_set), n_bars - 1)
+    exit_idx[has_exit] = sell_idx
+    
+    entry_price = close[entry_idx] * (1 + slippage)
+    exit_price = close[exit_idx]
+    quantity = np.empty(len(trade_set))
+    hold_cash = np.empty(len(trade_set))
+    after_exit = np.empty(len(trade_set))
+    needs_per_bar = np.zeros(n_sets, dtype=bool)
+    if n_sets == 1:
+        # One set (a single backtest): the same arithmetic on Python floats, trade by trade
+        cash = float(initial_cash)
+        for t, (price, sell_price, sold) in enumerate(zip(entry_price.tolist(), exit_price.tolist(),
+                                                          has_exit.tolist())):
+            shares = (cash * 0.95) / price
+            cost = shares * price + commission
+            needs_per_bar[0] |= not cost <= cash
+            quantity[t] = shares
+            hold_cash[t] = cash - cost
+            proceeds = shares * sell_price
+            after_exit[t] = hold_cash[t] + (proceeds - proceeds * slippage) - commission
+            if sold:
+                cash = float(after_exit[t])
+    else:
+        cash = np.full(n_sets, float(initial_cash))
+        by_rank = np.argsort(rank, kind='stable')
+        bounds = np.searchsorted(rank[by_rank], np.arange(int(n_buys.max()) + 1 if len(trade_set) else 0))
+        for k in range(len(bounds) - 1):
+            t = by_rank[bounds[k]:bounds[k + 1]]
+            sets = trade_set[t]
+            shares = (cash[sets] * 0.95) / entry_price[t]
+            cost = shares * entry_price[t] + commission
+            needs_per_bar[sets[~(cost <= cash[sets])]] = True
+            quantity[t] = shares
+            hold_cash[t] = cash[sets] - cost
+            sold = has_exit[t]
+            proceeds = shares * exit_price[t]
+            after_exit[t] = hold_cash[t] + (proceeds - proceeds * slippage) - commission
+            cash[sets[sold]] = after_exit[t][sold]
+    
+    # Equity: cash + position * close, with cash/position as left by the previous bar
+    cash_at = np.zeros((n_sets, n_bars))
+    position_at = np.zeros((n_sets, n_bars))
+    cash_at[trade_set, entry_idx] = hold_cash
+    position_at[trade_set, entry_idx] = quantity
+    cash_at[trade_set[has_exit], exit_idx[has_exit]] = after_exit[has_exit]
+    events = buys | sells
+    cash_after = _ffill_take(cash_at, events, float(initial_cash))
+    position_after = _ffill_take(position_at, events, 0.0)
+    equity = np.empty((n_sets, n_bars))
+    equity[:, 0] = float(initial_cash) + 0.0 * close[0]
+    equity[:, 1:] = cash_after[:, :-1] + position_after[:, :-1] * close[1:]
+    
+    pnl = (exit_price - entry_price) * quantity
+    return_pct = np.where(has_exit, (exit_price - entry_price) / entry_price, pnl / (quantity * entry_price))
+    return SignalSweep(equity, needs_per_bar, trade_set, entry_idx, exit_idx, has_exit, entry_price,
+                       exit_price, quantity, pnl, return_pct)
+
+
+def _mean_std(x: np.ndarray, mask: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Row-wise mean and population std (of the masked entries)"""
+    if mask is None:
+        return np.mean(x, axis=1), np.std(x, axis=1)
+    count = mask.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(mask, x, 0.0).sum(axis=1) / count
+        var = np.where(mask, (x - mean[:, None]) ** 2, 0.0).sum(axis=1) / count
+    return mean, np.sqrt(var)
+
+
+def _group_max(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    out = np.zeros(n_groups)
+    np.maximum.at(out, groups, values)
+    return out
+
+
+def sweep_metrics(
+    sweep: SignalSweep,
+    dates: List[datetime],
+    initial_cash: float,
+    start_date: str,
+    end_date: str,
+    benchmark_close: np.ndarray = None
+) -> Dict[str, np.ndarray]:
+    """BacktestEngine._calculate_metrics / _calculate_alpha_beta as arrays over parameter sets"""
+    equity = sweep.equity
+    n_sets = len(equity)
+    sqrt252 = np.sqrt(252)
+    m = {name: np.zeros(n_sets) for name in SWEEP_METRICS}
+    
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        returns = np.diff(equity, axis=1) / equity[:, :-1]
+        
+        m['total_return'] = (equity[:, -1] / initial_cash) - 1
+        years = (dates[-1] - dates[0]).days / 365.25
+        if years > 0:
+            m['cagr'] = ((equity[:, -1] / initial_cash) ** (1 / years)) - 1
+        
+        if returns.shape[1] > 0:
+            mean, std = _mean_std(returns)
+            m['sharpe_ratio'] = np.where(std > 0, mean / std * sqrt252, 0.0)
+            downside = returns < 0
+            _, down_std = _mean_std(returns, downside)
+            m['sortino_ratio'] = np.where(downside.any(axis=1) & (down_std > 0), mean / down_std * sqrt252, 0.0)
+        
+        running_max = np.maximum.accumulate(equity, axis=1)
+        drawdowns = (equity - running_max) / running_max
+        m['max_drawdown'] = np.abs(np.min(drawdowns, axis=1))
+        # Longest drawdown that recovered before the last bar
+        in_dd = drawdowns < 0
+        bars = np.arange(equity.shape[1])
+        run = bars - np.maximum.accumulate(np.where(in_dd, -1, bars), axis=1)
+        ends = in_dd[:, :-1] & ~in_dd[:, 1:]
+        m['max_drawdown_duration'] = np.where(ends, run[:, :-1], 0).max(axis=1, initial=0)
+        m['calmar_ratio'] = np.where(m['max_drawdown'] > 0, m['cagr'] / m['max_drawdown'], 0.0)
+        
+        # Trade statistics
+        ts, pnl = sweep.trade_set, sweep.pnl
+        count = np.bincount(ts, minlength=n_sets)
+        wins, losses = pnl > 0, pnl < 0
+        n_wins = np.bincount(ts, wins, minlength=n_sets)
+        n_losses = np.bincount(ts, losses, minlength=n_sets)
+        gross_profit = np.bincount(ts, np.where(wins, pnl, 0.0), minlength=n_sets)
+        gross_loss = np.bincount(ts, np.where(losses, pnl, 0.0), minlength=n_sets)
+        date_ns = np.array(dates, dtype='datetime64[ns]').astype(np.int64)
+        holding = (date_ns[sweep.exit_idx] - date_ns[sweep.entry_idx]) // _NS_PER_DAY
+        total_days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days
+        traded = count > 0
+        m['num_trades'] = count.astype(float)
+        m['win_rate'] = np.where(traded, n_wins / count, 0.0)
+        m['avg_win'] = np.where(n_wins > 0, gross_profit / n_wins, 0.0)
+        m['avg_loss'] = np.where(n_losses > 0, gross_loss / n_losses, 0.0)
+        m['profit_factor'] = np.where(traded & (gross_loss < 0), gross_profit / np.abs(gross_loss), 0.0)
+        held = np.bincount(ts, holding, minlength=n_sets)
+        m['avg_holding_period'] = np.where(traded, held / count, 0.0)
+        m['exposure_time'] = held / total_days if total_days > 0 else np.zeros(n_sets)
+        # Longest runs of wins / non-wins, trade by trade within each set
+        if len(ts):
+            new_run = np.ones(len(ts), dtype=bool)
+            new_run[1:] = (ts[1:] != ts[:-1]) | (wins[1:] != wins[:-1])
+            run_id = np.cumsum(new_run) - 1
+            run_len = np.bincount(run_id).astype(float)
+            starts = np.nonzero(new_run)[0]
+            run_win = wins[starts]
+            m['max_consecutive_wins'] = _group_max(np.where(run_win, run_len, 0), ts[starts], n_sets)
+            m['max_consecutive_losses'] = _group_max(np.where(run_win, 0, run_len), ts[starts], n_sets)
+        
+        # Alpha / beta vs benchmark (returns truncated to the shorter series)
+        if benchmark_close is not None and equity.shape[1] >= 2:
+            bench = np.diff(benchmark_close) / benchmark_close[:-1]
+            length = min(returns.shape[1], len(bench))
+            strat, bench = returns[:, :length], bench[:length]
+            if length > 1 and np.std(bench) > 0:
+                s_mean, _ = _mean_std(strat)
+                covariance = ((strat - s_mean[:, None]) * (bench - bench.mean())).sum(axis=1) / (length - 1)
+                variance = np.var(bench)
+                m['beta'] = covariance / variance if variance > 0 else np.zeros(n_sets)
+                m['alpha'] = s_mean * 252 - m['beta'] * (np.mean(bench) * 252)
+                a_mean, a_std = _mean_std(strat - bench)
+                m['information_ratio'] = np.where(a_std > 0, a_mean / a_std * sqrt252, 0.0)
+    return m
+
+
+def _sweep_chunk(
+    strategy_name: str,
+    data: np.ndarray,
+    dates: List[datetime],
+    start_date: str,
+    end_date: str,
+    param_sets: List[Dict],
+    benchmark_close: Optional[np.ndarray],
+    settings: Tuple[float, float, float]
+) -> Optional[Tuple[Dict[str, np.ndarray], np.ndarray]]:
+    """Metrics for a chunk of parameter sets (runs in a worker process for large grids)
+    Returns (metrics, ok) with ok False for sets that need the per-bar path, or None
+    if the strategy has no vectorised signals.
+    """
+    initial_cash, commission, slippage = settings
+    swept = STRATEGIES[strategy_name].sweep_signals(data, param_sets)
+    if swept is None:
+        return None
+    signals, valid = swept
+    sweep = simulate_signals(data[:, 3], signals, initial_cash, commission, slippage)
+    metrics = sweep_metrics(sweep, dates, initial_cash, start_date, end_date, benchmark_close)
+    return metrics, valid & ~sweep.needs_per_bar
+
+
 class ParameterOptimizer:
-    """Parameter optimization using grid search or random search"""
+    """Parameter optimization using grid search or random search
     
-    def __init__(self, engine: BacktestEngine):
+    Each search loads the ticker and SPY once. Strategies with sweep_signals() are
+    evaluated for all parameter sets as one array per chunk of chunk_size sets, with
+    chunks spread over `workers` processes for large grids; the rest (stateful
+    strategies, metrics outside SWEEP_METRICS) run the per-bar simulation per set on
+    the preloaded data. Results: [{'params', 'score', 'metrics'}], plus 'result'
+    (the BacktestResult) for sets that went through the per-bar path.
+    """
+    
+    def __init__(self, engine: BacktestEngine, workers: int = None, chunk_size: int = 256):
         self.engine = engine
+        self.workers = workers
+        self.chunk_size = chunk_size
     
     def grid_search(
         self,
@@ -962,37 +1380,9 @@ class ParameterOptimizer:
         # Generate all combinations
         param_names = list(param_grid.keys())
         param_values = list(param_grid.values())
-        combinations = list(itertools.product(*param_values))
-        
-        results = []
-        best_score = -np.inf
-        best_params = None
+        combinations = [dict(zip(param_names, combo)) for combo in itertools.product(*param_values)]
         
-        for combo in combinations:
-            params = dict(zip(param_names, combo))
-            
-            try:
-                result = self.engine.run_backtest(
-                    strategy_name, ticker, start_date, end_date,
-                    params, save_to_db=False
-                )
-                
-                score = getattr(result, metric)
-                results.append({
-                    'params': params,
-                    'score': score,
-                    'result': result
-                })
-                
-                if score > best_score:
-                    best_score = score
-                    best_params = params
-            
-            except Exception as e:
-                print(f"Error with params {params}: {e}")
-                continue
-        
-        return best_params, results
+        return self._search(strategy_name, ticker, start_date, end_date, combinations, metric)
     
     def random_search(
         self,
@@ -1006,10 +1396,7 @@ class ParameterOptimizer:
     ) -> Tuple[Dict, List[Dict]]:
         """Random search over parameter space"""
         
-        results = []
-        best_score = -np.inf
-        best_params = None
-        
+        trials = []
         for _ in range(n_trials):
             # Sample random parameters
             params = {}
@@ -1018,40 +1405,140 @@ class ParameterOptimizer:
                     params[param_name] = random.randint(min_val, max_val)
                 else:
                     params[param_name] = random.uniform(min_val, max_val)
-            
+            trials.append(params)
+        
+        return self._search(strategy_name, ticker, start_date, end_date, trials, metric)
+    
+    def _search(
+        self,
+        strategy_name: str,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+        param_sets: List[Dict],
+        metric: str
+    ) -> Tuple[Dict, List[Dict]]:
+        """Score every parameter set on data loaded once; best = first highest score"""
+        try:
+            if strategy_name not in STRATEGIES:
+                raise ValueError(f"Unknown strategy: {strategy_name}")
+            data, dates = self.engine._fetch_data(ticker, start_date, end_date)
+            benchmark = self.engine._fetch_data('SPY', start_date, end_date)
+        except Exception as e:
+            print(f"Error loading data for {ticker}: {e}")
+            return None, []
+        
+        results = self.evaluate(strategy_name, ticker, data, dates, start_date, end_date,
+                                param_sets, metric, benchmark)
+        
+        best_score = -np.inf
+        best_params = None
+        for r in results:
+            if r['score'] > best_score:
+                best_score = r['score']
+                best_params = r['params']
+        
+        return best_params, results
+    
+    def evaluate(
+        self,
+        strategy_name: str,
+        ticker: str,
+        data: np.ndarray,
+        dates: List[datetime],
+        start_date: str,
+        end_date: str,
+        param_sets: List[Dict],
+        metric: str = 'sharpe_ratio',
+        benchmark: Tuple[np.ndarray, List[datetime]] = None
+    ) -> List[Dict]:
+        """Score parameter sets on preloaded data, in the order given (failed sets are left out)"""
+        settings = (self.engine.initial_cash, self.engine.commission_rate, self.engine.slippage_rate)
+        benchmark_close = benchmark[0][:, 3] if benchmark is not None else None
+        chunks = [param_sets[i:i + self.chunk_size] for i in range(0, len(param_sets), self.chunk_size)]
+        
+        swept = [None] * len(chunks)
+        if metric in SWEEP_METRICS and STRATEGIES[strategy_name].vectorised():
+            args = [(strategy_name, data, dates, start_date, end_date, chunk, benchmark_close, settings)
+                    for chunk in chunks]
+            workers = min(self.workers or os.cpu_count() or 1, len(chunks))
             try:
-                result = self.engine.run_backtest(
-                    strategy_name, ticker, start_date, end_date,
-                    params, save_to_db=False
-                )
-                
-                score = getattr(result, metric)
+                if workers > 1:
+                    with ProcessPoolExecutor(max_workers=workers) as pool:
+                        swept = list(pool.map(_sweep_chunk, *zip(*args)))
+                else:
+                    swept = [_sweep_chunk(*a) for a in args]
+            except Exception as e:
+                print(f"Vectorised sweep failed ({e}); running each parameter set per bar")
+                swept = [None] * len(chunks)
+        
+        results = []
+        for chunk, chunk_swept in zip(chunks, swept):
+            for i, params in enumerate(chunk):
+                if chunk_swept is not None and chunk_swept[1][i]:
+                    metrics = {name: float(values[i]) for name, values in chunk_swept[0].items()}
+                    results.append({'params': params, 'score': metrics[metric], 'metrics': metrics})
+                    continue
+                try:
+                    result = self.engine.run_on_data(strategy_name, ticker, data, dates, start_date,
+                                                     end_date, params, benchmark)
+                except Exception as e:
+                    print(f"Error with params {params}: {e}")
+                    continue
                 results.append({
                     'params': params,
-                    'score': score,
+                    'score': getattr(result, metric),
+                    'metrics': {name: float(getattr(result, name)) for name in SWEEP_METRICS},
                     'result': result
                 })
-                
-                if score > best_score:
-                    best_score = score
-                    best_params = params
-            
-            except Exception as e:
-                print(f"Error with params {params}: {e}")
-                continue
         
-        return best_params, results
+        return results
 
 
 # ============================================================================
 # WALK-FORWARD OPTIMIZATION
 # ============================================================================
 
+def _walkforward_window(
+    engine: BacktestEngine,
+    strategy_name: str,
+    ticker: str,
+    data: np.ndarray,
+    dates: List[datetime],
+    start_date: str,
+    end_date: str,
+    param_sets: Optional[List[Dict]],
+    metric: str,
+    benchmark: Tuple[np.ndarray, List[datetime]],
+    workers: int = 1
+) -> List[Tuple[Dict, float]]:
+    """(params, score) per parameter set on one window's bars (runs in a worker process for
+    parallel walk-forwards); param_sets None scores the strategy defaults"""
+    if param_sets is None:
+        result = engine.run_on_data(strategy_name, ticker, data, dates, start_date, end_date, {}, benchmark)
+        return [({}, getattr(result, metric))]
+    results = ParameterOptimizer(engine, workers=workers).evaluate(
+        strategy_name, ticker, data, dates, start_date, end_date, param_sets, metric, benchmark)
+    return [(r['params'], r['score']) for r in results]
+
+
 class WalkForwardOptimizer:
-    """Walk-forward analysis with rolling windows"""
-    
-    def __init__(self, engine: BacktestEngine):
+    """Walk-forward analysis with rolling windows
+    
+    The ticker and SPY are loaded once for the whole range and every window is a slice
+    of that series, scored exactly as a backtest over the window alone. In-sample
+    optimisations run one window per worker process (`workers`, default all cores).
+    Scores are memoised per (window bars, params) for the optimizer's lifetime, and each
+    window's outcome (best params, in-sample score) is kept in a WindowCache on disk, so
+    a rerun only optimises windows it has not seen (use_cache=False to skip it).
+    """
+    
+    def __init__(self, engine: BacktestEngine, workers: int = None, cache_dir: str = None,
+                 use_cache: bool = True):
         self.engine = engine
+        self.workers = workers
+        self.cache = WindowCache(cache_dir) if use_cache else None
+        self._scores: Dict[Tuple[str, str], float] = {}  # (window key, params json) -> score
     
     def run_walkforward(
         self,
@@ -1066,18 +1553,15 @@ class WalkForwardOptimizer:
         save_to_db: bool = True
     ) -> Dict:
         """Run walk-forward optimization"""
+        if strategy_name not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy_name}")
         
         # Calculate windows
         start_dt = datetime.strptime(start_date, '%Y-%m-%d')
         end_dt = datetime.strptime(end_date, '%Y-%m-%d')
         
-        window_results = []
+        periods = []
         current_start = start_dt
-        window_num = 0
-        
-        # Concatenated OOS equity curves
-        oos_equity = []
-        
         while True:
             # Define train period
             train_start = current_start
@@ -1089,38 +1573,98 @@ class WalkForwardOptimizer:
             
             if test_end > end_dt:
                 break
+            periods.append((train_start, train_end, test_start, test_end))
             
-            window_num += 1
+            # Move to next window
+            current_start = test_start
+        
+        # One load for every window
+        if periods:
+            data, dates = self.engine._fetch_data(ticker, start_date, end_date)
+            spy_data, spy_dates = self.engine._fetch_data('SPY', start_date, end_date)
+        else:
+            data, dates, spy_data, spy_dates = np.empty((0, 5)), [], np.empty((0, 5)), []
+        date_ns = np.array(dates, dtype='datetime64[ns]')
+        spy_ns = np.array(spy_dates, dtype='datetime64[ns]')
+        settings = (self.engine.initial_cash, self.engine.commission_rate, self.engine.slippage_rate)
+        param_sets = ([dict(zip(param_grid, combo)) for combo in itertools.product(*param_grid.values())]
+                      if param_grid else None)
+        
+        def window(start: datetime, end: datetime) -> Dict:
+            """Bars for start <= date < end, as _fetch_data would return them"""
+            lo, hi = np.searchsorted(date_ns, np.datetime64(start, 'ns')), np.searchsorted(date_ns, np.datetime64(end, 'ns'))
+            spy_lo, spy_hi = np.searchsorted(spy_ns, np.datetime64(start, 'ns')), np.searchsorted(spy_ns, np.datetime64(end, 'ns'))
+            if lo == hi or spy_lo == spy_hi:
+                raise ValueError(f"No data for {ticker if lo == hi else 'SPY'}")
+            bars = {
+                'data': data[lo:hi],
+                'dates': dates[lo:hi],
+                'start_date': start.strftime('%Y-%m-%d'),
+                'end_date': end.strftime('%Y-%m-%d'),
+                'benchmark': (spy_data[spy_lo:spy_hi], spy_dates[spy_lo:spy_hi]),
+            }
+            bars['key'] = WindowCache.key(strategy_name, metric, settings, bars['start_date'], bars['end_date'],
+                                          bars['data'], date_ns[lo:hi], bars['benchmark'][0], spy_ns[spy_lo:spy_hi])
+            return bars
+        
+        # In-sample optimisation for the windows not cached on disk
+        train = [window(p[0], p[1]) for p in periods]
+        outcomes = [None] * len(train)
+        pending = []
+        for i, bars in enumerate(train):
+            bars['cache_key'] = WindowCache.key(bars['key'], param_sets)
+            outcome = self.cache.get(bars['cache_key']) if self.cache is not None else None
+            if outcome is not None:
+                outcomes[i] = (outcome['best_params'], outcome['is_score'])
+                continue
+            todo = [p for p in (param_sets or [{}]) if (bars['key'], json.dumps(p, sort_keys=True)) not in self._scores]
+            if todo:
+                pending.append((i, todo if param_sets else None))
+        
+        workers = min(self.workers or os.cpu_count() or 1, len(pending))
+        args = [(self.engine, strategy_name, ticker, train[i]['data'], train[i]['dates'], train[i]['start_date'],
+                 train[i]['end_date'], todo, metric, train[i]['benchmark']) for i, todo in pending]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                scored = list(pool.map(_walkforward_window, *zip(*args)))
+        else:
+            scored = [_walkforward_window(*a, workers=self.workers) for a in args]
+        for (i, _), window_scores in zip(pending, scored):
+            for params, score in window_scores:
+                self._scores[(train[i]['key'], json.dumps(params, sort_keys=True))] = score
+        
+        for i, bars in enumerate(train):
+            if outcomes[i] is not None:
+                continue
+            # Best = first highest score, as ParameterOptimizer.grid_search
+            best_params, is_score = None, -np.inf
+            for params in (param_sets or [{}]):
+                score = self._scores.get((bars['key'], json.dumps(params, sort_keys=True)))
+                if score is not None and score > is_score:
+                    best_params, is_score = params, score
+            if best_params is None:
+                # No parameter set could be scored: strategy defaults
+                result = self.engine.run_on_data(strategy_name, ticker, bars['data'], bars['dates'], bars['start_date'],
+                                                 bars['end_date'], None, bars['benchmark'])
+                is_score = getattr(result, metric)
+            outcomes[i] = (best_params, is_score)
+            if self.cache is not None:
+                self.cache.put(bars['cache_key'], {'best_params': best_params, 'is_score': is_score})
+        
+        window_results = []
+        
+        # Concatenated OOS equity curves
+        oos_equity = []
+        
+        for window_num, ((train_start, train_end, test_start, test_end), (best_params, is_score)) in enumerate(
+                zip(periods, outcomes), 1):
             print(f"Window {window_num}: Train {train_start.date()} to {train_end.date()}, Test {test_start.date()} to {test_end.date()}")
             
-            # Optimize on train period
-            if param_grid:
-                optimizer = ParameterOptimizer(self.engine)
-                best_params, _ = optimizer.grid_search(
-                    strategy_name, ticker,
-                    train_start.strftime('%Y-%m-%d'),
-                    train_end.strftime('%Y-%m-%d'),
-                    param_grid, metric
-                )
-            else:
-                # Use default params
-                best_params = {}
-            
-            # Get in-sample result
-            is_result = self.engine.run_backtest(
-                strategy_name, ticker,
-                train_start.strftime('%Y-%m-%d'),
-                train_end.strftime('%Y-%m-%d'),
-                best_params, save_to_db=False
-            )
-            is_score = getattr(is_result, metric)
-            
             # Test on out-of-sample period
-            oos_result = self.engine.run_backtest(
-                strategy_name, ticker,
-                test_start.strftime('%Y-%m-%d'),
-                test_end.strftime('%Y-%m-%d'),
-                best_params, save_to_db=False
+            test = window(test_start, test_end)
+            oos_result = self.engine.run_on_data(
+                strategy_name, ticker, test['data'], test['dates'],
+                test['start_date'], test['end_date'], best_params, test['benchmark']
             )
             oos_score = getattr(oos_result, metric)
             oos_return = oos_result.total_return
@@ -1140,9 +1684,6 @@ class WalkForwardOptimizer:
             
             # Collect OOS equity curve
             oos_equity.extend(oos_result.equity_curve)
-            
-            # Move to next window
-            current_start = test_start
         
         # Calculate overall OOS performance
         if oos_equity:
@@ -1169,7 +1710,7 @@ class WalkForwardOptimizer:
         summary = {
             'strategy': strategy_name,
             'ticker': ticker,
-            'n_windows': window_num,
+            'n_windows': len(window_results),
             'window_results': window_results,
             'oos_total_return': oos_total_return,
             'oos_sharpe': oos_sharpe,
@@ -1231,6 +1772,428 @@ class WalkForwardOptimizer:
         conn.close()
 
 
+# ============================================================================
+# PORTFOLIO BACKTESTING
+# ============================================================================
+
+PORTFOLIO_PARAMS = {
+    'stop_loss': None,              # exit when the position return <= this (e.g. -0.15)
+    'take_profit': None,            # exit when the position return >= this
+    'score_exit_threshold': None,   # exit when the ticker's score falls below this
+    'max_hold_days': None,          # exit after this many calendar days
+    'trailing_stop': None,          # exit when price / peak since entry - 1 <= this
+    'pyramid': 'none',              # PYRAMIDS key, or ((return, amount), ...) tiers
+    'pyramid_min_score': 30,        # add to a winner only while its score is above this
+    'max_positions': 999,
+    'max_per_sector': 999,
+    'min_entry_score': 25,
+    'cash_reserve_pct': 0,          # keep this fraction of portfolio value in cash
+}
+
+# Add `amount` to a position once its return reaches `return`; one tier per rebalance, in order
+PYRAMIDS = {
+    'none': (),
+    'add_2.5k_at_15pct': ((0.15, 2500),),
+    'add_2.5k_at_15_and_30pct': ((0.15, 2500), (0.30, 2500)),
+    'double_down_5k_at_20pct': ((0.20, 5000),),
+}
+
+EXIT_REASONS = ('stop_loss', 'take_profit', 'score_exit', 'max_hold', 'trailing_stop', 'backtest_end')
+
+PORTFOLIO_METRICS = (
+    'total_return', 'cagr', 'sharpe_ratio', 'sortino_ratio', 'max_drawdown', 'final_value',
+    'num_trades', 'win_rate', 'avg_win', 'avg_loss', 'avg_holding_period', 'exposure_time',
+)
+
+
+@dataclass
+class PricePanel:
+    """Aligned closes for many tickers: close[i, j] is tickers[j] on dates[i], NaN where it has no bar"""
+    dates: np.ndarray       # datetime64[ns], ascending
+    tickers: List[str]
+    close: np.ndarray       # (n_dates, n_tickers)
+    
+    @classmethod
+    def from_store(cls, tickers: List[str], start: str, end: str, store=None,
+                   download: bool = True) -> 'PricePanel':
+        """Panel for start <= date < end from the shared price store (fetching only missing bars)"""
+        store = store or get_price_store()
+        if download:
+            for ticker in tickers:
+                store.ensure(ticker, start, end)
+        frame = store.load(tickers, start, end, fields=['Close'])
+        return cls(frame.index.to_numpy(), list(frame.columns.get_level_values('Ticker')), frame.to_numpy())
+    
+    def filled(self) -> np.ndarray:
+        """close with gaps carried forward from each ticker's previous bar"""
+        bars = np.arange(len(self.dates))[:, None]
+        last = np.maximum.accumulate(np.where(np.isnan(self.close), -1, bars), axis=0)
+        filled = self.close[np.maximum(last, 0), np.arange(self.close.shape[1])]
+        filled[last < 0] = np.nan
+        return filled
+    
+    def rows_at(self, dates) -> np.ndarray:
+        """Index of the last bar on or before each date (-1 before the first bar)"""
+        return np.searchsorted(self.dates, np.asarray(dates, dtype='M8[ns]'), side='right') - 1
+
+
+class SharedArrays:
+    """Arrays copied once into shared memory; worker processes map them by name instead of unpickling copies"""
+    
+    def __init__(self, **arrays: np.ndarray):
+        self.specs = {}
+        self._blocks = []
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self._blocks.append(block)
+            self.specs[name] = (block.name, array.shape, array.dtype.str)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+    
+    @staticmethod
+    def attach(specs: Dict[str, Tuple]) -> Dict[str, np.ndarray]:
+        """Read-only views of the arrays described by specs (the blocks stay mapped for the process)"""
+        arrays = {}
+        for name, (block_name, shape, dtype) in specs.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            _attached_blocks.append(block)
+            arrays[name] = np.ndarray(shape, dtype, buffer=block.buf)
+            arrays[name].flags.writeable = False
+        return arrays
+
+
+_attached_blocks: List = []
+_shared_panel: Dict[str, np.ndarray] = {}
+
+
+def _attach_panel(specs: Dict[str, Tuple]):
+    """ProcessPoolExecutor initializer: map the shared panel in this worker"""
+    _shared_panel.update(SharedArrays.attach(specs))
+
+
+def simulate_portfolio(
+    close: np.ndarray,
+    days: np.ndarray,
+    rows: np.ndarray,
+    scores: np.ndarray,
+    eligible: np.ndarray,
+    sectors: np.ndarray,
+    params: Dict,
+    initial_cash: float,
+    position_size: float,
+    commission: float,
+    slippage: float
+) -> Dict[str, np.ndarray]:
+    """Rebalancing portfolio over a (bars, tickers) panel with one state array per field
+    
+    close: last known close per bar and ticker (NaN before listing); days: calendar day
+    number per bar; rows: bar of each rebalance; scores / eligible: (rebalances, tickers).
+    At each rebalance, in order: exits (first rule that fires, EXIT_REASONS), pyramid adds
+    (ticker order, while cash lasts), then new positions of position_size in score order
+    within the position, sector and cash limits. Buys pay close * (1 + slippage), sells get
+    close * (1 - slippage), each order pays commission; positions still open are closed at
+    the last bar without costs, as BacktestEngine does. Returns equity and invested value
+    per bar and one array per trade field.
+    """
+    p = {**PORTFOLIO_PARAMS, **(params or {})}
+    tiers = PYRAMIDS[p['pyramid']] if isinstance(p['pyramid'], str) else tuple(p['pyramid'] or ())
+    tier_return = np.array([t[0] for t in tiers] + [np.inf])
+    tier_amount = np.array([t[1] for t in tiers] + [0.0], dtype=float)
+    n_bars, n_tickers = close.shape
+    n_sectors = int(sectors.max()) + 1 if n_tickers else 0
+    
+    shares = np.zeros(n_tickers)
+    cost = np.zeros(n_tickers)
+    entry = np.zeros(n_tickers, dtype=np.int64)
+    peak = np.zeros(n_tickers)
+    adds = np.zeros(n_tickers, dtype=np.int64)
+    cash = float(initial_cash)
+    held_shares = np.zeros((len(rows), n_tickers))
+    held_cash = np.empty(len(rows))
+    trades = defaultdict(list)
+    
+    def close_out(idx, bar, prices, reason, costs):
+        nonlocal cash
+        proceeds = shares[idx] * prices * (1 - slippage) - commission if costs else shares[idx] * prices
+        cash += float(proceeds.sum())
+        for key, values in (('ticker', idx), ('entry_row', entry[idx]), ('exit_row', np.full(len(idx), bar)),
+                            ('entry_price', cost[idx] / shares[idx]), ('exit_price', prices),
+                            ('shares', shares[idx]), ('cost', cost[idx]), ('pnl', proceeds - cost[idx]),
+                            ('return_pct', proceeds / cost[idx] - 1), ('reason', reason)):
+            trades[key].append(np.asarray(values))
+        shares[idx] = 0.0
+        cost[idx] = 0.0
+    
+    for r, bar in enumerate(rows):
+        price = close[bar]
+        score = scores[r]
+        
+        # Exits
+        held = np.flatnonzero(shares > 0)
+        if len(held):
+            ret = price[held] / (cost[held] / shares[held]) - 1
+            peak[held] = np.maximum(peak[held], price[held])
+            never = np.zeros(len(held), dtype=bool)
+            rules = [
+                ret <= p['stop_loss'] if p['stop_loss'] else never,
+                ret >= p['take_profit'] if p['take_profit'] else never,
+                score[held] < p['score_exit_threshold'] if p['score_exit_threshold'] else never,
+                days[bar] - days[entry[held]] >= p['max_hold_days'] if p['max_hold_days'] else never,
+                price[held] / peak[held] - 1 <= p['trailing_stop'] if p['trailing_stop'] else never,
+            ]
+            reason = np.select(rules, np.arange(len(rules)), -1)
+            out = reason >= 0
+            if out.any():
+                close_out(held[out], bar, price[held[out]], reason[out], costs=True)
+            held, ret = held[~out], ret[~out]
+            
+            # Pyramid adds
+            if tiers and len(held):
+                add = (ret >= tier_return[np.minimum(adds[held], len(tiers))]) & (score[held] > p['pyramid_min_score'])
+                add_idx = held[add]
+                amount = tier_amount[adds[add_idx]]
+                affordable = np.cumsum(amount + commission) <= cash
+                add_idx, amount = add_idx[affordable], amount[affordable]
+                shares[add_idx] += amount / (price[add_idx] * (1 + slippage))
+                cost[add_idx] += amount + commission
+                adds[add_idx] += 1
+                cash -= float((amount + commission).sum())
+        
+        # Entries
+        held = shares > 0
+        slots = p['max_positions'] - int(held.sum())
+        if slots > 0:
+            value = cash + float(shares[held] @ price[held])
+            available = max(0.0, cash - value * p['cash_reserve_pct'])
+            n_new = min(slots, int(available / (position_size + commission)))
+            if n_new > 0:
+                new = np.flatnonzero(eligible[r] & ~held & (score >= p['min_entry_score']) & (price > 0))
+                new = new[np.argsort(-score[new], kind='stable')]
+                if p['max_per_sector'] is not None:
+                    sector = sectors[new]
+                    by_sector = np.argsort(sector, kind='stable')
+                    grouped = sector[by_sector]
+                    rank = np.empty(len(new), dtype=np.int64)
+                    rank[by_sector] = np.arange(len(new)) - np.searchsorted(grouped, grouped)
+                    full = np.bincount(sectors[held], minlength=n_sectors)[sector]
+                    new = new[rank < p['max_per_sector'] - full]
+                new = new[:n_new]
+                shares[new] = position_size / (price[new] * (1 + slippage))
+                cost[new] = position_size + commission
+                entry[new] = bar
+                peak[new] = price[new]
+                adds[new] = 0
+                cash -= len(new) * (position_size + commission)
+        
+        held_shares[r] = shares
+        held_cash[r] = cash
+    
+    held = np.flatnonzero(shares > 0)
+    if len(held):
+        close_out(held, n_bars - 1, close[-1, held], np.full(len(held), len(EXIT_REASONS) - 1), costs=False)
+    
+    # Equity: cash + holdings marked at each bar; holdings change only at rebalances
+    equity = np.full(n_bars, float(initial_cash))
+    invested = np.zeros(n_bars)
+    bounds = np.append(rows, n_bars)
+    for r in range(len(rows)):
+        cols = np.flatnonzero(held_shares[r])
+        value = close[bounds[r]:bounds[r + 1], cols] @ held_shares[r, cols]
+        invested[bounds[r]:bounds[r + 1]] = value
+        equity[bounds[r]:bounds[r + 1]] = held_cash[r] + value
+    
+    sim = {key: np.concatenate(parts) for key, parts in trades.items()}
+    for key in ('ticker', 'entry_row', 'exit_row', 'entry_price', 'exit_price', 'shares', 'cost',
+                'pnl', 'return_pct', 'reason'):
+        sim.setdefault(key, np.empty(0))
+    sim['equity'] = equity
+    sim['invested'] = invested
+    return sim
+
+
+def portfolio_metrics(sim: Dict[str, np.ndarray], days: np.ndarray, initial_cash: float) -> Dict[str, float]:
+    """PORTFOLIO_METRICS of a simulate_portfolio() run (daily returns; avg_win/avg_loss are trade returns)"""
+    equity = sim['equity']
+    returns = np.diff(equity) / equity[:-1]
+    years = (days[-1] - days[0]) / 365.25
+    running_max = np.maximum.accumulate(equity)
+    downside = returns[returns < 0]
+    pnl, trade_returns = sim['pnl'], sim['return_pct']
+    wins, losses = pnl > 0, pnl < 0
+    metrics = {
+        'total_return': equity[-1] / initial_cash - 1,
+        'cagr': (equity[-1] / initial_cash) ** (1 / years) - 1 if years > 0 else 0.0,
+        'sharpe_ratio': np.mean(returns) / np.std(returns) * np.sqrt(252) if len(returns) and np.std(returns) > 0 else 0.0,
+        'sortino_ratio': np.mean(returns) / np.std(downside) * np.sqrt(252) if len(downside) and np.std(downside) > 0 else 0.0,
+        'max_drawdown': abs(np.min((equity - running_max) / running_max)),
+        'final_value': equity[-1],
+        'num_trades': len(pnl),
+        'win_rate': wins.mean() if len(pnl) else 0.0,
+        'avg_win': trade_returns[wins].mean() if wins.any() else 0.0,
+        'avg_loss': trade_returns[losses].mean() if losses.any() else 0.0,
+        'avg_holding_period': np.mean(days[sim['exit_row'].astype(np.int64)] - days[sim['entry_row'].astype(np.int64)]) if len(pnl) else 0.0,
+        'exposure_time': np.mean(sim['invested'] / equity),
+    }
+    return {name: float(value) for name, value in metrics.items()}
+
+
+@dataclass
+class PortfolioResult:
+    """Results from a portfolio backtest"""
+    params: Dict
+    tickers: List[str]
+    dates: np.ndarray
+    equity: np.ndarray          # portfolio value per bar
+    invested: np.ndarray        # value of open positions per bar
+    trades: Dict[str, np.ndarray]
+    metrics: Dict[str, float]
+    
+    def trade_records(self) -> List[Dict]:
+        """One dict per closed trade, in exit order"""
+        dates = self.dates.astype('M8[D]').astype(str).tolist()
+        return [
+            {
+                'ticker': self.tickers[int(t)],
+                'entry_date': dates[int(entry)],
+                'exit_date': dates[int(exit_)],
+                'entry_price': float(entry_price),
+                'exit_price': float(exit_price),
+                'shares': float(shares),
+                'cost': float(cost),
+                'pnl': float(pnl),
+                'return_pct': float(return_pct),
+                'hold_days': int((self.dates[int(exit_)] - self.dates[int(entry)]) // np.timedelta64(1, 'D')),
+                'exit_reason': EXIT_REASONS[int(reason)],
+            }
+            for t, entry, exit_, entry_price, exit_price, shares, cost, pnl, return_pct, reason in zip(
+                *(self.trades[k] for k in ('ticker', 'entry_row', 'exit_row', 'entry_price', 'exit_price',
+                                           'shares', 'cost', 'pnl', 'return_pct', 'reason')))
+        ]
+
+
+def _portfolio_chunk(param_sets: List[Dict], settings: Tuple, arrays: Dict[str, np.ndarray] = None) -> List[Optional[Dict]]:
+    """Metrics per parameter set over the panel (the shared one in pool workers); None where a set fails"""
+    arrays = arrays if arrays is not None else _shared_panel
+    results = []
+    for params in param_sets:
+        try:
+            sim = simulate_portfolio(params=params, **arrays, **settings)
+            results.append(portfolio_metrics(sim, arrays['days'], settings['initial_cash']))
+        except Exception as e:
+            print(f"Error with params {params}: {e}")
+            results.append(None)
+    return results
+
+
+class PortfolioBacktester:
+    """Rebalancing portfolio backtests over a PricePanel, driven by a score matrix
+    
+    scores: DataFrame with one row per rebalance date and one column per ticker (NaN = not
+    scored); each rebalance trades at the last panel bar on or before its date. eligible
+    (same layout, optional) marks the tickers that may be bought on each date, default all
+    scored ones; sectors maps ticker → sector for max_per_sector. Parameter grids run across
+    `workers` processes that map the panel from shared memory.
+    """
+    
+    def __init__(
+        self,
+        panel: PricePanel,
+        scores,
+        eligible=None,
+        sectors: Dict[str, str] = None,
+        initial_cash: float = 100000,
+        position_size: float = 5000,
+        commission: float = 0.0,
+        slippage: float = 0.0005
+    ):
+        self.panel = panel
+        self.settings = {'initial_cash': initial_cash, 'position_size': position_size,
+                         'commission': commission, 'slippage': slippage}
+        scores = scores.sort_index().rename(columns=str.upper).reindex(columns=panel.tickers)
+        rows = panel.rows_at(scores.index)
+        keep = (rows >= 0) & np.append(rows[1:] != rows[:-1], True)  # last score row per bar
+        score_values = scores.to_numpy(dtype=float)
+        if eligible is None:
+            allowed = np.isfinite(score_values)
+        else:
+            eligible = eligible.rename(columns=str.upper).reindex(index=scores.index, columns=panel.tickers)
+            allowed = eligible.eq(True).to_numpy()
+        sector_names = [(sectors or {}).get(t, 'Unknown') for t in panel.tickers]
+        self.sector_names, sector_codes = np.unique(sector_names, return_inverse=True)
+        self.rebalance_dates = panel.dates[rows[keep]]
+        self.arrays = {
+            'close': panel.filled(),
+            'days': panel.dates.astype('M8[D]').astype(np.int64),
+            'rows': rows[keep],
+            'scores': score_values[keep],
+            'eligible': allowed[keep],
+            'sectors': sector_codes.astype(np.int64),
+        }
+    
+    def run(self, params: Dict = None) -> PortfolioResult:
+        """Single portfolio backtest with full equity curve and trades"""
+        sim = simulate_portfolio(params=params, **self.arrays, **self.settings)
+        metrics = portfolio_metrics(sim, self.arrays['days'], self.settings['initial_cash'])
+        return PortfolioResult(
+            params={**PORTFOLIO_PARAMS, **(params or {})},
+            tickers=self.panel.tickers,
+            dates=self.panel.dates,
+            equity=sim.pop('equity'),
+            invested=sim.pop('invested'),
+            trades=sim,
+            metrics=metrics
+        )
+    
+    def grid_search(
+        self,
+        param_grid: Dict[str, List],
+        metric: str = 'sharpe_ratio',
+        workers: int = None
+    ) -> Tuple[Dict, List[Dict]]:
+        """Every combination of param_grid; best = first highest score"""
+        combinations = [dict(zip(param_grid, combo)) for combo in itertools.product(*param_grid.values())]
+        results = self.evaluate(combinations, metric, workers)
+        best = max(results, key=lambda r: r['score'], default=None)
+        return (best['params'] if best else None), results
+    
+    def evaluate(
+        self,
+        param_sets: List[Dict],
+        metric: str = 'sharpe_ratio',
+        workers: int = None,
+        chunk_size: int = 8
+    ) -> List[Dict]:
+        """[{'params', 'score', 'metrics'}] per parameter set, in the order given (failed sets are left out)"""
+        chunks = [param_sets[i:i + chunk_size] for i in range(0, len(param_sets), chunk_size)]
+        workers = min(workers or os.cpu_count() or 1, len(chunks))
+        if workers > 1:
+            with SharedArrays(**self.arrays) as shared, \
+                    ProcessPoolExecutor(max_workers=workers, initializer=_attach_panel,
+                                        initargs=(shared.specs,)) as pool:
+                metrics = list(pool.map(_portfolio_chunk, chunks, itertools.repeat(self.settings)))
+        else:
+            metrics = [_portfolio_chunk(chunk, self.settings, self.arrays) for chunk in chunks]
+        
+        results = []
+        for chunk, chunk_metrics in zip(chunks, metrics):
+            for params, m in zip(chunk, chunk_metrics):
+                if m is not None:
+                    results.append({'params': params, 'score': m[metric], 'metrics': m})
+        return results
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -1359,6 +2322,8 @@ if __name__ == "__main__":
     wf_parser.add_argument('--test-months', type=int, default=3, help='Test window in months')
     wf_parser.add_argument('--metric', choices=['sharpe_ratio', 'total_return', 'calmar_ratio'], 
                           default='sharpe_ratio', help='Optimization metric')
+    wf_parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    wf_parser.add_argument('--no-cache', action='store_true', help='Re-optimise windows already in the window cache')
     
     # backtest-compare
     compare_parser = subparsers.add_parser('backtest-compare', help='Compare multiple strategies')
@@ -1549,7 +2514,7 @@ if __name__ == "__main__":
         
         elif args.command == 'backtest-walkforward':
             engine = BacktestEngine()
-            wf = WalkForwardOptimizer(engine)
+            wf = WalkForwardOptimizer(engine, workers=args.workers, use_cache=not args.no_cache)
             
             # Define parameter grids
             param_grids = {
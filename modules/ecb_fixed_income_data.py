@@ -1,24 +1,11 @@
 #!/usr/bin/env python3
 
 import requests
-import os
-import json
-import time
-from pathlib import Path
-
-CACHE_DIR = Path('/home/quant/apps/quantclaw-data/cache/ecb_fixed_income_data')
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
-CACHE_TTL = 3600
-
-def _cached_get(url, cache_key, params=None, headers=None):
-    cache_file = CACHE_DIR / f'{cache_key}.json'
-    if cache_file.exists() and (time.time() - cache_file.stat().st_mtime) < CACHE_TTL:
-        return json.loads(cache_file.read_text())
-    resp = requests.get(url, params=params, headers=headers, timeout=15)
-    resp.raise_for_status()
-    data = resp.json()
-    cache_file.write_text(json.dumps(data, indent=2))
-    return data
+
+try:
+    from modules.http_fetch import cached_get as _cached_get  # pooled, revalidating, shared cache
+except ImportError:  # run as a script from modules/
+    from http_fetch import cached_get as _cached_get
 
 """
 ECB Fixed Income Data Module
@@ -1,26 +1,13 @@
 #!/usr/bin/env python3
 
 import requests
-import os
-import json
-import time
-from pathlib import Path
 
 API_KEY = 'your_free_fred_api_key_here'  # Replace with your free FRED API key from https://research.stlouisfed.org/useraccount/register/
 
-CACHE_DIR = Path('/home/quant/apps/quantclaw-data/cache/fred_us_economic_indicators')
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
-CACHE_TTL = 3600
-
-def _cached_get(url, cache_key, params=None, headers=None):
-    cache_file = CACHE_DIR / f'{cache_key}.json'
-    if cache_file.exists() and (time.time() - cache_file.stat().st_mtime) < CACHE_TTL:
-        return json.loads(cache_file.read_text())
-    resp = requests.get(url, params=params, headers=headers, timeout=15)
-    resp.raise_for_status()
-    data = resp.json()
-    cache_file.write_text(json.dumps(data, indent=2))
-    return data
+try:
+    from modules.http_fetch import cached_get as _cached_get  # pooled, revalidating, shared cache
+except ImportError:  # run as a script from modules/
+    from http_fetch import cached_get as _cached_get
 
 """
 QuantClaw Data Module: fred_us_economic_indicators
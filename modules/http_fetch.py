@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP fetch layer for QuantClaw Data modules.
+
+Replaces the per-module `_cached_get` helpers (a JSON file per cache key, a
+fixed TTL, a new connection per call) with one process-wide fetcher:
+
+  - Keep-alive: one requests.Session per host, with its own connection pool.
+  - Revalidation: stale entries are re-requested with If-None-Match /
+    If-Modified-Since; a 304 refreshes the entry without a download.
+  - Cache: response bodies are stored zlib-compressed under their sha256
+    (identical bodies are stored once), with a small index file per request.
+    Total blob size is bounded; least recently used entries are evicted first.
+  - Coalescing: concurrent identical requests share one upstream call.
+  - Rate limits: upstream requests (not cache hits) take a token from the
+    pipeline's per-host budget (qcd_platform.pipeline.rate_limiter) when it
+    is importable.
+
+Usage — swap for a module's own helper (the fallback covers running a module as a script):
+    try:
+        from modules.http_fetch import cached_get as _cached_get
+    except ImportError:
+        from http_fetch import cached_get as _cached_get
+    data = _cached_get(url, "cache_key", params=params)     # parsed JSON, as before
+
+Modules with their own TTL:
+    _cached_get = functools.partial(cached_get, ttl=CACHE_TTL)
+
+Raw responses:
+    from modules.http_fetch import fetch
+    resp = fetch(url, params=params, ttl=600)   # FetchResult: status, headers, content, .json(), .text
+
+Settings (environment):
+    QCD_HTTP_CACHE_DIR   cache location (default <repo>/cache/http)
+    QCD_HTTP_CACHE_MB    bound on stored bodies, compressed (default 512)
+    QCD_HTTP_POOL_SIZE   keep-alive connections per host (default 10)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("quantclaw.http_fetch")
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    "QCD_HTTP_CACHE_DIR", Path(__file__).resolve().parent.parent / "cache" / "http"))
+DEFAULT_CACHE_BYTES = int(os.environ.get("QCD_HTTP_CACHE_MB", "512")) * 1024 * 1024
+DEFAULT_POOL_SIZE = int(os.environ.get("QCD_HTTP_POOL_SIZE", "10"))
+DEFAULT_TIMEOUT = 15
+DEFAULT_TTL = 3600
+
+# Request headers that change the response and so belong in the cache key
+_KEY_HEADERS = ("accept", "accept-language", "authorization", "x-api-key", "range")
+# Response headers kept with a cached body
+_KEEP_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    headers: Dict[str, str]
+    content: bytes
+    from_cache: bool = False     # served without an upstream request
+    revalidated: bool = False    # upstream answered 304 Not Modified
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+@dataclass
+class _Entry:
+    blob: str
+    status: int
+    fetched_at: float
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class ResponseCache:
+    """Content-addressed, compressed response store with size-bounded LRU eviction.
+
+    root/objects/<aa>/<sha256>   zlib-compressed body
+    root/index/<aa>/<key>.json   status, validators, blob digest; mtime = last use
+    """
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes: Optional[int] = None  # stored blob bytes, counted on first write
+
+    def _index_path(self, key: str) -> Path:
+        return self.root / "index" / key[:2] / f"{key}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def get(self, key: str) -> Optional[tuple]:
+        """(entry, body) for a request key, or None. Marks the entry as recently used."""
+        path = self._index_path(key)
+        try:
+            entry = _Entry(**json.loads(path.read_text()))
+            body = zlib.decompress(self._blob_path(entry.blob).read_bytes())
+            os.utime(path)
+        except (OSError, ValueError, TypeError, zlib.error):
+            return None
+        return entry, body
+
+    def put(self, key: str, status: int, headers: Dict[str, str], body: bytes,
+            fetched_at: float = None) -> _Entry:
+        digest = hashlib.sha256(body).hexdigest()
+        entry = _Entry(blob=digest, status=status, fetched_at=fetched_at or time.time(), headers=headers)
+        blob_path = self._blob_path(digest)
+        added = 0
+        if not blob_path.exists():
+            added = _atomic_write(blob_path, zlib.compress(body, 6))
+        _atomic_write(self._index_path(key), json.dumps(entry.__dict__).encode())
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._stored_bytes()
+            else:
+                self._bytes += added
+            over = self._bytes > self.max_bytes
+        if over:
+            self.evict()
+        return entry
+
+    def touch(self, key: str, entry: _Entry, fetched_at: float = None):
+        """Record a successful revalidation: the stored body is fresh again."""
+        entry.fetched_at = fetched_at or time.time()
+        _atomic_write(self._index_path(key), json.dumps(entry.__dict__).encode())
+
+    def _stored_bytes(self) -> int:
+        return sum(p.stat().st_size for p in (self.root / "objects").glob("*/*") if p.is_file())
+
+    def evict(self, target: float = 0.8) -> int:
+        """Drop least recently used entries until stored bodies fit in target × max_bytes."""
+        with self._lock:
+            entries = []
+            refs: Dict[str, int] = {}
+            for path in (self.root / "index").glob("*/*.json"):
+                try:
+                    blob = json.loads(path.read_text())["blob"]
+                    entries.append((path.stat().st_mtime, path, blob))
+                except (OSError, ValueError, KeyError):
+                    continue
+                refs[blob] = refs.get(blob, 0) + 1
+            total = self._stored_bytes()
+            removed = 0
+            for _, path, blob in sorted(entries):
+                if total <= self.max_bytes * target:
+                    break
+                path.unlink(missing_ok=True)
+                removed += 1
+                refs[blob] -= 1
+                if refs[blob] == 0:
+                    blob_path = self._blob_path(blob)
+                    try:
+                        total -= blob_path.stat().st_size
+                        blob_path.unlink()
+                    except OSError:
+                        pass
+            self._bytes = total
+        if removed:
+            logger.info(f"HTTP cache evicted {removed} entries ({total / 1e6:.1f} MB kept)")
+        return removed
+
+
+def _atomic_write(path: Path, data: bytes) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def request_key(method: str, url: str, params: Dict = None, headers: Dict = None) -> str:
+    """Cache key of a request: method, URL with sorted params, and the headers that vary responses."""
+    if params:
+        url = f"{url}{'&' if '?' in url else '?'}{urlencode(sorted(params.items()), doseq=True)}"
+    varying = sorted((k.lower(), str(v)) for k, v in (headers or {}).items() if k.lower() in _KEY_HEADERS)
+    return hashlib.sha256(json.dumps([method.upper(), url, varying]).encode()).hexdigest()
+
+
+class HttpFetcher:
+    """Per-host pooled sessions + ResponseCache + request coalescing. Thread-safe."""
+
+    def __init__(self, cache: ResponseCache = None, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT, user_agent: str = "QuantClaw-Data/1.0",
+                 rate_limiter=None):
+        self.cache = cache if cache is not None else ResponseCache()
+        self.rate_limiter = rate_limiter  # anything with key_for(url) and acquire(key)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._sessions: Dict[str, requests.Session] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, int] = {
+            "requests": 0, "hits": 0, "revalidated": 0, "misses": 0, "coalesced": 0, "bytes_downloaded": 0,
+        }
+
+    def session(self, url: str) -> requests.Session:
+        """The keep-alive session for url's host."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = self.user_agent
+                self._sessions[host] = session
+            return session
+
+    def fetch(self, url: str, params: Dict = None, headers: Dict = None, ttl: float = DEFAULT_TTL,
+              method: str = "GET", timeout: float = None) -> FetchResult:
+        """Fetch url, from cache while younger than ttl seconds (ttl=0 always revalidates).
+
+        Non-2xx answers raise requests.HTTPError, like resp.raise_for_status(); they are not cached.
+        """
+        key = request_key(method, url, params, headers)
+        self._count("requests")
+        if ttl > 0:
+            cached = self.cache.get(key)
+            if cached and time.time() - cached[0].fetched_at < ttl:
+                self._count("hits")
+                return _result(url, *cached, from_cache=True)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self._count("coalesced")
+            return future.result()
+
+        try:
+            result = self._fetch_upstream(key, url, params, headers, method, timeout)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _fetch_upstream(self, key, url, params, headers, method, timeout) -> FetchResult:
+        cached = self.cache.get(key)
+        request_headers = dict(headers or {})
+        if cached:
+            validators = cached[0].headers
+            if "etag" in validators:
+                request_headers["If-None-Match"] = validators["etag"]
+            if "last-modified" in validators:
+                request_headers["If-Modified-Since"] = validators["last-modified"]
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(self.rate_limiter.key_for(url))
+        resp = self.session(url).request(method, url, params=params, headers=request_headers,
+                                         timeout=timeout or self.timeout)
+        if resp.status_code == 304 and cached:
+            entry, body = cached
+            entry.headers.update({k: v for k, v in _kept_headers(resp).items() if k != "content-type"})
+            self.cache.touch(key, entry)
+            self._count("revalidated")
+            return _result(url, entry, body, revalidated=True)
+
+        resp.raise_for_status()
+        body = resp.content
+        self._count("misses")
+        self._count("bytes_downloaded", len(body))
+        entry = self.cache.put(key, resp.status_code, _kept_headers(resp), body)
+        return _result(url, entry, body)
+
+    def get_json(self, url: str, params: Dict = None, headers: Dict = None, ttl: float = DEFAULT_TTL) -> Any:
+        return self.fetch(url, params=params, headers=headers, ttl=ttl).json()
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self.metrics[name] += n
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
+
+
+def _kept_headers(resp: requests.Response) -> Dict[str, str]:
+    return {k: resp.headers[k] for k in _KEEP_HEADERS if k in resp.headers}
+
+
+def _result(url: str, entry: _Entry, body: bytes, from_cache: bool = False,
+            revalidated: bool = False) -> FetchResult:
+    return FetchResult(url=url, status=entry.status, headers=dict(entry.headers), content=body,
+                       from_cache=from_cache, revalidated=revalidated)
+
+
+_default: Optional[HttpFetcher] = None
+_default_lock = threading.Lock()
+
+
+def get_fetcher() -> HttpFetcher:
+    """The process-wide fetcher (created on first use)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpFetcher(rate_limiter=_pipeline_rate_limiter())
+        return _default
+
+
+def _pipeline_rate_limiter():
+    try:
+        from qcd_platform.pipeline.rate_limiter import get_rate_limiter
+    except ImportError:  # modules used outside the platform
+        return None
+    return get_rate_limiter()
+
+
+def fetch(url: str, params: Dict = None, headers: Dict = None, ttl: float = DEFAULT_TTL,
+          method: str = "GET", timeout: float = None) -> FetchResult:
+    return get_fetcher().fetch(url, params=params, headers=headers, ttl=ttl, method=method, timeout=timeout)
+
+
+def cached_get(url: str, cache_key: str = None, params: Dict = None, headers: Dict = None,
+               ttl: float = DEFAULT_TTL) -> Any:
+    """Drop-in for the modules' `_cached_get(url, cache_key, params, headers)`: returns parsed JSON.
+
+    cache_key is accepted for compatibility; entries are keyed by the request itself.
+    """
+    return get_fetcher().get_json(url, params=params, headers=headers, ttl=ttl)
@@ -12,25 +12,11 @@ Auth Info: Requires an IEX Cloud API token. Use a free tier token for access (e.
 """
 
 import requests
-import os
-import json
-import time
-from pathlib import Path
-
-# Cache setup
-CACHE_DIR = Path('/home/quant/apps/quantclaw-data/cache/iex_stock_market_data')
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
-CACHE_TTL = 3600  # 1 hour
-
-def _cached_get(url, cache_key, params=None, headers=None):
-    cache_file = CACHE_DIR / f'{cache_key}.json'
-    if cache_file.exists() and (time.time() - cache_file.stat().st_mtime) < CACHE_TTL:
-        return json.loads(cache_file.read_text())
-    resp = requests.get(url, params=params, headers=headers, timeout=15)
-    resp.raise_for_status()
-    data = resp.json()
-    cache_file.write_text(json.dumps(data, indent=2))
-    return data
+
+try:
+    from modules.http_fetch import cached_get as _cached_get  # pooled, revalidating, shared cache
+except ImportError:  # run as a script from modules/
+    from http_fetch import cached_get as _cached_get
 
 # IEX Cloud token for free tier access
 IEX_TOKEN = 'your_free_iex_cloud_token_here'  # Replace with your actual free tier token
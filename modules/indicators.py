@@ -0,0 +1,234 @@
+"""
+Vectorised technical indicators shared by the backtester and the analysis modules.
+
+Every indicator takes a 1-D series (numpy array or pandas Series) and returns a
+float64 array of the same length, NaN where it is not defined yet:
+
+  - Fixed windows (sma, rolling_std) reduce a stride-tricks window view, so each
+    value is bit for bit the np.mean / np.std of its window that the old per-bar
+    loops computed, and comparisons between indicators give the same signals.
+  - Windows with a min_periods (rolling_mean, rolling_sum) use cumulative sums
+    of the finite values and their counts, like pandas .rolling(...).
+  - Recursive smoothers (ema, wilder_rsi) run the recursion through
+    scipy.signal.lfilter instead of a Python loop.
+
+Results are memoised by (series id, indicator, params): the series id is its
+buffer address, shape, strides and dtype, and the cache holds a reference to the
+series so the address cannot be reused while the entry lives. Series are treated
+as immutable; cached results are read-only. clear_cache() drops everything.
+
+Usage:
+    from modules import indicators as ind
+    fast = ind.sma(closes, 10)
+    macd = ind.ema(closes, 12) - ind.ema(closes, 26)
+"""
+import functools
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+CACHE_SIZE = 512
+
+_cache: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _as_series(values) -> np.ndarray:
+    """1-D float64 view of values (no copy for float64 arrays and Series)"""
+    if hasattr(values, "to_numpy"):
+        values = values.to_numpy(dtype=float)
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 1:
+        raise ValueError(f"indicators take 1-D series, got shape {values.shape}")
+    return values
+
+
+def _series_id(values: np.ndarray) -> tuple:
+    return (values.__array_interface__["data"][0], values.shape, values.strides, values.dtype.str)
+
+
+def memoized(func):
+    """Cache func(series, *params, **options) per (series id, func name, params)"""
+
+    @functools.wraps(func)
+    def wrapper(values, *params, **options):
+        values = _as_series(values)
+        key = (_series_id(values), func.__name__, params, tuple(sorted(options.items())))
+        with _cache_lock:
+            entry = _cache.get(key)
+            if entry is not None:
+                _cache.move_to_end(key)
+                _stats["hits"] += 1
+                return entry[1]
+            _stats["misses"] += 1
+        result = func(values, *params, **options)
+        result.flags.writeable = False
+        with _cache_lock:
+            _cache[key] = (values, result)
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+        return result
+
+    return wrapper
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0)
+
+
+def cache_info() -> Dict[str, int]:
+    with _cache_lock:
+        return {"entries": len(_cache), **_stats}
+
+
+# ============================================================================
+# WINDOWED
+# ============================================================================
+
+def _windows(values: np.ndarray, period: int) -> np.ndarray:
+    """(n - period + 1, period) view of every full window"""
+    return sliding_window_view(values, period)
+
+
+@memoized
+def sma(values, period: int) -> np.ndarray:
+    """Simple moving average over full windows (NaN for the first period-1 bars)"""
+    out = np.full(len(values), np.nan)
+    if 0 < period <= len(values):
+        out[period - 1:] = _windows(values, period).mean(axis=1)
+    return out
+
+
+@memoized
+def rolling_std(values, period: int, ddof: int = 0) -> np.ndarray:
+    """Rolling standard deviation over full windows (population by default, as np.std)"""
+    out = np.full(len(values), np.nan)
+    if 0 < period <= len(values):
+        out[period - 1:] = _windows(values, period).std(axis=1, ddof=ddof)
+    return out
+
+
+def _rolling_totals(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum and count of the finite values in each trailing window (partial at the start)"""
+    finite = np.isfinite(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(finite, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(finite)))
+    lag = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+    return sums[1:] - sums[lag], counts[1:] - counts[lag]
+
+
+@memoized
+def rolling_sum(values, window: int, min_periods: int = None) -> np.ndarray:
+    """pandas .rolling(window, min_periods).sum(): NaNs skipped, NaN below min_periods"""
+    total, count = _rolling_totals(values, window)
+    return np.where(count >= (window if min_periods is None else min_periods), total, np.nan)
+
+
+@memoized
+def rolling_mean(values, window: int, min_periods: int = None) -> np.ndarray:
+    """pandas .rolling(window, min_periods).mean(): NaNs skipped, NaN below min_periods"""
+    total, count = _rolling_totals(values, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    return np.where(count >= max(window if min_periods is None else min_periods, 1), mean, np.nan)
+
+
+@memoized
+def momentum(values, lookback: int) -> np.ndarray:
+    """Return over the last lookback bars: values[i] / values[i - lookback] - 1"""
+    out = np.full(len(values), np.nan)
+    if 0 < lookback < len(values):
+        out[lookback:] = values[lookback:] / values[:len(values) - lookback] - 1
+    return out
+
+
+# ============================================================================
+# RECURSIVE
+# ============================================================================
+
+def _smooth(values: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """y[i] = alpha * x[i] + (1 - alpha) * y[i-1] with y[-1] = seed"""
+    if not len(values):
+        return np.empty(0)
+    decay = 1.0 - alpha
+    return lfilter([alpha], [1.0, -decay], values, zi=[decay * seed])[0]
+
+
+@memoized
+def ema(values, period: int, seed: str = "sma") -> np.ndarray:
+    """Exponential moving average with multiplier 2 / (period + 1)
+
+    seed="sma": starts at bar period-1 with the mean of the first period bars
+    (NaN before; a NaN anywhere carries forward), as the backtest strategies use;
+    raises ValueError when the series is shorter than period.
+    seed="first": starts at the first finite value and skips NaNs, as pandas
+    .ewm(span=period, adjust=False, ignore_na=True).mean().
+    """
+    alpha = 2.0 / (period + 1)
+    out = np.full(len(values), np.nan)
+    if seed == "sma":
+        if not 0 < period <= len(values):
+            raise ValueError(f"ema({period}) needs at least {period} bars, got {len(values)}")
+        out[period - 1] = values[:period].mean()
+        out[period:] = _smooth(values[period:], alpha, out[period - 1])
+        return out
+    if seed != "first":
+        raise ValueError(f"unknown ema seed {seed!r}")
+    finite = np.flatnonzero(np.isfinite(values))
+    if len(finite):
+        smoothed = np.full(len(values), np.nan)
+        smoothed[finite] = _smooth(values[finite], alpha, values[finite[0]])
+        seen = np.maximum.accumulate(np.where(np.isfinite(values), np.arange(len(values)), -1))
+        out[finite[0]:] = smoothed[seen[finite[0]:]]
+    return out
+
+
+def _gains_losses(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    deltas = np.diff(values)
+    return np.where(deltas > 0, deltas, 0.0), np.where(deltas < 0, -deltas, 0.0)
+
+
+@memoized
+def wilder_rsi(values, period: int) -> np.ndarray:
+    """RSI with Wilder smoothing, defined from bar period (NaN before)
+
+    Average gain/loss start as the mean of the first period moves and then
+    follow avg[i] = (avg[i-1] * (period - 1) + move) / period; RS adds 1e-10 to
+    the average loss so a run without losses gives 100. Raises ValueError when
+    the series has no more than period bars.
+    """
+    if not 0 < period < len(values):
+        raise ValueError(f"wilder_rsi({period}) needs more than {period} bars, got {len(values)}")
+    out = np.full(len(values), np.nan)
+    gains, losses = _gains_losses(values)
+    alpha = 1.0 / period
+    avg_gain = np.concatenate(([gains[:period].mean()], _smooth(gains[period:], alpha, gains[:period].mean())))
+    avg_loss = np.concatenate(([losses[:period].mean()], _smooth(losses[period:], alpha, losses[:period].mean())))
+    out[period:] = 100 - 100 / (1 + avg_gain / (avg_loss + 1e-10))
+    return out
+
+
+@memoized
+def rsi(values, period: int = 14) -> np.ndarray:
+    """RSI from simple rolling means of gains and losses (Cutler's RSI)
+
+    Matches the pandas form used by the analysis modules:
+    gain = delta.where(delta > 0, 0).rolling(period).mean(), RS = gain / loss.
+    The first bar counts as a zero move, so values start at bar period-1.
+    """
+    gains, losses = _gains_losses(values)
+    gains, losses = np.concatenate(([0.0], gains)), np.concatenate(([0.0], losses))
+    out = np.full(len(values), np.nan)
+    if 0 < period <= len(values):
+        avg_gain = _windows(gains, period).mean(axis=1)
+        avg_loss = _windows(losses, period).mean(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[period - 1:] = 100 - 100 / (1 + avg_gain / avg_loss)
+    return out
@@ -23,6 +23,11 @@ from typing import Dict, List, Tuple, Optional
 import json
 import sys
 
+try:
+    from modules import indicators
+except ImportError:
+    import indicators
+
 
 class KalmanFilter:
     """
@@ -240,7 +245,7 @@ class RegimeDetector:
         innovation_var = result['innovation_variance']
         
         # Rolling innovation variance
-        rolling_var = pd.Series(innovation_var).rolling(window=window, min_periods=1).mean()
+        rolling_var = pd.Series(indicators.rolling_mean(innovation_var, window, min_periods=1))
         
         # Classify regimes based on variance percentiles
         var_25 = rolling_var.quantile(0.25)
@@ -19,6 +19,11 @@ from typing import Dict, List, Tuple, Optional
 import json
 import sys
 
+try:
+    from modules import indicators
+except ImportError:
+    import indicators
+
 
 class TechnicalIndicators:
     """Calculate technical indicators for multi-timeframe analysis"""
@@ -31,13 +36,7 @@ class TechnicalIndicators:
         RSI = 100 - (100 / (1 + RS))
         where RS = Average Gain / Average Loss
         """
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return pd.Series(indicators.rsi(prices, period), index=prices.index)
     
     @staticmethod
     def macd(prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, pd.Series]:
@@ -48,11 +47,11 @@ class TechnicalIndicators:
         Signal Line = EMA(MACD, signal)
         Histogram = MACD - Signal
         """
-        ema_fast = prices.ewm(span=fast, adjust=False).mean()
-        ema_slow = prices.ewm(span=slow, adjust=False).mean()
+        ema_fast = TechnicalIndicators.ema(prices, fast)
+        ema_slow = TechnicalIndicators.ema(prices, slow)
         
         macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+        signal_line = TechnicalIndicators.ema(macd_line, signal)
         histogram = macd_line - signal_line
         
         return {
@@ -64,12 +63,12 @@ class TechnicalIndicators:
     @staticmethod
     def sma(prices: pd.Series, period: int) -> pd.Series:
         """Calculate Simple Moving Average"""
-        return prices.rolling(window=period).mean()
+        return pd.Series(indicators.sma(prices, period), index=prices.index)
     
     @staticmethod
     def ema(prices: pd.Series, period: int) -> pd.Series:
-        """Calculate Exponential Moving Average"""
-        return prices.ewm(span=period, adjust=False).mean()
+        """Calculate Exponential Moving Average (seeded with the first price, as ewm(adjust=False))"""
+        return pd.Series(indicators.ema(prices, period, seed="first"), index=prices.index)
 
 
 class TimeframeAnalyzer:
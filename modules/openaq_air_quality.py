@@ -12,25 +12,10 @@ Update Frequency: Real-time data, but cached responses are used with a 1-hour TT
 Auth Info: No authentication required; uses public endpoints
 """
 
-import requests
-import os
-import json
-import time
-from pathlib import Path
-
-CACHE_DIR = Path('/home/quant/apps/quantclaw-data/cache/openaq_air_quality')
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
-CACHE_TTL = 3600  # 1 hour
-
-def _cached_get(url, cache_key, params=None, headers=None):
-    cache_file = CACHE_DIR / f'{cache_key}.json'
-    if cache_file.exists() and (time.time() - cache_file.stat().st_mtime) < CACHE_TTL:
-        return json.loads(cache_file.read_text())
-    resp = requests.get(url, params=params, headers=headers, timeout=15)
-    resp.raise_for_status()
-    data = resp.json()
-    cache_file.write_text(json.dumps(data, indent=2))
-    return data
+try:
+    from modules.http_fetch import cached_get as _cached_get  # pooled, revalidating, shared cache
+except ImportError:  # run as a script from modules/
+    from http_fetch import cached_get as _cached_get
 
 def get_countries():
     """Retrieve a list of countries from OpenAQ API.
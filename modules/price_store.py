@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+Shared columnar OHLCV price store for QuantClaw Data.
+
+One place for daily price history instead of a CSV per ticker
+(refresh_price_cache.py), a (ticker, column)-keyed pickle rebuilt into
+DataFrames on every start (AlphaPickerV3, SAQuantReplica), an SQLite BLOB
+cache and a yf.download per backtest run (BacktestEngine):
+
+  - Layout: one directory per ticker holding one raw little-endian column
+    file per field (ts as int64 ns, Open/High/Low/Close/Volume as float64)
+    and a meta.json naming the committed generation and row count. Columns
+    are opened with np.memmap, so a read touches only the pages of the
+    requested date range and several processes share the page cache.
+  - Appends: new bars are written past the committed rows, then meta.json
+    is replaced atomically; a reader never sees a half-written append, and
+    a crashed append is truncated away by the next writer. Rewriting a
+    ticker (earlier history) writes a new generation and swaps meta.json.
+  - load(tickers, start, end) returns one aligned panel: a DataFrame on
+    the union of dates with (field, ticker) columns, like yf.download for
+    several tickers. read() returns one ticker's frame, frames() a lazy
+    dict-like view for code written against {ticker: DataFrame}.
+  - ensure() downloads only what is missing for a date range (unknown
+    tickers, earlier history, bars after the last stored one); refresh()
+    brings many tickers up to date in multi-ticker batches, re-basing the
+    stored history when Yahoo's split/dividend adjustment has changed.
+    Unknown tickers Yahoo returns nothing for (delisted, renamed) are noted
+    in unavailable.json, so callers can skip them for UNAVAILABLE_DAYS.
+
+Usage:
+    from modules.price_store import get_price_store
+    store = get_price_store()
+    panel = store.load(["AAPL", "MSFT"], "2024-01-01", "2025-01-01")
+    closes = panel["Close"]                # dates x tickers
+
+Settings (environment):
+    QCD_PRICE_STORE_DIR   store location (default <repo>/data/price_store)
+"""
+
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("quantclaw.price_store")
+
+DEFAULT_STORE_DIR = Path(os.environ.get(
+    "QCD_PRICE_STORE_DIR", Path(__file__).resolve().parent.parent / "data" / "price_store"))
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+_DTYPES = {"ts": np.dtype("<i8"), **{f: np.dtype("<f8") for f in FIELDS}}
+ROW_BYTES = sum(d.itemsize for d in _DTYPES.values())
+UNAVAILABLE_DAYS = 7   # how long a ticker Yahoo had no bars for is left out of scans
+
+
+def _key(ticker: str) -> str:
+    return ticker.strip().upper()
+
+
+def _to_ns(value) -> Optional[int]:
+    """Timestamp-like (str, datetime, Timestamp) → naive int64 ns; None stays None."""
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return int(ts.as_unit("ns").value)
+
+
+def ohlcv_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalise a yfinance-style frame: flat Open..Volume float columns, sorted naive DatetimeIndex.
+
+    Handles the (Price, Ticker) column MultiIndex of single-ticker yf.download,
+    lower-case names and tz-aware indexes (kept as exchange-local dates).
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.set_axis(df.columns.get_level_values(0), axis=1)
+    by_name = {str(c).strip().lower(): c for c in df.columns}
+    out = pd.DataFrame({f: pd.to_numeric(df[by_name[f.lower()]], errors="coerce") if f.lower() in by_name
+                        else np.nan for f in FIELDS}, index=df.index, dtype="float64")
+    index = pd.DatetimeIndex(out.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    out.index = index.as_unit("ns").rename("Date")
+    out = out[~out.isna().all(axis=1)]
+    out = out[~out.index.duplicated(keep="last")]
+    return out.sort_index()
+
+
+class PriceStore:
+    """Memory-mapped OHLCV columns per ticker, with atomic appends and aligned multi-ticker loads."""
+
+    def __init__(self, root=None):
+        self.root = Path(root or DEFAULT_STORE_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    # ── reading ──────────────────────────────────────────────
+
+    def tickers(self) -> List[str]:
+        return sorted(p.name for p in self.root.iterdir() if (p / "meta.json").exists())
+
+    def __contains__(self, ticker: str) -> bool:
+        return (self._dir(ticker) / "meta.json").exists()
+
+    def unavailable(self, tickers: Iterable[str], max_age_days: float = UNAVAILABLE_DAYS) -> List[str]:
+        """Those of tickers a refresh() found no bars for (and has not stored) within max_age_days."""
+        cutoff = time.time() - max_age_days * 86400
+        entries = self._unavailable_entries()
+        return [t for t in tickers if entries.get(_key(t), 0) >= cutoff]
+
+    def meta(self, ticker: str) -> Optional[dict]:
+        """{"ticker", "gen", "rows", "first", "last", "from", "through"} or None if not stored."""
+        try:
+            return json.loads((self._dir(ticker) / "meta.json").read_text())
+        except FileNotFoundError:
+            return None
+
+    def columns(self, ticker: str, start=None, end=None) -> Optional[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        """(ts int64 ns, {field: float64}) memmapped views for start <= ts < end; None if not stored."""
+        for _ in range(3):   # a rewrite may retire the generation between reading meta and opening it
+            meta = self.meta(ticker)
+            if meta is None:
+                return None
+            try:
+                cols = {name: self._memmap(ticker, name, meta) for name in _DTYPES}
+                break
+            except FileNotFoundError:
+                continue
+        else:
+            return None
+        ts = cols.pop("ts")
+        lo = 0 if start is None else int(np.searchsorted(ts, _to_ns(start), "left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, _to_ns(end), "left"))
+        return ts[lo:hi], {f: c[lo:hi] for f, c in cols.items()}
+
+    def read(self, ticker: str, start=None, end=None) -> Optional[pd.DataFrame]:
+        """One ticker's bars for start <= date < end (yfinance convention), or None if not stored."""
+        got = self.columns(ticker, start, end)
+        if got is None:
+            return None
+        ts, cols = got
+        return pd.DataFrame({f: np.array(c) for f, c in cols.items()},
+                            index=pd.DatetimeIndex(ts.view("M8[ns]"), name="Date"))
+
+    def load(self, tickers: Sequence[str], start=None, end=None,
+             fields: Sequence[str] = FIELDS) -> pd.DataFrame:
+        """Aligned panel for start <= date < end: union of dates × (field, ticker) columns, NaN where absent.
+
+        Tickers missing from the store keep their (all-NaN) columns so positions line up.
+        """
+        tickers = [_key(t) for t in tickers]
+        fields = list(fields)
+        parts = [self.columns(t, start, end) for t in tickers]
+        stamps = [p[0] for p in parts if p is not None and len(p[0])]
+        dates = np.unique(np.concatenate(stamps)) if stamps else np.empty(0, "i8")
+        values = np.full((len(dates), len(fields) * len(tickers)), np.nan)
+        for j, part in enumerate(parts):
+            if part is None or not len(part[0]):
+                continue
+            rows = np.searchsorted(dates, part[0])
+            for i, f in enumerate(fields):
+                values[rows, i * len(tickers) + j] = part[1][f]
+        return pd.DataFrame(values, index=pd.DatetimeIndex(dates.view("M8[ns]"), name="Date"),
+                            columns=pd.MultiIndex.from_product([fields, tickers], names=["Price", "Ticker"]))
+
+    def frames(self, tickers: Iterable[str] = None) -> "PriceFrames":
+        return PriceFrames(self, tickers)
+
+    # ── writing ──────────────────────────────────────────────
+
+    def append(self, ticker: str, df: pd.DataFrame, through=None) -> int:
+        """Append the bars of df dated after the last stored bar. Returns rows added.
+
+        through: the (exclusive) date up to which history is now known complete.
+        """
+        bars = ohlcv_frame(df)
+        with self._writer(ticker):
+            meta = self.meta(ticker)
+            if meta is None:
+                return self._write_gen(ticker, bars, 1, None, through) if len(bars) else 0
+            if meta["rows"]:
+                bars = bars[bars.index.asi8 > meta["last"]]
+            if len(bars):
+                for name, dtype in _DTYPES.items():
+                    path = self._path(ticker, name, meta["gen"])
+                    with open(path, "r+b") as f:
+                        f.truncate(meta["rows"] * dtype.itemsize)   # drop any uncommitted tail
+                        f.seek(0, os.SEEK_END)
+                        f.write(self._column(bars, name).tobytes())
+                meta.update(rows=meta["rows"] + len(bars), last=int(bars.index.asi8[-1]))
+                if not meta["first"]:
+                    meta["first"] = int(bars.index.asi8[0])
+            through = _to_ns(through)
+            if through is not None:
+                meta["through"] = max(meta.get("through") or through, through)
+            if len(bars) or through is not None:
+                self._commit(ticker, meta)
+            return len(bars)
+
+    def write(self, ticker: str, df: pd.DataFrame, start=None, through=None) -> int:
+        """Replace ticker's history with df (as a new generation). Returns rows written.
+
+        start / through: the range df is known to cover completely (for ensure()).
+        """
+        bars = ohlcv_frame(df)
+        with self._writer(ticker):
+            meta = self.meta(ticker)
+            return self._write_gen(ticker, bars, (meta["gen"] + 1) if meta else 1, start, through)
+
+    def ensure(self, ticker: str, start=None, end=None) -> bool:
+        """Download whatever the store lacks for start <= date < end. Returns True if bars are stored.
+
+        Unknown tickers and requests before the covered range are downloaded and
+        written whole; otherwise only the bars after the covered range are fetched.
+        start=None asks for the full history.
+        """
+        today = pd.Timestamp.now().normalize()
+        hi = min(pd.Timestamp(end), today) if end is not None and start is not None else today
+        meta = self.meta(ticker)
+        try:
+            if meta is None or (start is not None and _to_ns(start) < (meta.get("from") or meta["first"])):
+                if meta is not None:
+                    hi = max(hi, pd.Timestamp(meta.get("through") or meta["last"] + 1))
+                df = _download(ticker, start, hi)
+                if len(df):
+                    self.write(ticker, df, start=start, through=hi)
+            elif _to_ns(hi) > (meta.get("through") or meta["last"] + 1):
+                since = pd.Timestamp(meta.get("through") or meta["last"] + 1)
+                self.append(ticker, _download(ticker, since, hi), through=hi)
+        except Exception as e:
+            logger.warning(f"Price download failed for {ticker}: {e}")
+        meta = self.meta(ticker)
+        return bool(meta and meta["rows"])
+
+    def rebase(self, ticker: str, df: pd.DataFrame, price_factor: float, volume_factor: float = 1.0,
+               through=None) -> int:
+        """Scale the stored history for a new split/dividend adjustment and add df's later bars.
+
+        Written as one new generation, so readers see either the old or the re-based
+        history. Returns rows written.
+        """
+        bars = ohlcv_frame(df)
+        with self._writer(ticker):
+            meta = self.meta(ticker)
+            ts, cols = self.columns(ticker)
+            old = pd.DataFrame({f: np.asarray(c) * (volume_factor if f == "Volume" else price_factor)
+                                for f, c in cols.items()}, index=pd.DatetimeIndex(ts.view("M8[ns]"), name="Date"))
+            merged = pd.concat([old, bars[bars.index.asi8 > meta["last"]]])
+            return self._write_gen(ticker, merged, meta["gen"] + 1, meta.get("from"), through)
+
+    def refresh(self, tickers: Iterable[str], batch_size: int = 50, workers: int = 4,
+                progress=None) -> "RefreshReport":
+        """Bring tickers up to date, downloading only the bars after each one's last stored bar.
+
+        Tickers are grouped by the date their gap starts and requested in
+        multi-ticker batches of batch_size over a pool of `workers` threads;
+        unknown tickers get their full history. Each gap request repeats the last
+        stored bar: if Yahoo now reports it scaled consistently (a split or
+        dividend adjustment since the last refresh) the stored history is
+        re-based, otherwise the new bars are appended.
+        progress: optional callable(report) after each batch.
+        """
+        started = time.monotonic()
+        end = pd.Timestamp.now().normalize()   # today's bar is not final yet
+        report = RefreshReport()
+        gaps: Dict[Optional[int], List[str]] = {}
+        for ticker in dict.fromkeys(_key(t) for t in tickers):
+            meta = self.meta(ticker)
+            if meta is None or not meta["rows"]:
+                gaps.setdefault(None, []).append(ticker)
+            elif max(meta["last"] + 1, meta.get("through") or 0) < end.value:
+                gaps.setdefault(meta["last"], []).append(ticker)
+            else:
+                report.current += 1
+        requested = gaps.get(None, [])
+        batches = [(since, group[i:i + batch_size]) for since, group in gaps.items()
+                   for i in range(0, len(group), batch_size)]
+
+        def run(since, batch):
+            frames = _download_batch(batch, None if since is None else pd.Timestamp(since), end)
+            for ticker in batch:
+                self._refresh_one(ticker, frames.get(ticker), end, report)
+            report.requests += 1
+            if progress:
+                progress(report)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for future, (_, batch) in [(pool.submit(run, *b), b) for b in batches]:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning(f"Price batch of {len(batch)} failed: {e}")
+                    for ticker in batch:
+                        report.add(ticker, failed=True)
+        if requested:
+            self._note_unavailable(report.unavailable)
+        report.seconds = time.monotonic() - started
+        return report
+
+    # ── internals ────────────────────────────────────────────
+
+    def _refresh_one(self, ticker: str, df: Optional[pd.DataFrame], end, report: "RefreshReport"):
+        bars = ohlcv_frame(df) if df is not None and len(df) else None
+        meta = self.meta(ticker)
+        if bars is None or not len(bars):
+            report.add(ticker, failed=True, unavailable=meta is None or not meta["rows"])
+            return
+        if meta is None or not meta["rows"]:
+            report.add(ticker, rows=self.write(ticker, bars, through=end), new=True)
+            return
+        factors = None
+        if meta["last"] in bars.index.asi8:
+            ts, cols = self.columns(ticker, start=pd.Timestamp(meta["last"]))
+            factors = _adjustment({f: float(c[0]) for f, c in cols.items()}, bars.loc[pd.Timestamp(meta["last"])])
+        if factors:
+            self.rebase(ticker, bars, *factors, through=end)
+            report.add(ticker, rows=int((bars.index.asi8 > meta["last"]).sum()), rebased=True,
+                       written=self.meta(ticker)["rows"])
+        else:
+            report.add(ticker, rows=self.append(ticker, bars, through=end))
+
+    def _dir(self, ticker: str) -> Path:
+        return self.root / _key(ticker).replace(os.sep, "_")
+
+    def _path(self, ticker: str, name: str, gen: int) -> Path:
+        return self._dir(ticker) / f"{name}.{gen}.bin"
+
+    def _memmap(self, ticker: str, name: str, meta: dict) -> np.ndarray:
+        if not meta["rows"]:
+            return np.empty(0, _DTYPES[name])
+        return np.memmap(self._path(ticker, name, meta["gen"]), dtype=_DTYPES[name], mode="r",
+                         shape=(meta["rows"],))
+
+    @staticmethod
+    def _column(bars: pd.DataFrame, name: str) -> np.ndarray:
+        if name == "ts":
+            return bars.index.asi8.astype("<i8")
+        return bars[name].to_numpy("<f8")
+
+    def _writer(self, ticker: str):
+        """Exclusive per-ticker writer lock."""
+        return self._locked(self._dir(ticker))
+
+    @staticmethod
+    @contextmanager
+    def _locked(directory: Path):
+        """Exclusive lock on a directory; flock on a fresh descriptor excludes threads and processes."""
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _write_gen(self, ticker: str, bars: pd.DataFrame, gen: int, start, through) -> int:
+        for name in _DTYPES:
+            with open(self._path(ticker, name, gen), "wb") as f:
+                f.write(self._column(bars, name).tobytes())
+        stamps = bars.index.asi8
+        self._commit(ticker, {
+            "ticker": _key(ticker), "gen": gen, "rows": len(bars),
+            "first": int(stamps[0]) if len(bars) else 0, "last": int(stamps[-1]) if len(bars) else 0,
+            "from": _to_ns(start) if start is not None else (int(stamps[0]) if len(bars) else None),
+            "through": _to_ns(through),
+        })
+        # keep the previous generation for readers that opened it just before the swap
+        for path in self._dir(ticker).glob("*.bin"):
+            if int(path.name.split(".")[1]) < gen - 1:
+                path.unlink(missing_ok=True)
+        return len(bars)
+
+    def _unavailable_entries(self) -> Dict[str, float]:
+        try:
+            return json.loads((self.root / "unavailable.json").read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _note_unavailable(self, unavailable: List[str]):
+        """Record tickers that came back empty; forget ones that have been stored since."""
+        with self._locked(self.root):
+            entries = {t: at for t, at in self._unavailable_entries().items() if t not in self}
+            entries.update(dict.fromkeys(unavailable, time.time()))
+            path = self.root / "unavailable.json"
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(entries))
+            os.replace(tmp, path)
+
+    def _commit(self, ticker: str, meta: dict):
+        meta["updated"] = datetime.now().isoformat()
+        path = self._dir(ticker) / "meta.json"
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, path)
+
+
+@dataclass
+class RefreshReport:
+    """What a refresh() did: bars added, bytes written, requests and time spent."""
+    tickers: int = 0
+    current: int = 0          # already up to date, not requested
+    new: int = 0              # full history downloaded
+    rebased: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    unavailable: List[str] = field(default_factory=list)   # unstored and no bars returned
+    bars_added: int = 0
+    bytes_written: int = 0
+    requests: int = 0
+    seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, ticker: str, rows: int = 0, written: int = None, new: bool = False,
+            rebased: bool = False, failed: bool = False, unavailable: bool = False):
+        with self._lock:
+            self.tickers += 1
+            self.new += new
+            self.bars_added += rows
+            self.bytes_written += (rows if written is None else written) * ROW_BYTES
+            if rebased:
+                self.rebased.append(ticker)
+            if failed:
+                self.failed.append(ticker)
+            if unavailable:
+                self.unavailable.append(ticker)
+
+    def summary(self) -> str:
+        return (f"{self.tickers} tickers requested in {self.requests} batches ({self.current} already current, "
+                f"{self.new} new, {len(self.rebased)} re-based, {len(self.failed)} failed) | "
+                f"{self.bars_added:,} bars, {self.bytes_written / 1024 / 1024:.1f} MB written in {self.seconds:.1f}s")
+
+
+def _adjustment(stored: Dict[str, float], fresh: pd.Series, rtol: float = 1e-4) -> Optional[Tuple[float, float]]:
+    """(price_factor, volume_factor) if the same bar now comes back uniformly re-scaled, else None.
+
+    A split or dividend adjustment scales Open/High/Low/Close by one factor (and
+    Volume for splits); a correction to a single price does not, and is not re-based.
+    """
+    ratios = [fresh[f] / stored[f] for f in ("Open", "High", "Low", "Close")
+              if stored[f] and np.isfinite(stored[f]) and np.isfinite(fresh[f])]
+    if not ratios or abs(ratios[-1] - 1) <= rtol or max(ratios) - min(ratios) > rtol * max(ratios):
+        return None
+    volume = fresh["Volume"] / stored["Volume"] if stored["Volume"] and np.isfinite(fresh["Volume"]) else 1.0
+    return ratios[-1], volume
+
+
+class PriceFrames(Mapping):
+    """Dict-like {ticker: OHLCV DataFrame} over a PriceStore, read on access.
+
+    Stands in for the dicts of DataFrames that used to be unpickled whole at start-up.
+    Assigning a frame stores it.
+    """
+
+    def __init__(self, store: PriceStore, tickers: Iterable[str] = None):
+        self._store = store
+        self._tickers = list(dict.fromkeys(_key(t) for t in tickers)) if tickers is not None else store.tickers()
+        self._known = set(self._tickers)
+
+    def __getitem__(self, ticker: str) -> pd.DataFrame:
+        df = self._store.read(ticker) if _key(ticker) in self._known else None
+        if df is None:
+            raise KeyError(ticker)
+        return df
+
+    def __setitem__(self, ticker: str, df: pd.DataFrame):
+        self._store.write(ticker, df)
+        if _key(ticker) not in self._known:
+            self._tickers.append(_key(ticker))
+            self._known.add(_key(ticker))
+
+    def __contains__(self, ticker) -> bool:
+        return isinstance(ticker, str) and _key(ticker) in self._known
+
+    def __iter__(self):
+        return iter(self._tickers)
+
+    def __len__(self) -> int:
+        return len(self._tickers)
+
+
+def _throttle():
+    """Wait for the pipeline's shared Yahoo budget when the pipeline package is importable."""
+    try:
+        from qcd_platform.pipeline.rate_limiter import throttle
+    except ImportError:
+        return 0.0
+    return throttle("query1.finance.yahoo.com")
+
+
+def _download(ticker: str, start, end) -> pd.DataFrame:
+    """Daily adjusted bars for start <= date < end from Yahoo; start=None for the full history."""
+    import yfinance as yf
+    _throttle()
+    span = {"period": "max"} if start is None else {
+        "start": pd.Timestamp(start).strftime("%Y-%m-%d"), "end": pd.Timestamp(end).strftime("%Y-%m-%d")}
+    df = yf.download(ticker, interval="1d", auto_adjust=True, progress=False, **span)
+    return df if df is not None else pd.DataFrame()
+
+
+def _download_batch(tickers: Sequence[str], start, end) -> Dict[str, pd.DataFrame]:
+    """One multi-ticker Yahoo request; {ticker: frame} for the tickers that returned rows."""
+    import yfinance as yf
+    _throttle()
+    span = {"period": "max"} if start is None else {
+        "start": pd.Timestamp(start).strftime("%Y-%m-%d"), "end": pd.Timestamp(end).strftime("%Y-%m-%d")}
+    df = yf.download(list(tickers), interval="1d", auto_adjust=True, progress=False, threads=False,
+                     group_by="column", **span)
+    if df is None or df.empty:
+        return {}
+    if not isinstance(df.columns, pd.MultiIndex):
+        return {_key(tickers[0]): df}
+    level = df.columns.nlevels - 1
+    return {_key(t): df.xs(t, axis=1, level=level) for t in df.columns.get_level_values(level).unique()}
+
+
+def import_pickle(store: PriceStore, path) -> int:
+    """Load a legacy {(ticker, column): Series} price pickle into the store. Returns tickers imported."""
+    import pickle
+    with open(path, "rb") as f:
+        raw = pickle.load(f)
+    by_ticker: Dict[str, Dict[str, pd.Series]] = {}
+    for key, series in raw.items():
+        if isinstance(key, tuple) and len(key) == 2:
+            by_ticker.setdefault(key[0], {})[key[1]] = series
+    for ticker, cols in by_ticker.items():
+        store.write(ticker, pd.DataFrame(cols))
+    return len(by_ticker)
+
+
+def import_csv_dir(store: PriceStore, directory, skip_existing: bool = True) -> int:
+    """Load a legacy directory of <TICKER>.csv files (refresh_price_cache.py output). Returns tickers imported."""
+    imported = 0
+    for path in sorted(Path(directory).glob("*.csv")):
+        ticker = path.stem
+        if skip_existing and ticker in store:
+            continue
+        df = pd.read_csv(path, index_col=0)
+        df.index = pd.to_datetime(df.index, errors="coerce", utc=True).tz_convert(None)
+        df = df[df.index.notna()]
+        if len(df):
+            store.write(ticker, df)
+            imported += 1
+    return imported
+
+
+_default: Optional[PriceStore] = None
+_default_lock = threading.Lock()
+
+
+def get_price_store() -> PriceStore:
+    """The process-wide store (created on first use)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = PriceStore()
+        return _default
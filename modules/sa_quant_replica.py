@@ -25,6 +25,13 @@ COMPOSITE SCORE:
 - Strong Sell: < 1.2 (F)
 
 GRADE SCALE: A+ = 5.0, A = 4.0, B = 3.0, C = 2.0, D = 1.0, F = 0.0
+
+BATCH SCORING:
+- score_batch(tickers, dates) / score_pairs(pairs) load each ticker's inputs once,
+  grade all of its dates, memoise rows per (ticker, date) and spread tickers over
+  a process pool; every score also gets its percentile rank within the date's sector
+- find_strong_buys and run_blind_backtest score through the batch API
+  (benchmark: scripts/backtest/bench_sa_quant.py)
 """
 
 import yfinance as yf
@@ -33,12 +40,21 @@ import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import json
+import os
 import sys
 import sqlite3
 import pickle
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from tqdm import tqdm
 
+try:
+    from modules import indicators
+    from modules.price_store import get_price_store, import_pickle
+except ImportError:
+    import indicators
+    from price_store import get_price_store, import_pickle
+
 
 class SAQuantReplica:
     """
@@ -65,6 +81,10 @@ class SAQuantReplica:
         'Strong Sell': 0.0
     }
     
+    # Columns of score_pairs / score_batch; each score also gets a <score>_sector_pct rank
+    BATCH_SCORES = ('valuation', 'growth', 'profitability', 'momentum', 'eps_revisions', 'composite_score')
+    BATCH_COLUMNS = ('ticker', 'date', 'sector') + BATCH_SCORES + ('rating',)
+    
     def __init__(self, cache_dir: str = None):
         """Initialize with cache directory"""
         self.data_dir = Path(__file__).parent.parent / 'data'
@@ -72,9 +92,11 @@ class SAQuantReplica:
         self.cache_db = self.cache_dir / 'sa_quant_cache.db'
         self._init_cache_db()
         
-        # Load price cache
-        self.price_cache_path = self.data_dir / 'price_history_cache.pkl'
+        # Load price cache (a lazy view over the shared price store)
+        self.price_cache_path = self.data_dir / 'price_history_cache.pkl'  # legacy pickle, imported once
+        self.price_store = get_price_store()
         self.price_cache = self._load_price_cache()
+        self._grade_memo = {}  # (ticker, date) -> score_pairs row (None if it failed)
     
     def _init_cache_db(self):
         """Initialize SQLite cache for yfinance data"""
@@ -123,14 +145,12 @@ class SAQuantReplica:
         conn.commit()
         conn.close()
     
-    def _load_price_cache(self) -> Dict:
-        """Load price history cache"""
-        if not self.price_cache_path.exists():
-            print(f"Warning: Price cache not found at {self.price_cache_path}", file=sys.stderr)
-            return {}
-        
-        with open(self.price_cache_path, 'rb') as f:
-            return pickle.load(f)
+    def _load_price_cache(self):
+        """Open the price store as a {ticker: DataFrame} view; frames are read on access"""
+        if not self.price_store.tickers() and self.price_cache_path.exists():
+            imported = import_pickle(self.price_store, self.price_cache_path)
+            print(f"Imported {imported} tickers from {self.price_cache_path} into the price store", file=sys.stderr)
+        return self.price_store.frames()
     
     def _get_cached_financials(self, ticker: str) -> Optional[Dict]:
         """Get cached quarterly financials or fetch from yfinance"""
@@ -248,12 +268,10 @@ class SAQuantReplica:
         if ticker not in self.price_cache:
             return None
         
-        df = self.price_cache[ticker]
+        # Closest price before or on the date (reads only the stored range)
         target_date = pd.to_datetime(date)
-        
-        # Find closest price before or on the date
-        prices = df[df.index <= target_date]
-        if prices.empty:
+        prices = self.price_store.read(ticker, end=target_date + pd.Timedelta(1, 'ns'))
+        if prices is None or prices.empty:
             return None
         
         return prices['Close'].iloc[-1]
@@ -263,11 +281,10 @@ class SAQuantReplica:
         if ticker not in self.price_cache:
             return None
         
-        df = self.price_cache[ticker]
         target_date = pd.to_datetime(date)
         start_date = target_date - timedelta(days=days)
         
-        return df[(df.index >= start_date) & (df.index <= target_date)]
+        return self.price_store.read(ticker, start_date, target_date + pd.Timedelta(1, 'ns'))
     
     def _grade_to_score(self, grade: str) -> float:
         """Convert letter grade to numeric score"""
@@ -293,115 +310,147 @@ class SAQuantReplica:
         
         NOTE: This is a reasonable approximation since fundamental quality tends to persist.
         """
-        details = {}
-        
         # Get price at date
         price = self._get_price_at_date(ticker, date)
         if price is None:
             return 0.0, {'error': 'No price data'}
         
         # Get financials (will be current, not historical)
-        financials = self._get_cached_financials(ticker)
+        return self._grade_valuation(price, self._valuation_inputs(self._get_cached_financials(ticker)))
+    
+    def _valuation_inputs(self, financials: Optional[Dict]) -> Dict:
+        """TTM EPS, book value and revenue per share (only the date's price varies per date)"""
         if not financials:
-            return 0.0, {'error': 'No financials'}
+            return {'error': 'No financials'}
         
         income = financials['income']
         balance = financials['balance']
         
         if income.empty or balance.empty:
-            return 0.0, {'error': 'Empty financials'}
+            return {'error': 'Empty financials'}
         
         # Use all available quarters (yfinance only gives us ~5 latest)
         income_cols = income.columns.tolist()
         balance_cols = balance.columns.tolist()
         
         if len(income_cols) < 4 or len(balance_cols) < 1:
-            return 0.0, {'error': 'Not enough financial data'}
+            return {'error': 'Not enough financial data'}
         
         # Get last 4 quarters for TTM
         ttm_income = income[income_cols[:4]]
         latest_balance = balance[balance_cols[0]]
         
-        scores = []
+        per_share = {}
         
-        # P/E Ratio
+        # TTM EPS
         try:
             if 'Net Income' in ttm_income.index:
                 ttm_net_income = ttm_income.loc['Net Income'].sum()
                 if 'Ordinary Shares Number' in latest_balance.index:
                     shares = latest_balance['Ordinary Shares Number']
                     if shares > 0:
-                        ttm_eps = ttm_net_income / shares
-                        pe = price / ttm_eps if ttm_eps > 0 else 999
-                        details['PE'] = round(pe, 2)
-                        
-                        # Grade P/E
-                        if pe < 10:
-                            scores.append(self._grade_to_score('A+'))
-                        elif pe < 15:
-                            scores.append(self._grade_to_score('A'))
-                        elif pe < 20:
-                            scores.append(self._grade_to_score('B'))
-                        elif pe < 30:
-                            scores.append(self._grade_to_score('C'))
-                        elif pe < 50:
-                            scores.append(self._grade_to_score('D'))
-                        else:
-                            scores.append(self._grade_to_score('F'))
+                        per_share['eps'] = ttm_net_income / shares
         except:
             pass
         
-        # P/B Ratio
+        # Book value per share
         try:
             if 'Stockholders Equity' in latest_balance.index:
                 equity = latest_balance['Stockholders Equity']
                 if 'Ordinary Shares Number' in latest_balance.index:
                     shares = latest_balance['Ordinary Shares Number']
                     if shares > 0:
-                        book_value_per_share = equity / shares
-                        pb = price / book_value_per_share if book_value_per_share > 0 else 999
-                        details['PB'] = round(pb, 2)
-                        
-                        # Grade P/B
-                        if pb < 1:
-                            scores.append(self._grade_to_score('A+'))
-                        elif pb < 2:
-                            scores.append(self._grade_to_score('A'))
-                        elif pb < 3:
-                            scores.append(self._grade_to_score('B'))
-                        elif pb < 5:
-                            scores.append(self._grade_to_score('C'))
-                        elif pb < 10:
-                            scores.append(self._grade_to_score('D'))
-                        else:
-                            scores.append(self._grade_to_score('F'))
+                        per_share['book_value'] = equity / shares
         except:
             pass
         
-        # P/S Ratio
+        # TTM revenue per share
         try:
             if 'Total Revenue' in ttm_income.index:
                 ttm_revenue = ttm_income.loc['Total Revenue'].sum()
                 if 'Ordinary Shares Number' in latest_balance.index:
                     shares = latest_balance['Ordinary Shares Number']
                     if shares > 0:
-                        revenue_per_share = ttm_revenue / shares
-                        ps = price / revenue_per_share if revenue_per_share > 0 else 999
-                        details['PS'] = round(ps, 2)
-                        
-                        # Grade P/S
-                        if ps < 1:
-                            scores.append(self._grade_to_score('A+'))
-                        elif ps < 2:
-                            scores.append(self._grade_to_score('A'))
-                        elif ps < 4:
-                            scores.append(self._grade_to_score('B'))
-                        elif ps < 8:
-                            scores.append(self._grade_to_score('C'))
-                        elif ps < 15:
-                            scores.append(self._grade_to_score('D'))
-                        else:
-                            scores.append(self._grade_to_score('F'))
+                        per_share['revenue'] = ttm_revenue / shares
+        except:
+            pass
+        
+        return per_share
+    
+    def _grade_valuation(self, price: float, per_share: Dict) -> Tuple[float, Dict]:
+        """Valuation grade at a price, from _valuation_inputs"""
+        if 'error' in per_share:
+            return 0.0, {'error': per_share['error']}
+        
+        details = {}
+        scores = []
+        
+        # P/E Ratio
+        try:
+            if 'eps' in per_share:
+                ttm_eps = per_share['eps']
+                pe = price / ttm_eps if ttm_eps > 0 else 999
+                details['PE'] = round(pe, 2)
+                
+                # Grade P/E
+                if pe < 10:
+                    scores.append(self._grade_to_score('A+'))
+                elif pe < 15:
+                    scores.append(self._grade_to_score('A'))
+                elif pe < 20:
+                    scores.append(self._grade_to_score('B'))
+                elif pe < 30:
+                    scores.append(self._grade_to_score('C'))
+                elif pe < 50:
+                    scores.append(self._grade_to_score('D'))
+                else:
+                    scores.append(self._grade_to_score('F'))
+        except:
+            pass
+        
+        # P/B Ratio
+        try:
+            if 'book_value' in per_share:
+                book_value_per_share = per_share['book_value']
+                pb = price / book_value_per_share if book_value_per_share > 0 else 999
+                details['PB'] = round(pb, 2)
+                
+                # Grade P/B
+                if pb < 1:
+                    scores.append(self._grade_to_score('A+'))
+                elif pb < 2:
+                    scores.append(self._grade_to_score('A'))
+                elif pb < 3:
+                    scores.append(self._grade_to_score('B'))
+                elif pb < 5:
+                    scores.append(self._grade_to_score('C'))
+                elif pb < 10:
+                    scores.append(self._grade_to_score('D'))
+                else:
+                    scores.append(self._grade_to_score('F'))
+        except:
+            pass
+        
+        # P/S Ratio
+        try:
+            if 'revenue' in per_share:
+                revenue_per_share = per_share['revenue']
+                ps = price / revenue_per_share if revenue_per_share > 0 else 999
+                details['PS'] = round(ps, 2)
+                
+                # Grade P/S
+                if ps < 1:
+                    scores.append(self._grade_to_score('A+'))
+                elif ps < 2:
+                    scores.append(self._grade_to_score('A'))
+                elif ps < 4:
+                    scores.append(self._grade_to_score('B'))
+                elif ps < 8:
+                    scores.append(self._grade_to_score('C'))
+                elif ps < 15:
+                    scores.append(self._grade_to_score('D'))
+                else:
+                    scores.append(self._grade_to_score('F'))
         except:
             pass
         
@@ -422,9 +471,12 @@ class SAQuantReplica:
         Compare latest quarter to same quarter 1 year ago.
         Uses CURRENT financial data (yfinance limitation).
         """
+        return self._grade_growth(self._get_cached_financials(ticker))
+    
+    def _grade_growth(self, financials: Optional[Dict]) -> Tuple[float, Dict]:
+        """Growth grade from the quarterly financials (the same at every date)"""
         details = {}
         
-        financials = self._get_cached_financials(ticker)
         if not financials:
             return 0.0, {'error': 'No financials'}
         
@@ -517,9 +569,12 @@ class SAQuantReplica:
         Score profitability using margins, ROE, ROA, FCF margin.
         Uses CURRENT financial data (yfinance limitation).
         """
+        return self._grade_profitability(self._get_cached_financials(ticker))
+    
+    def _grade_profitability(self, financials: Optional[Dict]) -> Tuple[float, Dict]:
+        """Profitability grade from the quarterly financials (the same at every date)"""
         details = {}
         
-        financials = self._get_cached_financials(ticker)
         if not financials:
             return 0.0, {'error': 'No financials'}
         
@@ -703,119 +758,73 @@ class SAQuantReplica:
         """
         Score momentum using 3M/6M/12M returns, RSI, price vs 200MA.
         """
-        details = {}
-        
         # Get price history before date
         prices = self._get_price_history_before_date(ticker, date, days=365)
-        if prices is None or len(prices) < 50:
+        if prices is None:
             return 0.0, {'error': 'Not enough price data'}
         
-        current_price = prices['Close'].iloc[-1]
-        scores = []
+        close = prices['Close'].to_numpy()
+        return self._grade_momentum(close, np.array([0]), np.array([len(close)]))[0]
+    
+    def _grade_momentum(self, close: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> List[Tuple[float, Dict]]:
+        """
+        Momentum grade of each window close[start:end] (the year of bars before a date).
         
-        # 3-month return
-        if len(prices) >= 63:
-            price_3m_ago = prices['Close'].iloc[-63]
-            ret_3m = (current_price / price_3m_ago - 1) * 100
-            details['return_3m_pct'] = round(ret_3m, 2)
-            
-            if ret_3m > 30:
-                scores.append(self._grade_to_score('A+'))
-            elif ret_3m > 15:
-                scores.append(self._grade_to_score('A'))
-            elif ret_3m > 5:
-                scores.append(self._grade_to_score('B'))
-            elif ret_3m > 0:
-                scores.append(self._grade_to_score('C'))
-            elif ret_3m > -10:
-                scores.append(self._grade_to_score('D'))
-            else:
-                scores.append(self._grade_to_score('F'))
-        
-        # 6-month return
-        if len(prices) >= 126:
-            price_6m_ago = prices['Close'].iloc[-126]
-            ret_6m = (current_price / price_6m_ago - 1) * 100
-            details['return_6m_pct'] = round(ret_6m, 2)
-            
-            if ret_6m > 40:
-                scores.append(self._grade_to_score('A+'))
-            elif ret_6m > 20:
-                scores.append(self._grade_to_score('A'))
-            elif ret_6m > 8:
-                scores.append(self._grade_to_score('B'))
-            elif ret_6m > 0:
-                scores.append(self._grade_to_score('C'))
-            elif ret_6m > -15:
-                scores.append(self._grade_to_score('D'))
-            else:
-                scores.append(self._grade_to_score('F'))
-        
-        # 12-month return
-        if len(prices) >= 252:
-            price_12m_ago = prices['Close'].iloc[-252]
-            ret_12m = (current_price / price_12m_ago - 1) * 100
-            details['return_12m_pct'] = round(ret_12m, 2)
+        Returns and the 200MA are read at fixed offsets from each window's end and the
+        RSI from the rolling-mean series of the whole history, so one pass over a
+        ticker's closes grades all of its dates.
+        """
+        n = ends - starts
+        if len(close) == 0:
+            return [(0.0, {'error': 'Not enough price data'}) for _ in n]
+        
+        g = self.GRADE_SCALE
+        current = close[np.maximum(ends - 1, 0)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ret_3m, ret_6m, ret_12m = ((current / close[np.maximum(ends - k, 0)] - 1) * 100 for k in (63, 126, 252))
+            rsi = indicators.rsi(close, 14)[np.maximum(ends - 1, 0)]
+            pct_above_ma = (current / indicators.sma(close, 200)[np.maximum(ends - 1, 0)] - 1) * 100
+        
+        # (details key, bars needed, value, grade); NaN values grade F like the comparisons they fail
+        columns = [
+            ('return_3m_pct', n >= 63, ret_3m,
+             np.select([ret_3m > 30, ret_3m > 15, ret_3m > 5, ret_3m > 0, ret_3m > -10],
+                       [g['A+'], g['A'], g['B'], g['C'], g['D']], g['F'])),
+            ('return_6m_pct', n >= 126, ret_6m,
+             np.select([ret_6m > 40, ret_6m > 20, ret_6m > 8, ret_6m > 0, ret_6m > -15],
+                       [g['A+'], g['A'], g['B'], g['C'], g['D']], g['F'])),
+            ('return_12m_pct', n >= 252, ret_12m,
+             np.select([ret_12m > 50, ret_12m > 25, ret_12m > 10, ret_12m > 0, ret_12m > -20],
+                       [g['A+'], g['A'], g['B'], g['C'], g['D']], g['F'])),
+            ('rsi', (n >= 20) & ~np.isnan(rsi), rsi,
+             np.select([(rsi >= 50) & (rsi <= 70), (rsi >= 40) & (rsi <= 80), (rsi > 80) | (rsi < 30)],
+                       [g['A'], g['B'], g['D']], g['C'])),
+            ('pct_above_200ma', n >= 200, pct_above_ma,
+             np.select([pct_above_ma > 10, pct_above_ma > 5, pct_above_ma > 0, pct_above_ma > -5, pct_above_ma > -10],
+                       [g['A+'], g['A'], g['B'], g['C'], g['D']], g['F'])),
+        ]
+        
+        results = []
+        for i in range(len(n)):
+            if n[i] < 50:
+                results.append((0.0, {'error': 'Not enough price data'}))
+                continue
             
-            if ret_12m > 50:
-                scores.append(self._grade_to_score('A+'))
-            elif ret_12m > 25:
-                scores.append(self._grade_to_score('A'))
-            elif ret_12m > 10:
-                scores.append(self._grade_to_score('B'))
-            elif ret_12m > 0:
-                scores.append(self._grade_to_score('C'))
-            elif ret_12m > -20:
-                scores.append(self._grade_to_score('D'))
-            else:
-                scores.append(self._grade_to_score('F'))
-        
-        # RSI (14-day)
-        if len(prices) >= 20:
-            delta = prices['Close'].diff()
-            gain = delta.where(delta > 0, 0).rolling(window=14).mean()
-            loss = -delta.where(delta < 0, 0).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            current_rsi = rsi.iloc[-1]
+            details = {}
+            scores = []
+            for key, available, value, grade in columns:
+                if available[i]:
+                    details[key] = round(value[i], 2)
+                    scores.append(grade[i])
             
-            if not np.isnan(current_rsi):
-                details['rsi'] = round(current_rsi, 2)
-                
-                if 50 <= current_rsi <= 70:
-                    scores.append(self._grade_to_score('A'))
-                elif 40 <= current_rsi <= 80:
-                    scores.append(self._grade_to_score('B'))
-                elif current_rsi > 80 or current_rsi < 30:
-                    scores.append(self._grade_to_score('D'))
-                else:
-                    scores.append(self._grade_to_score('C'))
-        
-        # Price vs 200MA
-        if len(prices) >= 200:
-            ma_200 = prices['Close'].rolling(window=200).mean().iloc[-1]
-            pct_above_ma = ((current_price / ma_200 - 1) * 100)
-            details['pct_above_200ma'] = round(pct_above_ma, 2)
+            if not scores:
+                results.append((0.0, details))
+                continue
             
-            if pct_above_ma > 10:
-                scores.append(self._grade_to_score('A+'))
-            elif pct_above_ma > 5:
-                scores.append(self._grade_to_score('A'))
-            elif pct_above_ma > 0:
-                scores.append(self._grade_to_score('B'))
-            elif pct_above_ma > -5:
-                scores.append(self._grade_to_score('C'))
-            elif pct_above_ma > -10:
-                scores.append(self._grade_to_score('D'))
-            else:
-                scores.append(self._grade_to_score('F'))
-        
-        if not scores:
-            return 0.0, details
-        
-        avg_score = np.mean(scores)
-        details['score'] = round(avg_score, 2)
-        return avg_score, details
+            avg_score = np.mean(scores)
+            details['score'] = round(avg_score, 2)
+            results.append((avg_score, details))
+        return results
     
     # ========== FACTOR 5: EPS REVISIONS (25%) — MOST IMPORTANT ==========
     
@@ -826,63 +835,74 @@ class SAQuantReplica:
         
         Uses historical earnings data (indexed by quarter date) and analyst actions.
         """
+        revisions = self._revision_inputs(self._get_cached_earnings(ticker), self._get_cached_upgrades(ticker))
+        return self._grade_eps_revisions(revisions, pd.to_datetime(date).to_datetime64())
+    
+    def _revision_inputs(self, earnings: Optional[pd.DataFrame], upgrades: Optional[pd.DataFrame]) -> Dict:
+        """Dates and surprises of reported earnings, and dates and signs (+1 up, -1 down, 0) of analyst actions"""
+        revisions = {'earnings_dates': None, 'surprises': None, 'upgrade_dates': None, 'upgrade_signs': None}
+        if earnings is not None and not earnings.empty:
+            revisions['earnings_dates'] = np.asarray(earnings.index, dtype='M8[ns]')
+            revisions['surprises'] = earnings['surprisePercent'].to_numpy()
+        
+        if upgrades is not None and not upgrades.empty:
+            signs = []
+            actions = upgrades['Action'] if 'Action' in upgrades.columns else [''] * len(upgrades)
+            for action in actions:
+                action = str(action).lower()
+                if 'up' in action or 'upgrade' in action:
+                    signs.append(1)
+                elif 'down' in action or 'downgrade' in action:
+                    signs.append(-1)
+                else:
+                    signs.append(0)
+            revisions['upgrade_dates'] = np.asarray(upgrades.index, dtype='M8[ns]')
+            revisions['upgrade_signs'] = np.array(signs)
+        return revisions
+    
+    def _grade_eps_revisions(self, revisions: Dict, target_date: np.datetime64) -> Tuple[float, Dict]:
+        """EPS revisions grade at a date, from _revision_inputs"""
         details = {}
         scores = []
         
-        # Get earnings history
-        earnings = self._get_cached_earnings(ticker)
-        if earnings is not None and not earnings.empty:
+        if revisions['earnings_dates'] is not None:
             # Earnings history is indexed by quarter date, so we CAN filter historically
-            target_date = pd.to_datetime(date)
-            
-            # Filter earnings reported before date
-            earnings_before = earnings[earnings.index <= target_date]
+            before = revisions['earnings_dates'] <= target_date
             
-            if not earnings_before.empty and len(earnings_before) > 0:
+            if before.any():
+                surprises = revisions['surprises'][before]
+                
                 # Last earnings surprise
-                if len(earnings_before) >= 1:
-                    last_surprise = earnings_before.iloc[0]['surprisePercent'] * 100
-                    details['last_surprise_pct'] = round(last_surprise, 2)
-                    
-                    if last_surprise > 10:
-                        scores.append(self._grade_to_score('A+'))
-                    elif last_surprise > 5:
-                        scores.append(self._grade_to_score('A'))
-                    elif last_surprise > 0:
-                        scores.append(self._grade_to_score('B'))
-                    elif last_surprise > -5:
-                        scores.append(self._grade_to_score('C'))
-                    elif last_surprise > -10:
-                        scores.append(self._grade_to_score('D'))
-                    else:
-                        scores.append(self._grade_to_score('F'))
+                last_surprise = surprises[0] * 100
+                details['last_surprise_pct'] = round(last_surprise, 2)
+                
+                if last_surprise > 10:
+                    scores.append(self._grade_to_score('A+'))
+                elif last_surprise > 5:
+                    scores.append(self._grade_to_score('A'))
+                elif last_surprise > 0:
+                    scores.append(self._grade_to_score('B'))
+                elif last_surprise > -5:
+                    scores.append(self._grade_to_score('C'))
+                elif last_surprise > -10:
+                    scores.append(self._grade_to_score('D'))
+                else:
+                    scores.append(self._grade_to_score('F'))
                 
                 # Consecutive beats
-                if len(earnings_before) >= 2:
-                    surprises = earnings_before.head(2)['surprisePercent'].values
-                    if all(s > 0 for s in surprises):
+                if len(surprises) >= 2:
+                    if all(s > 0 for s in surprises[:2]):
                         details['consecutive_beats'] = 2
                         scores.append(self._grade_to_score('A'))  # Boost for consistency
         
-        # Get analyst upgrades
-        upgrades = self._get_cached_upgrades(ticker)
-        if upgrades is not None and not upgrades.empty:
-            target_date = pd.to_datetime(date)
-            cutoff_date = target_date - timedelta(days=90)
+        if revisions['upgrade_dates'] is not None:
+            cutoff_date = target_date - np.timedelta64(90, 'D')
             
-            # Filter upgrades in last 90 days before date
-            recent_upgrades = upgrades[(upgrades.index >= cutoff_date) & (upgrades.index <= target_date)]
+            # Net upgrades in last 90 days before date
+            recent = (revisions['upgrade_dates'] >= cutoff_date) & (revisions['upgrade_dates'] <= target_date)
             
-            if not recent_upgrades.empty:
-                # Count net upgrades
-                net_upgrades = 0
-                for _, row in recent_upgrades.iterrows():
-                    action = str(row.get('Action', '')).lower()
-                    if 'up' in action or 'upgrade' in action:
-                        net_upgrades += 1
-                    elif 'down' in action or 'downgrade' in action:
-                        net_upgrades -= 1
-                
+            if recent.any():
+                net_upgrades = int(revisions['upgrade_signs'][recent].sum())
                 details['net_upgrades_90d'] = net_upgrades
                 
                 if net_upgrades > 3:
@@ -906,6 +926,18 @@ class SAQuantReplica:
     
     # ========== COMPOSITE SCORING ==========
     
+    @staticmethod
+    def _composite(val_score: float, growth_score: float, profit_score: float,
+                   momentum_score: float, revisions_score: float) -> float:
+        """Weighted composite of the 5 factor scores"""
+        return (
+            val_score * 0.15 +
+            growth_score * 0.20 +
+            profit_score * 0.20 +
+            momentum_score * 0.20 +
+            revisions_score * 0.25
+        )
+    
     def score_at_date(self, ticker: str, date: str) -> Dict:
         """
         Score a stock using only data available at the given date.
@@ -920,15 +952,7 @@ class SAQuantReplica:
         momentum_score, momentum_details = self._score_momentum(ticker, date)
         revisions_score, revisions_details = self._score_eps_revisions(ticker, date)
         
-        # Weighted composite
-        composite = (
-            val_score * 0.15 +
-            growth_score * 0.20 +
-            profit_score * 0.20 +
-            momentum_score * 0.20 +
-            revisions_score * 0.25
-        )
-        
+        composite = self._composite(val_score, growth_score, profit_score, momentum_score, revisions_score)
         rating = self._score_to_rating(composite)
         
         return {
@@ -949,7 +973,8 @@ class SAQuantReplica:
         """Score a stock using current date"""
         return self.score_at_date(ticker, datetime.now().strftime('%Y-%m-%d'))
     
-    def find_strong_buys(self, universe: List[str], date: str = None, n: int = 10) -> List[Dict]:
+    def find_strong_buys(self, universe: List[str], date: str = None, n: int = 10,
+                         workers: Optional[int] = None) -> List[Dict]:
         """
         Find top N Strong Buy stocks from a universe.
         
@@ -957,6 +982,7 @@ class SAQuantReplica:
             universe: List of tickers to score
             date: Date to score at (default: today)
             n: Number of top stocks to return
+            workers: Scoring processes (default: one per CPU)
         
         Returns:
             List of scored stocks sorted by composite score
@@ -964,23 +990,173 @@ class SAQuantReplica:
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
         
-        results = []
-        for ticker in tqdm(universe, desc=f"Scoring stocks at {date}"):
-            try:
-                score_result = self.score_at_date(ticker, date)
-                if score_result['composite_score'] >= 3.5:  # Strong Buy threshold
-                    results.append(score_result)
-            except Exception as e:
-                continue
+        grades = self.score_batch(universe, [date], workers=workers)
+        strong = grades[grades['composite_score'] >= 3.5]  # Strong Buy threshold
         
         # Sort by composite score
-        results.sort(key=lambda x: x['composite_score'], reverse=True)
-        return results[:n]
+        strong = strong.sort_values('composite_score', ascending=False, kind='stable')
+        return [self.score_at_date(ticker, date) for ticker in strong['ticker'].head(n)]
+    
+    # ========== BATCH SCORING ==========
+    
+    def __getstate__(self):
+        # Pool workers get the scorer without the parent's memo
+        state = self.__dict__.copy()
+        state['_grade_memo'] = {}
+        return state
+    
+    def _get_cached_info(self, ticker: str) -> Dict:
+        """Get cached ticker info or fetch from yfinance"""
+        conn = sqlite3.connect(self.cache_db)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT data, updated FROM ticker_info WHERE ticker = ?', (ticker,))
+        row = cursor.fetchone()
+        
+        if row:
+            updated = datetime.fromisoformat(row[1])
+            if datetime.now() - updated < timedelta(hours=24):
+                conn.close()
+                return json.loads(row[0])
+        
+        try:
+            info = yf.Ticker(ticker).info
+            
+            cursor.execute('''
+                INSERT OR REPLACE INTO ticker_info (ticker, data, updated)
+                VALUES (?, ?, ?)
+            ''', (ticker, json.dumps(info), datetime.now().isoformat()))
+            conn.commit()
+            conn.close()
+            
+            return info
+        except Exception as e:
+            conn.close()
+            return {}
+    
+    def _price_columns(self, ticker: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(dates, closes) of all stored bars of a ticker; empty if it is not stored"""
+        got = self.price_store.columns(ticker) if ticker in self.price_cache else None
+        if got is None:
+            return np.empty(0, dtype='M8[ns]'), np.empty(0)
+        return got[0].view('M8[ns]'), np.array(got[1]['Close'])
+    
+    def _grade_ticker(self, ticker: str, dates: List[str]) -> List[Dict]:
+        """Grade rows of one ticker at each date, from inputs loaded once"""
+        stamps, close = self._price_columns(ticker)
+        targets = pd.to_datetime(dates).to_numpy()
+        ends = np.searchsorted(stamps, targets, side='right')
+        starts = np.searchsorted(stamps, targets - np.timedelta64(365, 'D'), side='left')
+        
+        financials = self._get_cached_financials(ticker)
+        per_share = self._valuation_inputs(financials)
+        growth_score = self._grade_growth(financials)[0]
+        profit_score = self._grade_profitability(financials)[0]
+        momentum = self._grade_momentum(close, starts, ends)
+        revisions = self._revision_inputs(self._get_cached_earnings(ticker), self._get_cached_upgrades(ticker))
+        sector = self._get_cached_info(ticker).get('sector') or 'Unknown'
+        
+        rows = []
+        for i, date in enumerate(dates):
+            try:
+                val_score = self._grade_valuation(close[ends[i] - 1], per_share)[0] if ends[i] > 0 else 0.0
+                revisions_score = self._grade_eps_revisions(revisions, targets[i])[0]
+            except Exception:
+                continue
+            momentum_score = momentum[i][0]
+            composite = self._composite(val_score, growth_score, profit_score, momentum_score, revisions_score)
+            rows.append({
+                'ticker': ticker,
+                'date': date,
+                'sector': sector,
+                'valuation': round(val_score, 2),
+                'growth': round(growth_score, 2),
+                'profitability': round(profit_score, 2),
+                'momentum': round(momentum_score, 2),
+                'eps_revisions': round(revisions_score, 2),
+                'composite_score': round(composite, 2),
+                'rating': self._score_to_rating(composite),
+            })
+        return rows
+    
+    def _grade_requests(self, requests: List[Tuple[str, List[str]]]) -> List[Dict]:
+        """Grade rows for (ticker, dates) requests; tickers that fail to load are left out"""
+        rows = []
+        for ticker, dates in requests:
+            try:
+                rows.extend(self._grade_ticker(ticker, dates))
+            except Exception as e:
+                print(f"Error scoring {ticker}: {e}", file=sys.stderr)
+        return rows
+    
+    def score_pairs(self, pairs: List[Tuple[str, str]], workers: Optional[int] = None,
+                    chunk_size: int = 25) -> pd.DataFrame:
+        """
+        Factor scores, composite and rating of each (ticker, date) pair, with sector percentile ranks.
+        
+        Each ticker's prices, financials, earnings, analyst actions and info are loaded once
+        and graded at all of its dates (growth and profitability, which use current
+        financials only, once per ticker). Graded rows are memoised per (ticker, date), so
+        repeated pairs are not graded again; new ones are graded in chunks of chunk_size
+        tickers across a process pool of `workers` (default: one per CPU).
+        
+        Every score column X also gets X_sector_pct: its percentile rank (0-1] among the
+        distinct pairs of the same date and sector, computed once per date over the whole
+        batch (a repeated pair is ranked once and its rows share that rank). The ranks are
+        for sector-relative screens only: composite_score and rating stay the replica's
+        absolute grades, which is what score_at_date and find_strong_buys report.
+        Pairs that fail to score are left out, as find_strong_buys always skipped them.
+        """
+        pairs = [(ticker, pd.Timestamp(date).strftime('%Y-%m-%d')) for ticker, date in pairs]
+        pending = {}
+        for ticker, date in dict.fromkeys(pairs):
+            if (ticker, date) not in self._grade_memo:
+                pending.setdefault(ticker, []).append(date)
+        requests = list(pending.items())
+        chunks = [requests[i:i + chunk_size] for i in range(0, len(requests), chunk_size)]
+        
+        workers = min(workers or os.cpu_count() or 1, len(chunks))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach_replica, initargs=(self,)) as pool:
+                graded = list(pool.map(_grade_chunk, chunks))
+        else:
+            graded = [self._grade_requests(chunk) for chunk in chunks]
+        
+        for ticker, dates in requests:
+            self._grade_memo.update(dict.fromkeys(((ticker, date) for date in dates), None))
+        for rows in graded:
+            self._grade_memo.update(((row['ticker'], row['date']), row) for row in rows)
+        
+        frame = pd.DataFrame([self._grade_memo[pair] for pair in pairs if self._grade_memo[pair] is not None],
+                             columns=list(self.BATCH_COLUMNS))
+        keys = ['ticker', 'date']
+        distinct = frame.drop_duplicates(keys)
+        ranks = distinct.groupby(['date', 'sector'])[list(self.BATCH_SCORES)].rank(pct=True)
+        ranks = frame[keys].merge(distinct[keys].join(ranks), on=keys, how='left').drop(columns=keys)
+        return frame.join(ranks.set_axis(frame.index).add_suffix('_sector_pct'))
+    
+    def score_batch(self, tickers: List[str], dates: List[str], workers: Optional[int] = None) -> pd.DataFrame:
+        """score_pairs over every date × ticker of a universe (rows by date, then in tickers order)"""
+        return self.score_pairs([(ticker, date) for date in dates for ticker in tickers], workers=workers)
+
+
+_replica: Optional[SAQuantReplica] = None  # the scorer of a pool worker
+
+
+def _attach_replica(replica: SAQuantReplica):
+    """ProcessPoolExecutor initializer: keep the parent's scorer in this worker"""
+    global _replica
+    _replica = replica
+
+
+def _grade_chunk(requests: List[Tuple[str, List[str]]]) -> List[Dict]:
+    return _replica._grade_requests(requests)
 
 
 # ========== CLI HELPERS ==========
 
-def run_blind_backtest(cache_dir: str = None, start_date: str = '2023-05-01', end_date: str = '2026-02-15') -> Dict:
+def run_blind_backtest(cache_dir: str = None, start_date: str = '2023-05-01', end_date: str = '2026-02-15',
+                       workers: Optional[int] = None) -> Dict:
     """
     Run blind backtest using SA Quant scoring.
     
@@ -994,6 +1170,7 @@ def run_blind_backtest(cache_dir: str = None, start_date: str = '2023-05-01', en
         cache_dir: Cache directory
         start_date: Start date for backtest
         end_date: End date for backtest
+        workers: Scoring processes (default: one per CPU)
     
     Returns:
         dict with backtest results
@@ -1033,17 +1210,22 @@ def run_blind_backtest(cache_dir: str = None, start_date: str = '2023-05-01', en
     print(f"\nRunning blind backtest: {len(pick_dates)} pick dates from {start_date} to {end_date}")
     print("Strategy: Pick top 2 Strong Buy stocks (composite >= 3.5)\n")
     
-    for pick_date in tqdm(pick_dates[:10], desc="Backtesting"):  # Limit to 10 dates for speed
-        # Pre-filter by momentum
+    # Each ticker's closes are read once for the momentum pre-filter of every date
+    closes = {ticker: scorer._price_columns(ticker) for ticker in universe}
+    candidates = {}
+    
+    for pick_date in tqdm(pick_dates[:10], desc="Pre-filtering"):  # Limit to 10 dates for speed
+        # Pre-filter by momentum (the last 180 days of bars)
+        target = pd.to_datetime(pick_date)
         momentum_candidates = []
         for ticker in universe:
-            prices = scorer._get_price_history_before_date(ticker, pick_date, days=180)
-            if prices is None or len(prices) < 126:
+            stamps, close = closes[ticker]
+            lo = np.searchsorted(stamps, (target - timedelta(days=180)).to_datetime64(), side='left')
+            hi = np.searchsorted(stamps, target.to_datetime64(), side='right')
+            if hi - lo < 126:
                 continue
             
-            current_price = prices['Close'].iloc[-1]
-            price_6m_ago = prices['Close'].iloc[-126] if len(prices) >= 126 else prices['Close'].iloc[0]
-            ret_6m = (current_price / price_6m_ago - 1) * 100
+            ret_6m = (close[hi - 1] / close[hi - 126] - 1) * 100
             
             if ret_6m > 15:  # Momentum filter
                 momentum_candidates.append((ticker, ret_6m))
@@ -1051,26 +1233,22 @@ def run_blind_backtest(cache_dir: str = None, start_date: str = '2023-05-01', en
         # Sort by momentum and take top 200
         momentum_candidates.sort(key=lambda x: -x[1])
         top_momentum = [t[0] for t in momentum_candidates[:200]]
+        candidates[pick_date] = top_momentum[:50]  # Limit to 50 for speed
+    
+    # Score every date's candidates with the full 5-factor model in one batch
+    grades = scorer.score_pairs([(ticker, d) for d, tickers in candidates.items() for ticker in tickers],
+                                workers=workers)
+    
+    for pick_date in candidates:
+        # Strong Buy only; pick top 2
+        scored = grades[(grades['date'] == pick_date) & (grades['composite_score'] >= 3.5)]
+        picks = scored.sort_values('composite_score', ascending=False, kind='stable').head(2)
         
-        # Score with full 5-factor model
-        scored = []
-        for ticker in top_momentum[:50]:  # Limit to 50 for speed
-            try:
-                result = scorer.score_at_date(ticker, pick_date)
-                if result['composite_score'] >= 3.5:  # Strong Buy only
-                    scored.append(result)
-            except:
-                continue
-        
-        # Pick top 2
-        scored.sort(key=lambda x: -x['composite_score'])
-        picks = scored[:2]
-        
-        if picks:
+        if len(picks):
             results.append({
                 'date': pick_date,
-                'picks': [p['ticker'] for p in picks],
-                'scores': [p['composite_score'] for p in picks]
+                'picks': picks['ticker'].tolist(),
+                'scores': picks['composite_score'].tolist()
             })
     
     print(f"\nBacktest completed: {len(results)} periods with picks")
@@ -1170,6 +1348,7 @@ if __name__ == '__main__':
     parser.add_argument('--n', type=int, default=10, help='Number of results')
     parser.add_argument('--start', default='2023-05-01', help='Backtest start date')
     parser.add_argument('--end', default='2026-02-15', help='Backtest end date')
+    parser.add_argument('--workers', type=int, help='Scoring processes (default: one per CPU)')
     
     args = parser.parse_args()
     
@@ -1199,7 +1378,8 @@ if __name__ == '__main__':
             universe = [line.strip() for line in f if line.strip()]
         
         scorer = SAQuantReplica()
-        results = scorer.find_strong_buys(universe[:200], date=args.date, n=args.n)  # Limit to 200 for speed
+        results = scorer.find_strong_buys(universe[:200], date=args.date, n=args.n,  # Limit to 200 for speed
+                                          workers=args.workers)
         
         print(f"\nTop {args.n} Strong Buy Stocks:\n")
         print(f"{'Ticker':<8} {'Score':<8} {'Rating':<15} {'Momentum':<10} {'EPS Rev':<10}")
@@ -1218,7 +1398,7 @@ if __name__ == '__main__':
             sys.exit(1)
     
     elif args.command == 'sa-backtest':
-        results = run_blind_backtest(start_date=args.start, end_date=args.end)
+        results = run_blind_backtest(start_date=args.start, end_date=args.end, workers=args.workers)
         
         if 'error' in results:
             print(f"Error: {results['error']}", file=sys.stderr)
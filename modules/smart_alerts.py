@@ -7,27 +7,53 @@ Features:
 - Alert rule engine (price crosses, volume spikes, RSI thresholds)
 - Multi-channel delivery (webhook, file-based, console)
 - Rate limiting (max N alerts per hour)
-- Alert history tracking with JSON storage
+- Alert history tracking with append-only JSON-lines storage
 - Cooldown periods to prevent spam
+
+Rule index (check_alerts touches only rules a tick can have changed):
+- Conditions are parsed once into (field, operator, threshold); active rules
+  are kept per (symbol, field) sorted by threshold, with the field's last
+  value. A new value only re-tests the rules whose threshold lies between
+  the last value and the new one (padded by the == tolerance); those that
+  turned true are the tick's candidates.
+- A rule that is true but in cooldown or over its hourly limit is queued
+  by the time it can trigger again; once due it is re-tested on its
+  symbol's next tick, so a condition that stays true re-fires exactly as
+  when every rule was checked on every tick.
+- Triggers are appended to the history log, and rule changes (triggers,
+  creates, deletes, toggles) to a journal that load_alerts() replays over
+  alerts.json; the snapshot is only rewritten when the journal outgrows it.
 """
 
+import bisect
+import functools
+import heapq
 import json
+import math
+import numbers
 import os
+import tempfile
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Optional, Any, Set, Tuple
+from dataclasses import dataclass
 import hashlib
 
 # Storage paths
 ALERTS_DIR = Path(__file__).parent.parent / "data" / "alerts"
 ALERTS_FILE = ALERTS_DIR / "alerts.json"
-HISTORY_FILE = ALERTS_DIR / "alert_history.json"
+ALERTS_JOURNAL = ALERTS_DIR / "alerts_journal.jsonl"
+HISTORY_FILE = ALERTS_DIR / "alert_history.jsonl"
+LEGACY_HISTORY_FILE = ALERTS_DIR / "alert_history.json"
 TRIGGERS_FILE = ALERTS_DIR / "triggered_alerts.json"
 
 ALERTS_DIR.mkdir(parents=True, exist_ok=True)
 
+OPERATORS = ['>=', '<=', '>', '<', '==', '!=']
+EQUALITY_TOLERANCE = 0.01
+JOURNAL_COMPACT_MIN = 1000  # journal records before alerts.json is rewritten
+
 
 @dataclass
 class AlertRule:
@@ -65,6 +91,93 @@ class AlertTrigger:
     message: str
 
 
+def _is_real(value) -> bool:
+    """A number the comparisons accept (the float/int check first: the ABC check is slow)"""
+    return isinstance(value, (float, int)) or isinstance(value, numbers.Real)
+
+
+@dataclass(frozen=True)
+class Condition:
+    """Parsed "field<operator>value" alert condition"""
+    field: str
+    op: str
+    threshold: float
+
+    def test(self, value) -> bool:
+        if not _is_real(value):
+            return False
+        if self.op == '>':
+            return value > self.threshold
+        elif self.op == '<':
+            return value < self.threshold
+        elif self.op == '>=':
+            return value >= self.threshold
+        elif self.op == '<=':
+            return value <= self.threshold
+        elif self.op == '==':
+            return abs(value - self.threshold) < EQUALITY_TOLERANCE
+        return abs(value - self.threshold) >= EQUALITY_TOLERANCE
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_condition(condition: str) -> Condition:
+    """Parse "price>200" style conditions (first operator found, in OPERATORS order). Raises ValueError."""
+    for op in OPERATORS:
+        if op in condition:
+            field, value = condition.split(op)
+            return Condition(field.strip().lower(), op, float(value.strip()))
+    raise ValueError(f"no operator in condition '{condition}'")
+
+
+class RuleGroup:
+    """Active rules on one (symbol, field), sorted by threshold, with the field's last value"""
+
+    __slots__ = ('thresholds', 'rules', 'last')
+
+    def __init__(self):
+        self.thresholds: List[float] = []
+        self.rules: List[Tuple[AlertRule, Condition]] = []
+        self.last: Optional[float] = None
+
+    def add(self, alert: AlertRule, condition: Condition):
+        i = bisect.bisect_right(self.thresholds, condition.threshold)
+        self.thresholds.insert(i, condition.threshold)
+        self.rules.insert(i, (alert, condition))
+
+    def remove(self, alert: AlertRule, condition: Condition):
+        lo = bisect.bisect_left(self.thresholds, condition.threshold)
+        hi = bisect.bisect_right(self.thresholds, condition.threshold)
+        for i in range(lo, hi):
+            if self.rules[i][0] is alert:
+                del self.thresholds[i], self.rules[i]
+                return
+
+    def crossed(self, value) -> List[AlertRule]:
+        """Set the field's new value; return the rules it made true"""
+        if not _is_real(value) or value != value:   # NaN
+            value = None
+        last, self.last = self.last, value
+        if value is None or value == last:
+            return []
+        if last is None:
+            return [alert for alert, condition in self.rules if condition.test(value)]
+        # thresholds between the two values, padded so == and != rules near either end are re-tested
+        lo = bisect.bisect_left(self.thresholds, min(last, value) - 2 * EQUALITY_TOLERANCE)
+        hi = bisect.bisect_right(self.thresholds, max(last, value) + 2 * EQUALITY_TOLERANCE)
+        return [alert for alert, condition in self.rules[lo:hi] if condition.test(value) and not condition.test(last)]
+
+
+def _write_atomic(path: Path, text: str):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
 class AlertEngine:
     """Alert rule engine with rate limiting and multi-channel delivery"""
 
@@ -75,32 +188,156 @@ class AlertEngine:
         self.load_history()
 
     def load_alerts(self):
-        """Load alerts from JSON storage"""
+        """Load alerts from JSON storage, replaying the change journal"""
+        alerts: Dict[str, AlertRule] = {}
         if ALERTS_FILE.exists():
             with open(ALERTS_FILE, 'r') as f:
                 data = json.load(f)
-                self.alerts = [AlertRule(**alert) for alert in data]
-        else:
-            self.alerts = []
+                alerts = {alert['id']: AlertRule(**alert) for alert in data}
+        self._journal_records = 0
+        if ALERTS_JOURNAL.exists():
+            with open(ALERTS_JOURNAL, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of a crashed write
+                    if 'put' in record:
+                        alerts[record['put']['id']] = AlertRule(**record['put'])
+                    else:
+                        alerts.pop(record['delete'], None)
+                    self._journal_records += 1
+        self.alerts = list(alerts.values())
+        self.reindex()
 
     def save_alerts(self):
-        """Save alerts to JSON storage"""
-        with open(ALERTS_FILE, 'w') as f:
-            json.dump([asdict(alert) for alert in self.alerts], f, indent=2)
+        """Save alerts to JSON storage (and start a new journal)
+
+        Rules and triggers are written from vars(): their fields are plain JSON
+        values, and asdict()'s deep copy dominates a tick with many triggers.
+        """
+        _write_atomic(ALERTS_FILE, json.dumps([vars(alert) for alert in self.alerts], indent=2))
+        ALERTS_JOURNAL.unlink(missing_ok=True)
+        self._journal_records = 0
+
+    def _journal(self, puts: List[AlertRule] = (), deletes: List[str] = ()):
+        """Append rule changes to the journal; compact into alerts.json once it outgrows the rules"""
+        records = [{'put': vars(alert)} for alert in puts] + [{'delete': alert_id} for alert_id in deletes]
+        with open(ALERTS_JOURNAL, 'a') as f:
+            f.write(''.join(json.dumps(record) + '\n' for record in records))
+        self._journal_records += len(records)
+        if self._journal_records > max(JOURNAL_COMPACT_MIN, len(self.alerts)):
+            self.save_alerts()
 
     def load_history(self):
         """Load alert history"""
+        self.history = []
+        if LEGACY_HISTORY_FILE.exists():
+            with open(LEGACY_HISTORY_FILE, 'r') as f:
+                self.history = [AlertTrigger(**trigger) for trigger in json.load(f)]
         if HISTORY_FILE.exists():
             with open(HISTORY_FILE, 'r') as f:
-                data = json.load(f)
-                self.history = [AlertTrigger(**trigger) for trigger in data]
-        else:
-            self.history = []
+                for line in f:
+                    try:
+                        self.history.append(AlertTrigger(**json.loads(line)))
+                    except ValueError:
+                        continue
 
     def save_history(self):
         """Save alert history"""
-        with open(HISTORY_FILE, 'w') as f:
-            json.dump([asdict(trigger) for trigger in self.history], f, indent=2)
+        _write_atomic(HISTORY_FILE, ''.join(json.dumps(vars(t)) + '\n' for t in self.history))
+        LEGACY_HISTORY_FILE.unlink(missing_ok=True)
+
+    def _append_history(self, triggers: List[AlertTrigger]):
+        self.history.extend(triggers)
+        with open(HISTORY_FILE, 'a') as f:
+            f.write(''.join(json.dumps(vars(t)) + '\n' for t in triggers))
+
+    # ── rule index ───────────────────────────────────────────
+
+    def reindex(self):
+        """Rebuild the rule index from self.alerts (every active rule is re-tested on its next tick)"""
+        self._by_id: Dict[str, AlertRule] = {}
+        self._order: Dict[str, int] = {}
+        self._index: Dict[str, Dict[str, RuleGroup]] = {}
+        self._pending: Dict[str, Set[str]] = {}      # symbol -> rules to re-test on its next tick
+        self._wakeups: List[Tuple[datetime, str]] = []
+        self._waiting: Dict[str, datetime] = {}
+        for alert in self.alerts:
+            self._add_rule(alert)
+
+    def _add_rule(self, alert: AlertRule):
+        self._by_id[alert.id] = alert
+        self._order.setdefault(alert.id, len(self._order))
+        if alert.active:
+            self._index_rule(alert)
+
+    def _index_rule(self, alert: AlertRule):
+        try:
+            condition = parse_condition(alert.condition)
+        except ValueError as e:
+            print(f"Error evaluating condition '{alert.condition}': {e}")
+            return
+        if math.isnan(condition.threshold):
+            return
+        groups = self._index.setdefault(alert.symbol, {})
+        groups.setdefault(condition.field, RuleGroup()).add(alert, condition)
+        self._pending.setdefault(alert.symbol, set()).add(alert.id)
+
+    def _unindex_rule(self, alert: AlertRule):
+        try:
+            condition = parse_condition(alert.condition)
+        except ValueError:
+            return
+        group = self._index.get(alert.symbol, {}).get(condition.field)
+        if group is not None:
+            group.remove(alert, condition)
+        self._pending.get(alert.symbol, set()).discard(alert.id)
+        self._waiting.pop(alert.id, None)
+
+    def _ready_at(self, alert: AlertRule) -> Optional[datetime]:
+        """When can_trigger() will next allow the alert (None: never)"""
+        if not alert.last_triggered:
+            return None
+        last = datetime.fromisoformat(alert.last_triggered)
+        ready = last + timedelta(minutes=alert.cooldown_minutes)
+        if alert.trigger_count_hour >= alert.max_per_hour:
+            if alert.max_per_hour <= 0:
+                return None
+            ready = max(ready, last + timedelta(hours=1, microseconds=1))  # the counter resets after > 1 hour
+        return ready
+
+    def _schedule(self, alert: AlertRule):
+        """Re-test a blocked alert on its first tick after it may trigger again"""
+        ready = self._ready_at(alert)
+        if ready is not None and self._waiting.get(alert.id) != ready:
+            self._waiting[alert.id] = ready
+            heapq.heappush(self._wakeups, (ready, alert.id))
+
+    def _wake(self, now: datetime):
+        while self._wakeups and self._wakeups[0][0] <= now:
+            ready, alert_id = heapq.heappop(self._wakeups)
+            if self._waiting.get(alert_id) == ready:
+                del self._waiting[alert_id]
+                alert = self._by_id[alert_id]
+                self._pending.setdefault(alert.symbol, set()).add(alert_id)
+
+    def _candidates(self, market_data: Dict[str, Dict[str, float]]) -> List[Tuple[AlertRule, float]]:
+        """Active alerts true on this tick that turned true or were due a re-test, in creation order"""
+        hits: Dict[str, Tuple[AlertRule, float]] = {}
+        for symbol, data in market_data.items():
+            groups = self._index.get(symbol)
+            if not groups:
+                continue
+            for field, group in groups.items():
+                for alert in group.crossed(data.get(field)):
+                    hits[alert.id] = (alert, data[field])
+            for alert_id in self._pending.pop(symbol, ()):
+                alert = self._by_id[alert_id]
+                condition = parse_condition(alert.condition)
+                if condition.test(data.get(condition.field)):
+                    hits[alert_id] = (alert, data[condition.field])
+        return sorted(hits.values(), key=lambda hit: self._order[hit[0].id])
 
     def create_alert(
         self,
@@ -141,7 +378,8 @@ class AlertEngine:
         )
 
         self.alerts.append(alert)
-        self.save_alerts()
+        self._add_rule(alert)
+        self._journal(puts=[alert])
         return alert
 
     def list_alerts(self, active_only: bool = False) -> List[AlertRule]:
@@ -152,29 +390,33 @@ class AlertEngine:
 
     def get_alert(self, alert_id: str) -> Optional[AlertRule]:
         """Get alert by ID"""
-        for alert in self.alerts:
-            if alert.id == alert_id:
-                return alert
-        return None
+        return self._by_id.get(alert_id)
 
     def delete_alert(self, alert_id: str) -> bool:
         """Delete an alert"""
-        for i, alert in enumerate(self.alerts):
-            if alert.id == alert_id:
-                self.alerts.pop(i)
-                self.save_alerts()
-                return True
-        return False
+        alert = self._by_id.pop(alert_id, None)
+        if alert is None:
+            return False
+        if alert.active:
+            self._unindex_rule(alert)
+        self.alerts.remove(alert)
+        self._journal(deletes=[alert_id])
+        return True
 
     def toggle_alert(self, alert_id: str, active: Optional[bool] = None) -> bool:
         """Toggle or set alert active status"""
         alert = self.get_alert(alert_id)
         if alert:
+            was_active = alert.active
             if active is None:
                 alert.active = not alert.active
             else:
                 alert.active = active
-            self.save_alerts()
+            if alert.active and not was_active:
+                self._index_rule(alert)
+            elif was_active and not alert.active:
+                self._unindex_rule(alert)
+            self._journal(puts=[alert])
             return True
         return False
 
@@ -190,48 +432,24 @@ class AlertEngine:
             (triggered: bool, value: float)
         """
         try:
-            # Parse condition: "field operator value"
-            for op in ['>=', '<=', '>', '<', '==', '!=']:
-                if op in condition:
-                    field, value = condition.split(op)
-                    field = field.strip().lower()
-                    target_value = float(value.strip())
-                    
-                    if field not in data:
-                        return False, None
-                    
-                    current_value = data[field]
-                    
-                    # Evaluate condition
-                    result = False
-                    if op == '>':
-                        result = current_value > target_value
-                    elif op == '<':
-                        result = current_value < target_value
-                    elif op == '>=':
-                        result = current_value >= target_value
-                    elif op == '<=':
-                        result = current_value <= target_value
-                    elif op == '==':
-                        result = abs(current_value - target_value) < 0.01
-                    elif op == '!=':
-                        result = abs(current_value - target_value) >= 0.01
-                    
-                    return result, current_value if result else None
-            
-            return False, None
+            parsed = parse_condition(condition)
+            if parsed.field not in data:
+                return False, None
+            current_value = data[parsed.field]
+            result = parsed.test(current_value)
+            return result, current_value if result else None
         except Exception as e:
             print(f"Error evaluating condition '{condition}': {e}")
             return False, None
 
-    def can_trigger(self, alert: AlertRule) -> tuple[bool, str]:
+    def can_trigger(self, alert: AlertRule, now: Optional[datetime] = None) -> tuple[bool, str]:
         """
         Check if alert can trigger based on rate limiting and cooldown
         
         Returns:
             (can_trigger: bool, reason: str)
         """
-        now = datetime.utcnow()
+        now = now or datetime.utcnow()
         
         # Check cooldown period
         if alert.last_triggered:
@@ -308,39 +526,32 @@ class AlertEngine:
         
         return delivery_status
 
-    def check_alerts(self, market_data: Dict[str, Dict[str, float]]) -> List[AlertTrigger]:
+    def check_alerts(self, market_data: Dict[str, Dict[str, float]],
+                     now: Optional[datetime] = None) -> List[AlertTrigger]:
         """
-        Check all active alerts against current market data
+        Check active alerts against current market data
+        
+        Only the rules a tick can have changed are tested: those whose
+        threshold the new values crossed, and those due a re-test because
+        their cooldown or hourly limit ran out while their condition held.
         
         Args:
             market_data: Dict of symbol -> {price, volume, rsi, etc.}
+            now: Tick time (default: utcnow)
             
         Returns:
             List of triggered alerts
         """
+        now = now or datetime.utcnow()
+        self._wake(now)
         triggered = []
         
-        for alert in self.alerts:
-            if not alert.active:
-                continue
-            
-            # Check if we have data for this symbol
-            if alert.symbol not in market_data:
-                continue
-            
-            # Evaluate condition
-            is_triggered, trigger_value = self.evaluate_condition(
-                alert.condition,
-                market_data[alert.symbol]
-            )
-            
-            if not is_triggered:
-                continue
-            
+        for alert, trigger_value in self._candidates(market_data):
             # Check rate limiting
-            can_trigger, reason = self.can_trigger(alert)
+            can_trigger, reason = self.can_trigger(alert, now)
             if not can_trigger:
                 print(f"⏸️  Alert {alert.id} rate limited: {reason}")
+                self._schedule(alert)
                 continue
             
             # Deliver alert
@@ -352,7 +563,7 @@ class AlertEngine:
                 alert_id=alert.id,
                 symbol=alert.symbol,
                 condition=alert.condition,
-                triggered_at=datetime.utcnow().isoformat(),
+                triggered_at=now.isoformat(),
                 triggered_value=trigger_value,
                 channels=alert.channels,
                 delivery_status=delivery_status,
@@ -363,14 +574,14 @@ class AlertEngine:
             alert.last_triggered = trigger.triggered_at
             alert.trigger_count_hour += 1
             alert.trigger_count_total += 1
+            self._schedule(alert)
             
             triggered.append(trigger)
-            self.history.append(trigger)
         
         # Save updates
         if triggered:
-            self.save_alerts()
-            self.save_history()
+            self._append_history(triggered)
+            self._journal(puts=list({t.alert_id: self._by_id[t.alert_id] for t in triggered}.values()))
         
         return triggered
 
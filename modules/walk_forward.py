@@ -2,6 +2,13 @@
 Walk-Forward Optimization Module
 Out-of-sample strategy tuning with rolling windows to prevent overfitting.
 Phase 37: Quantitative Analytics
+
+Windows are optimised in parallel worker processes over the one downloaded
+series. Objective values are memoised per (window, strategy cache key), and
+strategies with a warmup() reuse one signal series for every window: a window
+only masks the bars its own indicators could not have filled yet. Each
+window's optimum is kept in a WindowCache on disk, so a rerun only optimises
+windows it has not seen.
 """
 
 import yfinance as yf
@@ -11,10 +18,19 @@ from scipy.optimize import minimize
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
 import json
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from modules import indicators
+    from modules.window_cache import WindowCache
+except ImportError:
+    import indicators
+    from window_cache import WindowCache
+
 
 @dataclass
 class OptimizationResult:
@@ -50,6 +66,15 @@ class Strategy:
     def generate_signals(self, prices: pd.Series) -> pd.Series:
         """Generate trading signals (-1, 0, 1)"""
         raise NotImplementedError
+    
+    def cache_key(self) -> tuple:
+        """Parameters as the signals see them (equal keys give equal signals)"""
+        return tuple(sorted(self.params.items()))
+    
+    def warmup(self) -> Optional[int]:
+        """Bars before the signal depends only on a fixed trailing window (0 there), or
+        None if signals must be generated on each window's own prices"""
+        return None
 
 
 class SMAStrategy(Strategy):
@@ -62,14 +87,20 @@ class SMAStrategy(Strategy):
     
     def generate_signals(self, prices: pd.Series) -> pd.Series:
         """Generate signals: 1 (long), -1 (short), 0 (neutral)"""
-        fast_ma = prices.rolling(window=self.fast_period).mean()
-        slow_ma = prices.rolling(window=self.slow_period).mean()
+        fast_ma = indicators.sma(prices, self.fast_period)
+        slow_ma = indicators.sma(prices, self.slow_period)
         
         signals = pd.Series(0, index=prices.index)
         signals[fast_ma > slow_ma] = 1
         signals[fast_ma < slow_ma] = -1
         
         return signals
+    
+    def cache_key(self) -> tuple:
+        return (self.fast_period, self.slow_period)
+    
+    def warmup(self) -> Optional[int]:
+        return max(self.fast_period, self.slow_period) - 1
 
 
 def fetch_data(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
@@ -104,24 +135,47 @@ def calculate_sharpe_ratio(returns: pd.Series, periods_per_year: int = 252) -> f
     return mean_return / std_return if std_return > 0 else 0.0
 
 
-def optimize_strategy(prices: pd.Series, strategy_class: type, 
-                     param_bounds: Dict[str, Tuple[float, float]]) -> Tuple[Dict, float]:
-    """Optimize strategy parameters on in-sample data"""
+class WindowObjective:
+    """Sharpe ratio of strategy_class(**params) on prices[start:end], memoised per
+    (window, strategy cache key); windows of one series share signals where they can"""
+    
+    def __init__(self, prices: pd.Series, strategy_class: type):
+        self.prices = prices
+        self.strategy_class = strategy_class
+        self._signals = {}  # cache key -> signals over all prices (strategies with a warmup)
+        self._sharpe = {}   # (start, end, cache key) -> Sharpe ratio
+    
+    def signals(self, strategy: Strategy, start: int, end: int) -> pd.Series:
+        """strategy.generate_signals(prices.iloc[start:end])"""
+        warmup = strategy.warmup()
+        if warmup is None:
+            return strategy.generate_signals(self.prices.iloc[start:end])
+        key = strategy.cache_key()
+        if key not in self._signals:
+            self._signals[key] = strategy.generate_signals(self.prices)
+        signals = self._signals[key].iloc[start:end].copy()
+        signals.iloc[:warmup] = 0
+        return signals
     
-    def objective(params_array):
+    def returns(self, params: Dict, start: int, end: int) -> pd.Series:
+        strategy = self.strategy_class(**params)
+        return calculate_returns(self.prices.iloc[start:end], self.signals(strategy, start, end))
+    
+    def sharpe(self, params: Dict, start: int, end: int) -> float:
+        key = (start, end, self.strategy_class(**params).cache_key())
+        if key not in self._sharpe:
+            self._sharpe[key] = calculate_sharpe_ratio(self.returns(params, start, end))
+        return self._sharpe[key]
+
+
+def _optimize_window(objective: WindowObjective, param_bounds: Dict[str, Tuple[float, float]],
+                     start: int, end: int) -> Tuple[Dict, float]:
+    """Maximise the Sharpe ratio on prices[start:end] (L-BFGS-B from the midpoint of the bounds)"""
+    
+    def negative_sharpe(params_array):
         # Convert array to dict
         params = {name: val for name, val in zip(param_bounds.keys(), params_array)}
-        
-        # Create strategy and generate signals
-        strategy = strategy_class(**params)
-        signals = strategy.generate_signals(prices)
-        
-        # Calculate returns and Sharpe
-        returns = calculate_returns(prices, signals)
-        sharpe = calculate_sharpe_ratio(returns)
-        
-        # Minimize negative Sharpe (maximize Sharpe)
-        return -sharpe
+        return -objective.sharpe(params, start, end)
     
     # Initial guess (midpoint of bounds)
     x0 = [np.mean(bounds) for bounds in param_bounds.values()]
@@ -130,7 +184,7 @@ def optimize_strategy(prices: pd.Series, strategy_class: type,
     bounds = list(param_bounds.values())
     
     # Optimize
-    result = minimize(objective, x0, bounds=bounds, method='L-BFGS-B')
+    result = minimize(negative_sharpe, x0, bounds=bounds, method='L-BFGS-B')
     
     # Extract best parameters
     best_params = {name: val for name, val in zip(param_bounds.keys(), result.x)}
@@ -139,6 +193,19 @@ def optimize_strategy(prices: pd.Series, strategy_class: type,
     return best_params, best_sharpe
 
 
+def _optimize_windows(prices: pd.Series, strategy_class: type, param_bounds: Dict[str, Tuple[float, float]],
+                      windows: List[Tuple[int, int]]) -> List[Tuple[Dict, float]]:
+    """Optimum per (start, end) window, sharing one WindowObjective (runs in a worker process)"""
+    objective = WindowObjective(prices, strategy_class)
+    return [_optimize_window(objective, param_bounds, start, end) for start, end in windows]
+
+
+def optimize_strategy(prices: pd.Series, strategy_class: type, 
+                     param_bounds: Dict[str, Tuple[float, float]]) -> Tuple[Dict, float]:
+    """Optimize strategy parameters on in-sample data"""
+    return _optimize_window(WindowObjective(prices, strategy_class), param_bounds, 0, len(prices))
+
+
 def walk_forward_optimize(symbol: str, 
                          strategy_class: type = SMAStrategy,
                          param_bounds: Dict[str, Tuple[float, float]] = None,
@@ -146,7 +213,10 @@ def walk_forward_optimize(symbol: str,
                          end_date: str = None,
                          in_sample_days: int = 252,
                          out_sample_days: int = 63,
-                         step_days: int = 63) -> WalkForwardResults:
+                         step_days: int = 63,
+                         workers: int = None,
+                         cache_dir: str = None,
+                         use_cache: bool = True) -> WalkForwardResults:
     """
     Perform walk-forward optimization
     
@@ -159,6 +229,9 @@ def walk_forward_optimize(symbol: str,
         in_sample_days: Training window size
         out_sample_days: Testing window size
         step_days: Window step size (overlap if < out_sample_days)
+        workers: Processes optimising windows (default: all cores)
+        cache_dir: WindowCache directory (default data/walkforward_cache)
+        use_cache: Reuse and store per-window optima on disk
     
     Returns:
         WalkForwardResults with all analysis
@@ -181,33 +254,54 @@ def walk_forward_optimize(symbol: str,
     df = fetch_data(symbol, start_date, end_date)
     prices = df['Close']
     
-    # Walk-forward windows
-    windows: List[OptimizationResult] = []
-    all_oos_returns = []
-    param_history = {key: [] for key in param_bounds.keys()}
-    
+    # Walk-forward windows: (in-sample start, in-sample end = OOS start, OOS end)
+    bounds = []
     start_idx = 0
     while start_idx + in_sample_days + out_sample_days <= len(prices):
-        # Define windows
-        is_start = start_idx
         is_end = start_idx + in_sample_days
-        oos_start = is_end
-        oos_end = min(oos_start + out_sample_days, len(prices))
-        
-        # In-sample optimization
+        bounds.append((start_idx, is_end, min(is_end + out_sample_days, len(prices))))
+        start_idx += step_days
+    
+    # In-sample optimization, for the windows not cached on disk
+    cache = WindowCache(cache_dir) if use_cache else None
+    optima: List[Optional[Tuple[Dict, float]]] = [None] * len(bounds)
+    keys = []
+    for i, (is_start, is_end, _) in enumerate(bounds):
         is_prices = prices.iloc[is_start:is_end]
-        best_params, is_sharpe = optimize_strategy(is_prices, strategy_class, param_bounds)
-        
+        keys.append(WindowCache.key('walk_forward', strategy_class.__name__, param_bounds,
+                                    str(is_prices.index[0]), str(is_prices.index[-1]), is_prices.to_numpy()))
+        cached = cache.get(keys[i]) if cache is not None else None
+        if cached is not None:
+            optima[i] = (cached['params'], cached['in_sample_sharpe'])
+    
+    pending = [i for i, optimum in enumerate(optima) if optimum is None]
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    objective = WindowObjective(prices, strategy_class)
+    if workers > 1:
+        # Adjacent windows go to the same worker so they share its signal memo
+        groups = [[bounds[i][:2] for i in group] for group in np.array_split(pending, workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            found = pool.map(_optimize_windows, [prices] * workers, [strategy_class] * workers,
+                             [param_bounds] * workers, groups)
+            found = [optimum for group in found for optimum in group]
+    else:
+        found = [_optimize_window(objective, param_bounds, *bounds[i][:2]) for i in pending]
+    for i, optimum in zip(pending, found):
+        optima[i] = optimum
+        if cache is not None:
+            cache.put(keys[i], {'params': optimum[0], 'in_sample_sharpe': optimum[1]})
+    
+    windows: List[OptimizationResult] = []
+    all_oos_returns = []
+    param_history = {key: [] for key in param_bounds.keys()}
+    
+    for (is_start, is_end, oos_end), (best_params, is_sharpe) in zip(bounds, optima):
         # Out-of-sample testing
-        oos_prices = prices.iloc[oos_start:oos_end]
-        strategy = strategy_class(**best_params)
-        oos_signals = strategy.generate_signals(oos_prices)
-        oos_returns = calculate_returns(oos_prices, oos_signals)
+        oos_returns = objective.returns(best_params, is_end, oos_end)
         oos_sharpe = calculate_sharpe_ratio(oos_returns)
         
         # Calculate metrics
-        is_returns_total = ((1 + calculate_returns(is_prices, 
-                            strategy_class(**best_params).generate_signals(is_prices))).prod() - 1) * 100
+        is_returns_total = ((1 + objective.returns(best_params, is_start, is_end)).prod() - 1) * 100
         oos_returns_total = ((1 + oos_returns).prod() - 1) * 100
         
         degradation = is_sharpe - oos_sharpe
@@ -234,9 +328,6 @@ def walk_forward_optimize(symbol: str,
         # Track parameter history
         for key, val in best_params.items():
             param_history[key].append(val)
-        
-        # Step forward
-        start_idx += step_days
     
     # Calculate aggregate metrics
     avg_is_sharpe = np.mean([w.in_sample_sharpe for w in windows])
@@ -374,6 +465,10 @@ if __name__ == "__main__":
                        help='Out-of-sample window size in days')
     parser.add_argument('--step', type=int, default=63,
                        help='Window step size in days')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Processes optimising windows (default: all cores)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-optimise windows already in the window cache')
     
     args = parser.parse_args()
     
@@ -385,7 +480,9 @@ if __name__ == "__main__":
                 strategy_class=SMAStrategy,
                 in_sample_days=args.in_sample,
                 out_sample_days=args.out_sample,
-                step_days=args.step
+                step_days=args.step,
+                workers=args.workers,
+                use_cache=not args.no_cache
             )
             print(format_results(results, args.symbol))
         
@@ -396,7 +493,9 @@ if __name__ == "__main__":
                 strategy_class=SMAStrategy,
                 in_sample_days=args.in_sample,
                 out_sample_days=args.out_sample,
-                step_days=args.step
+                step_days=args.step,
+                workers=args.workers,
+                use_cache=not args.no_cache
             )
             print(json.dumps(result, indent=2))
         
@@ -407,7 +506,9 @@ if __name__ == "__main__":
                 strategy_class=SMAStrategy,
                 in_sample_days=args.in_sample,
                 out_sample_days=args.out_sample,
-                step_days=args.step
+                step_days=args.step,
+                workers=args.workers,
+                use_cache=not args.no_cache
             )
             print(json.dumps(result, indent=2))
     
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Resumable on-disk cache of walk-forward window results.
+
+A walk-forward run optimises every window from scratch, although a rerun over
+a longer history (or after a crash) shares all but the newest windows with
+the last one. WindowCache keeps each window's outcome (best params, in-sample
+score) as one small JSON file, so reruns only optimise the windows they have
+not seen:
+
+  - Keys: key(*parts) hashes everything an outcome depends on: strategy,
+    parameter grid, costs and the window's bars themselves (numpy arrays are
+    hashed by dtype, shape and bytes). A re-based or extended price history
+    changes the key, so an outcome is never reused for different data.
+  - Writes go to a temporary file that replaces the entry atomically; a
+    crashed run leaves either the old entry, the new one, or none. Unreadable
+    entries count as misses.
+
+Usage:
+    from modules.window_cache import WindowCache
+    cache = WindowCache()
+    key = cache.key("sma_crossover", grid, train_bars)
+    outcome = cache.get(key)
+    if outcome is None:
+        cache.put(key, {"best_params": best, "is_score": score})
+
+Settings (environment):
+    QCD_WALKFORWARD_CACHE_DIR   cache location (default <repo>/data/walkforward_cache)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    "QCD_WALKFORWARD_CACHE_DIR", Path(__file__).resolve().parent.parent / "data" / "walkforward_cache"))
+
+VERSION = 1  # bump when the meaning of a cached outcome changes
+
+
+def _json_default(value):
+    """numpy scalars as Python numbers, anything else (dates) as str"""
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+class WindowCache:
+    """Directory of JSON outcomes, one file per window key"""
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root is not None else DEFAULT_CACHE_DIR
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(*parts) -> str:
+        """Hex digest of parts: arrays by dtype, shape and bytes, everything else as sorted JSON"""
+        digest = hashlib.sha1(str(VERSION).encode())
+        for part in parts:
+            if isinstance(part, np.ndarray):
+                part = np.ascontiguousarray(part)
+                digest.update(f"{part.dtype.str}{part.shape}".encode())
+                digest.update(part.tobytes())
+            else:
+                digest.update(json.dumps(part, sort_keys=True, default=_json_default).encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key)) as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f, default=_json_default)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def clear(self):
+        for path in self.root.glob("*.json"):
+            path.unlink()
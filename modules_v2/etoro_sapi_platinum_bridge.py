@@ -261,8 +261,12 @@ class EtoroSapiPlatinumBridgeModule(BaseModule):
         report.compute_overall()
         return report
 
-    def run(self, symbols: List[str] = None) -> Dict[str, Any]:
-        """Load from ``data_points``, write ``platinum_records``, minimal DCC telemetry."""
+    def run(self, symbols: List[str] = None, run_context=None, compute_fn=None) -> Dict[str, Any]:
+        """Load from ``data_points``, write ``platinum_records``, minimal DCC telemetry.
+
+        Writes its telemetry directly; ``run_context`` and ``compute_fn`` are accepted
+        for orchestrator compatibility.
+        """
         if self.module_id is None:
             self.register()
 
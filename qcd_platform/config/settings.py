@@ -14,6 +14,10 @@ DB_CONFIG = {
 KAFKA_CONFIG = {
     "bootstrap_servers": os.getenv("QCD_KAFKA_SERVERS", "localhost:9092"),
     "client_id": "quantclaw-pipeline",
+    "acks": os.getenv("QCD_KAFKA_ACKS", "all"),
+    "linger_ms": int(os.getenv("QCD_KAFKA_LINGER_MS", "50")),
+    "batch_size": int(os.getenv("QCD_KAFKA_BATCH_BYTES", str(64 * 1024))),
+    "max_queue": int(os.getenv("QCD_KAFKA_MAX_QUEUE", "10000")),  # in-process event queue bound
 }
 
 REDIS_CONFIG = {
@@ -26,9 +30,18 @@ REDIS_CONFIG = {
 PIPELINE_CONFIG = {
     "max_retries": 3,
     "retry_delay_seconds": 60,
+    "host_concurrency": int(os.getenv("QCD_HOST_CONCURRENCY", "2")),  # modules per upstream host at once
+    "process_workers": int(os.getenv("QCD_PROCESS_WORKERS", str(max(1, (os.cpu_count() or 2) // 2)))),  # 0 = no process pool
     "quality_threshold_gold": 80,
     "quality_threshold_silver": 50,
     "batch_size": 1000,
+    "copy_min_rows": int(os.getenv("QCD_COPY_MIN_ROWS", "5000")),  # use COPY at/above this many rows
+    "rate_limit_backend": os.getenv("QCD_RATE_LIMIT_BACKEND", "redis"),  # redis | file
+    "rate_limit_dir": os.getenv("QCD_RATE_LIMIT_DIR", "/tmp/qcd_rate_limits"),  # file backend state
+    "rate_limits": os.getenv("QCD_RATE_LIMITS", ""),  # "host=rate/burst,..." tokens per second
+    "rate_limit_default": os.getenv("QCD_RATE_LIMIT_DEFAULT", "5/10"),  # rate/burst for other hosts
+    "v1_chunk_rows": int(os.getenv("QCD_V1_CHUNK_ROWS", "50000")),  # V1 results are cleaned/stored in chunks this size
+    "redis_latest_encoding": os.getenv("QCD_REDIS_LATEST_ENCODING", "json"),  # json | zlib | msgpack
     "alert_whatsapp_group": "MarketDataClaw",
 }
 
@@ -0,0 +1,22 @@
+-- Migration 005: execution class in the module registry
+-- 'io'  modules (HTTP fetchers) run on the orchestrator's thread pool
+-- 'cpu' modules (pandas-heavy clean/validate, numeric V1 modules) run their
+--       compute stages in the process pool (see pipeline/executor.py)
+
+BEGIN;
+
+ALTER TABLE modules
+    ADD COLUMN IF NOT EXISTS execution_class VARCHAR(10) NOT NULL DEFAULT 'io';
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'modules_execution_class_check') THEN
+        ALTER TABLE modules ADD CONSTRAINT modules_execution_class_check
+            CHECK (execution_class IN ('io', 'cpu'));
+    END IF;
+END $$;
+
+-- Flag CPU-bound modules by hand, e.g.:
+--   UPDATE modules SET execution_class = 'cpu' WHERE name IN ('copula_monte_carlo', 'factor_model_engine');
+
+COMMIT;
@@ -9,16 +9,20 @@ Each module inherits from BaseModule and implements:
 import hashlib
 import json
 import logging
+import pickle
+import tempfile
 import time
 import traceback
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 
 from . import db
+from .datapoint_batch import DataPointBatch, RecentKeys, datetime_micros, dedup_key
 from .kafka_producer import publish_event
-from .redis_cache import cache_latest
+from .redis_cache import cache_latest_many
+from .run_context import RunContext
 
 logger = logging.getLogger("quantclaw.pipeline")
 
@@ -44,6 +48,18 @@ class DataPoint:
             d["ts"] = d["ts"].isoformat()
         return d
 
+    def to_record(self) -> Dict:
+        """Shallow dict for DB row building — same keys as to_dict() without deep-copying payload."""
+        return {
+            "ts": self.ts.isoformat() if isinstance(self.ts, datetime) else self.ts,
+            "symbol": self.symbol,
+            "cadence": self.cadence,
+            "tier": self.tier,
+            "quality_score": self.quality_score,
+            "payload": self.payload,
+            "source_hash": self.source_hash,
+        }
+
 
 @dataclass
 class QualityReport:
@@ -56,6 +72,28 @@ class QualityReport:
     issues: List[str] = field(default_factory=list)
     passed_gold: bool = False
 
+    @classmethod
+    def combine(cls, chunks: List[tuple]) -> "QualityReport":
+        """One report for (rows_clean, report) pairs of separately validated chunks.
+
+        Scores are weighted by clean rows; timeliness is the newest chunk's.
+        """
+        if len(chunks) == 1:
+            return chunks[0][1]
+        weights = [rows for rows, _ in chunks] if any(rows for rows, _ in chunks) else [1] * len(chunks)
+        total = sum(weights)
+        reports = [report for _, report in chunks]
+        combined = cls(
+            completeness=sum(w * r.completeness for w, r in zip(weights, reports)) / total,
+            timeliness=max(r.timeliness for r in reports),
+            accuracy=sum(w * r.accuracy for w, r in zip(weights, reports)) / total,
+            consistency=sum(w * r.consistency for w, r in zip(weights, reports)) / total,
+            schema_valid=all(r.schema_valid for r in reports),
+            issues=list(dict.fromkeys(issue for r in reports for issue in r.issues)),
+        )
+        combined.compute_overall()
+        return combined
+
     def compute_overall(self):
         scores = [self.completeness, self.timeliness, self.accuracy, self.consistency]
         non_zero = [s for s in scores if s > 0]
@@ -63,6 +101,65 @@ class QualityReport:
         self.passed_gold = self.overall_score >= 80 and self.schema_valid
 
 
+class CleanError(Exception):
+    """clean() or validate() failed after fetch; carries the chunk's bronze rows so run() can still store them."""
+
+    def __init__(self, message: str, output: "ModuleOutput"):
+        super().__init__(message, output)
+        self.output = output
+
+    def __str__(self) -> str:
+        return self.args[0]
+
+
+@dataclass
+class ModuleOutput:
+    """Result of the compute stages (fetch → clean → validate), ready to persist.
+
+    Data point rows (see db.build_data_point_row) are held column-wise with
+    repeated values shared, so pickling it to ship back from a worker process
+    writes each distinct timestamp, symbol, payload or hash once (pickle memoises
+    by identity) instead of once per DataPoint.
+    """
+    rows_in: int = 0
+    rows_clean: int = 0
+    bronze_columns: tuple = ()
+    tier_columns: tuple = ()
+    quality: Optional[QualityReport] = None
+    latest: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # symbol → newest clean payload
+
+    @staticmethod
+    def to_columns(rows: List[tuple], shared: Dict = None) -> tuple:
+        """Transpose rows into columns, replacing equal values with one shared object."""
+        shared = {} if shared is None else shared
+
+        def share(v):
+            try:
+                return shared.setdefault(v, v)
+            except TypeError:  # unhashable raw ts; keep as is
+                return v
+
+        return tuple([share(v) for v in col] for col in zip(*rows)) if rows else ()
+
+    @staticmethod
+    def to_rows(columns: tuple) -> List[tuple]:
+        return list(zip(*columns)) if columns else []
+
+    def bronze_rows(self) -> List[tuple]:
+        return self.to_rows(self.bronze_columns)
+
+    def tier_rows(self) -> List[tuple]:
+        return self.to_rows(self.tier_columns)
+
+    def promote(self, quality_score: int):
+        """Relabel the clean (tier) rows gold with the given quality score."""
+        if self.tier_columns:
+            columns = list(self.tier_columns)
+            columns[4] = ["gold"] * len(columns[4])
+            columns[5] = [quality_score] * len(columns[5])
+            self.tier_columns = tuple(columns)
+
+
 class BaseModule(ABC):
     name: str = "unnamed"
     display_name: str = ""
@@ -70,6 +167,8 @@ class BaseModule(ABC):
     granularity: str = "symbol"  # symbol | market | macro | global
     tags: List[str] = []
     symbols: Optional[List[str]] = None  # None = all symbols in universe
+    execution_class: Optional[str] = None  # io | cpu; None keeps whatever the registry says
+    _dedup_seen: Optional[RecentKeys] = None  # keys of recent chunks while run() streams fetch_chunks()
 
     def __init__(self):
         self.module_id: Optional[int] = None
@@ -83,19 +182,27 @@ class BaseModule(ABC):
             cadence=self.cadence,
             granularity=self.granularity,
             tags=self.tags,
+            execution_class=self.execution_class,
         )
         return self.module_id
 
     @abstractmethod
-    def fetch(self, symbols: List[str] = None) -> List[DataPoint]:
-        """Bronze: fetch raw data from external source. Returns list of DataPoints."""
+    def fetch(self, symbols: List[str] = None) -> Union[List[DataPoint], DataPointBatch]:
+        """Bronze: fetch raw data from external source. Returns DataPoints or a columnar DataPointBatch."""
         ...
 
+    def fetch_chunks(self, symbols: List[str] = None) -> Iterator[Union[List[DataPoint], DataPointBatch]]:
+        """Bronze in pieces: run() cleans, validates and stores each chunk before pulling the next.
+        Override for sources that can stream; by default the whole fetch() is one chunk."""
+        yield self.fetch(symbols=symbols)
+
     def clean(self, raw_points: List[DataPoint]) -> List[DataPoint]:
         """Silver: validate schema, clean nulls, normalize timestamps, deduplicate.
         Override for module-specific cleaning logic."""
+        if isinstance(raw_points, DataPointBatch):
+            return raw_points.clean(seen=self._dedup_seen)
         cleaned = []
-        seen = set()
+        seen = self._dedup_seen if self._dedup_seen is not None else set()
         for point in raw_points:
             if not point.payload:
                 continue
@@ -108,10 +215,10 @@ class BaseModule(ABC):
                 point.ts = point.ts.replace(tzinfo=timezone.utc)
 
             point.compute_hash()
-            dedup_key = (point.symbol, point.ts.isoformat(), point.source_hash)
-            if dedup_key in seen:
+            key = dedup_key(point.symbol, datetime_micros(point.ts), point.source_hash)
+            if key in seen:
                 continue
-            seen.add(dedup_key)
+            seen.add(key)
 
             point.tier = "silver"
             point.quality_score = max(point.quality_score, 50)
@@ -128,7 +235,12 @@ class BaseModule(ABC):
             return report
 
         total = len(clean_points)
-        with_payload = sum(1 for p in clean_points if p.payload)
+        if isinstance(clean_points, DataPointBatch):
+            with_payload = int(clean_points.payload_present().sum())
+            latest = clean_points.latest_ts()
+        else:
+            with_payload = sum(1 for p in clean_points if p.payload)
+            latest = max(p.ts for p in clean_points)
         report.completeness = (with_payload / total * 100) if total > 0 else 0
 
         now = datetime.now(timezone.utc)
@@ -138,7 +250,6 @@ class BaseModule(ABC):
             "monthly": 1440, "quarterly": 4320,
         }
         max_age_hours = cadence_hours.get(self.cadence, 48)
-        latest = max(p.ts for p in clean_points)
         age_hours = (now - latest).total_seconds() / 3600
         report.timeliness = max(0, min(100, (1 - age_hours / max_age_hours) * 100))
 
@@ -149,11 +260,125 @@ class BaseModule(ABC):
         report.compute_overall()
         return report
 
-    def run(self, symbols: List[str] = None) -> Dict:
-        """Execute full Bronze → Silver → Gold pipeline for this module."""
+    def compute(self, symbols: List[str] = None) -> ModuleOutput:
+        """fetch → clean → validate with no database or broker side effects.
+
+        Safe to call in a worker process; run() persists the returned output.
+        """
+        self.logger.info(f"[{self.name}] Fetching data...")
+        return self.compute_chunk(self.fetch(symbols=symbols))
+
+    def compute_chunk(self, raw_points: Union[List[DataPoint], DataPointBatch], promote: bool = True) -> ModuleOutput:
+        """clean → validate for fetched points (all of them, or one fetch_chunks() chunk).
+
+        With promote=False the clean rows stay silver even if this chunk passes gold;
+        run() then decides the tier once, from the quality of the whole run.
+        """
+        if self._dedup_seen is not None:
+            self._dedup_seen.next_chunk()
+        output = ModuleOutput()
+        output.rows_in = len(raw_points)
+        if not output.rows_in:
+            return output
+        if isinstance(raw_points, DataPointBatch):
+            if self._handles_batches():
+                return self._compute_batch(raw_points, output, promote)
+            raw_points = raw_points.to_points()
+
+        # Bronze: serialise raw rows now, before clean() mutates the points in place
+        bronze_rows = []
+        bronze_payloads = {}
+        for p in raw_points:
+            p.compute_hash()
+            payload_json = db.encode_payload(p.payload)
+            row = db.build_data_point_row(self.module_id, p.to_record(), payload_json)
+            if row is not None:
+                bronze_rows.append(row)
+                bronze_payloads[id(p)] = (p.payload, payload_json)
+
+        try:
+            # Silver: clean
+            self.logger.info(f"[{self.name}] Cleaning data...")
+            clean_points = self.clean(raw_points)
+
+            # Gold: validate
+            self.logger.info(f"[{self.name}] Validating quality...")
+            quality = self.validate(clean_points)
+        except Exception as e:
+            output.bronze_columns = ModuleOutput.to_columns(bronze_rows)
+            raise CleanError(str(e), output) from e
+
+        # Clean points are stored once, at the tier they end up in (silver, or gold on promotion).
+        # The default clean() never touches payloads, so its points reuse the bronze encoding;
+        # an overridden clean() may rewrite them in place, so those are encoded again.
+        reuse = type(self).clean is BaseModule.clean
+        tier_rows = []
+        for p in clean_points:
+            cached = bronze_payloads.get(id(p)) if reuse else None
+            payload_json = cached[1] if cached and cached[0] is p.payload else None
+            row = db.build_data_point_row(self.module_id, p.to_record(), payload_json)
+            if row is not None:
+                tier_rows.append(row)
+
+        output.rows_clean = len(clean_points)
+        shared: Dict[Any, Any] = {}
+        output.bronze_columns = ModuleOutput.to_columns(bronze_rows, shared)
+        output.tier_columns = ModuleOutput.to_columns(tier_rows, shared)
+        output.quality = quality
+        output.latest = {p.symbol: p.payload for p in clean_points if p.symbol}
+        if promote and quality.passed_gold:
+            output.promote(quality.overall_score)
+        return output
+
+    def _handles_batches(self) -> bool:
+        """Columnar batches stay columnar unless clean()/validate() are overridden per point."""
+        cls = type(self)
+        return cls.clean is BaseModule.clean and cls.validate is BaseModule.validate
+
+    def _compute_batch(self, batch: DataPointBatch, output: ModuleOutput, promote: bool = True) -> ModuleOutput:
+        """compute() for a DataPointBatch: hashing, cleaning and row building stay column-wise."""
+        payload_json = batch.encode_payloads()
+        output.bronze_columns = batch.to_row_columns(self.module_id, payload_json)
+
+        try:
+            self.logger.info(f"[{self.name}] Cleaning data...")
+            clean = self.clean(batch)
+
+            self.logger.info(f"[{self.name}] Validating quality...")
+            quality = self.validate(clean)
+        except Exception as e:
+            raise CleanError(str(e), output) from e
+
+        # batch cleaning never rewrites payloads, so every clean row reuses its bronze encoding
+        output.tier_columns = clean.to_row_columns(self.module_id, [payload_json[i] for i in clean.row_ids])
+        output.rows_clean = len(clean)
+        output.quality = quality
+        output.latest = clean.latest_payloads()
+        if promote and quality.passed_gold:
+            output.promote(quality.overall_score)
+        return output
+
+    def run(self, symbols: List[str] = None, run_context: RunContext = None,
+            compute_fn: Callable[["BaseModule", Optional[List[str]]], ModuleOutput] = None) -> Dict:
+        """Execute full Bronze → Silver → Gold pipeline for this module.
+
+        Run bookkeeping (pipeline_runs, quality_checks, modules) is buffered in
+        run_context; without one, a private context is flushed when the run ends.
+        Without compute_fn, fetch_chunks() is consumed one chunk at a time: each
+        chunk is cleaned, validated and stored before the next is fetched, so a
+        streaming source never has its whole output in memory. compute_fn(module,
+        symbols) instead returns a single ModuleOutput, e.g. from a process pool
+        (see executor.HybridExecutor). rows_dropped (stored as rows_failed) counts
+        fetched rows that cleaning removed. Duplicates are dropped within a chunk and
+        against the previous chunk (see RecentKeys), and the clean rows' tier comes
+        from the run's combined quality report: a multi-chunk run spools its clean
+        rows to a temporary file and inserts them at their final tier at the end.
+        """
         if self.module_id is None:
             self.register()
 
+        ctx = run_context or RunContext()
+
         result = {
             "module": self.name,
             "status": "unknown",
@@ -164,66 +389,97 @@ class BaseModule(ABC):
         }
 
         start_time = time.time()
-        run_id = db.start_pipeline_run(self.module_id, "gold")
+        run = ctx.start_run(self.module_id, "gold")
+        spool = None
 
         try:
-            # Bronze: fetch
-            self.logger.info(f"[{self.name}] Fetching data...")
-            raw_points = self.fetch(symbols=symbols)
-            result["rows_in"] = len(raw_points)
-
-            if not raw_points:
+            if compute_fn:
+                outputs = [compute_fn(self, symbols)]
+            else:
+                self.logger.info(f"[{self.name}] Fetching data...")
+                # chunks dedup against the previous one and stay silver; the run's tier is decided below
+                self._dedup_seen = RecentKeys()
+                outputs = (self.compute_chunk(chunk, promote=False) for chunk in self.fetch_chunks(symbols))
+
+            rows_clean, rows_bronze, rows_tier, chunks = 0, 0, 0, []
+            result.update(self._write_stats([], [], False))
+            for output, only in self._single_lookahead(outputs):
+                result["rows_in"] += output.rows_in
+                rows_clean += output.rows_clean
+                chunks.append((output.rows_clean, output.quality))
+
+                bronze_rows = output.bronze_rows()
+                promoted = only and output.quality.passed_gold
+                if only:
+                    # one chunk: its own quality is the run's, so it is stored at its final tier
+                    if promoted:
+                        output.promote(output.quality.overall_score)
+                    tier_rows = output.tier_rows()
+                else:
+                    # several chunks: clean rows wait on disk until the combined report decides their tier
+                    spool = spool or tempfile.TemporaryFile()
+                    pickle.dump(output.tier_columns, spool, protocol=pickle.HIGHEST_PROTOCOL)
+                    tier_rows = []
+
+                # Bronze + silver/gold rows of a chunk go to the database in a single transaction
+                db.insert_data_point_rows(bronze_rows + tier_rows)
+                rows_bronze += len(bronze_rows)
+                rows_tier += len(tier_rows)
+                for key, value in self._write_stats(bronze_rows, tier_rows, promoted).items():
+                    result[key] += value
+
+                # Cache latest values in Redis (one pipelined round trip per chunk)
+                cache_latest_many(self.name, output.latest.items())
+                del output, bronze_rows, tier_rows
+
+            if not result["rows_in"]:
                 self.logger.warning(f"[{self.name}] No data returned from fetch")
                 duration_ms = int((time.time() - start_time) * 1000)
-                db.complete_pipeline_run(run_id, "success", rows_in=0, rows_out=0, duration_ms=duration_ms)
+                ctx.complete_run(run, "success", rows_in=0, rows_out=0, duration_ms=duration_ms)
+                if run_context is None:
+                    ctx.flush()
                 result["status"] = "empty"
                 result["duration_ms"] = duration_ms
                 return result
 
-            for p in raw_points:
-                p.compute_hash()
-
-            # Store bronze
-            inserted = db.insert_data_points(self.module_id, [p.to_dict() for p in raw_points])
-            self.logger.info(f"[{self.name}] Bronze: {inserted} points stored")
+            quality = QualityReport.combine(chunks)
+            if spool is not None:
+                promote_to = quality.overall_score if quality.passed_gold else None
+                rows_tier += self._store_spooled(spool, result, promote_to)
+                spool.close()
+                spool = None
+            ctx.record_quality_check(run, "completeness", quality.completeness >= 80, int(quality.completeness))
+            ctx.record_quality_check(run, "timeliness", quality.timeliness >= 60, int(quality.timeliness))
+            ctx.record_quality_check(run, "accuracy", quality.accuracy >= 80, int(quality.accuracy))
+            ctx.record_quality_check(run, "consistency", quality.consistency >= 80, int(quality.consistency))
+            ctx.record_quality_check(run, "schema_valid", quality.schema_valid, 100 if quality.schema_valid else 0)
+
+            rows_dropped = result["rows_in"] - rows_clean
+            self.logger.info(
+                f"[{self.name}] Stored {rows_bronze} bronze + {rows_tier} "
+                f"{'gold' if quality.passed_gold else 'silver'} points"
+                + (f" in {len(chunks)} chunks" if len(chunks) > 1 else "")
+                + f"; {rows_dropped} of {result['rows_in']} rows dropped by cleaning"
+            )
 
             domain_tag = self._primary_domain()
             publish_event(f"quantclaw.pipeline.bronze.{domain_tag}", {
                 "module": self.name,
-                "count": inserted,
+                "count": rows_bronze,
                 "ts": datetime.now(timezone.utc).isoformat(),
             })
 
-            # Silver: clean
-            self.logger.info(f"[{self.name}] Cleaning data...")
-            clean_points = self.clean(raw_points)
-
-            if clean_points:
-                db.insert_data_points(self.module_id, [p.to_dict() for p in clean_points])
+            if rows_clean:
                 publish_event(f"quantclaw.pipeline.silver.{domain_tag}", {
                     "module": self.name,
-                    "count": len(clean_points),
+                    "count": rows_clean,
                     "ts": datetime.now(timezone.utc).isoformat(),
                 })
 
-            # Gold: validate
-            self.logger.info(f"[{self.name}] Validating quality...")
-            quality = self.validate(clean_points)
-
-            db.record_quality_check(run_id, "completeness", quality.completeness >= 80, int(quality.completeness))
-            db.record_quality_check(run_id, "timeliness", quality.timeliness >= 60, int(quality.timeliness))
-            db.record_quality_check(run_id, "accuracy", quality.accuracy >= 80, int(quality.accuracy))
-            db.record_quality_check(run_id, "consistency", quality.consistency >= 80, int(quality.consistency))
-            db.record_quality_check(run_id, "schema_valid", quality.schema_valid, 100 if quality.schema_valid else 0)
-
             if quality.passed_gold:
-                for p in clean_points:
-                    p.tier = "gold"
-                    p.quality_score = quality.overall_score
-                db.insert_data_points(self.module_id, [p.to_dict() for p in clean_points])
                 publish_event(f"quantclaw.pipeline.gold.{domain_tag}", {
                     "module": self.name,
-                    "count": len(clean_points),
+                    "count": rows_clean,
                     "quality_score": quality.overall_score,
                     "ts": datetime.now(timezone.utc).isoformat(),
                 })
@@ -231,44 +487,33 @@ class BaseModule(ABC):
 
                 # Platinum: score >= 95, at least 2 runs, no consecutive failures
                 if quality.overall_score >= 95:
-                    rows = db.execute_query(
-                        "SELECT run_count, consecutive_failures FROM modules WHERE id = %s",
-                        (self.module_id,), fetch=True,
-                    )
-                    if rows and rows[0]["run_count"] >= 2 and rows[0]["consecutive_failures"] == 0:
+                    stats = ctx.module_stats(self.module_id)
+                    if stats and stats["run_count"] >= 2 and stats["consecutive_failures"] == 0:
                         tier_reached = "platinum"
-                        for p in clean_points:
-                            p.tier = "platinum"
             else:
-                tier_reached = "silver" if clean_points else "bronze"
+                tier_reached = "silver" if rows_clean else "bronze"
 
             # Update module tier
-            db.execute_query(
-                "UPDATE modules SET current_tier = %s, quality_score = %s WHERE id = %s",
-                (tier_reached, quality.overall_score, self.module_id),
-            )
-
-            # Cache latest values in Redis
-            for p in clean_points:
-                if p.symbol:
-                    cache_latest(self.name, p.symbol, p.payload)
+            ctx.update_module("id", self.module_id,
+                              current_tier=tier_reached, quality_score=quality.overall_score)
 
             duration_ms = int((time.time() - start_time) * 1000)
-            result["rows_out"] = len(clean_points)
+            result["rows_out"] = rows_clean
+            result["rows_dropped"] = rows_dropped
             result["status"] = "success"
             result["tier_reached"] = tier_reached
             result["quality_score"] = quality.overall_score
             result["duration_ms"] = duration_ms
             result["issues"] = quality.issues
 
-            db.complete_pipeline_run(
-                run_id, "success",
-                rows_in=len(raw_points), rows_out=len(clean_points),
+            ctx.complete_run(
+                run, "success",
+                rows_in=result["rows_in"], rows_out=rows_clean, rows_failed=rows_dropped,
                 duration_ms=duration_ms,
             )
 
             self.logger.info(
-                f"[{self.name}] Complete: {len(clean_points)} points → {tier_reached} "
+                f"[{self.name}] Complete: {rows_clean} points → {tier_reached} "
                 f"(score={quality.overall_score}, {duration_ms}ms)"
             )
 
@@ -277,8 +522,25 @@ class BaseModule(ABC):
             error_msg = str(e)
             self.logger.error(f"[{self.name}] Failed: {error_msg}")
 
-            db.complete_pipeline_run(
-                run_id, "failed",
+            if isinstance(e, CleanError):
+                # the fetched rows are kept even though cleaning them failed
+                bronze_rows = e.output.bronze_rows()
+                try:
+                    db.insert_data_point_rows(bronze_rows)
+                    result["rows_in"] += e.output.rows_in
+                    for key, value in self._write_stats(bronze_rows, [], False).items():
+                        result[key] = result.get(key, 0) + value
+                except Exception as store_error:
+                    self.logger.error(f"[{self.name}] Could not store bronze rows: {store_error}")
+            if spool is not None:
+                # clean rows of the chunks before the failure are kept, at silver
+                try:
+                    self._store_spooled(spool, result)
+                except Exception as store_error:
+                    self.logger.error(f"[{self.name}] Could not store silver rows: {store_error}")
+
+            ctx.complete_run(
+                run, "failed",
                 rows_in=result["rows_in"],
                 error_message=error_msg,
                 duration_ms=duration_ms,
@@ -294,9 +556,64 @@ class BaseModule(ABC):
             result["status"] = "failed"
             result["error"] = error_msg
             result["duration_ms"] = duration_ms
+        finally:
+            self._dedup_seen = None
+            if spool is not None:
+                spool.close()
 
+        if run_context is None:
+            ctx.flush()
         return result
 
+    @staticmethod
+    def _single_lookahead(outputs) -> Iterator[tuple]:
+        """(output, only) for each non-empty output; only is True when it is the sole one."""
+        outputs = (output for output in outputs if output.rows_in)
+        first = next(outputs, None)
+        if first is None:
+            return
+        try:
+            second = next(outputs, None)
+        except Exception:
+            yield first, False  # stored silver before the failure propagates
+            raise
+        yield first, second is None
+        if second is not None:
+            yield second, False
+            for output in outputs:
+                yield output, False
+
+    def _store_spooled(self, spool, result: Dict, quality_score: Optional[int] = None) -> int:
+        """Insert the tier rows run() spooled chunk by chunk, as gold with quality_score if given."""
+        spool.seek(0)
+        stored = 0
+        while True:
+            try:
+                output = ModuleOutput(tier_columns=pickle.load(spool))
+            except EOFError:
+                return stored
+            if quality_score is not None:
+                output.promote(quality_score)
+            tier_rows = output.tier_rows()
+            db.insert_data_point_rows(tier_rows)
+            stored += len(tier_rows)
+            for key, value in self._write_stats([], tier_rows, quality_score is not None).items():
+                result[key] = result.get(key, 0) + value
+
+    @staticmethod
+    def _write_stats(bronze_rows: List[tuple], tier_rows: List[tuple], promoted: bool) -> Dict:
+        """Rows/bytes written this run vs. the old bronze + silver + gold-copy layout."""
+        payload_idx = 6
+        bronze_bytes = sum(len(r[payload_idx]) for r in bronze_rows)
+        tier_bytes = sum(len(r[payload_idx]) for r in tier_rows)
+        return {
+            "rows_written": len(bronze_rows) + len(tier_rows),
+            "bytes_written": bronze_bytes + tier_bytes,
+            # a promoted run used to write every clean row twice (silver, then gold)
+            "rows_saved": len(tier_rows) if promoted else 0,
+            "bytes_saved": tier_bytes if promoted else 0,
+        }
+
     def _primary_domain(self) -> str:
         domain_map = {
             "US Equities": "us_equities",
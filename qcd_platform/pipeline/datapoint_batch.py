@@ -0,0 +1,677 @@
+"""
+DataPointBatch — columnar storage for a module's data points.
+
+A list of DataPoint dataclasses costs a Python object, a datetime and a
+payload dict per row. A batch keeps the same information column-wise:
+
+  ts             int64 microseconds since the Unix epoch, UTC (NAT_US = no usable timestamp)
+  symbols        pandas Categorical: integer codes into one table of distinct symbols
+  payload        DataFrame with one typed column per payload key; NA = key absent
+  quality_score  int16 per row
+  source_hash    object array of 16-hex digests, computed on first use
+  cadence, tier  batch-wide strings
+
+Indexing a batch gives a DataPointView, the per-row DataPoint API (ts,
+symbol, payload, ...) read from and written back to the columns.
+to_points() materialises real DataPoints for code that needs them, e.g.
+modules that override clean() or validate().
+
+None and NaN payload values are treated as absent keys, the same values
+db.encode_payload drops when a row is stored.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import db
+
+NAT_US = np.iinfo(np.int64).min
+
+_MISSING = object()
+_PLAIN = (str, int, float, bool, dict, list, type(None))
+
+
+def to_utc_micros(values, default: datetime = None) -> np.ndarray:
+    """Timestamps (datetimes, ISO strings, pandas values) → int64 UTC microseconds.
+
+    Naive values are taken as UTC. Unparseable values become `default`, or NAT_US without one.
+    """
+    if isinstance(values, pd.Series) and (isinstance(values.dtype, pd.DatetimeTZDtype)
+                                          or values.dtype.kind == "M"):
+        parsed = pd.to_datetime(values, utc=True).reset_index(drop=True)  # already datetimes: no parse
+    else:
+        parsed = pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors="coerce", format="mixed")
+    if default is not None:
+        parsed = parsed.fillna(pd.Timestamp(default))
+    micros = parsed.dt.as_unit("us").to_numpy(dtype="datetime64[us]").astype(np.int64)
+    micros[parsed.isna().to_numpy()] = NAT_US
+    return micros
+
+
+def micros_to_datetime(micros: int) -> Optional[datetime]:
+    if micros == NAT_US:
+        return None
+    return pd.Timestamp(int(micros), unit="us", tz="UTC").to_pydatetime()
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def datetime_micros(ts: datetime) -> int:
+    """Aware datetime → UTC microseconds since the epoch (the unit of DataPointBatch.ts)."""
+    return (ts - _EPOCH) // timedelta(microseconds=1)
+
+
+def dedup_key(symbol, ts_micros: int, digest: Optional[str]) -> tuple:
+    """Silver dedup key of a row; DataPoints and batch rows build the same key."""
+    return None if symbol is None else str(symbol), int(ts_micros), digest
+
+
+class RecentKeys:
+    """Dedup keys of the current and the previous chunk of a streamed run.
+
+    Duplicates that straddle a chunk boundary are caught while memory stays
+    bounded by two chunks, whatever the size of the run. next_chunk() drops
+    the keys of the chunk before the previous one.
+    """
+
+    def __init__(self):
+        self.previous, self.current = set(), set()
+
+    def __contains__(self, key) -> bool:
+        return key in self.current or key in self.previous
+
+    def add(self, key):
+        self.current.add(key)
+
+    def update(self, keys):
+        self.current.update(keys)
+
+    def next_chunk(self):
+        self.previous, self.current = self.current, set()
+
+
+def _payload_column(values: List[Any]):
+    """Typed column for one payload key; nullable dtypes keep ints as ints when rows lack the key."""
+    present = [v for v in values if v is not _MISSING and v is not None]
+    kinds = {type(v) for v in present}
+    values = [None if v is _MISSING else v for v in values]
+    if kinds == {int}:
+        return pd.array(values, dtype="Int64")
+    if kinds == {float}:
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    if kinds == {bool}:
+        return pd.array(values, dtype="boolean")
+    if kinds == {str}:
+        return pd.array(values, dtype="string")
+    # trailing None stops numpy nesting lists; a Series keeps pandas from inferring datetime columns
+    return pd.Series(np.array(values + [None], dtype=object)[:-1], dtype=object)
+
+
+def payload_frame(payloads: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+    """Build the structured payload frame from payload dicts (columns in first-seen key order)."""
+    payloads = [p if isinstance(p, dict) else {} for p in payloads]
+    keys: Dict[str, None] = {}
+    for p in payloads:
+        for k in p:
+            keys.setdefault(k, None)
+    return pd.DataFrame(
+        {k: _payload_column([p.get(k, _MISSING) for p in payloads]) for k in keys},
+        index=pd.RangeIndex(len(payloads)),
+    )
+
+
+def _is_absent(v) -> bool:
+    return v is None or v is pd.NA or v is pd.NaT or (isinstance(v, float) and v != v)
+
+
+def _v1_value(v):
+    """Per-cell conversion V1 DataFrame results have always had (numpy → Python, datetimes → ISO)."""
+    if hasattr(v, "item"):
+        return v.item()
+    if hasattr(v, "isoformat"):
+        return v.isoformat()
+    if isinstance(v, _PLAIN):
+        return v
+    return str(v)
+
+
+def _python_values(col: pd.Series) -> List[Any]:
+    """Column → list of Python values with None for absent, converted the way rows are read."""
+    dtype = col.dtype
+    if isinstance(dtype, pd.DatetimeTZDtype) or np.issubdtype(getattr(dtype, "type", object), np.datetime64):
+        return [None if pd.isna(t) else t.isoformat() for t in col]
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and not isinstance(dtype, pd.CategoricalDtype):
+        values = col.to_numpy(dtype=object, na_value=None).tolist()
+        if dtype.kind in "iufb":
+            return [None if v is None else _v1_value(v) for v in values]
+        return values
+    if dtype.kind == "f":
+        values = col.to_numpy()
+        if not np.isnan(values).any():
+            return values.tolist()
+        return [None if v != v else v for v in values.tolist()]
+    if dtype.kind in "iub":
+        return col.to_numpy().tolist()
+    return [None if _is_absent(v) else v for v in col.astype(object).tolist()]
+
+
+_FLOAT_SPECIAL = {float("inf"): "Infinity", float("-inf"): "-Infinity"}
+_SPECIAL_TEXTS = frozenset(_FLOAT_SPECIAL.values())
+
+
+def _str_json(v: str) -> str:
+    # printable ASCII without quotes or backslashes encodes as itself, like json.dumps(ensure_ascii=True)
+    if v.isascii() and v.isprintable() and '"' not in v and "\\" not in v:
+        return f'"{v}"'
+    return json.dumps(v)
+
+
+def _cell_json(v, sort_keys: bool, finite_only: bool = False) -> Optional[str]:
+    if v is None:
+        return None
+    if finite_only and isinstance(v, float) and v in _FLOAT_SPECIAL:
+        return None
+    t = type(v)
+    if t is str:
+        return _str_json(v)
+    if t is float:
+        return _FLOAT_SPECIAL.get(v) or float.__repr__(v)
+    if t is int:
+        return int.__repr__(v)
+    return json.dumps(v, sort_keys=sort_keys, default=str)
+
+
+def _json_texts(col: pd.Series, sort_keys: bool, finite_only: bool = False) -> List[Optional[str]]:
+    """JSON text of every cell, exactly as json.dumps(payload) writes it; None where the key is absent.
+
+    finite_only also treats ±Infinity as absent (what encode_payload does).
+    """
+    values = _python_values(col)
+    kind = getattr(col.dtype, "kind", "O")
+    if kind == "b":
+        return [None if v is None else ("true" if v else "false") for v in values]
+    if kind in "iu" and not isinstance(col.dtype, pd.api.extensions.ExtensionDtype):
+        return list(map(int.__repr__, values))
+    if kind == "f" and not isinstance(col.dtype, pd.api.extensions.ExtensionDtype):
+        floats = col.to_numpy()
+        if np.isfinite(floats).all():
+            return list(map(float.__repr__, values))
+        if not np.isinf(floats).any():
+            return [None if v is None else float.__repr__(v) for v in values]
+    elif (col.dtype == object or isinstance(col.dtype, pd.StringDtype)) and len(values) > 64 \
+            and all(type(v) is str or v is None for v in values):
+        # repeated strings (exchanges, currencies, sectors) are encoded once each
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+        if len(uniques) * 4 < len(values):
+            texts = np.array([_cell_json(v, sort_keys, finite_only) for v in uniques] + [None], dtype=object)
+            return texts[codes].tolist()
+    return [_cell_json(v, sort_keys, finite_only) for v in values]
+
+
+class DataPointView:
+    """One row of a DataPointBatch with the DataPoint attribute API; writes go to the batch columns."""
+
+    __slots__ = ("_batch", "_i")
+
+    def __init__(self, batch: "DataPointBatch", i: int):
+        self._batch = batch
+        self._i = i
+
+    @property
+    def ts(self) -> Optional[datetime]:
+        return micros_to_datetime(self._batch.ts[self._i])
+
+    @ts.setter
+    def ts(self, value):
+        self._batch.ts[self._i] = to_utc_micros([value])[0]
+
+    @property
+    def symbol(self) -> Optional[str]:
+        value = self._batch.symbols[self._i]
+        return None if pd.isna(value) else value
+
+    @symbol.setter
+    def symbol(self, value):
+        self._batch.set_symbol(self._i, value)
+
+    @property
+    def cadence(self) -> str:
+        return self._batch.cadence
+
+    @property
+    def tier(self) -> str:
+        return self._batch.tier
+
+    @property
+    def quality_score(self) -> int:
+        return int(self._batch.quality_score[self._i])
+
+    @quality_score.setter
+    def quality_score(self, value: int):
+        self._batch.quality_score[self._i] = value
+
+    @property
+    def source_hash(self) -> Optional[str]:
+        return self._batch.source_hash[self._i]
+
+    @source_hash.setter
+    def source_hash(self, value: Optional[str]):
+        self._batch._source_hash[self._i] = value
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        """A fresh dict; assign to .payload (not mutate it) to change the stored row."""
+        return self._batch.payload_dicts([self._i])[0]
+
+    @payload.setter
+    def payload(self, value: Dict[str, Any]):
+        self._batch.set_payload(self._i, value)
+
+    def compute_hash(self) -> str:
+        raw = json.dumps(self.payload, sort_keys=True, default=str)
+        self.source_hash = hashlib.sha256(raw.encode()).hexdigest()[:16]
+        return self.source_hash
+
+    def to_record(self) -> Dict:
+        ts = self.ts
+        return {
+            "ts": ts.isoformat() if ts is not None else "NaT",
+            "symbol": self.symbol,
+            "cadence": self.cadence,
+            "tier": self.tier,
+            "quality_score": self.quality_score,
+            "payload": self.payload,
+            "source_hash": self.source_hash,
+        }
+
+    to_dict = to_record
+
+    def __repr__(self):
+        return f"DataPointView(ts={self.ts!r}, symbol={self.symbol!r}, tier={self.tier!r})"
+
+
+def _assemble(columns: List[Any], texts: List[List[Optional[str]]]) -> List[str]:
+    """Row JSON objects from per-column cell texts (None = key absent), keys in the given order."""
+    keys = [json.dumps(str(c)) + ": " for c in columns]
+    if not any(None in t for t in texts):
+        template = "{" + ", ".join(k.replace("%", "%%") + "%s" for k in keys) + "}"
+        return [template % row for row in zip(*texts)]
+    return [
+        "{" + ", ".join(k + t for k, t in zip(keys, row) if t is not None) + "}"
+        for row in zip(*texts)
+    ]
+
+
+class DataPointBatch:
+    """Columnar data points. See the module docstring for the column layout."""
+
+    def __init__(self, ts: np.ndarray, symbols, payload: pd.DataFrame, cadence: str = "daily",
+                 tier: str = "bronze", quality_score: np.ndarray = None, source_hash: np.ndarray = None,
+                 row_ids: np.ndarray = None):
+        n = len(ts)
+        self.ts = np.asarray(ts, dtype=np.int64)
+        self.symbols = symbols if isinstance(symbols, pd.Categorical) else pd.Categorical(symbols)
+        self.payload = payload if isinstance(payload.index, pd.RangeIndex) and payload.index.start == 0 \
+            else payload.reset_index(drop=True)
+        self.cadence = cadence
+        self.tier = tier
+        self.quality_score = (np.zeros(n, dtype=np.int16) if quality_score is None
+                              else np.asarray(quality_score, dtype=np.int16))
+        self._source_hash = (np.full(n, None, dtype=object) if source_hash is None
+                             else np.asarray(source_hash, dtype=object))
+        # positions in the batch this one was taken from (lets callers reuse per-row work)
+        self.row_ids = np.arange(n) if row_ids is None else np.asarray(row_ids)
+
+    # ── construction ────────────────────────────────────────────────
+
+    @classmethod
+    def from_points(cls, points: List, cadence: str = None) -> "DataPointBatch":
+        """Columnar copy of DataPoint-like objects (tier and cadence taken from the first point)."""
+        first = points[0] if points else None
+        return cls(
+            ts=to_utc_micros([p.ts for p in points]),
+            symbols=[None if p.symbol is None else str(p.symbol) for p in points],
+            payload=payload_frame(p.payload for p in points),
+            cadence=cadence or (first.cadence if first else "daily"),
+            tier=first.tier if first else "bronze",
+            quality_score=[p.quality_score for p in points],
+            source_hash=[p.source_hash for p in points],
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, ts_col: str = None, symbol_col: str = None,
+                   cadence: str = "daily", default_ts: datetime = None) -> "DataPointBatch":
+        """Batch from a DataFrame: every column other than ts/symbol becomes a payload column.
+
+        Rows without a usable timestamp get default_ts (now, unless given), as V1 results always have.
+        """
+        default_ts = default_ts or datetime.now(timezone.utc)
+        n = len(df)
+        if ts_col is not None and ts_col in df.columns:
+            col = df[ts_col]
+            ts = to_utc_micros(col if col.dtype.kind == "M" or isinstance(col.dtype, pd.DatetimeTZDtype)
+                               else col.to_numpy(dtype=object), default=default_ts)
+        else:
+            ts = np.full(n, to_utc_micros([default_ts])[0], dtype=np.int64)
+
+        symbols = pd.Categorical([None] * n)
+        if symbol_col is not None and symbol_col in df.columns:
+            col = df[symbol_col]
+            if col.dtype == object:
+                col = col.map(lambda v: None if isinstance(v, (list, dict)) else v)
+            symbols = pd.Categorical(col.astype("string").to_numpy(dtype=object, na_value=None))
+
+        payload = df.drop(columns=[c for c in (ts_col, symbol_col) if c is not None and c in df.columns])
+        payload = payload.rename(columns=str).reset_index(drop=True)
+        for name in payload.columns:
+            col = payload[name]
+            if col.dtype == object:
+                payload[name] = col.map(lambda v: v if isinstance(v, _PLAIN) else _v1_value(v))
+        return cls(ts=ts, symbols=symbols, payload=payload, cadence=cadence)
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]], symbol_keys=("symbol", "ticker"),
+                     ts_keys=("date", "timestamp", "ts", "period"), cadence: str = "daily",
+                     default_ts: datetime = None) -> "DataPointBatch":
+        """Batch from row dicts, as V1 list results are converted.
+
+        The first of symbol_keys a row has names it; the last of ts_keys that parses times it
+        (default_ts, i.e. now, otherwise). All of those keys are left out of the payload.
+        """
+        default_ts = default_ts or datetime.now(timezone.utc)
+        payload = payload_frame(records)
+        n = len(payload)
+
+        symbols = [None] * n
+        for key in reversed(symbol_keys):
+            if key in payload.columns:
+                values = _python_values(payload.pop(key))
+                symbols = [s if v is None else str(v) for s, v in zip(symbols, values)]
+
+        ts = np.full(n, to_utc_micros([default_ts])[0], dtype=np.int64)
+        for key in ts_keys:
+            if key in payload.columns:
+                parsed = to_utc_micros(_python_values(payload.pop(key)))
+                ts = np.where(parsed != NAT_US, parsed, ts)
+
+        return cls(ts=ts, symbols=symbols, payload=payload, cadence=cadence)
+
+    # ── sequence / per-row view ─────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("DataPointBatch index out of range")
+            return DataPointView(self, int(index))
+        return self.take(np.arange(len(self))[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield DataPointView(self, i)
+
+    def take(self, indices) -> "DataPointBatch":
+        """New batch with the given rows (positions or a boolean mask), in that order."""
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        return DataPointBatch(
+            ts=self.ts[indices],
+            symbols=self.symbols[indices],
+            payload=self.payload.take(indices).reset_index(drop=True),
+            cadence=self.cadence,
+            tier=self.tier,
+            quality_score=self.quality_score[indices],
+            source_hash=self._source_hash[indices],
+            row_ids=self.row_ids[indices],
+        )
+
+    def to_points(self) -> List:
+        """Materialise DataPoint objects (for per-row code paths)."""
+        from .base_module import DataPoint
+        stamps = self.ts_datetimes()
+        symbols = self.symbol_list()
+        payloads = self.payload_dicts()
+        return [
+            DataPoint(ts=stamps[i], symbol=symbols[i], cadence=self.cadence, tier=self.tier,
+                      quality_score=int(self.quality_score[i]), payload=payloads[i],
+                      source_hash=self.source_hash[i])
+            for i in range(len(self))
+        ]
+
+    # ── column access ───────────────────────────────────────────────
+
+    def ts_datetimes(self) -> List[Optional[datetime]]:
+        valid = self.ts != NAT_US
+        stamps = pd.to_datetime(np.where(valid, self.ts, 0), unit="us", utc=True).to_pydatetime()
+        return [s if ok else None for s, ok in zip(stamps, valid)]
+
+    def symbol_list(self) -> List[Optional[str]]:
+        categories = list(self.symbols.categories)
+        return [None if c < 0 else categories[c] for c in self.symbols.codes.tolist()]
+
+    def payload_present(self) -> np.ndarray:
+        """Rows with at least one payload value."""
+        if self.payload.shape[1] == 0:
+            return np.zeros(len(self), dtype=bool)
+        return self.payload.notna().any(axis=1).to_numpy()
+
+    def payload_dicts(self, rows: List[int] = None) -> List[Dict[str, Any]]:
+        """Payload dict per row (all rows, or the given positions), absent keys omitted."""
+        frame = self.payload if rows is None else self.payload.iloc[list(rows)]
+        if frame.shape[1] == 0:
+            return [{} for _ in range(len(frame))]
+        keys = [str(k) for k in frame.columns]
+        columns = [_python_values(frame[k]) for k in frame.columns]
+        return [
+            {k: v for k, v in zip(keys, values) if v is not None}
+            for values in zip(*columns)
+        ]
+
+    def set_symbol(self, i: int, value: Optional[str]):
+        if value is not None:
+            value = str(value)
+            if value not in self.symbols.categories:
+                self.symbols = self.symbols.add_categories([value])
+        self.symbols[i] = value
+
+    def set_payload(self, i: int, payload: Dict[str, Any]):
+        payload = payload or {}
+        self._source_hash[i] = None
+        for key in set(self.payload.columns) | set(payload):
+            value = payload.get(key)
+            if key not in self.payload.columns:
+                self.payload[key] = np.full(len(self), None, dtype=object)
+            try:
+                self.payload.loc[i, key] = value
+            except (TypeError, ValueError):
+                self.payload[key] = self.payload[key].astype(object)
+                self.payload.loc[i, key] = value
+
+    # ── pipeline operations ─────────────────────────────────────────
+
+    def payload_texts(self, sort_keys: bool = False, finite_only: bool = False) -> List[str]:
+        """json.dumps(payload, sort_keys=sort_keys, default=str) for every row, built column by column."""
+        columns = list(self.payload.columns)
+        if sort_keys:
+            columns.sort(key=str)
+        if not columns:
+            return ["{}"] * len(self)
+        return _assemble(columns, [_json_texts(self.payload[c], sort_keys, finite_only) for c in columns])
+
+    @property
+    def source_hash(self) -> np.ndarray:
+        """Digest per row; rows not hashed yet are hashed now."""
+        missing = np.flatnonzero(pd.isna(self._source_hash))
+        if len(missing):
+            self._source_hash[missing] = self._digests(missing)
+        return self._source_hash
+
+    @source_hash.setter
+    def source_hash(self, values):
+        self._source_hash = np.asarray(values, dtype=object)
+
+    def _digests(self, rows: np.ndarray) -> List[str]:
+        """First 16 hex chars of sha256 over the sorted-key payload JSON (DataPoint.compute_hash)."""
+        subset = self if len(rows) == len(self) else self.take(rows)
+        sha256 = hashlib.sha256
+        return [sha256(t.encode()).hexdigest()[:16] for t in subset.payload_texts(sort_keys=True)]
+
+    def compute_hashes(self) -> np.ndarray:
+        """(Re)compute every row's source_hash; same digests as DataPoint.compute_hash."""
+        self._source_hash = np.array(self._digests(np.arange(len(self))) + [None], dtype=object)[:-1]
+        return self._source_hash
+
+    def payload_keys(self) -> pd.DataFrame:
+        """Columns whose row-wise equality is equality of the digested payload JSON.
+
+        Strings and typed columns compare as-is; other object cells compare by
+        their sorted-key JSON, and -0.0 is kept apart from 0.0 as its JSON is.
+        """
+        keys = {}
+        for i, name in enumerate(sorted(self.payload.columns, key=str)):
+            col = self.payload[name].reset_index(drop=True)
+            if col.dtype == object and not all(type(v) is str or v is None for v in col.tolist()):
+                col = pd.Series(_json_texts(col, sort_keys=True), dtype=object)
+            keys[f"p{i}"] = col
+            if col.dtype.kind == "f" and not isinstance(col.dtype, pd.api.extensions.ExtensionDtype):
+                negative_zero = (col.to_numpy() == 0) & np.signbit(col.to_numpy())
+                if negative_zero.any():
+                    keys[f"z{i}"] = negative_zero
+        return pd.DataFrame(keys, index=pd.RangeIndex(len(self)))
+
+    def clean(self, seen: set = None) -> "DataPointBatch":
+        """Silver: drop rows without payload or timestamp, dedup on (symbol, ts, payload digest).
+
+        When digests are missing the payload columns are compared directly
+        instead; equal columns mean equal digests, so the rows kept are exactly
+        those the per-point clean keeps. Digests are then computed on first use.
+        seen (a set or RecentKeys of dedup_key() tuples) carries keys across
+        batches: rows already in it are dropped too, and the keys kept are added.
+        """
+        keep = self.take(self.payload_present() & (self.ts != NAT_US))
+        keys = pd.DataFrame({"symbol": keep.symbols.codes, "ts": keep.ts})
+        if pd.isna(keep._source_hash).any():
+            keys = pd.concat([keys, keep.payload_keys()], axis=1)
+        else:
+            keys["hash"] = keep._source_hash
+        clean = keep.take(~keys.duplicated().to_numpy())
+        if seen is not None:
+            row_keys = list(map(dedup_key, clean.symbol_list(), clean.ts.tolist(), clean.source_hash.tolist()))
+            fresh = np.array([k not in seen for k in row_keys], dtype=bool)
+            seen.update(row_keys)
+            if not fresh.all():
+                clean = clean.take(fresh)
+        clean.tier = "silver"
+        np.maximum(clean.quality_score, 50, out=clean.quality_score)
+        return clean
+
+    def latest_ts(self) -> Optional[datetime]:
+        valid = self.ts[self.ts != NAT_US]
+        return micros_to_datetime(valid.max()) if len(valid) else None
+
+    def latest_payloads(self) -> Dict[str, Dict[str, Any]]:
+        """Payload of the last row per symbol (what cache_latest_many would keep)."""
+        codes = self.symbols.codes
+        has_symbol = np.flatnonzero(codes >= 0)
+        if not len(has_symbol):
+            return {}
+        last = pd.Series(has_symbol).groupby(codes[has_symbol]).last()
+        categories = self.symbols.categories
+        payloads = self.payload_dicts(last.to_numpy().tolist())
+        return {str(categories[code]): payload for code, payload in zip(last.index, payloads)}
+
+    def payload_json(self) -> List[str]:
+        """Stored JSONB text per row, identical to db.encode_payload(view.payload)."""
+        try:
+            texts = self.payload_texts(finite_only=True)
+        except (TypeError, ValueError):
+            return [db.encode_payload(p) for p in self.payload_dicts()]
+        return [
+            t.replace(": NaN", ": null").replace(":NaN", ":null")
+             .replace(": Infinity", ": null").replace(": -Infinity", ": null")
+            for t in texts
+        ]
+
+    def encode_payloads(self) -> List[str]:
+        """compute_hashes() and payload_json() in one pass over the payload cells.
+
+        A scalar cell has the same JSON text in the sorted-key digest text and in
+        the stored JSON, so those columns are encoded once and assembled twice;
+        only object columns (which may hold nested dicts) are encoded per use.
+        """
+        columns = list(self.payload.columns)
+        if not columns:
+            self.compute_hashes()
+            return ["{}"] * len(self)
+        texts = {c: _json_texts(self.payload[c], sort_keys=True) for c in columns}
+        ordered = sorted(columns, key=str)
+        sha256 = hashlib.sha256
+        digests = [sha256(t.encode()).hexdigest()[:16] for t in _assemble(ordered, [texts[c] for c in ordered])]
+        self._source_hash = np.array(digests + [None], dtype=object)[:-1]
+
+        nested = [c for c in columns if self.payload[c].dtype == object]
+        try:
+            stored = {c: _json_texts(self.payload[c], sort_keys=False, finite_only=True) for c in nested}
+        except (TypeError, ValueError):
+            return [db.encode_payload(p) for p in self.payload_dicts()]
+        for c in columns:
+            if c not in stored:  # ±Infinity is dropped from the stored JSON, as payload_json() does
+                stored[c] = texts[c] if _SPECIAL_TEXTS.isdisjoint(texts[c]) \
+                    else [None if t in _SPECIAL_TEXTS else t for t in texts[c]]
+        payload_json = _assemble(columns, [stored[c] for c in columns])
+        if not nested:
+            return payload_json
+        return [
+            t.replace(": NaN", ": null").replace(":NaN", ":null")
+             .replace(": Infinity", ": null").replace(": -Infinity", ": null")
+            for t in payload_json
+        ]
+
+    def to_row_columns(self, module_id: int, payload_json: List[str] = None) -> tuple:
+        """Columns of db.build_data_point_row tuples for rows with a timestamp.
+
+        Batch-wide values are one shared object per column, so the result pickles compactly.
+        """
+        payload_json = self.payload_json() if payload_json is None else payload_json
+        valid = np.flatnonzero(self.ts != NAT_US)
+        if not len(valid):
+            return ()
+        stamps = self.ts_datetimes()
+        symbols = self.symbol_list()
+        scores = self.quality_score.tolist()
+        hashes = self.source_hash.tolist()
+        return (
+            [stamps[i] for i in valid],
+            [module_id] * len(valid),
+            [symbols[i] for i in valid],
+            [self.cadence] * len(valid),
+            [self.tier] * len(valid),
+            [scores[i] for i in valid],
+            [payload_json[i] for i in valid],
+            [hashes[i] for i in valid],
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns."""
+        return int(
+            self.ts.nbytes + self.symbols.codes.nbytes
+            + sum(len(str(c)) + 49 for c in self.symbols.categories)
+            + self.payload.memory_usage(deep=True, index=False).sum()
+            + self.quality_score.nbytes + self._source_hash.nbytes
+            + sum(len(h) + 49 for h in self._source_hash if h is not None)
+        )
+
+    def __repr__(self):
+        return (f"DataPointBatch({len(self)} rows, {self.payload.shape[1]} payload columns, "
+                f"{len(self.symbols.categories)} symbols, tier={self.tier!r})")
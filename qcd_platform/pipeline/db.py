@@ -9,7 +9,7 @@ from typing import Any, Dict, List, Optional
 import psycopg2
 from psycopg2 import pool, extras
 
-from ..config import DB_CONFIG
+from ..config import DB_CONFIG, PIPELINE_CONFIG
 
 logger = logging.getLogger("quantclaw.db")
 
@@ -52,56 +52,89 @@ def execute_many(sql: str, data: List[tuple]):
             extras.execute_batch(cur, sql, data, page_size=500)
 
 
-def insert_data_points(module_id: int, points: List[Dict]):
-    """Bulk insert data points using execute_values for speed."""
-    if not points:
+def encode_payload(payload: Dict) -> str:
+    """JSON-encode a payload for the JSONB column, dropping None/NaN/Inf values."""
+    import math
+    try:
+        cleaned_payload = {}
+        for k, v in (payload or {}).items():
+            if v is None:
+                continue
+            try:
+                if isinstance(v, float) and (math.isnan(v) or math.isinf(v)):
+                    continue
+            except (TypeError, ValueError):
+                pass
+            cleaned_payload[k] = v
+        raw_json = json.dumps(cleaned_payload, default=str)
+        raw_json = raw_json.replace(": NaN", ": null").replace(":NaN", ":null")
+        raw_json = raw_json.replace(": Infinity", ": null").replace(": -Infinity", ": null")
+        return raw_json
+    except (TypeError, ValueError):
+        return "{}"
+
+
+def build_data_point_row(module_id: int, point: Dict, payload_json: str = None) -> Optional[tuple]:
+    """Build the INSERT tuple for one data point dict. Returns None for unusable timestamps."""
+    ts = point["ts"]
+    if isinstance(ts, str) and ts in ("NaT", "None", ""):
+        return None
+    if payload_json is None:
+        payload_json = encode_payload(point.get("payload", {}))
+    return (
+        ts,
+        module_id,
+        point.get("symbol"),
+        point.get("cadence", "daily"),
+        point.get("tier", "bronze"),
+        point.get("quality_score", 0),
+        payload_json,
+        point.get("source_hash"),
+    )
+
+
+def insert_data_point_rows(rows: List[tuple]) -> int:
+    """Insert prepared data point rows (see build_data_point_row) in one transaction.
+    Large batches are streamed through COPY (see bulk_loader)."""
+    if not rows:
         return 0
 
+    if len(rows) >= PIPELINE_CONFIG["copy_min_rows"]:
+        from .bulk_loader import copy_data_point_rows
+        return copy_data_point_rows(rows)
+
     sql = """
         INSERT INTO data_points (ts, module_id, symbol, cadence, tier, quality_score, payload, source_hash)
         VALUES %s
         ON CONFLICT DO NOTHING
     """
-    values = []
-    for p in points:
-        ts = p["ts"]
-        if isinstance(ts, str) and ts in ("NaT", "None", ""):
-            continue
-        try:
-            import math
-            payload = p.get("payload", {})
-            cleaned_payload = {}
-            for k, v in payload.items():
-                if v is None:
-                    continue
-                try:
-                    if isinstance(v, float) and (math.isnan(v) or math.isinf(v)):
-                        continue
-                except (TypeError, ValueError):
-                    pass
-                cleaned_payload[k] = v
-            raw_json = json.dumps(cleaned_payload, default=str)
-            raw_json = raw_json.replace(": NaN", ": null").replace(":NaN", ":null")
-            raw_json = raw_json.replace(": Infinity", ": null").replace(": -Infinity", ": null")
-            payload_json = raw_json
-        except (TypeError, ValueError):
-            payload_json = "{}"
-
-        values.append((
-            ts,
-            module_id,
-            p.get("symbol"),
-            p.get("cadence", "daily"),
-            p.get("tier", "bronze"),
-            p.get("quality_score", 0),
-            payload_json,
-            p.get("source_hash"),
-        ))
-
     with get_connection() as conn:
         with conn.cursor() as cur:
-            extras.execute_values(cur, sql, values, page_size=500)
-            return len(values)
+            extras.execute_values(cur, sql, rows, page_size=500)
+            return len(rows)
+
+
+def insert_data_point_batch(module_id: int, batch, payload_json: List[str] = None) -> int:
+    """Insert a DataPointBatch; large batches go straight from its columns into COPY."""
+    if batch is None or len(batch) == 0:
+        return 0
+    if len(batch) >= PIPELINE_CONFIG["copy_min_rows"]:
+        from .bulk_loader import copy_batch
+        return copy_batch(module_id, batch, payload_json)
+    return insert_data_point_rows(list(zip(*batch.to_row_columns(module_id, payload_json))))
+
+
+def insert_data_points(module_id: int, points: List[Dict]):
+    """Bulk insert data points using execute_values for speed."""
+    if not points:
+        return 0
+
+    values = []
+    for p in points:
+        row = build_data_point_row(module_id, p)
+        if row is not None:
+            values.append(row)
+    return insert_data_point_rows(values)
 
 
 def get_module_id(module_name: str) -> Optional[int]:
@@ -113,19 +146,21 @@ def get_module_id(module_name: str) -> Optional[int]:
 
 def register_module(name: str, display_name: str = None, source_file: str = None,
                     cadence: str = "daily", granularity: str = "symbol",
-                    tags: List[str] = None) -> int:
-    """Register or update a module in the registry. Returns module_id."""
+                    tags: List[str] = None, execution_class: str = None) -> int:
+    """Register or update a module in the registry. Returns module_id.
+    execution_class (io | cpu) is only overwritten when given."""
     rows = execute_query(
-        """INSERT INTO modules (name, display_name, source_file, cadence, granularity)
-           VALUES (%s, %s, %s, %s, %s)
+        """INSERT INTO modules (name, display_name, source_file, cadence, granularity, execution_class)
+           VALUES (%s, %s, %s, %s, %s, COALESCE(%s, 'io'))
            ON CONFLICT (name) DO UPDATE SET
                display_name = COALESCE(EXCLUDED.display_name, modules.display_name),
                source_file = COALESCE(EXCLUDED.source_file, modules.source_file),
                cadence = EXCLUDED.cadence,
                granularity = EXCLUDED.granularity,
+               execution_class = COALESCE(%s, modules.execution_class),
                updated_at = NOW()
            RETURNING id""",
-        (name, display_name or name, source_file, cadence, granularity),
+        (name, display_name or name, source_file, cadence, granularity, execution_class, execution_class),
         fetch=True,
     )
     module_id = rows[0]["id"]
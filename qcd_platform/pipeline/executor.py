@@ -0,0 +1,102 @@
+"""
+HybridExecutor — runs the compute stages of CPU-bound modules in a process pool.
+
+run_batch keeps every module on the scheduler's threads, which suits HTTP
+fetchers but serialises pandas-heavy clean()/validate() and numeric V1
+modules on the GIL. Modules registered with execution_class = 'cpu' instead
+hand BaseModule.compute() (fetch → clean → validate) to a worker process:
+
+  - Workers are warm: each process imports the pipeline, pandas/numpy and
+    the configured modules once, then keeps its loaded module instances.
+  - Results come back as a ModuleOutput, i.e. data point rows column-wise
+    plus the quality report, not as lists of DataPoint objects.
+  - Persistence, events and run bookkeeping stay in the parent, so a shared
+    RunContext and the Kafka/Redis clients are never touched from a worker.
+
+Processes are started with 'spawn' — the parent already runs the Kafka
+sender and scheduler threads, which fork would copy in an unknown state.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from .base_module import BaseModule, ModuleOutput
+
+logger = logging.getLogger("quantclaw.executor")
+
+_worker_orchestrator = None  # per-process PipelineOrchestrator, used only for load_module_class
+
+
+def _init_worker(modules_dir: str, preload: List[str]):
+    global _worker_orchestrator
+    import numpy  # noqa: F401  warm the heavy imports once per worker
+    import pandas  # noqa: F401
+    from .orchestrator import PipelineOrchestrator
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s: %(message)s")
+    _worker_orchestrator = PipelineOrchestrator(modules_dir=modules_dir)
+    for name in preload:
+        try:
+            _worker_orchestrator.load_module_class(name)
+        except Exception as e:
+            logger.warning(f"[{name}] Preload in worker failed: {e}")
+
+
+def _compute_in_worker(module_name: str, module_id: int, symbols: Optional[List[str]]) -> ModuleOutput:
+    module = _worker_orchestrator.load_module_class(module_name)
+    if module is None:
+        raise RuntimeError(f"Module not found in worker: {module_name}")
+    module.module_id = module_id  # registered by the parent; avoids a registry write per run
+    return module.compute(symbols)
+
+
+def runs_in_process_pool(module: BaseModule) -> bool:
+    """Modules that override run() keep their own pipeline and can't be split into compute + persist."""
+    return type(module).run is BaseModule.run
+
+
+class HybridExecutor:
+    """Lazily started process pool for 'cpu' modules; 'io' modules never reach it."""
+
+    def __init__(self, modules_dir: str, process_workers: int = 2, preload: List[str] = None):
+        self.modules_dir = modules_dir
+        self.process_workers = process_workers
+        self.preload = list(preload or [])
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.metrics: Dict[str, int] = {"submitted": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.modules_dir, self.preload),
+                )
+                logger.info(f"Process pool started: {self.process_workers} workers, "
+                            f"{len(self.preload)} modules preloaded")
+            return self._pool
+
+    def compute(self, module: BaseModule, symbols: List[str] = None) -> ModuleOutput:
+        """BaseModule.run compute_fn: run module.compute() in a worker and wait for its output."""
+        self._count("submitted")
+        future = self._get_pool().submit(_compute_in_worker, module.name, module.module_id, symbols)
+        try:
+            return future.result()
+        except Exception:
+            self._count("failed")
+            raise
+
+    def _count(self, name: str):
+        with self._lock:
+            self.metrics[name] += 1
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
@@ -1,60 +1,221 @@
 """
 Kafka producer for pipeline events.
 Gracefully degrades if Kafka is unavailable.
+
+publish_event() never waits on the broker: events go onto a bounded
+in-process queue, a sender thread hands them to the (batching) Kafka
+producer, and delivery callbacks keep success/failure counters. Call
+flush() as a barrier when every event published so far must be delivered,
+e.g. at the end of a batch.
 """
+import atexit
 import json
 import logging
+import queue
+import threading
+import time
 from typing import Any, Dict, Optional
 
 logger = logging.getLogger("quantclaw.kafka")
 
-_producer = None
-
-
-def _get_producer():
-    global _producer
-    if _producer is not None:
-        return _producer
-    try:
-        from kafka import KafkaProducer
-        from ..config import KAFKA_CONFIG
-        _producer = KafkaProducer(
-            bootstrap_servers=KAFKA_CONFIG["bootstrap_servers"],
-            client_id=KAFKA_CONFIG["client_id"],
-            value_serializer=lambda v: json.dumps(v, default=str).encode("utf-8"),
-            key_serializer=lambda k: k.encode("utf-8") if k else None,
-            acks="all",
-            retries=3,
-            max_block_ms=5000,
-        )
-        logger.info("Kafka producer connected")
-    except Exception as e:
-        logger.warning(f"Kafka unavailable, events will be logged only: {e}")
-        _producer = False  # sentinel to avoid retrying
-    return _producer
+_STOP = object()
+COUNTERS = ("queued", "sent", "delivered", "failed", "dropped")
+
+
+class EventPublisher:
+    """Non-blocking publisher over any producer with a kafka-python style send()/flush().
+
+    send() must return a future supporting add_callback()/add_errback().
+    """
+
+    def __init__(self, producer, max_queue: int = 10000, enqueue_timeout: float = 0.0):
+        self.producer = producer
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._idle = threading.Condition(self._lock)
+        self.metrics = dict.fromkeys(COUNTERS, 0)
+        self.failures_by_topic: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+        self._sender = threading.Thread(target=self._drain, name="kafka-event-sender", daemon=True)
+        self._sender.start()
+
+    def publish(self, topic: str, data: Dict[str, Any], key: str = None) -> bool:
+        """Queue an event. Returns False (and counts a drop) if the queue stays full."""
+        with self._lock:
+            self._in_flight += 1
+        try:
+            if self.enqueue_timeout > 0:
+                self._queue.put((topic, data, key), timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait((topic, data, key))
+        except queue.Full:
+            self._count("dropped")
+            self._settle()
+            logger.warning(f"Kafka event queue full, dropped event for {topic}")
+            return False
+        self._count("queued")
+        return True
+
+    def _drain(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            topic, data, key = item
+            try:
+                future = self.producer.send(topic, value=data, key=key)
+                self._count("sent")
+                future.add_callback(self._on_delivered, topic)
+                future.add_errback(self._on_failed, topic)
+            except Exception as e:
+                self._on_failed(topic, e)
+
+    def _on_delivered(self, topic: str, _metadata=None):
+        self._count("delivered")
+        self._settle()
+
+    def _on_failed(self, topic: str, exc: Exception = None):
+        self._count("failed")
+        with self._lock:
+            self.failures_by_topic[topic] = self.failures_by_topic.get(topic, 0) + 1
+            self.last_error = str(exc)
+        logger.warning(f"Failed to publish to {topic}: {exc}")
+        self._settle()
+
+    def _count(self, name: str):
+        with self._lock:
+            self.metrics[name] += 1
+
+    def _settle(self):
+        with self._idle:
+            self._in_flight -= 1
+            if self._in_flight <= 0:
+                self._idle.notify_all()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until every published event is delivered or failed. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = self._in_flight
+            if pending <= 0:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Kafka flush timed out with {pending} events in flight")
+                return False
+            # futures only complete once the producer sends its batches, so push it along
+            try:
+                self.producer.flush(timeout=min(remaining, 1.0))
+            except Exception as e:
+                logger.debug(f"Kafka producer flush: {e}")
+            with self._idle:
+                if self._in_flight > 0:
+                    self._idle.wait(timeout=min(remaining, 0.05))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.metrics,
+                "in_flight": self._in_flight,
+                "queue_depth": self._queue.qsize(),
+                "failures_by_topic": dict(self.failures_by_topic),
+                "last_error": self.last_error,
+            }
+
+    def close(self, timeout: float = 10.0):
+        self.flush(timeout=timeout)
+        self._queue.put(_STOP)
+        self._sender.join(timeout=timeout)
+        self.producer.close()
+
+
+_publisher: Any = None  # EventPublisher, False when Kafka is unavailable, None before first use
+_publisher_lock = threading.Lock()
+
+
+def _create_producer():
+    from kafka import KafkaProducer
+    from ..config import KAFKA_CONFIG
+    return KafkaProducer(
+        bootstrap_servers=KAFKA_CONFIG["bootstrap_servers"],
+        client_id=KAFKA_CONFIG["client_id"],
+        value_serializer=lambda v: json.dumps(v, default=str).encode("utf-8"),
+        key_serializer=lambda k: k.encode("utf-8") if k else None,
+        acks=KAFKA_CONFIG.get("acks", "all"),
+        retries=3,
+        max_block_ms=5000,
+        linger_ms=KAFKA_CONFIG.get("linger_ms", 50),
+        batch_size=KAFKA_CONFIG.get("batch_size", 64 * 1024),
+    )
+
+
+def _get_publisher():
+    global _publisher
+    if _publisher is not None:
+        return _publisher
+    with _publisher_lock:
+        if _publisher is not None:
+            return _publisher
+        try:
+            from ..config import KAFKA_CONFIG
+            _publisher = EventPublisher(
+                _create_producer(),
+                max_queue=KAFKA_CONFIG.get("max_queue", 10000),
+            )
+            logger.info("Kafka producer connected")
+        except Exception as e:
+            logger.warning(f"Kafka unavailable, events will be logged only: {e}")
+            _publisher = False  # sentinel to avoid retrying
+    return _publisher
+
+
+def set_producer(producer):
+    """Install a producer (e.g. an in-memory fake in tests). None resets to lazy connect."""
+    global _publisher
+    with _publisher_lock:
+        if _publisher:
+            _publisher.close(timeout=1.0)
+        _publisher = EventPublisher(producer) if producer is not None else None
 
 
 def publish_event(topic: str, data: Dict[str, Any], key: str = None):
-    """Publish an event to a Kafka topic. Falls back to logging if Kafka is down."""
-    producer = _get_producer()
-    if not producer:
+    """Queue an event for a Kafka topic without waiting on the broker. Falls back to logging if Kafka is down."""
+    publisher = _get_publisher()
+    if not publisher:
         logger.debug(f"[kafka-fallback] {topic}: {json.dumps(data, default=str)[:200]}")
         return
+    publisher.publish(topic, data, key=key)
+
+
+def flush(timeout: float = 10.0) -> bool:
+    """Delivery barrier: wait for all queued events. True if everything was delivered or failed."""
+    if _publisher:
+        return _publisher.flush(timeout=timeout)
+    return True
 
-    try:
-        future = producer.send(topic, value=data, key=key)
-        future.get(timeout=5)
-    except Exception as e:
-        logger.warning(f"Failed to publish to {topic}: {e}")
 
+def get_stats() -> Dict[str, Any]:
+    """Publisher counters (queued/sent/delivered/failed/dropped, queue depth, failures by topic)."""
+    if _publisher:
+        return _publisher.stats()
+    return {}
 
-def flush():
-    if _producer and _producer is not False:
-        _producer.flush(timeout=10)
+
+def stats_since(before: Dict[str, Any]) -> Dict[str, int]:
+    """Counter increments since an earlier get_stats() snapshot (the counters themselves are process-wide)."""
+    after = get_stats()
+    return {name: after.get(name, 0) - before.get(name, 0) for name in COUNTERS}
 
 
 def close():
-    global _producer
-    if _producer and _producer is not False:
-        _producer.close()
-        _producer = None
+    global _publisher
+    if _publisher:
+        _publisher.close()
+    _publisher = None
+
+
+# short-lived scripts publish and exit; don't lose what is still queued
+atexit.register(flush)
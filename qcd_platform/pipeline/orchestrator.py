@@ -9,13 +9,18 @@ import os
 import sys
 import time
 import traceback
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional
 
 from . import db
+from ..config import PIPELINE_CONFIG
+from . import kafka_producer
 from .kafka_producer import publish_event
 from .redis_cache import set_module_health, publish_update
+from .executor import HybridExecutor, runs_in_process_pool
+from .rate_limiter import get_rate_limiter
+from .run_context import RunContext
+from .scheduler import BatchScheduler, ScheduledTask, upstream_host
 
 logger = logging.getLogger("quantclaw.orchestrator")
 
@@ -34,12 +39,20 @@ CADENCE_INTERVALS = {
 
 
 class PipelineOrchestrator:
-    def __init__(self, modules_dir: str = None, max_workers: int = 4):
+    def __init__(self, modules_dir: str = None, max_workers: int = 4,
+                 host_limit: int = None, host_limits: Dict[str, int] = None,
+                 process_workers: int = None):
         self.modules_dir = modules_dir or os.path.join(
             os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "modules_v2"
         )
         self.max_workers = max_workers
+        self.host_limit = host_limit or PIPELINE_CONFIG["host_concurrency"]
+        self.host_limits = host_limits or {}
+        self.process_workers = PIPELINE_CONFIG["process_workers"] if process_workers is None else process_workers
+        self._executor: Optional[HybridExecutor] = None
+        self.last_batch_metrics: Dict = {}
         self._module_cache: Dict[str, object] = {}
+        self._manifest_hosts: Optional[Dict[str, str]] = None
 
     def discover_modules(self) -> List[Dict]:
         """Find all registered modules due for execution."""
@@ -119,14 +132,32 @@ class PipelineOrchestrator:
         logger.warning(f"Module not found in v2 or v1: {module_name}")
         return None
 
-    def run_module(self, module_name: str, symbols: List[str] = None) -> Dict:
-        """Run a single module through the full pipeline."""
+    def run_module(self, module_name: str, symbols: List[str] = None,
+                   run_context: RunContext = None, execution_class: str = None,
+                   host: str = None) -> Dict:
+        """Run a single module through the full pipeline.
+
+        Bookkeeping writes go to run_context; without one they are flushed
+        in a single transaction once the module finishes. 'cpu' modules run
+        their compute stages in the process pool while a batch has one open.
+        The run is tracked by the rate limiter: throttle() calls default to the
+        module's upstream host, and the time spent waiting for budget is
+        returned as rate_limit_wait_ms.
+        """
         module = self.load_module_class(module_name)
         if module is None:
             return {"module": module_name, "status": "not_found"}
 
+        ctx = run_context or RunContext()
         set_module_health(module_name, "running")
-        result = module.run(symbols=symbols)
+        execution_class = execution_class or module.execution_class or "io"
+        compute_fn = None
+        if execution_class == "cpu" and self._executor is not None and runs_in_process_pool(module):
+            compute_fn = self._executor.compute
+        limiter = get_rate_limiter()
+        with limiter.track(module_name, host or self._upstream_host(module_name)):
+            result = module.run(symbols=symbols, run_context=ctx, compute_fn=compute_fn)
+            result["rate_limit_wait_ms"] = int(limiter.current_wait() * 1000)
 
         health_status = "healthy" if result["status"] == "success" else "error"
         set_module_health(module_name, health_status, {
@@ -139,10 +170,9 @@ class PipelineOrchestrator:
         # Schedule next run
         interval = CADENCE_INTERVALS.get(module.cadence, timedelta(days=1))
         next_run = datetime.now(timezone.utc) + interval
-        db.execute_query(
-            "UPDATE modules SET next_run_at = %s WHERE name = %s",
-            (next_run, module_name),
-        )
+        ctx.update_module("name", module_name, next_run_at=next_run)
+        if run_context is None:
+            ctx.flush()
 
         publish_update("qcd:updates", {
             "type": "module_complete",
@@ -153,11 +183,11 @@ class PipelineOrchestrator:
         return result
 
     def run_module_with_retry(self, module_name: str, max_retries: int = 3,
-                              symbols: List[str] = None) -> Dict:
+                              symbols: List[str] = None, run_context: RunContext = None) -> Dict:
         """Run module with retry logic. After max_retries, create an alert."""
         last_result = None
         for attempt in range(1, max_retries + 1):
-            result = self.run_module(module_name, symbols=symbols)
+            result = self.run_module(module_name, symbols=symbols, run_context=run_context)
             last_result = result
 
             if result["status"] in ("success", "empty"):
@@ -168,6 +198,11 @@ class PipelineOrchestrator:
             if attempt < max_retries:
                 time.sleep(60 * attempt)
 
+        self._escalate_failure(module_name, max_retries, last_result)
+        return last_result
+
+    def _escalate_failure(self, module_name: str, max_retries: int, last_result: Dict):
+        """Critical alert + notification once a module has exhausted its retries."""
         module_id = db.get_module_id(module_name)
         if module_id:
             db.create_alert(
@@ -192,10 +227,52 @@ class PipelineOrchestrator:
             except Exception as e:
                 logger.warning(f"WhatsApp alert delivery failed: {e}")
 
-        return last_result
-
-    def run_batch(self, module_names: List[str] = None, symbols: List[str] = None) -> List[Dict]:
-        """Run multiple modules in parallel."""
+    def _upstream_host(self, module_name: str, source_url: Optional[str] = None) -> Optional[str]:
+        """Upstream API host for a module: modules.source_url, else the V1 manifest's api_urls."""
+        host = upstream_host(source_url)
+        if host:
+            return host
+        if self._manifest_hosts is None:
+            import json
+            manifest_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "module_manifest.json")
+            try:
+                with open(manifest_path) as f:
+                    entries = json.load(f)
+                self._manifest_hosts = {
+                    e["name"]: upstream_host(*sorted(e.get("api_urls") or [])) for e in entries
+                }
+            except (OSError, ValueError):
+                self._manifest_hosts = {}
+        return self._manifest_hosts.get(module_name)
+
+    def build_tasks(self, module_names: List[str]) -> List[ScheduledTask]:
+        """Scheduling metadata (next_run_at, cadence, avg_duration_ms, host, execution class) in one query."""
+        rows = db.execute_query(
+            """SELECT name, cadence, next_run_at, avg_duration_ms, source_url, execution_class
+               FROM modules WHERE name = ANY(%s)""",
+            (list(module_names),), fetch=True,
+        ) or []
+        meta = {r["name"]: r for r in rows}
+        tasks = []
+        for name in module_names:
+            row = meta.get(name, {})
+            tasks.append(ScheduledTask(
+                name=name,
+                next_run_at=row.get("next_run_at"),
+                cadence=row.get("cadence") or "daily",
+                avg_duration_ms=row.get("avg_duration_ms"),
+                host=self._upstream_host(name, row.get("source_url")),
+                execution_class=row.get("execution_class") or "io",
+            ))
+        return tasks
+
+    def run_batch(self, module_names: List[str] = None, symbols: List[str] = None,
+                  coalesce_metadata: bool = False) -> List[Dict]:
+        """Run multiple modules in parallel: threads for 'io' modules, a process pool for 'cpu' compute.
+
+        With coalesce_metadata, run bookkeeping for the whole batch is buffered
+        in one RunContext and written in a single transaction at the end.
+        """
         if module_names is None:
             due = self.get_due_modules()
             module_names = [m["name"] for m in due]
@@ -205,35 +282,69 @@ class PipelineOrchestrator:
             return []
 
         logger.info(f"Running batch of {len(module_names)} modules...")
-        results = []
-
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {
-                executor.submit(self.run_module_with_retry, name, 3, symbols): name
-                for name in module_names
-            }
-            for future in as_completed(futures):
-                name = futures[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    logger.error(f"[{name}] Unexpected error: {e}")
-                    results.append({"module": name, "status": "error", "error": str(e)})
-
+        max_retries = PIPELINE_CONFIG["max_retries"]
+        events_before = kafka_producer.get_stats()  # publisher counters are process-wide
+
+        batch_context = None
+        if coalesce_metadata:
+            batch_context = RunContext()
+            batch_context.prefetch_module_stats(module_names, key_column="name")
+
+        tasks = self.build_tasks(module_names)
+        cpu_modules = [t.name for t in tasks if t.execution_class == "cpu"]
+        if cpu_modules and self.process_workers > 0:
+            self._executor = HybridExecutor(self.modules_dir, self.process_workers, preload=cpu_modules)
+
+        scheduler = BatchScheduler(
+            run_fn=lambda task: self.run_module(task.name, symbols=symbols, run_context=batch_context,
+                                                execution_class=task.execution_class, host=task.host),
+            max_workers=self.max_workers,
+            host_limit=self.host_limit,
+            host_limits=self.host_limits,
+            max_attempts=max_retries,
+            retry_delay=PIPELINE_CONFIG["retry_delay_seconds"],
+            on_exhausted=lambda task, result: self._escalate_failure(task.name, max_retries, result),
+        )
+        try:
+            results = scheduler.run(tasks)
+        finally:
+            if batch_context is not None:
+                batch_context.flush()
+            executor, self._executor = self._executor, None
+            if executor is not None:
+                executor.shutdown()
+
+        self.last_batch_metrics = scheduler.metrics()
+        self.last_batch_metrics["rate_limit_wait_s"] = {
+            r["module"]: round(r["rate_limit_wait_ms"] / 1000, 3) for r in results if r.get("rate_limit_wait_ms")
+        }
+        if executor is not None:
+            self.last_batch_metrics["process_pool"] = dict(executor.metrics, workers=executor.process_workers)
         success_count = sum(1 for r in results if r["status"] == "success")
-        logger.info(f"Batch complete: {success_count}/{len(results)} succeeded")
+        logger.info(f"Batch complete: {success_count}/{len(results)} succeeded "
+                    f"(utilisation={self.last_batch_metrics['worker_utilisation']:.0%}, "
+                    f"max queue={self.last_batch_metrics['max_queue_depth']}, "
+                    f"retries={self.last_batch_metrics['retries']})")
+
+        # Delivery barrier: every pipeline event from this batch is acknowledged (or failed) here
+        kafka_producer.flush(timeout=30)
+        event_stats = kafka_producer.stats_since(events_before)
+        if event_stats["failed"] or event_stats["dropped"]:
+            logger.warning(f"Kafka delivery: {event_stats['failed']} failed, "
+                           f"{event_stats['dropped']} dropped")
 
         publish_update("qcd:updates", {
             "type": "batch_complete",
             "total": len(results),
             "success": success_count,
+            "events": {k: event_stats[k] for k in ("delivered", "failed", "dropped")},
+            "scheduler": self.last_batch_metrics,
             "ts": datetime.now(timezone.utc).isoformat(),
         })
 
         return results
 
-    def run_overnight(self, cadences: List[str] = None):
+    def run_overnight(self, cadences: List[str] = None, coalesce_metadata: bool = False):
         """Overnight batch: run all modules matching given cadences."""
         cadences = cadences or ["daily", "weekly", "monthly", "quarterly", "4h"]
         now = datetime.now(timezone.utc)
@@ -254,4 +365,4 @@ class PipelineOrchestrator:
 
         module_names = [m["name"] for m in modules]
         logger.info(f"Overnight run: {len(module_names)} modules due")
-        return self.run_batch(module_names)
+        return self.run_batch(module_names, coalesce_metadata=coalesce_metadata)
@@ -0,0 +1,227 @@
+"""
+Rate limiter — token buckets per upstream host (or host + API key), shared across threads and processes.
+
+Modules used to throttle with blind sleeps (time.sleep between calls, 0.5 s
+every 10 tickers). Here every call takes a token from its bucket instead:
+
+  - A bucket refills at `rate` tokens/s up to `burst`. acquire() reserves a
+    token and sleeps exactly until it is due, so a burst goes through at
+    once and a sustained stream is paced at `rate` with no extra delay.
+  - Buckets live in Redis (one atomic Lua script per acquire, server clock),
+    so all workers and processes share one budget per host. Without Redis
+    they fall back to small state files under a file lock, shared by the
+    processes on one machine.
+  - Time spent waiting is reported per module: the orchestrator runs each
+    module inside track(module_name), and wait_report() sums the waits.
+
+Limits come from PIPELINE_CONFIG["rate_limits"] ("host=rate/burst,...",
+env QCD_RATE_LIMITS); other hosts get PIPELINE_CONFIG["rate_limit_default"].
+
+Usage from a module:
+    from qcd_platform.pipeline.rate_limiter import throttle
+    throttle("api.stlouisfed.org")          # instead of time.sleep(0.5)
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from ..config import PIPELINE_CONFIG
+from .scheduler import upstream_host
+
+logger = logging.getLogger("quantclaw.rate_limiter")
+
+_RESERVE_LUA = """
+local rate, burst, cost, max_wait = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens < cost then wait = (cost - tokens) / rate end
+if wait > max_wait then return tostring(-wait) end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - cost), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RateLimitExceeded(Exception):
+    """The wait for a token would be longer than the caller's max_wait."""
+
+    def __init__(self, key: str, wait: float):
+        super().__init__(f"Rate limit for {key}: next token in {wait:.2f}s")
+        self.key = key
+        self.wait = wait
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """'host=rate/burst,host2=rate' → {host: (rate, burst)}; burst defaults to rate."""
+    limits = {}
+    for item in filter(None, (s.strip() for s in (spec or "").split(","))):
+        key, _, value = item.partition("=")
+        rate, _, burst = value.partition("/")
+        limits[key.strip().lower()] = (float(rate), float(burst or rate))
+    return limits
+
+
+def _reserve(tokens: float, ts: float, now: float, rate: float, burst: float,
+             cost: float, max_wait: float) -> Tuple[float, float]:
+    """Token bucket step shared by the local backends: (wait, tokens left) or (-wait, tokens) if refused."""
+    tokens = min(burst, tokens + max(0.0, now - ts) * rate)
+    wait = (cost - tokens) / rate if tokens < cost else 0.0
+    if wait > max_wait:
+        return -wait, tokens
+    return wait, tokens - cost
+
+
+class RedisBuckets:
+    """Buckets as Redis hashes (qcd:ratelimit:<key>), updated atomically by a Lua script."""
+
+    def __init__(self, client):
+        self._script = client.register_script(_RESERVE_LUA)
+
+    def reserve(self, key: str, rate: float, burst: float, cost: float, max_wait: float) -> float:
+        return float(self._script(keys=[f"qcd:ratelimit:{key}"], args=[rate, burst, cost, max_wait]))
+
+
+class FileBuckets:
+    """Buckets as JSON files under an flock, shared by processes on this machine."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, rate: float, burst: float, cost: float, max_wait: float) -> float:
+        name = hashlib.sha1(key.encode()).hexdigest()[:16]
+        path = os.path.join(self.directory, f"{name}.json")
+        with self._lock, open(path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                state = json.loads(raw) if raw else {}
+                now = time.time()
+                wait, tokens = _reserve(state.get("tokens", burst), state.get("ts", now), now,
+                                        rate, burst, cost, max_wait)
+                if wait >= 0:
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps({"key": key, "tokens": tokens, "ts": now}))
+                    f.flush()
+                return wait
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class RateLimiter:
+    """Token-bucket budget per key (upstream host, optionally + API key), with per-module wait accounting."""
+
+    def __init__(self, backend=None, limits: Dict[str, Tuple[float, float]] = None,
+                 default_limit: Tuple[float, float] = None):
+        self.backend = backend if backend is not None else _default_backend()
+        self.limits = limits if limits is not None else parse_limits(PIPELINE_CONFIG["rate_limits"])
+        self.default_limit = default_limit or next(iter(parse_limits(
+            f"*={PIPELINE_CONFIG['rate_limit_default']}").values()))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._waits: Dict[str, Dict[str, float]] = {}  # module → {"wait_s", "acquired", "max_wait_s"}
+
+    @staticmethod
+    def key_for(url_or_host: str, api_key: str = None) -> str:
+        """Bucket key: the upstream host, plus a digest of the API key when budgets are per key."""
+        host = upstream_host(url_or_host) or url_or_host
+        if api_key:
+            return f"{host}#{hashlib.sha1(api_key.encode()).hexdigest()[:8]}"
+        return host
+
+    def limit_for(self, key: str) -> Tuple[float, float]:
+        return self.limits.get(key) or self.limits.get(key.split("#")[0]) or self.default_limit
+
+    def acquire(self, key: str = None, cost: float = 1, max_wait: float = None) -> float:
+        """Take `cost` tokens from key's bucket, sleeping until they are due. Returns seconds waited.
+
+        key defaults to the host of the module being tracked. Raises RateLimitExceeded,
+        without taking tokens, if the wait would exceed max_wait.
+        """
+        key = key or getattr(self._local, "host", None)
+        if not key:
+            return 0.0
+        rate, burst = self.limit_for(key)
+        wait = self.backend.reserve(key, rate, burst, cost, 1e18 if max_wait is None else max_wait)
+        if wait < 0:
+            raise RateLimitExceeded(key, -wait)
+        if wait > 0:
+            time.sleep(wait)
+        self._record(wait)
+        return wait
+
+    def _record(self, wait: float):
+        module = getattr(self._local, "module", None) or "(untracked)"
+        with self._lock:
+            stats = self._waits.setdefault(module, {"wait_s": 0.0, "acquired": 0, "max_wait_s": 0.0})
+            stats["wait_s"] += wait
+            stats["acquired"] += 1
+            stats["max_wait_s"] = max(stats["max_wait_s"], wait)
+        if getattr(self._local, "module_wait", None) is not None:
+            self._local.module_wait += wait
+
+    @contextmanager
+    def track(self, module_name: str, host: str = None):
+        """Attribute acquire() waits on this thread to module_name; host becomes the default key."""
+        previous = (getattr(self._local, "module", None), getattr(self._local, "host", None),
+                    getattr(self._local, "module_wait", None))
+        self._local.module, self._local.host, self._local.module_wait = module_name, host, 0.0
+        try:
+            yield self
+        finally:
+            self._local.module, self._local.host, self._local.module_wait = previous
+
+    def current_wait(self) -> float:
+        """Seconds waited so far inside the innermost track() on this thread."""
+        return getattr(self._local, "module_wait", None) or 0.0
+
+    def wait_report(self, reset: bool = False) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            report = {m: dict(s) for m, s in self._waits.items()}
+            if reset:
+                self._waits.clear()
+        return report
+
+
+def _default_backend():
+    if PIPELINE_CONFIG["rate_limit_backend"] == "redis":
+        from .redis_cache import _get_redis
+        client = _get_redis()
+        if client:
+            return RedisBuckets(client)
+        logger.warning("Redis unavailable; rate limit buckets shared through local files only")
+    return FileBuckets(PIPELINE_CONFIG["rate_limit_dir"])
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide limiter (created on first use)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+def throttle(url_or_host: str = None, api_key: str = None, cost: float = 1) -> float:
+    """Wait for budget on url_or_host (default: the tracked module's host). Returns seconds waited."""
+    limiter = get_rate_limiter()
+    key = limiter.key_for(url_or_host, api_key) if url_or_host else None
+    return limiter.acquire(key, cost=cost)
@@ -1,14 +1,29 @@
 """
 Redis cache layer for hot data access.
 Gracefully degrades if Redis is unavailable.
+
+Latest values (qcd:latest:<module>:<symbol>) can be written one at a time
+(cache_latest) or pipelined (cache_latest_many), optionally in a compact
+binary encoding. get_latest_many is read-through: misses fall back to the
+newest gold data_points row and are written back to the cache.
 """
 import json
 import logging
-from typing import Any, Dict, Optional
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger("quantclaw.redis")
 
 _client = None
+_raw_client = None
+
+# Binary encodings carry a 2-byte tag; JSON values are stored untagged as before
+_TAG_ZLIB = b"\x00z"
+_TAG_MSGPACK = b"\x00m"
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "fallback_hits": 0, "fallback_misses": 0, "writes": 0}
 
 
 def _get_redis():
@@ -27,30 +42,175 @@ def _get_redis():
     return _client
 
 
+def _get_raw_redis():
+    """Client without response decoding, needed to read binary-encoded values."""
+    global _raw_client
+    if _raw_client is not None:
+        return _raw_client
+    if not _get_redis():
+        return False
+    import redis
+    from ..config import REDIS_CONFIG
+    _raw_client = redis.Redis(**{**REDIS_CONFIG, "decode_responses": False})
+    return _raw_client
+
+
+def _latest_key(module_name: str, symbol: str) -> str:
+    return f"qcd:latest:{module_name}:{symbol}"
+
+
+def encode_value(payload: Dict[str, Any], encoding: str = "json") -> bytes:
+    """Serialise a payload: 'json' (plain, readable by any client), 'zlib' or 'msgpack'."""
+    if encoding == "msgpack":
+        try:
+            import msgpack
+            return _TAG_MSGPACK + msgpack.packb(payload, default=str, use_bin_type=True)
+        except ImportError:
+            encoding = "zlib"
+    text = json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+    if encoding == "zlib":
+        return _TAG_ZLIB + zlib.compress(text, 6)
+    return text
+
+
+def decode_value(raw) -> Optional[Dict]:
+    """Inverse of encode_value; also reads legacy plain-JSON values."""
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        return json.loads(raw)
+    if raw.startswith(_TAG_ZLIB):
+        return json.loads(zlib.decompress(raw[2:]))
+    if raw.startswith(_TAG_MSGPACK):
+        import msgpack
+        return msgpack.unpackb(raw[2:], raw=False)
+    return json.loads(raw)
+
+
+def _count(name: str, n: int = 1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters for the latest-value API since process start."""
+    with _stats_lock:
+        return dict(_stats)
+
+
 def cache_latest(module_name: str, symbol: str, payload: Dict[str, Any], ttl: int = 86400):
     """Cache the latest data point for a module/symbol pair. TTL defaults to 24h."""
     r = _get_redis()
     if not r:
         return
     try:
-        key = f"qcd:latest:{module_name}:{symbol}"
+        key = _latest_key(module_name, symbol)
         r.setex(key, ttl, json.dumps(payload, default=str))
+        _count("writes")
     except Exception as e:
         logger.warning(f"Redis cache write failed: {e}")
 
 
+def cache_latest_many(module_name: str, items: Iterable[Tuple[str, Dict[str, Any]]],
+                      ttl: int = 86400, encoding: str = None, chunk_size: int = 1000) -> int:
+    """Pipelined cache_latest for (symbol, payload) pairs; later pairs win for repeated symbols.
+
+    encoding defaults to PIPELINE_CONFIG['redis_latest_encoding'] ('json' unless configured).
+    Returns the number of keys written.
+    """
+    r = _get_raw_redis()
+    if not r:
+        return 0
+    if encoding is None:
+        from ..config import PIPELINE_CONFIG
+        encoding = PIPELINE_CONFIG.get("redis_latest_encoding", "json")
+
+    latest: Dict[str, Dict[str, Any]] = {}
+    for symbol, payload in items:
+        if symbol:
+            latest[symbol] = payload
+
+    written = 0
+    try:
+        symbols = list(latest)
+        for start in range(0, len(symbols), chunk_size):
+            pipe = r.pipeline(transaction=False)
+            for symbol in symbols[start:start + chunk_size]:
+                pipe.setex(_latest_key(module_name, symbol), ttl, encode_value(latest[symbol], encoding))
+            pipe.execute()
+            written += len(symbols[start:start + chunk_size])
+    except Exception as e:
+        logger.warning(f"Redis pipelined cache write failed after {written} keys: {e}")
+    _count("writes", written)
+    return written
+
+
 def get_latest(module_name: str, symbol: str) -> Optional[Dict]:
-    r = _get_redis()
+    r = _get_raw_redis()
     if not r:
         return None
     try:
-        key = f"qcd:latest:{module_name}:{symbol}"
-        val = r.get(key)
-        return json.loads(val) if val else None
+        return decode_value(r.get(_latest_key(module_name, symbol)))
     except Exception:
         return None
 
 
+def _latest_from_db(module_name: str, symbols: List[str]) -> Dict[str, Dict]:
+    from . import db
+    rows = db.execute_query(
+        """SELECT DISTINCT ON (dp.symbol) dp.symbol, dp.payload
+           FROM data_points dp
+           JOIN modules m ON m.id = dp.module_id
+           WHERE m.name = %s AND dp.symbol = ANY(%s) AND dp.tier = 'gold'
+           ORDER BY dp.symbol, dp.ts DESC""",
+        (module_name, symbols),
+        fetch=True,
+    ) or []
+    return {row["symbol"]: row["payload"] for row in rows}
+
+
+def get_latest_many(module_name: str, symbols: List[str], fallback: bool = True,
+                    ttl: int = 86400) -> Dict[str, Dict]:
+    """Latest payload per symbol: one MGET, then (optionally) one DB query for the misses.
+
+    Symbols found in neither place are absent from the result.
+    """
+    symbols = list(dict.fromkeys(s for s in symbols if s))
+    found: Dict[str, Dict] = {}
+    misses = symbols
+
+    r = _get_raw_redis()
+    if r and symbols:
+        try:
+            values = r.mget([_latest_key(module_name, s) for s in symbols])
+            misses = []
+            for symbol, raw in zip(symbols, values):
+                payload = decode_value(raw) if raw is not None else None
+                if payload is None:
+                    misses.append(symbol)
+                else:
+                    found[symbol] = payload
+        except Exception as e:
+            logger.warning(f"Redis MGET failed: {e}")
+            misses = [s for s in symbols if s not in found]
+    _count("hits", len(found))
+    _count("misses", len(misses))
+
+    if fallback and misses:
+        try:
+            from_db = _latest_from_db(module_name, misses)
+        except Exception as e:
+            logger.warning(f"Latest-value DB fallback failed: {e}")
+            from_db = {}
+        _count("fallback_hits", len(from_db))
+        _count("fallback_misses", len(misses) - len(from_db))
+        if from_db:
+            found.update(from_db)
+            cache_latest_many(module_name, from_db.items(), ttl=ttl)
+
+    return found
+
+
 def set_module_health(module_name: str, status: str, details: Dict = None):
     r = _get_redis()
     if not r:
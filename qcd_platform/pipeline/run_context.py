@@ -0,0 +1,192 @@
+"""
+RunContext — buffers pipeline bookkeeping writes and flushes them in one transaction.
+
+A module run used to make a round trip per bookkeeping statement
+(start_pipeline_run, five record_quality_check calls, the modules UPDATE,
+the platinum-eligibility SELECT, complete_pipeline_run, and the
+orchestrator's next_run_at UPDATE). A RunContext collects them in memory
+and writes everything on flush():
+
+  1. INSERT pipeline_runs (status 'running', original started_at) RETURNING id
+  2. INSERT quality_checks for those ids
+  3. UPDATE pipeline_runs to the final status — fires trg_update_module_stats
+     exactly as the unbuffered path does
+  4. UPDATE modules (tier, quality score, next_run_at, ...)
+
+One context per module run gives one transaction per run; the orchestrator
+can also share one context across a whole run_batch.
+"""
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from psycopg2 import extras
+
+from . import db
+
+logger = logging.getLogger("quantclaw.run_context")
+
+
+class PendingRun:
+    """A pipeline_runs row that has not been written yet."""
+
+    def __init__(self, module_id: int, tier_target: str):
+        self.module_id = module_id
+        self.tier_target = tier_target
+        self.started_at = datetime.now(timezone.utc)
+        self.completed_at: Optional[datetime] = None
+        self.status = "running"
+        self.rows_in = 0
+        self.rows_out = 0
+        self.rows_failed = 0
+        self.error_message: Optional[str] = None
+        self.duration_ms: Optional[int] = None
+        self.quality_checks: List[tuple] = []
+        self.run_id: Optional[int] = None  # set on flush
+
+
+class RunContext:
+    """Thread-safe buffer of run metadata for one module run or one batch."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: List[PendingRun] = []
+        self._module_updates: Dict[tuple, Dict[str, Any]] = {}
+        self._module_stats: Dict[int, Dict[str, int]] = {}
+
+    # ── pipeline_runs / quality_checks ──────────────────────────────
+
+    def start_run(self, module_id: int, tier_target: str) -> PendingRun:
+        run = PendingRun(module_id, tier_target)
+        with self._lock:
+            self._runs.append(run)
+        return run
+
+    def record_quality_check(self, run: PendingRun, check_type: str, passed: bool,
+                             score: int = 0, details: Dict = None):
+        run.quality_checks.append((check_type, passed, score, details or {}))
+
+    def complete_run(self, run: PendingRun, status: str, rows_in: int = 0,
+                     rows_out: int = 0, rows_failed: int = 0,
+                     error_message: str = None, duration_ms: int = None):
+        run.status = status
+        run.completed_at = datetime.now(timezone.utc)
+        run.rows_in, run.rows_out, run.rows_failed = rows_in, rows_out, rows_failed
+        run.error_message = error_message
+        run.duration_ms = duration_ms
+
+        # Mirror trg_update_module_stats so later reads in this context see the new counters
+        with self._lock:
+            stats = self._module_stats.get(run.module_id)
+            if stats is not None:
+                if status == "success":
+                    stats["run_count"] += 1
+                    stats["consecutive_failures"] = 0
+                elif status == "failed":
+                    stats["consecutive_failures"] += 1
+
+    # ── modules ─────────────────────────────────────────────────────
+
+    def update_module(self, key_column: str, key: Any, **fields):
+        """Buffer `UPDATE modules SET <fields> WHERE <key_column> = key` (later calls merge)."""
+        if key_column not in ("id", "name"):
+            raise ValueError(f"Unsupported modules key column: {key_column}")
+        with self._lock:
+            self._module_updates.setdefault((key_column, key), {}).update(fields)
+
+    def prefetch_module_stats(self, keys: Iterable[Any], key_column: str = "id"):
+        """Load run_count / consecutive_failures for many modules (by id or name) in one query."""
+        if key_column not in ("id", "name"):
+            raise ValueError(f"Unsupported modules key column: {key_column}")
+        keys = [k for k in set(keys) if k is not None and (key_column != "id" or k not in self._module_stats)]
+        if not keys:
+            return
+        rows = db.execute_query(
+            f"SELECT id, run_count, consecutive_failures FROM modules WHERE {key_column} = ANY(%s)",
+            (keys,), fetch=True,
+        ) or []
+        with self._lock:
+            for row in rows:
+                self._module_stats.setdefault(row["id"], {
+                    "run_count": row["run_count"] or 0,
+                    "consecutive_failures": row["consecutive_failures"] or 0,
+                })
+
+    def module_stats(self, module_id: int) -> Optional[Dict[str, int]]:
+        """run_count / consecutive_failures as of this context (fetched once, then tracked)."""
+        if module_id not in self._module_stats:
+            self.prefetch_module_stats([module_id])
+        return self._module_stats.get(module_id)
+
+    # ── flush ───────────────────────────────────────────────────────
+
+    @property
+    def pending(self) -> int:
+        return len(self._runs) + len(self._module_updates)
+
+    def flush(self):
+        """Write everything buffered so far in a single transaction."""
+        with self._lock:
+            runs, self._runs = self._runs, []
+            updates, self._module_updates = self._module_updates, {}
+        if not runs and not updates:
+            return
+
+        with db.get_connection() as conn:
+            with conn.cursor() as cur:
+                if runs:
+                    self._write_runs(cur, runs)
+                for (key_column, key), fields in updates.items():
+                    assignments = ", ".join(f"{col} = %s" for col in fields)
+                    cur.execute(
+                        f"UPDATE modules SET {assignments} WHERE {key_column} = %s",
+                        (*fields.values(), key),
+                    )
+
+        logger.debug(f"Flushed {len(runs)} runs and {len(updates)} module updates")
+
+    @staticmethod
+    def _write_runs(cur, runs: List[PendingRun]):
+        ids = extras.execute_values(
+            cur,
+            """INSERT INTO pipeline_runs (module_id, tier_target, status, started_at)
+               VALUES %s RETURNING id""",
+            [(r.module_id, r.tier_target, "running", r.started_at) for r in runs],
+            fetch=True,
+        )
+        for run, (run_id,) in zip(runs, ids):
+            run.run_id = run_id
+
+        checks = [
+            (r.run_id, check_type, passed, score, extras.Json(details))
+            for r in runs
+            for check_type, passed, score, details in r.quality_checks
+        ]
+        if checks:
+            extras.execute_values(
+                cur,
+                "INSERT INTO quality_checks (run_id, check_type, passed, score, details) VALUES %s",
+                checks,
+            )
+
+        # A separate UPDATE keeps trg_update_module_stats (AFTER UPDATE OF status) firing
+        finished = [r for r in runs if r.status != "running"]
+        if finished:
+            extras.execute_values(
+                cur,
+                """UPDATE pipeline_runs AS r SET
+                       status = v.status, completed_at = v.completed_at, duration_ms = v.duration_ms,
+                       rows_in = v.rows_in, rows_out = v.rows_out, rows_failed = v.rows_failed,
+                       error_message = v.error_message
+                   FROM (VALUES %s) AS v(id, status, completed_at, duration_ms,
+                                         rows_in, rows_out, rows_failed, error_message)
+                   WHERE r.id = v.id""",
+                [
+                    (r.run_id, r.status, r.completed_at, r.duration_ms,
+                     r.rows_in, r.rows_out, r.rows_failed, r.error_message)
+                    for r in finished
+                ],
+                template="(%s::bigint, %s::varchar, %s::timestamptz, %s::integer, "
+                         "%s::integer, %s::integer, %s::integer, %s::text)",
+            )
@@ -0,0 +1,210 @@
+"""
+Batch scheduler — priority queue with per-upstream-host concurrency caps.
+
+Used by PipelineOrchestrator.run_batch in place of submitting every module
+to a thread pool in list order:
+
+  - Ready tasks are ordered by (next_run_at, cadence, -avg_duration_ms):
+    the most overdue first, faster cadences before slower ones, and among
+    equals the historically slowest modules first so long runs don't end
+    up at the tail of the batch.
+  - At most `host_limit` modules talking to the same upstream host run at
+    once (per-host overrides allowed); modules without a known host are
+    only bound by the worker count.
+  - A failed attempt is requeued with a ready-at time instead of sleeping
+    inside a worker, so backoff never occupies a thread.
+
+metrics() reports queue depth and worker utilisation for the batch.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger("quantclaw.scheduler")
+
+CADENCE_RANK = {
+    "realtime": 0, "1min": 1, "5min": 2, "15min": 3, "1h": 4, "4h": 5,
+    "daily": 6, "weekly": 7, "monthly": 8, "quarterly": 9,
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def upstream_host(*urls: Optional[str]) -> Optional[str]:
+    """Host of the first usable URL, preferring api.* hosts (manifest api_urls mix docs and endpoints)."""
+    hosts = []
+    for url in urls:
+        if not url:
+            continue
+        host = urlparse(url if "://" in url else f"https://{url}").hostname
+        if host:
+            hosts.append(host.lower())
+    if not hosts:
+        return None
+    api_hosts = [h for h in hosts if h.startswith("api.")]
+    return (api_hosts or hosts)[0]
+
+
+@dataclass
+class ScheduledTask:
+    name: str
+    next_run_at: Optional[datetime] = None
+    cadence: str = "daily"
+    avg_duration_ms: Optional[int] = None
+    host: Optional[str] = None
+    execution_class: str = "io"
+    attempt: int = 1
+    ready_at: float = 0.0  # time.monotonic() before which a retry must not start
+    result: Optional[Dict] = field(default=None, repr=False)
+
+    def priority(self) -> tuple:
+        due = self.next_run_at or _EPOCH
+        return (due, CADENCE_RANK.get(self.cadence, 6), -(self.avg_duration_ms or 0), self.name)
+
+
+class BatchScheduler:
+    """Runs `run_fn(task)` for each task with priority order, host caps and requeued retries.
+
+    run_fn returns a result dict; statuses in `ok_statuses` complete the task,
+    anything else is retried up to max_attempts with `retry_delay * attempt` backoff.
+    on_exhausted(task, result) is called once a task runs out of attempts.
+    """
+
+    def __init__(self, run_fn: Callable[[ScheduledTask], Dict], max_workers: int = 4,
+                 host_limit: int = 2, host_limits: Dict[str, int] = None,
+                 max_attempts: int = 3, retry_delay: float = 60.0,
+                 ok_statuses=("success", "empty"),
+                 on_exhausted: Callable[[ScheduledTask, Dict], None] = None):
+        self.run_fn = run_fn
+        self.max_workers = max_workers
+        self.host_limit = host_limit
+        self.host_limits = host_limits or {}
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.ok_statuses = set(ok_statuses)
+        self.on_exhausted = on_exhausted
+
+        self._seq = itertools.count()
+        self._ready: List[tuple] = []
+        self._delayed: List[tuple] = []
+        self._host_running: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._busy_seconds = 0.0
+        self._depth_samples: List[int] = []
+        self._metrics: Dict[str, Any] = {}
+
+    def _push(self, task: ScheduledTask):
+        if task.ready_at > time.monotonic():
+            heapq.heappush(self._delayed, (task.ready_at, next(self._seq), task))
+        else:
+            heapq.heappush(self._ready, (task.priority(), next(self._seq), task))
+
+    def _promote_due_retries(self):
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, task = heapq.heappop(self._delayed)
+            heapq.heappush(self._ready, (task.priority(), next(self._seq), task))
+
+    def _host_has_capacity(self, host: Optional[str]) -> bool:
+        if host is None:
+            return True
+        limit = max(1, self.host_limits.get(host, self.host_limit))
+        return self._host_running.get(host, 0) < limit
+
+    def _next_runnable(self) -> Optional[ScheduledTask]:
+        """Pop the best-priority task whose host has a free slot; blocked tasks keep their place."""
+        blocked = []
+        task = None
+        while self._ready:
+            entry = heapq.heappop(self._ready)
+            if self._host_has_capacity(entry[2].host):
+                task = entry[2]
+                break
+            blocked.append(entry)
+        for entry in blocked:
+            heapq.heappush(self._ready, entry)
+        return task
+
+    def _timed_run(self, task: ScheduledTask) -> Dict:
+        start = time.monotonic()
+        try:
+            return self.run_fn(task)
+        except Exception as e:
+            logger.error(f"[{task.name}] Unexpected error: {e}")
+            return {"module": task.name, "status": "error", "error": str(e)}
+        finally:
+            with self._lock:
+                self._busy_seconds += time.monotonic() - start
+
+    def run(self, tasks: List[ScheduledTask]) -> List[Dict]:
+        for task in tasks:
+            self._push(task)
+
+        results: List[Dict] = []
+        running = {}
+        retries = 0
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while self._ready or self._delayed or running:
+                self._promote_due_retries()
+                while len(running) < self.max_workers:
+                    task = self._next_runnable()
+                    if task is None:
+                        break
+                    if task.host:
+                        self._host_running[task.host] = self._host_running.get(task.host, 0) + 1
+                    running[executor.submit(self._timed_run, task)] = task
+                self._depth_samples.append(len(self._ready) + len(self._delayed))
+
+                timeout = None
+                if self._delayed:
+                    timeout = max(0.0, self._delayed[0][0] - time.monotonic())
+                if not running:
+                    time.sleep(timeout or 0)
+                    continue
+
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    if task.host:
+                        self._host_running[task.host] -= 1
+                    result = future.result()
+                    task.result = result
+
+                    if result.get("status") in self.ok_statuses:
+                        results.append(result)
+                    elif task.attempt < self.max_attempts:
+                        logger.warning(f"[{task.name}] Attempt {task.attempt}/{self.max_attempts} failed: "
+                                       f"{result.get('error', 'unknown')} — requeued")
+                        task.ready_at = time.monotonic() + self.retry_delay * task.attempt
+                        task.attempt += 1
+                        retries += 1
+                        self._push(task)
+                    else:
+                        if self.on_exhausted:
+                            self.on_exhausted(task, result)
+                        results.append(result)
+
+        wall = time.monotonic() - started
+        self._metrics = {
+            "tasks": len(tasks),
+            "retries": retries,
+            "wall_seconds": round(wall, 3),
+            "busy_worker_seconds": round(self._busy_seconds, 3),
+            "worker_utilisation": round(self._busy_seconds / (wall * self.max_workers), 3) if wall > 0 else 0.0,
+            "max_queue_depth": max(self._depth_samples, default=0),
+            "avg_queue_depth": round(sum(self._depth_samples) / len(self._depth_samples), 1)
+            if self._depth_samples else 0.0,
+        }
+        return results
+
+    def metrics(self) -> Dict[str, Any]:
+        return dict(self._metrics)
@@ -4,20 +4,28 @@ V1 Adapter — Wraps legacy function-based modules as BaseModule subclasses.
 Instead of rewriting 993 modules from scratch, this adapter:
 1. Dynamically imports the v1 module
 2. Calls its main function (get_data, fetch_*, get_*)
-3. Converts the return value (dict/DataFrame/list) into DataPoint objects
+3. Converts the return value (dict/DataFrame/list/generator) into DataPoints
+   or columnar DataPointBatches
 4. Feeds them through the standard Bronze→Silver→Gold pipeline
+
+Large results are never truncated: fetch_chunks() cuts them into chunks of
+chunk_rows rows, and BaseModule.run stores each chunk before converting the
+next, so a generator result is only ever held one chunk at a time.
 """
 import importlib.util
+import itertools
 import json
 import logging
 import os
 import sys
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 import pandas as pd
 
+from ..config import PIPELINE_CONFIG
 from .base_module import BaseModule, DataPoint
+from .datapoint_batch import DataPointBatch
 
 logger = logging.getLogger("quantclaw.v1_adapter")
 
@@ -41,6 +49,7 @@ class V1ModuleAdapter(BaseModule):
         self._call_args = call_args or {}
         self._v1_module = None
         self._v1_callable = None
+        self.chunk_rows = PIPELINE_CONFIG["v1_chunk_rows"]
         super().__init__()
 
     def _load_v1_module(self):
@@ -109,40 +118,49 @@ class V1ModuleAdapter(BaseModule):
                     if self._v1_callable:
                         break
 
-    def _convert_to_datapoints(self, raw_data: Any, symbols: List[str] = None) -> List[DataPoint]:
-        """Convert v1 output (dict/DataFrame/list/str) into DataPoint objects."""
-        points = []
-        now = datetime.now(timezone.utc)
+    def _convert_to_datapoints(self, raw_data: Any, symbols: List[str] = None) -> Union[List[DataPoint], DataPointBatch]:
+        """Convert the whole v1 output (dict/DataFrame/list/generator/str) into DataPoints or one DataPointBatch."""
+        chunks = list(self._iter_chunks(raw_data, datetime.now(timezone.utc), chunk_rows=None))
+        return chunks[0] if chunks else []
 
+    def _iter_chunks(self, raw_data: Any, now: datetime,
+                     chunk_rows: Optional[int]) -> Iterator[Union[List[DataPoint], DataPointBatch]]:
+        """v1 output as chunks of at most chunk_rows rows (None: one chunk per result)."""
         if raw_data is None:
-            return points
+            return
 
         if isinstance(raw_data, pd.DataFrame):
-            return self._convert_dataframe(raw_data, now)
+            yield from self._convert_dataframe(raw_data, now, chunk_rows)
+            return
 
         if isinstance(raw_data, dict):
             if "error" in raw_data:
                 logger.warning(f"[{self.name}] V1 returned error: {raw_data['error']}")
-                return points
-            return self._convert_dict(raw_data, now)
-
-        if isinstance(raw_data, list):
-            return self._convert_list(raw_data, now)
+                return
+            if "data" in raw_data and isinstance(raw_data["data"], list):
+                yield from self._convert_list(raw_data["data"], now, chunk_rows)
+                return
+            yield self._convert_dict(raw_data, now)
+            return
 
         if isinstance(raw_data, (str, int, float)):
-            points.append(DataPoint(
+            yield [DataPoint(
                 ts=now, symbol=None, cadence=self.cadence,
                 payload={"value": raw_data, "source": self.name},
-            ))
-            return points
+            )]
+            return
+
+        if isinstance(raw_data, (list, tuple)) or _is_row_iterator(raw_data):
+            yield from self._convert_list(raw_data, now, chunk_rows)
+            return
 
         logger.warning(f"[{self.name}] Unhandled return type: {type(raw_data)}")
-        return points
 
-    def _convert_dataframe(self, df: pd.DataFrame, now: datetime) -> List[DataPoint]:
-        points = []
+    def _convert_dataframe(self, df: pd.DataFrame, now: datetime,
+                           chunk_rows: Optional[int] = None) -> Iterator[DataPointBatch]:
+        """DataFrame results stay columnar: a DataPointBatch per chunk instead of a DataPoint per row."""
         if df.empty:
-            return points
+            return
 
         symbol_col = next((c for c in ["symbol", "ticker", "Symbol", "Ticker"] if c in df.columns), None)
         date_col = next((c for c in ["date", "Date", "timestamp", "ts", "datetime"] if c in df.columns), None)
@@ -152,57 +170,16 @@ class V1ModuleAdapter(BaseModule):
             if date_col is None:
                 date_col = df.columns[0]
 
-        for _, row in df.head(500).iterrows():
-            row_dict = {}
-            for k, v in row.items():
-                try:
-                    if pd.isna(v):
-                        continue
-                except (TypeError, ValueError):
-                    pass
-                if hasattr(v, "item"):
-                    v = v.item()
-                elif isinstance(v, pd.Timestamp):
-                    if pd.isna(v):
-                        continue
-                    v = v.isoformat()
-                elif hasattr(v, "isoformat"):
-                    v = v.isoformat()
-                elif isinstance(v, (dict, list)):
-                    pass
-                elif not isinstance(v, (str, int, float, bool, type(None))):
-                    v = str(v)
-                row_dict[str(k)] = v
-
-            symbol = row_dict.pop(symbol_col, None) if symbol_col else None
-            ts = now
-            if date_col and date_col in row_dict:
-                try:
-                    raw_ts = row_dict.pop(date_col)
-                    ts = pd.Timestamp(raw_ts).to_pydatetime()
-                    if ts.tzinfo is None:
-                        ts = ts.replace(tzinfo=timezone.utc)
-                except Exception:
-                    pass
-
-            if isinstance(symbol, (list, dict)):
-                symbol = None
-            if symbol is not None:
-                symbol = str(symbol)
-
-            points.append(DataPoint(
-                ts=ts, symbol=symbol, cadence=self.cadence,
-                payload=row_dict,
-            ))
-
-        return points
+        step = chunk_rows or len(df)
+        for start in range(0, len(df), step):
+            yield DataPointBatch.from_frame(
+                df.iloc[start:start + step], ts_col=date_col, symbol_col=symbol_col,
+                cadence=self.cadence, default_ts=now,
+            )
 
     def _convert_dict(self, data: dict, now: datetime) -> List[DataPoint]:
         points = []
 
-        if "data" in data and isinstance(data["data"], list):
-            return self._convert_list(data["data"], now)
-
         is_nested_symbols = all(
             isinstance(v, dict) for v in data.values()
         ) and len(data) > 1
@@ -244,9 +221,24 @@ class V1ModuleAdapter(BaseModule):
 
         return points
 
-    def _convert_list(self, data: list, now: datetime) -> List[DataPoint]:
+    def _convert_list(self, data: Iterable, now: datetime,
+                      chunk_rows: Optional[int] = None) -> Iterator[Union[List[DataPoint], DataPointBatch]]:
+        """List/generator results, chunk by chunk; chunks of dicts are converted column-wise."""
+        rows = iter(data)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_rows)) if chunk_rows else list(rows)
+            if not chunk:
+                return
+            if all(isinstance(item, dict) for item in chunk):
+                yield DataPointBatch.from_records(chunk, cadence=self.cadence, default_ts=now)
+            else:
+                yield self._convert_items(chunk, now)
+            if not chunk_rows:
+                return
+
+    def _convert_items(self, items: list, now: datetime) -> List[DataPoint]:
         points = []
-        for item in data[:500]:
+        for item in items:
             if isinstance(item, dict):
                 symbol = item.pop("symbol", item.pop("ticker", None))
                 ts = now
@@ -271,7 +263,15 @@ class V1ModuleAdapter(BaseModule):
                 ))
         return points
 
-    def fetch(self, symbols: List[str] = None) -> List[DataPoint]:
+    def fetch(self, symbols: List[str] = None) -> Union[List[DataPoint], DataPointBatch]:
+        return self._convert_to_datapoints(self._call_v1(symbols), symbols)
+
+    def fetch_chunks(self, symbols: List[str] = None) -> Iterator[Union[List[DataPoint], DataPointBatch]]:
+        """The v1 result in chunks of chunk_rows rows; generators are consumed as chunks are stored."""
+        yield from self._iter_chunks(self._call_v1(symbols), datetime.now(timezone.utc), self.chunk_rows)
+
+    def _call_v1(self, symbols: List[str] = None) -> Any:
+        """Call the v1 entry point with inferred arguments; returns its raw result."""
         self._load_v1_module()
 
         if self._v1_callable is None:
@@ -435,7 +435,7 @@ class V1ModuleAdapter(BaseModule):
         finally:
             sys.exit = old_exit
 
-        return self._convert_to_datapoints(raw_data, symbols)
+        return raw_data
 
     @staticmethod
     def _try_parse_stdout(text: str):
@@ -457,6 +457,11 @@ class V1ModuleAdapter(BaseModule):
         return None
 
 
+def _is_row_iterator(value: Any) -> bool:
+    """Generators and other one-shot iterators of rows (not strings, dicts or DataFrames)."""
+    return isinstance(value, Iterator) and not isinstance(value, (str, bytes, dict))
+
+
 def create_adapter_from_manifest(entry: dict) -> V1ModuleAdapter:
     """Create a V1ModuleAdapter from a manifest entry."""
     return V1ModuleAdapter(
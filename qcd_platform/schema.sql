@@ -45,6 +45,7 @@ CREATE TABLE IF NOT EXISTS modules (
     error_count INTEGER DEFAULT 0,
     consecutive_failures SMALLINT DEFAULT 0,
     avg_duration_ms INTEGER,
+    execution_class VARCHAR(10) NOT NULL DEFAULT 'io' CHECK (execution_class IN ('io', 'cpu')),
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Bulk Loader Benchmark — execute_values vs. binary COPY for data_points.
+
+Writes synthetic rows under a throwaway module and deletes them afterwards.
+Needs a reachable PostgreSQL configured through the usual QCD_DB_* variables.
+
+Usage:
+  python3 bench_bulk_loader.py                       # 10k, 100k, 1M rows
+  python3 bench_bulk_loader.py --sizes 10000,50000   # custom sizes
+  python3 bench_bulk_loader.py --encode-only         # no database: COPY encoding cost only
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from qcd_platform.pipeline import db
+from qcd_platform.pipeline import bulk_loader
+
+BENCH_MODULE = "__bench_bulk_loader"
+
+
+def make_points(n: int):
+    base = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "ts": (base + timedelta(minutes=i)).isoformat(),
+            "symbol": f"SYM{i % 5000}",
+            "cadence": "daily",
+            "tier": "bronze",
+            "quality_score": 0,
+            "payload": {"close": 100.0 + i % 97, "volume": i * 10, "change": float("nan") if i % 50 == 0 else 0.5},
+            "source_hash": f"{i:016x}",
+        }
+        for i in range(n)
+    ]
+
+
+def make_frame(n: int):
+    import numpy as np
+    import pandas as pd
+
+    close = 100.0 + np.arange(n) % 97
+    change = np.where(np.arange(n) % 50 == 0, np.nan, 0.5)
+    return pd.DataFrame({
+        "ts": pd.date_range("2020-01-01", periods=n, freq="min", tz="UTC"),
+        "symbol": [f"SYM{i % 5000}" for i in range(n)],
+        "close": close,
+        "volume": np.arange(n) * 10,
+        "change": change,
+    })
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def cleanup(module_id: int):
+    db.execute_query("DELETE FROM data_points WHERE module_id = %s", (module_id,))
+
+
+def run(sizes, encode_only: bool):
+    module_id = None if encode_only else db.register_module(BENCH_MODULE, cadence="daily")
+    print(f"{'rows':>10} {'path':<22} {'seconds':>9} {'rows/sec':>12}")
+    for n in sizes:
+        points = make_points(n)
+        rows, prep = timed(lambda: [db.build_data_point_row(module_id or 0, p) for p in points])
+
+        if encode_only:
+            blob, t = timed(bulk_loader.encode_copy_stream, rows)
+            print(f"{n:>10} {'copy encode':<22} {prep + t:>9.2f} {n / (prep + t):>12,.0f}  ({len(blob) / 1e6:.1f} MB)")
+            continue
+
+        _, t = timed(db.insert_data_points, module_id, points)
+        print(f"{n:>10} {'execute_values':<22} {t:>9.2f} {n / t:>12,.0f}")
+        cleanup(module_id)
+
+        _, t = timed(bulk_loader.copy_data_point_rows, rows)
+        print(f"{n:>10} {'copy (rows)':<22} {prep + t:>9.2f} {n / (prep + t):>12,.0f}")
+        cleanup(module_id)
+
+        frame = make_frame(n)
+        _, t = timed(bulk_loader.copy_dataframe, module_id, frame)
+        print(f"{n:>10} {'copy (DataFrame)':<22} {t:>9.2f} {n / t:>12,.0f}")
+        cleanup(module_id)
+
+    if module_id is not None:
+        db.execute_query("DELETE FROM modules WHERE id = %s", (module_id,))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark data_points bulk loading")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated row counts")
+    parser.add_argument("--encode-only", action="store_true", help="Skip the database, time COPY encoding only")
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(",")], args.encode_only)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Silver Clean Benchmark — per-point BaseModule.clean vs. the vectorised DataPointBatch path.
+
+Input is DataFrame-shaped module output (naive timestamps, ~10% duplicate rows).
+The columnar timing includes building the batch from the DataFrame (bulk UTC
+timestamp normalisation), so it covers everything the per-point loop does.
+The "clean" columns time clean() alone; the batch path leaves source_hash
+digests to be computed on first use there. The "pipeline" columns time
+compute_chunk(), which also hashes and JSON-encodes every fetched row for the
+bronze tier and builds the rows run() inserts — the number that matters for a
+module run. Both outputs are compared row by row before timings are reported.
+
+Usage:
+  python3 bench_clean.py                      # 10k, 100k rows
+  python3 bench_clean.py --sizes 100000,1000000
+"""
+import argparse
+import copy
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+import pandas as pd
+
+from qcd_platform.pipeline.base_module import BaseModule, DataPoint
+from qcd_platform.pipeline.datapoint_batch import DataPointBatch
+
+
+class _BenchModule(BaseModule):
+    name = "__bench_clean"
+
+    def fetch(self, symbols=None):
+        return []
+
+
+def make_frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    unique = n - n // 10
+    close = 100 + rng.standard_normal(unique).cumsum()
+    df = pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=unique, freq="min"),
+        "symbol": [f"SYM{i % 2000}" for i in range(unique)],
+        "open": close + rng.standard_normal(unique),
+        "close": close,
+        "volume": rng.integers(1_000, 1_000_000, unique),
+        "exchange": rng.choice(["NYSE", "NASDAQ", "LSE"], unique),
+    })
+    return pd.concat([df, df.sample(n - unique, random_state=3)], ignore_index=True)
+
+
+def make_points(df: pd.DataFrame):
+    stamps = df["date"].dt.to_pydatetime()
+    symbols = df["symbol"].tolist()
+    payloads = df.drop(columns=["date", "symbol"]).to_dict("records")
+    return [DataPoint(ts=t, symbol=s, payload=p) for t, s, p in zip(stamps, symbols, payloads)]
+
+
+def same_output(points, batch) -> bool:
+    return (
+        [p.symbol for p in points] == batch.symbol_list()
+        and [p.ts for p in points] == batch.ts_datetimes()
+        and [p.source_hash for p in points] == list(batch.source_hash)
+        and [p.payload for p in points] == batch.payload_dicts()
+        and [p.quality_score for p in points] == batch.quality_score.tolist()
+    )
+
+
+def same_rows(expected, output) -> bool:
+    """Same bronze and tier rows apart from the ts representation (ISO string vs. datetime)."""
+    return all(
+        [r[1:] for r in getattr(expected, rows)()] == [r[1:] for r in getattr(output, rows)()]
+        for rows in ("bronze_rows", "tier_rows")
+    )
+
+
+def run(sizes):
+    module = _BenchModule()
+    module.module_id = 0
+    print(f"{'rows':>10} {'clean per-point s':>18} {'batch s':>8} {'speedup':>8} "
+          f"{'pipeline per-point s':>21} {'batch s':>8} {'speedup':>8} {'clean rows':>11} identical")
+    for n in sizes:
+        df = make_frame(n)
+        points = make_points(df)
+
+        start = time.perf_counter()
+        expected = module.clean(copy.copy(points))
+        per_point = time.perf_counter() - start
+
+        start = time.perf_counter()
+        clean = module.clean(DataPointBatch.from_frame(df, ts_col="date", symbol_col="symbol"))
+        columnar = time.perf_counter() - start
+
+        points = make_points(df)
+        start = time.perf_counter()
+        expected_output = module.compute_chunk(points, promote=False)
+        pipeline_per_point = time.perf_counter() - start
+
+        start = time.perf_counter()
+        output = module.compute_chunk(DataPointBatch.from_frame(df, ts_col="date", symbol_col="symbol"),
+                                      promote=False)
+        pipeline_columnar = time.perf_counter() - start
+
+        identical = same_output(expected, clean) and same_rows(expected_output, output)
+        print(f"{n:>10} {per_point:>18.3f} {columnar:>8.3f} {per_point / columnar:>7.1f}x "
+              f"{pipeline_per_point:>21.3f} {pipeline_columnar:>8.3f} "
+              f"{pipeline_per_point / pipeline_columnar:>7.1f}x {len(clean):>11} {identical}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BaseModule.clean paths")
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated row counts")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    run([int(s) for s in args.sizes.split(",")])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+DataPointBatch Benchmark — per-row DataPoint lists vs. columnar batches.
+
+For a synthetic OHLCV-style module output, measures:
+  - memory held by the representation (tracemalloc, while building it)
+  - time of BaseModule.compute(): hash → clean → validate → DB row columns
+
+No database is needed; compute() stops before any write.
+
+Usage:
+  python3 bench_datapoint_batch.py                 # 1M rows
+  python3 bench_datapoint_batch.py --rows 100000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+import pandas as pd
+
+from qcd_platform.pipeline.base_module import BaseModule, DataPoint
+from qcd_platform.pipeline.datapoint_batch import DataPointBatch
+
+
+def make_frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    close = 100 + rng.standard_normal(n).cumsum()
+    return pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=n, freq="min", tz="UTC"),
+        "symbol": [f"SYM{i % 5000}" for i in range(n)],
+        "open": close + rng.standard_normal(n),
+        "high": close + 1.0,
+        "low": close - 1.0,
+        "close": close,
+        "volume": rng.integers(1_000, 1_000_000, n),
+    })
+
+
+def build_points(df: pd.DataFrame):
+    stamps = df["date"].dt.to_pydatetime()
+    symbols = df["symbol"].tolist()
+    payloads = df.drop(columns=["date", "symbol"]).to_dict("records")
+    return [DataPoint(ts=t, symbol=s, payload=p) for t, s, p in zip(stamps, symbols, payloads)]
+
+
+def build_batch(df: pd.DataFrame):
+    return DataPointBatch.from_frame(df, ts_col="date", symbol_col="symbol")
+
+
+class _BenchModule(BaseModule):
+    name = "__bench_datapoint_batch"
+
+    def __init__(self, data):
+        super().__init__()
+        self.module_id = 0
+        self._data = data
+
+    def fetch(self, symbols=None):
+        return self._data
+
+
+def measure(label: str, build, df: pd.DataFrame):
+    gc.collect()
+    tracemalloc.start()
+    data = build(df)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    gc.collect()
+
+    data = build(df)  # untraced copy for timing
+    start = time.perf_counter()
+    output = _BenchModule(data).compute()
+    seconds = time.perf_counter() - start
+    print(f"{label:<18} {held / 1e6:>10.1f} {seconds:>10.2f} {len(df) / seconds:>12,.0f} {output.rows_clean:>10}")
+    return held, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DataPoint lists vs. DataPointBatch")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic module output")
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    print(f"{args.rows:,} rows")
+    print(f"{'representation':<18} {'memory MB':>10} {'compute s':>10} {'rows/sec':>12} {'clean rows':>10}")
+    points_mem, points_s = measure("DataPoint list", build_points, df)
+    batch_mem, batch_s = measure("DataPointBatch", build_batch, df)
+    print(f"memory: {points_mem / batch_mem:.1f}x smaller, compute: {points_s / batch_s:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
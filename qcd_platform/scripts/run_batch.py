@@ -25,6 +25,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 from qcd_platform.pipeline.db import execute_query, get_db_pool
 from qcd_platform.pipeline.v1_adapter import V1ModuleAdapter
+from qcd_platform.pipeline import kafka_producer
 from qcd_platform.pipeline.kafka_producer import publish_event
 from qcd_platform.pipeline.redis_cache import set_module_health, publish_update
 
@@ -191,6 +192,8 @@ def run_batch(module_names: list, manifest: dict, max_workers: int = 4) -> list:
 
     logger.info(f"\nBatch complete: {success}/{total} success, {failed} failed")
 
+    kafka_producer.flush(timeout=30)
+
     publish_update("qcd:updates", {
         "type": "batch_complete",
         "total": total,
@@ -108,6 +108,10 @@ def main():
     parser.add_argument("--register-all", action="store_true", help="Register all modules_v2")
     parser.add_argument("--status", action="store_true", help="Show pipeline status")
     parser.add_argument("--workers", type=int, default=4, help="Max parallel workers")
+    parser.add_argument("--process-workers", type=int, default=None,
+                        help="Process pool size for 'cpu' modules (0 = run them on threads)")
+    parser.add_argument("--coalesce-metadata", action="store_true",
+                        help="Write run bookkeeping for the whole batch in one transaction at the end")
 
     args = parser.parse_args()
     modules_dir = os.path.join(os.path.dirname(__file__), "..", "..", "modules_v2")
@@ -120,18 +124,19 @@ def main():
         show_status()
         return
 
-    orch = PipelineOrchestrator(modules_dir=modules_dir, max_workers=args.workers)
+    orch = PipelineOrchestrator(modules_dir=modules_dir, max_workers=args.workers,
+                                process_workers=args.process_workers)
 
     if args.module:
         result = orch.run_module_with_retry(args.module)
         print(json.dumps(result, indent=2, default=str))
     elif args.batch:
-        results = orch.run_overnight(cadences=[args.batch])
+        results = orch.run_overnight(cadences=[args.batch], coalesce_metadata=args.coalesce_metadata)
         for r in results:
             status_icon = "✅" if r["status"] == "success" else "❌"
             print(f"  {status_icon} {r['module']:30s} → {r.get('tier_reached', 'none'):6s} ({r.get('rows_out', 0)} rows, {r.get('duration_ms', 0)}ms)")
     elif args.overnight:
-        results = orch.run_overnight()
+        results = orch.run_overnight(coalesce_metadata=args.coalesce_metadata)
         success = sum(1 for r in results if r["status"] == "success")
         print(f"\nOvernight run complete: {success}/{len(results)} succeeded")
     else:
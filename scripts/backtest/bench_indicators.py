@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: modules/indicators.py against the per-bar loops and pandas calls it replaced.
+Prints per-indicator timings (cold = empty memo cache, warm = cached) and the
+largest relative difference from the old implementation.
+
+Usage: python scripts/backtest/bench_indicators.py [--bars 5000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from modules import indicators
+
+
+def loop_sma(prices, period):
+    sma = np.full(len(prices), np.nan)
+    for i in range(period - 1, len(prices)):
+        sma[i] = np.mean(prices[i - period + 1:i + 1])
+    return sma
+
+
+def loop_std(prices, period):
+    std = np.full(len(prices), np.nan)
+    for i in range(period - 1, len(prices)):
+        std[i] = np.std(prices[i - period + 1:i + 1])
+    return std
+
+
+def loop_ema(prices, period):
+    ema = np.full(len(prices), np.nan)
+    multiplier = 2 / (period + 1)
+    ema[period - 1] = np.mean(prices[:period])
+    for i in range(period, len(prices)):
+        ema[i] = (prices[i] - ema[i-1]) * multiplier + ema[i-1]
+    return ema
+
+
+def loop_rsi(prices, period):
+    deltas = np.diff(prices)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+    avg_gains = np.full(len(prices), np.nan)
+    avg_losses = np.full(len(prices), np.nan)
+    avg_gains[period] = np.mean(gains[:period])
+    avg_losses[period] = np.mean(losses[:period])
+    for i in range(period + 1, len(prices)):
+        avg_gains[i] = (avg_gains[i-1] * (period - 1) + gains[i-1]) / period
+        avg_losses[i] = (avg_losses[i-1] * (period - 1) + losses[i-1]) / period
+    return 100 - (100 / (1 + avg_gains / (avg_losses + 1e-10)))
+
+
+def pandas_rsi(prices, period):
+    delta = prices.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        indicators.clear_cache()
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), out
+
+
+def max_rel_diff(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if not np.array_equal(np.isnan(a), np.isnan(b)):
+        return float("inf")
+    mask = ~np.isnan(a)
+    return float(np.max(np.abs(a[mask] - b[mask]) / np.maximum(np.abs(b[mask]), 1.0), initial=0.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bars", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, args.bars)))
+    series = pd.Series(closes)
+    cases = [
+        ("sma(50) loop", lambda: loop_sma(closes, 50), lambda: indicators.sma(closes, 50)),
+        ("sma(200) loop", lambda: loop_sma(closes, 200), lambda: indicators.sma(closes, 200)),
+        ("rolling_std(20) loop", lambda: loop_std(closes, 20), lambda: indicators.rolling_std(closes, 20)),
+        ("ema(26) loop", lambda: loop_ema(closes, 26), lambda: indicators.ema(closes, 26)),
+        ("wilder_rsi(14) loop", lambda: loop_rsi(closes, 14), lambda: indicators.wilder_rsi(closes, 14)),
+        ("rsi(14) pandas", lambda: pandas_rsi(series, 14), lambda: indicators.rsi(series, 14)),
+        ("ema(26) pandas ewm", lambda: series.ewm(span=26, adjust=False).mean(),
+         lambda: indicators.ema(series, 26, seed="first")),
+        ("rolling_mean(20, 1) pandas", lambda: series.rolling(20, min_periods=1).mean(),
+         lambda: indicators.rolling_mean(series, 20, min_periods=1)),
+    ]
+
+    print(f"{args.bars} bars, best of {args.repeat}")
+    print(f"{'indicator':<28}{'old ms':>10}{'cold ms':>10}{'warm us':>10}{'speedup':>10}{'max rel diff':>14}")
+    for name, old, new in cases:
+        t_old, expected = best_of(old, args.repeat)
+        t_new, got = best_of(new, args.repeat)
+        t0 = time.perf_counter()
+        new()
+        t_warm = time.perf_counter() - t0
+        print(f"{name:<28}{t_old * 1e3:>10.2f}{t_new * 1e3:>10.3f}{t_warm * 1e6:>10.1f}"
+              f"{t_old / t_new:>9.0f}x{max_rel_diff(got, expected):>14.1e}")
+
+
+if __name__ == "__main__":
+    main()
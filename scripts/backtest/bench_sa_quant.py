@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SAQuantReplica.score_batch against score_at_date one (ticker, date) at a time.
+Builds a synthetic price store and yfinance cache (no network), times the per-pair loop
+on a sample of the grid, the batch over the whole grid (cold, then memoised), and checks
+that both give the same composite scores on the sample.
+
+Usage: python scripts/backtest/bench_sa_quant.py [--tickers 1500] [--dates 60] [--workers N] [--sample 300]
+"""
+
+import argparse
+import json
+import pickle
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from modules import sa_quant_replica
+from modules.price_store import PriceStore
+
+SECTORS = ['Technology', 'Healthcare', 'Financials', 'Industrials', 'Energy', 'Consumer Cyclical']
+
+
+def build_cache(root: Path, n_tickers: int, seed: int = 0):
+    """Price store with 5 years of bars and a filled SQLite cache for n_tickers synthetic tickers"""
+    rng = np.random.default_rng(seed)
+    store = PriceStore(root / 'prices')
+    dates = pd.bdate_range('2020-01-02', '2024-12-31')
+    quarters = pd.date_range(end='2024-12-31', periods=20, freq='QE')[::-1]
+    tickers = [f"S{j:04d}" for j in range(n_tickers)]
+    now = datetime.now().isoformat()
+    financials, earnings, upgrades, info = [], [], [], []
+    for j, ticker in enumerate(tickers):
+        close = 30 * np.exp(np.cumsum(rng.normal(rng.normal(0.0005, 0.001), 0.02, len(dates))))
+        store.append(ticker, pd.DataFrame({'Close': close}, index=dates))
+
+        revenue = rng.uniform(1e8, 1e10) * (1 + rng.normal(0.03, 0.08, 5)).cumprod()
+        income = pd.DataFrame([revenue, revenue * rng.uniform(0.2, 0.7), revenue * rng.normal(0.12, 0.1, 5),
+                               revenue * rng.normal(0.08, 0.1, 5)],
+                              index=['Total Revenue', 'Gross Profit', 'EBIT', 'Net Income'], columns=quarters[:5])
+        balance = pd.DataFrame([[rng.uniform(1e7, 1e9)] * 5, rng.normal(5e9, 4e9, 5), rng.uniform(1e10, 5e10, 5)],
+                               index=['Ordinary Shares Number', 'Stockholders Equity', 'Total Assets'],
+                               columns=quarters[:5])
+        cashflow = pd.DataFrame([revenue * rng.normal(0.1, 0.1, 5)], index=['Free Cash Flow'], columns=quarters[:5])
+        history = pd.DataFrame({'surprisePercent': rng.normal(0.03, 0.08, len(quarters))}, index=quarters)
+        actions = pd.DataFrame({'Action': rng.choice(['up', 'down', 'main', 'init'], 80)},
+                               index=pd.DatetimeIndex(np.sort(rng.choice(dates, 80))[::-1]))
+        financials.append((ticker, pickle.dumps(income), pickle.dumps(balance), pickle.dumps(cashflow), now))
+        earnings.append((ticker, pickle.dumps(history), now))
+        upgrades.append((ticker, pickle.dumps(actions), now))
+        info.append((ticker, json.dumps({'sector': SECTORS[j % len(SECTORS)]}), now))
+
+    sa_quant_replica.get_price_store = lambda: store
+    scorer = sa_quant_replica.SAQuantReplica(cache_dir=root / 'cache')
+    conn = sqlite3.connect(scorer.cache_db)
+    conn.executemany('INSERT INTO quarterly_financials VALUES (?, ?, ?, ?, ?)', financials)
+    conn.executemany('INSERT INTO earnings_history VALUES (?, ?, ?)', earnings)
+    conn.executemany('INSERT INTO upgrades_downgrades VALUES (?, ?, ?)', upgrades)
+    conn.executemany('INSERT INTO ticker_info VALUES (?, ?, ?)', info)
+    conn.commit()
+    conn.close()
+    return scorer, tickers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickers", type=int, default=1500)
+    parser.add_argument("--dates", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=None, help="batch processes (default: one per CPU)")
+    parser.add_argument("--sample", type=int, default=300, help="pairs timed with score_at_date")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        scorer, tickers = build_cache(Path(tmp), args.tickers)
+        dates = [d.strftime('%Y-%m-%d') for d in pd.date_range('2022-01-01', periods=args.dates, freq='SMS')]
+        print(f"{args.tickers} tickers x {args.dates} dates = {args.tickers * args.dates} pairs "
+              f"(synthetic cache built in {time.perf_counter() - t0:.1f}s)")
+
+        rng = np.random.default_rng(1)
+        sample = [(tickers[i], dates[k]) for i, k in zip(rng.integers(0, len(tickers), args.sample),
+                                                          rng.integers(0, len(dates), args.sample))]
+        t0 = time.perf_counter()
+        loop = {pair: scorer.score_at_date(*pair)['composite_score'] for pair in sample}
+        per_pair = (time.perf_counter() - t0) / len(sample)
+
+        t0 = time.perf_counter()
+        grades = scorer.score_batch(tickers, dates, workers=args.workers)
+        t_batch = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        scorer.score_batch(tickers, dates, workers=args.workers)
+        t_memo = time.perf_counter() - t0
+
+        batch = grades.set_index(['ticker', 'date'])['composite_score']
+        mismatches = sum(batch[pair] != score for pair, score in loop.items())
+        t_loop = per_pair * args.tickers * args.dates
+        print(f"score_at_date loop   {per_pair * 1e3:8.2f} ms/pair  ~{t_loop:8.1f}s for the grid (from {len(sample)} pairs)")
+        print(f"score_batch          {t_batch / len(grades) * 1e3:8.3f} ms/pair   {t_batch:8.1f}s  ({t_loop / t_batch:.0f}x)")
+        print(f"score_batch memoised {t_memo:27.2f}s")
+        print(f"composite mismatches on the sample: {mismatches}/{len(sample)}")
+
+
+if __name__ == "__main__":
+    main()
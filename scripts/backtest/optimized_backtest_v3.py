@@ -2,6 +2,10 @@
 """
 Comprehensive Optimized Backtest for Alpha Picker V3
 Parameter grid optimization with proper portfolio accounting
+
+Every rebalance date is scored once into a (dates × tickers) score matrix; the
+parameter grid then runs on modules.backtesting_engine.PortfolioBacktester over
+one shared price panel, across worker processes.
 """
 
 import sys
@@ -9,453 +13,73 @@ import os
 sys.path.insert(0, '/home/quant/apps/quantclaw-data')
 
 from modules.alpha_picker import AlphaPickerV3
+from modules.backtesting_engine import EXIT_REASONS, PortfolioBacktester, PricePanel
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
-import yfinance as yf
+from typing import Dict, List, Tuple
 from itertools import product
 import json
-from tqdm import tqdm
 import warnings
 warnings.filterwarnings('ignore')
 
 
-class Position:
-    """Track individual position with pyramiding support"""
-    def __init__(self, ticker: str, entry_date: datetime, entry_price: float, shares: float, score: float):
-        self.ticker = ticker
-        self.entry_date = entry_date
-        self.entry_price = entry_price
-        self.shares = shares
-        self.entry_score = score
-        self.peak_price = entry_price
-        self.pyramids = []  # List of (date, price, shares, cost)
-        
-    @property
-    def total_shares(self) -> float:
-        return self.shares + sum(p[2] for p in self.pyramids)
-    
-    @property
-    def total_cost(self) -> float:
-        base_cost = self.shares * self.entry_price
-        pyramid_cost = sum(p[3] for p in self.pyramids)
-        return base_cost + pyramid_cost
-    
-    @property
-    def avg_entry_price(self) -> float:
-        return self.total_cost / self.total_shares if self.total_shares > 0 else self.entry_price
-    
-    def add_pyramid(self, date: datetime, price: float, amount: float):
-        """Add to position"""
-        shares = amount / price
-        self.pyramids.append((date, price, shares, amount))
-        
-    def current_value(self, current_price: float) -> float:
-        """Current market value"""
-        return self.total_shares * current_price
-    
-    def pnl(self, current_price: float) -> float:
-        """Profit/loss"""
-        return self.current_value(current_price) - self.total_cost
-    
-    def return_pct(self, current_price: float) -> float:
-        """Return percentage based on total cost"""
-        return (current_price / self.avg_entry_price - 1) if self.avg_entry_price > 0 else 0
-
+def build_score_matrix(picker: AlphaPickerV3, rebalance_dates: List[datetime], sa_exclusions: List[str],
+                       min_entry_score: float) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, str]]:
+    """Scores, buy eligibility and sectors for every rebalance date, scored once for all parameter sets
 
-class BacktestEngine:
-    """
-    Comprehensive backtest engine with parameter optimization
+    Candidates are the first 100 prefiltered, non-excluded tickers of each date. Tickers that
+    could have been bought (score >= min_entry_score somewhere) are also scored on every other
+    date, so held positions keep a score for score exits.
     """
-    
-    def __init__(self, 
-                 starting_cash: float = 120000,
-                 position_size: float = 5000,
-                 rebalance_dates: List[datetime] = None,
-                 sa_exclusions: List[str] = None):
-        
-        self.starting_cash = starting_cash
-        self.position_size = position_size
-        self.rebalance_dates = rebalance_dates or []
-        self.sa_exclusions = set(sa_exclusions or [])
-        
-        # Initialize Alpha Picker
-        self.picker = AlphaPickerV3()
-        
-        # State
-        self.cash = starting_cash
-        self.positions: Dict[str, Position] = {}
-        self.closed_trades = []
-        self.equity_curve = []
-        self.rebalance_log = []
-        
-    def get_price(self, ticker: str, date: datetime) -> Optional[float]:
-        """Get historical price for ticker on specific date"""
-        try:
-            stock = yf.Ticker(ticker)
-            # Get data around the date
-            start = date - timedelta(days=7)
-            end = date + timedelta(days=7)
-            hist = stock.history(start=start, end=end)
-            
-            if hist is None or len(hist) == 0:
-                return None
-            
-            # Find closest date
-            hist.index = pd.to_datetime(hist.index).tz_localize(None)
-            closest_idx = hist.index.get_indexer([date], method='nearest')[0]
-            
-            if closest_idx >= 0 and closest_idx < len(hist):
-                return float(hist['Close'].iloc[closest_idx])
-            
-            return None
-        except:
-            return None
-    
-    def get_current_portfolio_value(self, date: datetime) -> float:
-        """Calculate total portfolio value"""
-        positions_value = 0
-        
-        for ticker, pos in self.positions.items():
-            price = self.get_price(ticker, date)
-            if price:
-                positions_value += pos.current_value(price)
-        
-        return self.cash + positions_value
-    
-    def check_exit_criteria(self, ticker: str, pos: Position, current_price: float, 
-                           current_score: float, params: dict, date: datetime) -> Tuple[bool, str]:
-        """Check if position should be closed"""
-        
-        # Stop loss
-        stop_loss = params.get('stop_loss')
-        if stop_loss and pos.return_pct(current_price) <= stop_loss:
-            return True, f"stop_loss_{abs(stop_loss)*100:.0f}pct"
-        
-        # Take profit
-        take_profit = params.get('take_profit')
-        if take_profit and pos.return_pct(current_price) >= take_profit:
-            return True, f"take_profit_{take_profit*100:.0f}pct"
-        
-        # Score-based exit
-        score_exit = params.get('score_exit_threshold')
-        if score_exit and current_score < score_exit:
-            return True, f"score_below_{score_exit}"
-        
-        # Time-based exit
-        max_hold_days = params.get('max_hold_days')
-        if max_hold_days:
-            days_held = (date - pos.entry_date).days
-            if days_held >= max_hold_days:
-                return True, f"max_hold_{max_hold_days}days"
-        
-        # Trailing stop
-        trailing_stop = params.get('trailing_stop')
-        if trailing_stop:
-            # Update peak
-            if current_price > pos.peak_price:
-                pos.peak_price = current_price
-            
-            drawdown = (current_price / pos.peak_price - 1)
-            if drawdown <= trailing_stop:
-                return True, f"trailing_stop_{abs(trailing_stop)*100:.0f}pct"
-        
-        return False, ""
-    
-    def check_pyramid_opportunity(self, ticker: str, pos: Position, current_price: float,
-                                  current_score: float, params: dict) -> Optional[float]:
-        """Check if we should add to position (pyramid)"""
-        pyramid_cfg = params.get('pyramid')
-        if not pyramid_cfg or pyramid_cfg == 'none':
-            return None
-        
-        # Check if score still strong
-        if current_score <= 30:
-            return None
-        
-        current_return = pos.return_pct(current_price)
-        
-        if pyramid_cfg == 'add_2.5k_at_15pct':
-            if current_return >= 0.15 and len(pos.pyramids) == 0:
-                return 2500
-        
-        elif pyramid_cfg == 'add_2.5k_at_15_and_30pct':
-            if current_return >= 0.30 and len(pos.pyramids) == 1:
-                return 2500
-            elif current_return >= 0.15 and len(pos.pyramids) == 0:
-                return 2500
-        
-        elif pyramid_cfg == 'double_down_5k_at_20pct':
-            if current_return >= 0.20 and len(pos.pyramids) == 0:
-                return 5000
-        
-        return None
-    
-    def run_backtest(self, params: dict, verbose: bool = False) -> dict:
-        """Run single backtest with given parameters"""
-        
-        # Reset state
-        self.cash = self.starting_cash
-        self.positions = {}
-        self.closed_trades = []
-        self.equity_curve = []
-        self.rebalance_log = []
-        
-        if verbose:
-            print(f"\nRunning backtest with params: {params}")
-        
-        # Track metrics
-        peak_value = self.starting_cash
-        max_drawdown = 0
-        
-        for date in self.rebalance_dates:
-            if verbose:
-                print(f"\n{'='*60}")
-                print(f"Rebalance date: {date.strftime('%Y-%m-%d')}")
-            
-            # Score all existing positions
-            positions_to_close = []
-            positions_to_pyramid = []
-            
-            for ticker, pos in self.positions.items():
-                current_price = self.get_price(ticker, date)
-                if not current_price:
-                    if verbose:
-                        print(f"  Warning: No price for {ticker}, skipping")
-                    continue
-                
-                # Score the stock
-                result = self.picker.score_stock(ticker, as_of_date=date)
-                current_score = result.get('score', 0)
-                
-                # Check exit criteria
-                should_exit, exit_reason = self.check_exit_criteria(
-                    ticker, pos, current_price, current_score, params, date
-                )
-                
-                if should_exit:
-                    positions_to_close.append((ticker, pos, current_price, exit_reason))
-                else:
-                    # Check pyramid opportunity
-                    pyramid_amount = self.check_pyramid_opportunity(
-                        ticker, pos, current_price, current_score, params
-                    )
-                    if pyramid_amount and self.cash >= pyramid_amount:
-                        positions_to_pyramid.append((ticker, pos, current_price, pyramid_amount))
-            
-            # Close positions
-            for ticker, pos, exit_price, exit_reason in positions_to_close:
-                pnl = pos.pnl(exit_price)
-                ret_pct = pos.return_pct(exit_price)
-                hold_days = (date - pos.entry_date).days
-                
-                self.cash += pos.current_value(exit_price)
-                
-                self.closed_trades.append({
-                    'ticker': ticker,
-                    'entry_date': pos.entry_date.strftime('%Y-%m-%d'),
-                    'exit_date': date.strftime('%Y-%m-%d'),
-                    'entry_price': pos.avg_entry_price,
-                    'exit_price': exit_price,
-                    'shares': pos.total_shares,
-                    'cost': pos.total_cost,
-                    'pnl': pnl,
-                    'return_pct': ret_pct,
-                    'hold_days': hold_days,
-                    'exit_reason': exit_reason
-                })
-                
-                del self.positions[ticker]
-                
-                if verbose:
-                    print(f"  CLOSE {ticker}: {ret_pct:+.1%} ({exit_reason}) | Hold: {hold_days}d | P&L: ${pnl:,.0f}")
-            
-            # Pyramid positions
-            for ticker, pos, price, amount in positions_to_pyramid:
-                pos.add_pyramid(date, price, amount)
-                self.cash -= amount
-                
-                if verbose:
-                    print(f"  PYRAMID {ticker}: +${amount:,.0f} @ ${price:.2f} | Return: {pos.return_pct(price):+.1%}")
-            
-            # Score universe and find new picks
-            max_positions = params.get('max_positions', 999)
-            max_per_sector = params.get('max_per_sector', 999)
-            min_score = params.get('min_entry_score', 25)
-            cash_reserve_pct = params.get('cash_reserve_pct', 0)
-            
-            positions_to_open = max(0, max_positions - len(self.positions))
-            
-            if positions_to_open > 0:
-                # Calculate available cash
-                total_value = self.get_current_portfolio_value(date)
-                min_cash = total_value * cash_reserve_pct
-                available_cash = max(0, self.cash - min_cash)
-                
-                max_new_positions = min(positions_to_open, int(available_cash / self.position_size))
-                
-                if max_new_positions > 0:
-                    # Pre-filter universe
-                    candidates = self.picker.prefilter_universe(min_6m_return=0.05, as_of_date=date, verbose=False)
-                    
-                    # Remove SA exclusions and existing positions
-                    candidates = [t for t in candidates if t not in self.sa_exclusions and t not in self.positions]
-                    
-                    if verbose:
-                        print(f"  Candidates after filter: {len(candidates)}")
-                    
-                    # Score candidates
-                    scored = []
-                    for ticker in candidates[:100]:  # Limit to top 100 for speed
-                        result = self.picker.score_stock(ticker, as_of_date=date)
-                        if result['score'] >= min_score:
-                            scored.append(result)
-                    
-                    # Sort by score
-                    scored.sort(key=lambda x: x['score'], reverse=True)
-                    
-                    # Check sector limits
-                    sector_counts = {}
-                    for ticker, pos in self.positions.items():
-                        result = self.picker.score_stock(ticker, as_of_date=date)
-                        sector = result.get('sector', 'Unknown')
-                        sector_counts[sector] = sector_counts.get(sector, 0) + 1
-                    
-                    # Open new positions
-                    opened = 0
-                    for result in scored:
-                        if opened >= max_new_positions:
-                            break
-                        
-                        ticker = result['ticker']
-                        sector = result.get('sector', 'Unknown')
-                        
-                        # Check sector limit
-                        if sector_counts.get(sector, 0) >= max_per_sector:
-                            continue
-                        
-                        # Get entry price
-                        entry_price = self.get_price(ticker, date)
-                        if not entry_price:
-                            continue
-                        
-                        # Open position
-                        shares = self.position_size / entry_price
-                        pos = Position(ticker, date, entry_price, shares, result['score'])
-                        self.positions[ticker] = pos
-                        self.cash -= self.position_size
-                        
-                        sector_counts[sector] = sector_counts.get(sector, 0) + 1
-                        opened += 1
-                        
-                        if verbose:
-                            print(f"  OPEN {ticker}: Score={result['score']:.1f} | ${entry_price:.2f} | {shares:.1f} shares | Sector={sector}")
-            
-            # Record equity curve
-            portfolio_value = self.get_current_portfolio_value(date)
-            self.equity_curve.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'portfolio_value': portfolio_value,
-                'cash': self.cash,
-                'positions_value': portfolio_value - self.cash,
-                'num_positions': len(self.positions)
-            })
-            
-            # Update drawdown
-            if portfolio_value > peak_value:
-                peak_value = portfolio_value
-            
-            current_drawdown = (portfolio_value / peak_value - 1) if peak_value > 0 else 0
-            max_drawdown = min(max_drawdown, current_drawdown)
-            
-            # Sanity check
-            calculated_value = self.cash + sum(
-                pos.current_value(self.get_price(ticker, date) or 0) 
-                for ticker, pos in self.positions.items()
-            )
-            
-            if abs(calculated_value - portfolio_value) > 1:
-                print(f"  WARNING: Portfolio accounting mismatch! Calculated={calculated_value:.2f}, Recorded={portfolio_value:.2f}")
-        
-        # Close all remaining positions at end
-        final_date = self.rebalance_dates[-1]
-        for ticker, pos in list(self.positions.items()):
-            exit_price = self.get_price(ticker, final_date)
-            if exit_price:
-                pnl = pos.pnl(exit_price)
-                ret_pct = pos.return_pct(exit_price)
-                hold_days = (final_date - pos.entry_date).days
-                
-                self.cash += pos.current_value(exit_price)
-                
-                self.closed_trades.append({
-                    'ticker': ticker,
-                    'entry_date': pos.entry_date.strftime('%Y-%m-%d'),
-                    'exit_date': final_date.strftime('%Y-%m-%d'),
-                    'entry_price': pos.avg_entry_price,
-                    'exit_price': exit_price,
-                    'shares': pos.total_shares,
-                    'cost': pos.total_cost,
-                    'pnl': pnl,
-                    'return_pct': ret_pct,
-                    'hold_days': hold_days,
-                    'exit_reason': 'backtest_end'
-                })
-        
-        self.positions = {}
-        
-        # Calculate metrics
-        final_value = self.cash
-        total_return = (final_value / self.starting_cash - 1)
-        
-        # Calculate annualized return
-        days = (self.rebalance_dates[-1] - self.rebalance_dates[0]).days
-        years = days / 365.25
-        annualized_return = (1 + total_return) ** (1 / years) - 1 if years > 0 else 0
-        
-        # Calculate Sharpe ratio
-        if len(self.equity_curve) > 1:
-            returns = []
-            for i in range(1, len(self.equity_curve)):
-                prev_val = self.equity_curve[i-1]['portfolio_value']
-                curr_val = self.equity_curve[i]['portfolio_value']
-                ret = (curr_val / prev_val - 1) if prev_val > 0 else 0
-                returns.append(ret)
-            
-            if len(returns) > 0 and np.std(returns) > 0:
-                sharpe = np.mean(returns) / np.std(returns) * np.sqrt(24)  # 24 rebalances per year
-            else:
-                sharpe = 0
-        else:
-            sharpe = 0
-        
-        # Win rate
-        winning_trades = [t for t in self.closed_trades if t['return_pct'] > 0]
-        win_rate = len(winning_trades) / len(self.closed_trades) if self.closed_trades else 0
-        
-        # Avg win/loss
-        avg_win = np.mean([t['return_pct'] for t in winning_trades]) if winning_trades else 0
-        losing_trades = [t for t in self.closed_trades if t['return_pct'] <= 0]
-        avg_loss = np.mean([t['return_pct'] for t in losing_trades]) if losing_trades else 0
-        
-        results = {
-            'params': params,
-            'final_value': final_value,
-            'total_return': total_return,
-            'annualized_return': annualized_return,
-            'sharpe_ratio': sharpe,
-            'max_drawdown': max_drawdown,
-            'num_trades': len(self.closed_trades),
-            'win_rate': win_rate,
-            'avg_win': avg_win,
-            'avg_loss': avg_loss,
-            'avg_hold_days': np.mean([t['hold_days'] for t in self.closed_trades]) if self.closed_trades else 0,
-            'equity_curve': self.equity_curve,
-            'trades': self.closed_trades
-        }
-        
-        return results
+    exclusions = set(sa_exclusions)
+    scorer = picker.point_in_time()
+    candidates = {date: [t for t in scorer.prefilter(date, min_6m_return=0.05) if t not in exclusions][:100]
+                  for date in rebalance_dates}
+    tickers = list(dict.fromkeys(t for names in candidates.values() for t in names))
+    scores = scorer.scores(rebalance_dates, tickers).set_axis(rebalance_dates)
+    eligible = pd.DataFrame(False, index=scores.index, columns=scores.columns)
+    for date, names in candidates.items():
+        eligible.loc[date, names] = True
+
+    # Keep the candidates' scores, and every date's score of the tickers that could be bought
+    buyable = (eligible & (scores >= min_entry_score)).any()
+    scores = scores.astype(float).where(eligible | buyable)
+    sectors = {t: scorer.sector(t) if (scores[t] > -999).any() else 'Unknown' for t in scores.columns}
+    return scores, eligible, sectors
+
+
+def to_report(result: Dict) -> Dict:
+    """Portfolio metrics under the names this report has always used"""
+    m = result['metrics']
+    return {
+        'params': result['params'],
+        'final_value': m['final_value'],
+        'total_return': m['total_return'],
+        'annualized_return': m['cagr'],
+        'sharpe_ratio': m['sharpe_ratio'],
+        'max_drawdown': -m['max_drawdown'],
+        'num_trades': m['num_trades'],
+        'win_rate': m['win_rate'],
+        'avg_win': m['avg_win'],
+        'avg_loss': m['avg_loss'],
+        'avg_hold_days': m['avg_holding_period'],
+    }
+
+
+def equity_at_rebalances(backtester: PortfolioBacktester, run) -> List[Dict]:
+    """Portfolio value, cash and open positions after each rebalance"""
+    curve = []
+    for date, bar in zip(backtester.rebalance_dates, backtester.arrays['rows']):
+        still_open = (run.trades['exit_row'] > bar) | (run.trades['reason'] == EXIT_REASONS.index('backtest_end'))
+        open_ = (run.trades['entry_row'] <= bar) & still_open
+        curve.append({
+            'date': pd.Timestamp(date).strftime('%Y-%m-%d'),
+            'portfolio_value': float(run.equity[bar]),
+            'cash': float(run.equity[bar] - run.invested[bar]),
+            'positions_value': float(run.invested[bar]),
+            'num_positions': int(open_.sum())
+        })
+    return curve
 
 
 def generate_rebalance_dates(start: str, end: str) -> List[datetime]:
@@ -621,28 +245,33 @@ def main():
     print("\nGenerating parameter grid...")
     param_grid = generate_parameter_grid()
     
+    # Score every rebalance date once
+    print("\nScoring universe at each rebalance date...")
+    picker = AlphaPickerV3()
+    scores, eligible, sectors = build_score_matrix(
+        picker, rebalance_dates, sa_exclusions,
+        min_entry_score=min(p.get('min_entry_score', 25) for p in param_grid)
+    )
+    print(f"Scored {scores.shape[1]} tickers, {int(eligible.values.sum())} buy candidates")
+    
+    # Load prices once; the last rebalance date is the last bar
+    print("\nLoading price panel...")
+    panel = PricePanel.from_store(
+        list(scores.columns),
+        rebalance_dates[0] - timedelta(days=10),
+        rebalance_dates[-1] + timedelta(days=1)
+    )
+    backtester = PortfolioBacktester(
+        panel, scores, eligible, sectors,
+        initial_cash=120000,
+        position_size=5000,
+        commission=0.0,
+        slippage=0.0
+    )
+    
     # Run optimization
     print(f"\nRunning {len(param_grid)} backtests...")
-    print("This will take a while...\n")
-    
-    results = []
-    
-    for i, params in enumerate(tqdm(param_grid, desc="Backtests")):
-        engine = BacktestEngine(
-            starting_cash=120000,
-            position_size=5000,
-            rebalance_dates=rebalance_dates,
-            sa_exclusions=sa_exclusions
-        )
-        
-        result = engine.run_backtest(params, verbose=False)
-        results.append(result)
-        
-        # Print progress every 10
-        if (i + 1) % 10 == 0:
-            best_so_far = max(results, key=lambda x: x['sharpe_ratio'])
-            print(f"\nProgress: {i+1}/{len(param_grid)}")
-            print(f"Best Sharpe so far: {best_so_far['sharpe_ratio']:.3f} (Return: {best_so_far['annualized_return']:.1%})")
+    results = [to_report(r) for r in backtester.evaluate(param_grid, 'sharpe_ratio')]
     
     # Sort by Sharpe ratio (with return > 50% filter)
     qualified = [r for r in results if r['annualized_return'] > 0.50]
@@ -680,6 +309,9 @@ def main():
     print("Saving results...")
     
     best = qualified[0] if qualified else results[0]
+    best_run = backtester.run(best['params'])
+    best['equity_curve'] = equity_at_rebalances(backtester, best_run)
+    best['trades'] = best_run.trade_records()
     
     output = {
         'optimization_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: indexed AlertEngine.check_alerts against scanning every rule on every tick.
+Builds synthetic rules (thresholds around each symbol's starting values) and random-walk
+ticks for every symbol, times both per tick, and checks that they trigger the same alerts.
+
+Usage: python scripts/bench_smart_alerts.py [--rules 100000] [--symbols 5000] [--ticks 20]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import smart_alerts
+from modules.smart_alerts import AlertEngine, AlertRule
+
+FIELDS = ['price', 'volume', 'rsi']
+
+
+def legacy_evaluate(condition: str, data: dict):
+    """evaluate_condition before the index: parse the condition string on every call"""
+    for op in ['>=', '<=', '>', '<', '==', '!=']:
+        if op in condition:
+            field, value = condition.split(op)
+            field = field.strip().lower()
+            target = float(value.strip())
+            if field not in data:
+                return False, None
+            current = data[field]
+            result = {'>': current > target, '<': current < target, '>=': current >= target,
+                      '<=': current <= target, '==': abs(current - target) < 0.01,
+                      '!=': abs(current - target) >= 0.01}[op]
+            return result, current if result else None
+    return False, None
+
+
+def full_scan(engine, rules, market_data, now):
+    """check_alerts before the index: every active rule on every tick (delivery and saving skipped)"""
+    fired = []
+    for alert in rules:
+        if not alert.active or alert.symbol not in market_data:
+            continue
+        hit, value = legacy_evaluate(alert.condition, market_data[alert.symbol])
+        if not hit or not engine.can_trigger(alert, now)[0]:
+            continue
+        alert.last_triggered = now.isoformat()
+        alert.trigger_count_hour += 1
+        alert.trigger_count_total += 1
+        fired.append((alert.id, value))
+    return fired
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rules', type=int, default=100_000)
+    parser.add_argument('--symbols', type=int, default=5_000)
+    parser.add_argument('--ticks', type=int, default=20)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp())
+    smart_alerts.ALERTS_DIR = root
+    smart_alerts.ALERTS_FILE = root / 'alerts.json'
+    smart_alerts.ALERTS_JOURNAL = root / 'alerts_journal.jsonl'
+    smart_alerts.HISTORY_FILE = root / 'alert_history.jsonl'
+    smart_alerts.LEGACY_HISTORY_FILE = root / 'alert_history.json'
+
+    rng = np.random.default_rng(0)
+    symbols = [f"S{j:05d}" for j in range(args.symbols)]
+    values = {'price': rng.uniform(10, 500, args.symbols), 'volume': rng.uniform(1e5, 1e7, args.symbols),
+              'rsi': rng.uniform(20, 80, args.symbols)}
+    ops = ['>', '<', '>=', '<=']
+    rules = []
+    for i in range(args.rules):
+        j, field = int(rng.integers(args.symbols)), FIELDS[i % 3]
+        threshold = round(values[field][j] * rng.uniform(0.8, 1.2), 2)
+        rules.append(AlertRule(id=f"a{i:06d}", symbol=symbols[j], condition=f"{field}{ops[i % 4]}{threshold}",
+                               channels=[]))
+
+    engine = AlertEngine()
+    engine.alerts = [AlertRule(**asdict(r)) for r in rules]
+    started = time.perf_counter()
+    engine.reindex()
+    print(f"{args.rules:,} rules on {args.symbols:,} symbols, indexed in {time.perf_counter() - started:.2f}s")
+
+    now = datetime(2025, 1, 6, 14, 30)
+    indexed_times, scan_times, fired = [], [], 0
+    for tick in range(args.ticks):
+        now += timedelta(minutes=1)
+        for field, scale in [('price', 0.004), ('volume', 0.05), ('rsi', 0.02)]:
+            values[field] = values[field] * np.exp(rng.normal(0, scale, args.symbols))
+        market_data = {s: {f: float(values[f][j]) for f in FIELDS} for j, s in enumerate(symbols)}
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            got = [(t.alert_id, t.triggered_value) for t in engine.check_alerts(market_data, now=now)]
+        indexed_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        expected = full_scan(engine, rules, market_data, now)
+        scan_times.append(time.perf_counter() - started)
+
+        assert got == expected, f"tick {tick}: indexed and full scan differ"
+        fired += len(got)
+
+    # the first tick tests every rule against the symbols' first values
+    print(f"first tick: indexed {indexed_times[0] * 1000:.1f}ms, full scan {scan_times[0] * 1000:.1f}ms")
+    indexed, scan = np.median(indexed_times[1:]), np.median(scan_times[1:])
+    print(f"per tick (median of {args.ticks - 1}): indexed {indexed * 1000:.1f}ms, "
+          f"full scan {scan * 1000:.1f}ms ({scan / indexed:.0f}x)")
+    print(f"{fired:,} triggers, identical on every tick")
+
+    # what the old check_alerts wrote after every tick that triggered anything
+    started = time.perf_counter()
+    with open(root / 'legacy_alerts.json', 'w') as f:
+        json.dump([asdict(alert) for alert in rules], f, indent=2)
+    with open(root / 'legacy_history.json', 'w') as f:
+        json.dump([asdict(trigger) for trigger in engine.history], f, indent=2)
+    print(f"full scan's rewrite of alerts.json and alert_history.json per triggering tick (not timed above): "
+          f"{time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,28 @@
 #!/usr/bin/env python3
-"""Download full US stock universe to local cache."""
-import yfinance as yf
-import os, sys, warnings, time
+"""Bring the full US stock universe up to date in the shared price store (modules/price_store.py).
+
+Only missing bars are requested: each ticker's gap since its last stored bar,
+in multi-ticker batches over a small thread pool. New tickers get their full
+history; tickers whose split/dividend adjustment changed are re-based.
+"""
+import os, sys, warnings
 warnings.filterwarnings('ignore')
 
-cache_dir = '/home/quant/apps/quantclaw-data/data/price_cache'
-os.makedirs(cache_dir, exist_ok=True)
-existing = set(f.replace('.csv','') for f in os.listdir(cache_dir) if f.endswith('.csv'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from qcd_platform.pipeline.rate_limiter import get_rate_limiter
+from modules.price_store import get_price_store, import_csv_dir
+
+BATCH_SIZE = 50   # tickers per Yahoo request
+WORKERS = 4       # concurrent requests (all draw on the shared Yahoo rate limit)
+
+store = get_price_store()
+# One-time migration of the per-ticker CSVs this script used to write
+legacy_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "price_cache")
+if os.path.isdir(legacy_dir):
+    imported = import_csv_dir(store, legacy_dir)
+    if imported:
+        print(f"Imported {imported} tickers from legacy CSV cache {legacy_dir}")
+existing = set(store.tickers())
 
 # S&P 500 + NASDAQ 100 + Major ETFs + Popular stocks
 ALL_TICKERS = [
@@ -92,39 +108,24 @@ ALL_TICKERS = [
 # Deduplicate
 tickers = list(dict.fromkeys(ALL_TICKERS))
 new = [t for t in tickers if t not in existing]
-print(f"Total unique: {len(tickers)} | Already cached: {len(existing)} | New to download: {len(new)}")
+print(f"Total unique: {len(tickers)} | Already stored: {len(tickers) - len(new)} | New to download: {len(new)}")
+
 
-downloaded = 0
-failed = 0
-total_rows = 0
-batch_size = 10
+def progress(report):
+    if report.requests % 5 == 0:
+        print(f"  Progress: {report.requests} batches, {report.tickers} tickers, {report.bars_added:,} bars so far...")
 
-for i, t in enumerate(new):
-    try:
-        data = yf.download(t, period='max', interval='1d', progress=False)
-        if data.empty:
-            failed += 1
-            continue
-        if hasattr(data.columns, 'levels') and len(data.columns.levels) > 1:
-            data.columns = data.columns.get_level_values(0)
-        outpath = os.path.join(cache_dir, f'{t}.csv')
-        data.to_csv(outpath)
-        rows = len(data)
-        total_rows += rows
-        downloaded += 1
-        if downloaded % 50 == 0:
-            print(f"  Progress: {downloaded}/{len(new)} downloaded, {total_rows:,} rows so far...")
-    except Exception as e:
-        failed += 1
 
-    # Rate limit - small pause every 10
-    if (i+1) % batch_size == 0:
-        time.sleep(0.5)
+report = store.refresh(tickers, batch_size=BATCH_SIZE, workers=WORKERS, progress=progress)
+waited = sum(w["wait_s"] for w in get_rate_limiter().wait_report().values())
 
-print(f"\n=== DONE: {downloaded} new + {len(existing)} existing = {downloaded + len(existing)} total tickers ===")
-print(f"New rows: {total_rows:,} | Failed: {failed}")
+print(f"\n=== DONE: {report.summary()} ===")
+print(f"Rate limit wait: {waited:.1f}s")
+if report.rebased:
+    print(f"Re-based (split/dividend adjustment changed): {', '.join(report.rebased)}")
+if report.failed:
+    print(f"Failed: {', '.join(report.failed)}")
 
-# Total cache stats
-all_files = [f for f in os.listdir(cache_dir) if f.endswith('.csv')]
-total_size = sum(os.path.getsize(os.path.join(cache_dir, f)) for f in all_files)
-print(f"Cache: {len(all_files)} files, {total_size/1024/1024:.1f} MB")
+# Total store stats
+total_size = sum(f.stat().st_size for f in store.root.glob("*/*.bin"))
+print(f"Store: {len(store.tickers())} tickers, {total_size/1024/1024:.1f} MB at {store.root}")
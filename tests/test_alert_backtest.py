@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Alert backtest tests: condition masks and the grouped metrics match the row-by-row
+backtest, and a parallel multi-symbol scan matches scanning one symbol at a time.
+Run: python -m pytest tests/test_alert_backtest.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+pytest.importorskip("yfinance")
+from modules import alert_backtest
+from modules.alert_backtest import COMMON_CONDITIONS, METRICS
+
+CONDITIONS = COMMON_CONDITIONS + ['rsi>50', 'sma_50<=sma_20', 'macd>0', 'macd_hist>=0', 'sma_20>sma_50',
+                                  'volume_ratio==1', 'price>sma_50', 'rsi<0']
+
+
+def synthetic_frame(seed, days=320):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=days)
+    close = 80 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, days)))
+    spread = close * rng.uniform(0.005, 0.03, days)
+    volume = rng.lognormal(14, 0.6, days)
+    volume[::37] = np.nan
+    return alert_backtest.add_indicators(pd.DataFrame({'Open': close, 'High': close + spread, 'Low': close - spread,
+                                                       'Close': close, 'Volume': volume}, index=dates))
+
+
+@pytest.fixture
+def frames(monkeypatch):
+    frames = {f"S{j}": synthetic_frame(j) for j in range(6)}
+
+    def fetch(symbol, period='1y'):
+        if symbol not in frames:
+            raise Exception(f"Error fetching data for {symbol}: No data found for {symbol}")
+        return frames[symbol].copy()
+
+    monkeypatch.setattr(alert_backtest, 'fetch_data_with_indicators', fetch)
+    return frames
+
+
+def reference_backtest(df, condition):
+    """backtest_alert as it was: evaluate_condition on every row, metrics from the signal list"""
+    indicator, operator, threshold = alert_backtest.parse_condition(condition)
+    long = alert_backtest.determine_direction(condition) == 'long'
+    signals = []
+    for idx, row in df.iterrows():
+        if alert_backtest.evaluate_condition(row, indicator, operator, threshold) and pd.notna(row['fwd_return_1d']):
+            fwd = [row['fwd_return_1d'], row['fwd_return_5d'], row['fwd_return_20d']]
+            signals.append((idx.strftime('%Y-%m-%d'), fwd[0] * 100,
+                            *[pd.notna(f) and (f > 0) == long for f in fwd]))
+    if not signals:
+        return [], dict.fromkeys(METRICS, 0.0)
+    n = len(signals)
+    hit_1d, hit_5d = sum(s[2] for s in signals) / n, sum(s[3] for s in signals) / n
+    wins = [s[1] for s in signals if s[2]]
+    losses = [s[1] for s in signals if not s[2]]
+    pf = sum(wins) / abs(sum(losses)) if losses and abs(sum(losses)) > 0 else 0.0
+    returns = [s[1] / 100 for s in signals]
+    cumulative = np.cumsum(returns)
+    return signals, {
+        'total_signals': n, 'hit_rate_1d': hit_1d, 'hit_rate_5d': hit_5d,
+        'hit_rate_20d': sum(s[4] for s in signals) / n, 'false_positive_rate': 1 - hit_1d,
+        'false_negative_rate': 0.0, 'avg_win': np.mean(wins) if wins else 0.0,
+        'avg_loss': np.mean(losses) if losses else 0.0, 'profit_factor': pf,
+        'signal_quality_score': hit_1d * 40 + min(pf / 3.0, 1.0) * 30 + (1 - abs(hit_5d - hit_1d)) * 30,
+        'sharpe_ratio': np.mean(returns) / np.std(returns) * np.sqrt(252)
+        if n > 1 and np.std(returns) > 0 else 0.0,
+        'max_drawdown': abs(np.min(cumulative - np.maximum.accumulate(cumulative))),
+    }
+
+
+def test_grouped_stats_match_the_row_loop(frames):
+    df = frames['S1']
+    stats = alert_backtest.condition_stats(df, CONDITIONS)
+    assert list(stats.index) == CONDITIONS and list(stats.columns) == METRICS
+    assert stats.loc['rsi<30', 'total_signals'] > 0 and stats.loc['rsi<0', 'total_signals'] == 0
+    for condition in CONDITIONS:
+        signals, expected = reference_backtest(df, condition)
+        assert stats.loc[condition].to_dict() == pytest.approx(expected, rel=1e-9, abs=1e-12), condition
+
+        result = alert_backtest.backtest_alert('S1', condition)
+        assert [(s.date, s.actual_move_1d, s.hit_1d, s.hit_5d, s.hit_20d) for s in result.signals] == signals
+        assert {m: getattr(result, m) for m in METRICS} == stats.loc[condition].to_dict()
+    with pytest.raises(ValueError):
+        alert_backtest.condition_mask(df, 'rsi>nope')
+
+
+def test_signal_quality_fetches_once(frames, monkeypatch):
+    calls = []
+    fetch = alert_backtest.fetch_data_with_indicators
+    monkeypatch.setattr(alert_backtest, 'fetch_data_with_indicators', lambda *a: calls.append(a) or fetch(*a))
+    result = alert_backtest.signal_quality_analysis('S2', conditions=COMMON_CONDITIONS + ['rsi>nope', 'bogus'])
+    assert calls == [('S2', '1y')] and result['conditions_tested'] == len(COMMON_CONDITIONS) + 2
+
+    expected = [(c, reference_backtest(frames['S2'], c)[1]) for c in COMMON_CONDITIONS]
+    expected = sorted([e for e in expected if e[1]['total_signals']], key=lambda e: -e[1]['signal_quality_score'])
+    assert [t['condition'] for t in result['top_conditions']] == [c for c, _ in expected]
+    assert [t['quality_score'] for t in result['top_conditions']] == \
+        pytest.approx([e['signal_quality_score'] for _, e in expected])
+    assert alert_backtest.signal_quality_analysis('NOPE')['top_conditions'] == []
+
+
+def test_parallel_scan_matches_serial(frames, capsys):
+    symbols = list(frames) + ['NOPE']
+    serial = alert_backtest.scan_conditions(symbols, CONDITIONS, workers=1)
+    assert list(serial['symbol'].unique()) == list(frames) and len(serial) == len(frames) * len(CONDITIONS)
+    assert 'NOPE' in capsys.readouterr().err
+    pd.testing.assert_frame_equal(alert_backtest.scan_conditions(symbols, CONDITIONS, workers=4), serial)
+
+    one = serial[serial['symbol'] == 'S3'].set_index('condition')[METRICS]
+    pd.testing.assert_frame_equal(one, alert_backtest.condition_stats(frames['S3'], CONDITIONS))
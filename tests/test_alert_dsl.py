@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Alert DSL tests: the compiler shares sub-expressions and respects precedence, and a
+universe scan over one price-store panel agrees with evaluating each ticker's own bars.
+Run: python -m pytest tests/test_alert_dsl.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+pytest.importorskip("yfinance")
+from modules import alert_dsl, price_store
+from modules.alert_dsl import Compare, Indicator, Logical, compile_expression
+from modules.price_store import PriceStore
+
+EXPRESSIONS = [
+    'rsi < 40',
+    'rsi(7) < 30 OR rsi(7) > 70',
+    'price > 50 AND volume > 1.5M',
+    'sma(5) crosses_above sma(20) OR sma(5) crosses_below sma(20)',
+    'price > bb_upper() OR price < bb_lower(10, 1.5)',
+    'macd_signal == "bullish" AND change_pct(5d) > 2',
+    'macd() > 0 && ema(10) > price',
+    '(atr > 1 OR obv < 0) AND change_pct(1d) >= -1%',
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Synthetic OHLCV store up to today: some tickers listed late, one stale, some sessions missing"""
+    rng = np.random.default_rng(9)
+    store = PriceStore(tmp_path)
+    dates = pd.bdate_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=1), periods=260)
+    for j in range(24):
+        close = 50 * np.exp(np.cumsum(rng.normal(0.0005, 0.025, len(dates))))
+        close[-1] = 50.0 + j
+        spread = close * rng.uniform(0.005, 0.03, len(dates))
+        frame = pd.DataFrame({'Open': close, 'High': close + spread, 'Low': close - spread, 'Close': close,
+                              'Volume': rng.uniform(5e5, 3e6, len(dates))}, index=dates)
+        first = int(rng.integers(120, 230)) if j % 5 == 2 else 0
+        last = len(dates) - 7 if j == 3 else len(dates)
+        keep = rng.random(len(dates)) >= 0.02   # sessions the ticker has no bar for
+        keep[-3] &= j % 4 != 1                  # ... including one just before the last bar
+        store.append(f"T{j:02d}", frame[keep].iloc[first:last])
+    return store
+
+
+def test_compiler_shares_nodes_and_binds_and_tighter():
+    compiled = compile_expression('rsi < 25 OR rsi(14) > 75 AND volume > 1M')
+    assert compiled.indicators == [Indicator('rsi', (14,)), Indicator('volume')]
+    assert isinstance(compiled.tree, Logical) and compiled.tree.op == 'OR'
+    assert compiled.tree.terms[1] == Logical('AND', (Compare('>', Indicator('rsi', (14,)), alert_dsl.Number(75)),
+                                                     Compare('>', Indicator('volume'), alert_dsl.Number(1e6))))
+    grouped = compile_expression('(rsi < 25 OR rsi > 75) AND volume > 1M')
+    assert grouped.tree.op == 'AND' and grouped.tree.terms[0].op == 'OR'
+    assert compile_expression('rsi < 25') is compile_expression('rsi < 25')
+    assert compile_expression('atr(20) > 1').fields == ['High', 'Low', 'Close']
+    for bad in ['rsi <', 'rsi 25', 'foo > 1', 'rsi(1, 2) > 3', '(rsi < 25', 'price', 'price > 1 AND']:
+        with pytest.raises(ValueError):
+            compile_expression(bad)
+
+
+def test_shared_subexpressions_are_computed_once(store, monkeypatch):
+    calls = []
+    sma = alert_dsl.INDICATORS['sma']
+    monkeypatch.setitem(alert_dsl.INDICATORS, 'sma', (lambda ev, period: calls.append(period) or sma[0](ev, period),)
+                        + sma[1:])
+    compiled = compile_expression('price > bb_upper() OR price < bb_lower() OR sma(20) crosses_above sma(50)')
+    compiled.mask(alert_dsl.load_panel(store.tickers(), compiled.fields, store=store))
+    assert sorted(calls) == [20, 50]
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_scan_matches_per_ticker_evaluation(store, monkeypatch, expression):
+    loads = []
+    load_panel = alert_dsl.load_panel
+    monkeypatch.setattr(alert_dsl, 'load_panel', lambda *args, **kwargs: loads.append(kwargs['start']) or
+                        load_panel(*args, **kwargs))
+    universe = store.tickers() + ['NOPE']
+    monkeypatch.setattr(store, 'refresh', lambda tickers: loads.append(list(tickers)))
+
+    results = alert_dsl.scan_universe(expression, universe, store=store)
+    assert loads[0] == ['NOPE'] and [r['ticker'] for r in results] == universe
+    assert results[-1] == {**results[-1], 'match': False, 'explanation': 'Error: No data available for NOPE'}
+
+    parser = alert_dsl.DSLParser()
+    for result in results[:-1]:
+        expected = parser.evaluate(expression, result['ticker'], store.read(result['ticker'], loads[1]))
+        assert (result['match'], result['explanation']) == expected
+    assert not any(r['explanation'].startswith('Error') for r in results[:-1])
+
+
+def test_scan_does_not_redownload_unavailable_tickers(store, monkeypatch):
+    requests = []
+    monkeypatch.setattr(price_store, '_download_batch', lambda tickers, start, end: requests.append(tickers) or {})
+    universe = store.tickers()[:3] + ['GONE']
+    for _ in range(2):
+        results = alert_dsl.scan_universe('rsi < 101', universe, store=store)
+        assert results[-1]['explanation'] == 'Error: No data available for GONE'
+    assert requests == [['GONE']]
+    alert_dsl.scan_universe('rsi < 101', ['GONE'], store=store, refresh=True)
+    assert requests == [['GONE']] * 2
+
+
+def test_scan_finds_matches_and_reports_bad_expressions(store):
+    results = alert_dsl.scan_universe('rsi < 101', store.tickers(), store=store)
+    assert all(r['match'] for r in results)
+    assert {r['match'] for r in alert_dsl.scan_universe('rsi < 50', store.tickers(), store=store)} == {True, False}
+    errors = alert_dsl.scan_universe('rsi << 5', ['T00', 'T01'], store=store)
+    assert [r['match'] for r in errors] == [False, False] and errors[0]['explanation'].startswith('Error')
+
+
+def test_mask_is_per_ticker_bars_scattered_to_dates(store):
+    compiled = compile_expression('sma(5) crosses_above sma(20) OR rsi(7) > 60')
+    panel = alert_dsl.load_panel(store.tickers(), ['Open', 'High', 'Low', 'Close', 'Volume'], store=store)
+    mask = compiled.mask(panel)
+    for ticker in store.tickers():
+        own = store.read(ticker)
+        expected = compiled.mask({f: own[[f]].set_axis([ticker], axis=1) for f in compiled.fields})[ticker]
+        assert mask[ticker].reindex(own.index).tolist() == expected.tolist()
+        assert not mask[ticker].drop(own.index).any()
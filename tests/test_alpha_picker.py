@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Alpha picker tests: the point-in-time panel scorer matches score_stock, the
+pre-filter and top picks at every as-of date.
+Run: python -m pytest tests/test_alpha_picker.py -v
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+pytest.importorskip("tqdm")
+from modules.alpha_picker import AlphaPickerV3, PointInTimeScorer
+from modules.price_store import PriceStore
+
+SECTORS = ['Technology', 'Materials', 'Energy', 'Financial Services', 'Industrials', 'Healthcare', 'Consumer Cyclical']
+ETFS = ['SPY', 'IWM', 'XLI', 'XLK', 'XLB', 'XLF', 'XLY', 'GLD']
+
+
+@pytest.fixture
+def picker(tmp_path, monkeypatch):
+    """AlphaPickerV3 over a synthetic price store, with ticker info from a dict instead of yfinance"""
+    rng = np.random.default_rng(11)
+    store = PriceStore(tmp_path)
+    dates = pd.bdate_range('2022-01-03', periods=700)
+    tickers = [f"S{j:02d}" for j in range(30)]
+    for j, ticker in enumerate(tickers + ETFS):
+        drift = rng.normal(0.001, 0.002)
+        close = 40 * np.exp(np.cumsum(rng.normal(drift, 0.02, len(dates))))
+        idx = dates[int(rng.integers(0, 400)) if j % 5 == 0 else 0:]  # some listed late
+        close = close[-len(idx):]
+        close[rng.random(len(idx)) < 0.03] = np.nan  # missing closes
+        store.append(ticker, pd.DataFrame({'Close': close}, index=idx))
+
+    info = {t: {'sector': SECTORS[j % len(SECTORS)], 'marketCap': [2e8, 5e9, 8e10][j % 3],
+                'revenueGrowth': rng.normal(0.1, 0.2), 'grossMargins': rng.uniform(0, 0.8),
+                'forwardPE': rng.uniform(-10, 60), 'earningsQuarterlyGrowth': rng.normal(0.1, 0.3)}
+            for j, t in enumerate(tickers)}
+
+    picker = object.__new__(AlphaPickerV3)
+    picker.price_store = store
+    picker.price_cache = store.frames()
+    picker.sector_etfs = list(ETFS)
+    picker.universe = tickers
+    picker._point_in_time = None
+    monkeypatch.setattr(picker, '_get_info', lambda ticker: info.get(ticker, {}))
+    return picker
+
+
+AS_OF = [datetime(2021, 12, 1), datetime(2022, 10, 14), datetime(2022, 10, 15), datetime(2023, 1, 1),
+         datetime(2023, 6, 15), datetime(2024, 3, 1), datetime(2024, 12, 31)]
+
+
+def test_scores_equal_score_stock_at_every_date(picker):
+    scorer = picker.point_in_time()
+    scores = scorer.scores(AS_OF)
+    expected = [[picker.score_stock(t, as_of_date=d)['score'] for t in scorer.tickers] for d in AS_OF]
+    assert scores.to_numpy().tolist() == expected
+    assert (scores > -999).any(axis=None) and (scores == -999).any(axis=None)
+    assert picker.point_in_time() is scorer
+
+
+@pytest.mark.parametrize("as_of", AS_OF)
+def test_prefilter_and_top_picks_equal_the_per_ticker_versions(picker, as_of):
+    scorer = PointInTimeScorer(picker)
+    assert scorer.prefilter(as_of) == picker.prefilter_universe(as_of_date=as_of, verbose=False)
+    assert scorer.prefilter(as_of, 0.3) == picker.prefilter_universe(0.3, as_of_date=as_of, verbose=False)
+    assert scorer.top_picks(5, as_of) == picker.get_top_picks(5, as_of_date=as_of, verbose=False)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Backtesting engine tests: vectorised sweeps and simulation match the per-bar simulation.
+Run: python -m pytest tests/test_backtesting_engine.py -v
+"""
+
+import bisect
+import itertools
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from modules import backtesting_engine
+from modules.backtesting_engine import (STRATEGIES, SWEEP_METRICS, BacktestEngine, ParameterOptimizer, SMA_Crossover,
+                                        WalkForwardOptimizer)
+
+START, END = '2018-01-01', '2023-12-31'
+
+GRIDS = {
+    'sma_crossover': {'fast_period': [5, 10, 15], 'slow_period': [20, 50]},
+    'rsi_mean_reversion': {'rsi_period': [10, 14, 5000], 'oversold': [25, 30], 'overbought': [70]},
+    'bollinger_breakout': {'period': [15, 20], 'num_std': [1.5, 2.0]},
+    'macd_signal': {'fast': [8, 12], 'slow': [26], 'signal': [9]},
+    'momentum': {'lookback_period': [10, 20], 'threshold': [0.01, 0.03]},
+    'pairs_trading': {'lookback': [30, 60], 'z_entry': [2.0], 'z_exit': [0.5]},
+}
+
+
+def ohlcv(n, seed, day_step=1.4):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    data = np.column_stack([close * 0.999, close * 1.01, close * 0.99, close, rng.integers(1e5, 1e6, n) * 1.0])
+    dates = [datetime(2018, 1, 1) + timedelta(days=int(i * day_step)) for i in range(n)]
+    return data, dates
+
+
+@pytest.fixture(scope="module")
+def market():
+    return ohlcv(1200, 1), ohlcv(1205, 2, day_step=1)
+
+
+@pytest.mark.parametrize("commission", [0.0, 5.0])
+@pytest.mark.parametrize("strategy", list(GRIDS))
+def test_sweep_matches_per_bar_simulation(tmp_path, market, strategy, commission):
+    (data, dates), benchmark = market
+    engine = BacktestEngine(commission=commission, db_path=tmp_path / "bt.db")
+    per_bar = BacktestEngine(commission=commission, db_path=tmp_path / "bt.db", vectorised=False)
+    grid = GRIDS[strategy]
+    param_sets = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+    results = ParameterOptimizer(engine, workers=1).evaluate(
+        strategy, 'TEST', data, dates, START, END, param_sets, 'sharpe_ratio', benchmark)
+
+    assert [r['params'] for r in results] == [p for p in param_sets if p.get('rsi_period') != 5000]
+    for r in results:
+        expected = per_bar.run_on_data(strategy, 'TEST', data, dates, START, END, r['params'], benchmark)
+        for name in SWEEP_METRICS:
+            assert r['metrics'][name] == pytest.approx(float(getattr(expected, name)), rel=1e-9, abs=1e-12, nan_ok=True), name
+        assert r['score'] == r['metrics']['sharpe_ratio']
+    assert sum(r['metrics']['num_trades'] for r in results) > 0 or strategy == 'macd_signal'
+
+
+def test_grid_search_loads_data_once_and_chunks_across_processes(tmp_path, market, monkeypatch):
+    (data, dates), benchmark = market
+    engine = BacktestEngine(db_path=tmp_path / "bt.db")
+    fetched = []
+    monkeypatch.setattr(engine, '_fetch_data',
+                        lambda ticker, start, end: fetched.append(ticker) or (benchmark if ticker == 'SPY' else (data, dates)))
+    grid = {'fast_period': list(range(3, 23)), 'slow_period': [30, 40, 60, 90, 120]}
+
+    best, results = ParameterOptimizer(engine, workers=2, chunk_size=16).grid_search(
+        'sma_crossover', 'TEST', START, END, grid, 'total_return')
+    serial = ParameterOptimizer(engine, workers=1).evaluate(
+        'sma_crossover', 'TEST', data, dates, START, END, [r['params'] for r in results], 'total_return', benchmark)
+
+    assert fetched == ['TEST', 'SPY']
+    assert len(results) == 100 and [r['score'] for r in results] == [r['score'] for r in serial]
+    assert best == max(results, key=lambda r: r['score'])['params']
+
+
+class NoSignals(SMA_Crossover):
+    def next(self, bar_idx, data):
+        return 0
+
+
+@pytest.mark.parametrize("commission", [0.0, 5.0, 6000.0])
+@pytest.mark.parametrize("strategy", list(GRIDS) + ['no_signals'])
+def test_vectorised_simulation_matches_per_bar(tmp_path, market, monkeypatch, strategy, commission):
+    (data, dates), benchmark = market
+    monkeypatch.setitem(STRATEGIES, 'no_signals', NoSignals)
+    grid = GRIDS.get(strategy, GRIDS['sma_crossover'])
+    arrays = BacktestEngine(commission=commission, db_path=tmp_path / "bt.db")
+    per_bar = BacktestEngine(commission=commission, db_path=tmp_path / "bt.db", vectorised=False)
+
+    for values in itertools.product(*grid.values()):
+        params = dict(zip(grid, values))
+        if params.get('rsi_period') == 5000:
+            continue
+        got = arrays.run_on_data(strategy, 'TEST', data, dates, START, END, params, benchmark)
+        expected = per_bar.run_on_data(strategy, 'TEST', data, dates, START, END, params, benchmark)
+        assert [getattr(got, name) for name in SWEEP_METRICS] == [getattr(expected, name) for name in SWEEP_METRICS]
+        assert got.trades == expected.trades
+        assert got.equity_curve == expected.equity_curve
+        assert got.monthly_returns == expected.monthly_returns
+    assert not NoSignals.vectorised() and STRATEGIES['pairs_trading'].vectorised() is False
+
+
+def fetch_slice(self, ticker, start, end):
+    """_fetch_data over the test market: bars for start <= date < end"""
+    data, dates = ohlcv(1205, 2, day_step=1) if ticker == 'SPY' else ohlcv(1200, 1)
+    lo = bisect.bisect_left(dates, datetime.strptime(start, '%Y-%m-%d'))
+    hi = bisect.bisect_left(dates, datetime.strptime(end, '%Y-%m-%d'))
+    if lo == hi:
+        raise ValueError(f"No data for {ticker}")
+    return data[lo:hi], dates[lo:hi]
+
+
+@pytest.mark.parametrize("strategy", ['sma_crossover', 'momentum'])
+def test_walkforward_matches_window_by_window_backtests(tmp_path, monkeypatch, strategy):
+    monkeypatch.setattr(BacktestEngine, '_fetch_data', fetch_slice)
+    engine = BacktestEngine(db_path=tmp_path / "bt.db")
+    grid = GRIDS[strategy]
+    summary = WalkForwardOptimizer(engine, workers=2, cache_dir=tmp_path / "wf").run_walkforward(
+        strategy, 'TEST', START, '2021-03-31', 6, 2, grid, 'sharpe_ratio', save_to_db=False)
+
+    assert summary['n_windows'] == 6
+    for w in summary['window_results']:
+        train = (w['train_start'].strftime('%Y-%m-%d'), w['train_end'].strftime('%Y-%m-%d'))
+        test = (w['test_start'].strftime('%Y-%m-%d'), w['test_end'].strftime('%Y-%m-%d'))
+        best, _ = ParameterOptimizer(engine, workers=1).grid_search(strategy, 'TEST', *train, grid, 'sharpe_ratio')
+        is_result = engine.run_backtest(strategy, 'TEST', *train, best, save_to_db=False)
+        oos_result = engine.run_backtest(strategy, 'TEST', *test, best, save_to_db=False)
+        assert w['best_params'] == best
+        assert w['is_score'] == pytest.approx(is_result.sharpe_ratio, rel=1e-9, abs=1e-12)
+        assert w['oos_score'] == oos_result.sharpe_ratio
+        assert w['oos_result'].equity_curve == oos_result.equity_curve
+
+
+def test_walkforward_reruns_only_new_windows(tmp_path, monkeypatch):
+    monkeypatch.setattr(BacktestEngine, '_fetch_data', fetch_slice)
+    engine = BacktestEngine(db_path=tmp_path / "bt.db")
+    optimised = []
+    window = backtesting_engine._walkforward_window
+    monkeypatch.setattr(backtesting_engine, '_walkforward_window',
+                        lambda *args, **kwargs: optimised.append(args[5]) or window(*args, **kwargs))
+    grid = GRIDS['sma_crossover']
+
+    def run(end, **kwargs):
+        optimised.clear()
+        wf = WalkForwardOptimizer(engine, workers=1, cache_dir=tmp_path / "wf", **kwargs)
+        return wf.run_walkforward('sma_crossover', 'TEST', START, end, 6, 2, grid, save_to_db=False)
+
+    first = run('2020-06-30')
+    assert len(optimised) == first['n_windows'] == 4
+    extended = run('2021-03-31')
+    assert len(optimised) == extended['n_windows'] - 4 == 2
+    assert [w['best_params'] for w in extended['window_results'][:4]] == [w['best_params'] for w in first['window_results']]
+    again = run('2021-03-31')
+    assert optimised == [] and again['oos_equity_curve'] == extended['oos_equity_curve']
+    run('2021-03-31', use_cache=False)
+    assert len(optimised) == 6
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+BaseModule.run write-path tests: a single chunk's bronze and tier rows go out in one
+insert, tier rows carry the cleaned payload, a failing clean() still stores bronze, and
+a multi-chunk run dedups against the previous chunk and stores its clean rows at one
+tier, decided from the combined quality.
+Run: python -m pytest tests/test_base_module.py -v
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from qcd_platform.pipeline import base_module
+from qcd_platform.pipeline.base_module import BaseModule, DataPoint
+from qcd_platform.pipeline.datapoint_batch import DataPointBatch
+from qcd_platform.pipeline.run_context import RunContext
+
+NOW = datetime.now(timezone.utc)
+
+
+class RawModule(BaseModule):
+    name = "write_path"
+
+    def fetch(self, symbols=None):
+        return [DataPoint(ts=NOW, symbol=f"S{i}", payload={"raw": i}) for i in range(4)]
+
+
+class ChunkedModule(BaseModule):
+    name = "chunked_write_path"
+
+    def __init__(self, chunks):
+        super().__init__()
+        self.chunks = chunks
+
+    def fetch(self, symbols=None):
+        return [p for chunk in self.chunks for p in chunk]
+
+    def fetch_chunks(self, symbols=None):
+        yield from self.chunks
+
+
+def points(ts, symbols, value=1):
+    return [DataPoint(ts=ts, symbol=s, payload={"close": value}) for s in symbols]
+
+
+@pytest.fixture
+def inserts(monkeypatch):
+    calls = []
+    monkeypatch.setattr(base_module.db, "insert_data_point_rows", lambda rows: calls.append(list(rows)))
+    monkeypatch.setattr(base_module, "cache_latest_many", lambda name, items: None)
+    monkeypatch.setattr(base_module, "publish_event", lambda topic, event: None)
+    monkeypatch.setattr(RunContext, "module_stats", lambda self, module_id: None)  # no platinum lookup
+    return calls
+
+
+def run(module):
+    module.module_id = 7
+    return module.run(run_context=RunContext())
+
+
+def test_bronze_and_tier_rows_in_one_insert(inserts):
+    result = run(RawModule())
+    assert result["status"] == "success" and result["tier_reached"] == "gold"
+    assert len(inserts) == 1
+    rows = inserts[0]
+    assert [r[4] for r in rows] == ["bronze"] * 4 + ["gold"] * 4
+    assert [json.loads(r[6]) for r in rows] == [{"raw": i} for i in range(4)] * 2
+    assert result["rows_written"] == 8 and result["rows_saved"] == 4
+
+
+def test_tier_rows_store_the_cleaned_payload(inserts):
+    class Rewrites(RawModule):
+        def clean(self, raw_points):
+            cleaned = super().clean(raw_points)
+            for p in cleaned[:2]:
+                p.payload = {"normalized": p.payload["raw"] * 2}
+            for p in cleaned[2:]:
+                p.payload["raw"] = float(p.payload["raw"])  # rewritten in place
+            return cleaned
+
+    run(Rewrites())
+    rows = inserts[0]
+    assert [r[6] for r in rows[:4]] == [json.dumps({"raw": i}) for i in range(4)]
+    assert [r[6] for r in rows[4:]] == ['{"normalized": 0}', '{"normalized": 2}', '{"raw": 2.0}', '{"raw": 3.0}']
+
+
+def test_failed_clean_still_stores_bronze(inserts):
+    class Broken(RawModule):
+        def clean(self, raw_points):
+            raise ValueError("bad payload")
+
+    result = run(Broken())
+    assert result["status"] == "failed" and result["error"] == "bad payload"
+    assert [[r[4] for r in rows] for rows in inserts] == [["bronze"] * 4]
+    assert result["rows_in"] == 4 and result["rows_written"] == 4
+
+
+def test_multi_chunk_run_is_stored_at_one_tier_from_the_combined_report(inserts):
+    stale = NOW - timedelta(hours=40)  # on its own this chunk scores below gold
+    result = run(ChunkedModule([points(NOW, ["A", "B"]), points(stale, ["C", "D"])]))
+
+    assert result["tier_reached"] == "gold" and result["rows_saved"] == 4 and result["rows_written"] == 8
+    # bronze goes out per chunk; the spooled clean rows follow once the run's tier is known
+    assert [[r[4] for r in rows] for rows in inserts] == [["bronze"] * 2] * 2 + [["gold"] * 2] * 2
+    assert {r[5] for rows in inserts[2:] for r in rows} == {result["quality_score"]}
+    assert [r[2] for rows in inserts[2:] for r in rows] == ["A", "B", "C", "D"]
+
+
+def test_multi_chunk_run_below_gold_stays_silver(inserts):
+    stale = NOW - timedelta(hours=40)
+    result = run(ChunkedModule([points(stale, ["A"]), points(stale, ["B"])]))
+    assert result["tier_reached"] == "silver" and result["rows_saved"] == 0
+    assert [r[4] for rows in inserts for r in rows] == ["bronze", "bronze", "silver", "silver"]
+
+
+def test_single_chunk_is_stored_at_its_final_tier(inserts):
+    stale = NOW - timedelta(hours=40)
+    assert run(ChunkedModule([points(stale, ["A"])]))["tier_reached"] == "silver"
+    assert [[r[4] for r in rows] for rows in inserts] == [["bronze", "silver"]]
+
+
+def test_failed_later_chunk_keeps_earlier_clean_rows_silver(inserts):
+    class BreaksOnX(ChunkedModule):
+        def clean(self, raw_points):
+            if any(p.symbol == "X" for p in raw_points):
+                raise ValueError("bad chunk")
+            return super().clean(raw_points)
+
+    result = run(BreaksOnX([points(NOW, ["A"]), points(NOW, ["B"]), points(NOW, ["X"])]))
+    assert result["status"] == "failed" and result["rows_in"] == 3
+    assert [[(r[2], r[4]) for r in rows] for rows in inserts] == [
+        [("A", "bronze")], [("B", "bronze")], [("X", "bronze")], [("A", "silver")], [("B", "silver")]]
+
+
+def test_duplicates_across_adjacent_chunks_are_stored_once(inserts):
+    chunks = [
+        points(NOW, ["A", "B"]),
+        DataPointBatch.from_points(points(NOW, ["B", "C"]) + points(NOW, ["A"], value=2)),
+        points(NOW, ["C", "A"]),  # C repeats the previous chunk; A is two chunks back, beyond the window
+    ]
+    module = ChunkedModule(chunks)
+    result = run(module)
+
+    tier = [(r[2], json.loads(r[6])["close"]) for rows in inserts for r in rows if r[4] != "bronze"]
+    assert tier == [("A", 1), ("B", 1), ("C", 1), ("A", 2), ("A", 1)]
+    assert result["rows_in"] == 7 and result["rows_dropped"] == 2 and result["rows_written"] == 12
+    assert module._dedup_seen is None
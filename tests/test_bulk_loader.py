@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Bulk loader tests: the binary COPY encoding of prepared rows, timestamp conversion, and
+DataFrame payloads matching what db.encode_payload stores on the execute_values path.
+Run: python -m pytest tests/test_bulk_loader.py -v
+"""
+
+import json
+import struct
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from qcd_platform.pipeline import bulk_loader, db
+
+PG_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def decode_copy(data):
+    """Rows of a binary COPY stream as lists of raw field bytes (None for NULL)."""
+    assert data.startswith(b"PGCOPY\n\xff\r\n\x00") and data.endswith(struct.pack("!h", -1))
+    pos, rows = 19, []
+    while True:
+        (count,) = struct.unpack_from("!h", data, pos)
+        pos += 2
+        if count == -1:
+            return rows
+        fields = []
+        for _ in range(count):
+            (size,) = struct.unpack_from("!i", data, pos)
+            pos += 4
+            fields.append(None if size == -1 else data[pos:pos + size])
+            pos += max(size, 0)
+        rows.append(fields)
+
+
+def test_ts_micros_accepts_what_postgres_accepted():
+    aware = datetime(2026, 3, 1, 12, 30, 15, 250, tzinfo=timezone.utc)
+    expected = (aware - PG_EPOCH) // timedelta(microseconds=1)
+    assert bulk_loader._ts_micros(aware) == expected
+    assert bulk_loader._ts_micros(aware.replace(tzinfo=None)) == expected
+    assert bulk_loader._ts_micros("2026-03-01T12:30:15.000250+00:00") == expected
+    assert bulk_loader._ts_micros("2026-03-01 14:30:15.000250+02:00") == expected
+    assert bulk_loader._ts_micros("03/01/2026 12:30:15.000250") == expected
+    assert bulk_loader._ts_micros("Mar 1, 2026") == (datetime(2026, 3, 1, tzinfo=timezone.utc) - PG_EPOCH) \
+        // timedelta(microseconds=1)
+    assert bulk_loader._ts_micros(pd.Timestamp(aware)) == expected
+    assert bulk_loader._ts_micros(np.datetime64("2026-03-01T12:30:15.000250")) == expected
+    assert bulk_loader._ts_micros(date(2026, 3, 1)) == (datetime(2026, 3, 1, tzinfo=timezone.utc) - PG_EPOCH) \
+        // timedelta(microseconds=1)
+    for unusable in ["", "NaT", "None", "not a date", None, pd.NaT, np.datetime64("NaT"), object()]:
+        assert bulk_loader._ts_micros(unusable) is None
+
+
+def test_copy_stream_encodes_prepared_rows():
+    ts = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    rows = [
+        (ts, 7, "AAPL", "daily", "gold", 91, '{"close": 1.5}', "abcd"),
+        ("garbage", 7, "BAD", "daily", "bronze", 0, "{}", None),
+        ("03/02/2026", 7, None, "daily", "bronze", None, '{"name": "é"}', None),
+    ]
+    decoded = decode_copy(bulk_loader.encode_copy_stream(rows))
+    assert len(decoded) == 2 and all(len(r) == len(bulk_loader.COPY_COLUMNS) for r in decoded)
+
+    first, second = decoded
+    assert struct.unpack("!q", first[0])[0] == (ts - PG_EPOCH) // timedelta(microseconds=1)
+    assert struct.unpack("!i", first[1])[0] == 7 and struct.unpack("!h", first[5])[0] == 91
+    assert first[2:5] == [b"AAPL", b"daily", b"gold"] and first[7] == b"abcd"
+    assert first[6] == b"\x01" + b'{"close": 1.5}'
+    assert struct.unpack("!q", second[0])[0] == (datetime(2026, 3, 2, tzinfo=timezone.utc) - PG_EPOCH) \
+        // timedelta(microseconds=1)
+    assert second[2] is None and second[5] is None and second[7] is None
+    assert json.loads(second[6][1:].decode()) == {"name": "é"}
+
+
+def test_dataframe_payloads_match_encode_payload():
+    df = pd.DataFrame({
+        "tiny": [0.000012345678901234, 1.0, np.nan, 2.5],
+        "big": [123456789.123456789, np.inf, -np.inf, 1e300],
+        "count": [1, 2, 3, 4],
+        "name": ["a", None, "c\"quoted\"", "é"],
+        "flag": [True, False, True, False],
+        7: [1.5, 2.5, 3.5, np.nan],
+    }, index=[10, 11, 12, 13])
+    expected = [db.encode_payload(row) for row in df.to_dict("records")]
+    assert bulk_loader.dataframe_payloads(df) == expected
+    assert json.loads(bulk_loader.dataframe_payloads(df)[0])["tiny"] == 0.000012345678901234
+    assert bulk_loader.dataframe_payloads(df, ["count"]) == [json.dumps({"count": i}) for i in range(1, 5)]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+CLI dispatcher tests: the command index, a daemon round trip over the Unix socket,
+and --via-daemon falling back to in-process when the daemon does not answer.
+Run: python -m pytest tests/test_cli.py -v
+"""
+
+import os
+import socket
+import stat
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import cli
+
+ECHO_MODULE = '''import sys
+
+
+def main():
+    print("args:", " ".join(sys.argv[1:]))
+    print("to stderr", file=sys.stderr)
+    return 3
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+@pytest.fixture
+def echo_command(tmp_path, monkeypatch):
+    (tmp_path / "echo_module.py").write_text(ECHO_MODULE)
+    monkeypatch.setattr(cli, "MODULES_DIR", tmp_path)
+    monkeypatch.setattr(cli, "_COMMAND_INDEX", {"echo-test": {"file": "echo_module.py", "commands": ["echo-test"]}})
+    return "echo-test"
+
+
+@pytest.fixture
+def socket_path():
+    # AF_UNIX paths are limited to ~100 bytes, too short for pytest's tmp_path
+    path = f"/tmp/qc-cli-test-{os.getpid()}.sock"
+    yield path
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+def test_command_index_covers_every_command_first_registration_wins(monkeypatch):
+    monkeypatch.setattr(cli, "_COMMAND_INDEX", None)
+    index = cli.get_command_index()
+    assert cli.get_command_index() is index
+    for module_info in cli.MODULES.values():
+        for command in module_info["commands"]:
+            first = next(m for m in cli.MODULES.values() if command in m["commands"])
+            assert index[command] is first
+    assert set(index) == {c for m in cli.MODULES.values() for c in m["commands"]}
+    assert cli.dispatch_command(["no-such-command"], mode="in-process") == 1
+
+
+def test_daemon_round_trip(echo_command, socket_path, capsys):
+    server = cli._bind_daemon(socket_path)
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert cli.send_to_daemon([echo_command, "a", "b"], socket_path=socket_path, timeout=10) == 3
+        captured = capsys.readouterr()
+        assert captured.out == "args: echo-test a b\n" and captured.err == "to stderr\n"
+        assert cli.send_to_daemon(["no-such-command"], socket_path=socket_path, timeout=10) == 1
+        for flag in cli._MODE_FLAGS:  # mode flags are not honoured inside the daemon
+            assert cli.send_to_daemon([flag, echo_command], socket_path=socket_path, timeout=10) == 1
+        capsys.readouterr()
+        assert cli.send_to_daemon([echo_command, "c"], socket_path=socket_path, timeout=10) == 3
+        assert capsys.readouterr().out == "args: echo-test c\n"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_unresponsive_daemon_falls_back_to_in_process(echo_command, socket_path, capsys, monkeypatch):
+    assert cli.send_to_daemon([echo_command], socket_path=socket_path) is None  # no socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hung:  # accepts, never answers
+        hung.bind(socket_path)
+        hung.listen(1)
+        assert cli.send_to_daemon([echo_command], socket_path=socket_path, timeout=0.2) is None
+
+        send = cli.send_to_daemon
+        monkeypatch.setattr(cli, "send_to_daemon", lambda args: send(args, socket_path=socket_path, timeout=0.2))
+        assert cli.dispatch_command(["--via-daemon", echo_command, "x"]) == 3
+    assert capsys.readouterr().out == "args: echo-test x\n"
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as dead:  # closes without a response
+        os.unlink(socket_path)
+        dead.bind(socket_path)
+        dead.listen(1)
+        closer = threading.Thread(target=lambda: dead.accept()[0].close())
+        closer.start()
+        assert send([echo_command], socket_path=socket_path, timeout=5) is None
+        closer.join()
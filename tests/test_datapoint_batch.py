@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+DataPointBatch tests: columnar construction, the per-row view, and parity with the DataPoint path.
+Run: python -m pytest tests/test_datapoint_batch.py -v
+"""
+
+import copy
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from qcd_platform.pipeline import db
+from qcd_platform.pipeline.base_module import BaseModule, DataPoint, ModuleOutput
+from qcd_platform.pipeline.datapoint_batch import NAT_US, DataPointBatch
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def sample_points():
+    return [
+        DataPoint(ts=NOW, symbol="AAPL", payload={"close": 1.5, "volume": 10, "name": "Apple"}),
+        DataPoint(ts="2026-03-01T11:00:00", symbol="MSFT", payload={"close": 2.5, "tags": ["a"]}),
+        DataPoint(ts="not a date", symbol="BAD", payload={"close": 3.0}),
+        DataPoint(ts=NOW, symbol="EMPTY", payload={}),
+        DataPoint(ts=NOW, symbol="AAPL", payload={"close": 1.5, "volume": 10, "name": "Apple"}),
+    ]
+
+
+class PassThrough(BaseModule):
+    name = "batch_parity"
+
+    def fetch(self, symbols=None):
+        return []
+
+
+def test_view_reads_and_writes_columns():
+    batch = DataPointBatch.from_points(sample_points())
+    assert len(batch) == 5
+    assert batch[0].payload == {"close": 1.5, "volume": 10, "name": "Apple"}
+    assert batch[1].ts == datetime(2026, 3, 1, 11, 0, tzinfo=timezone.utc)
+    assert batch[2].ts is None and batch.ts[2] == NAT_US
+    assert batch.payload["volume"].dtype == "Int64"  # ints stay ints despite rows without the key
+
+    view = batch[1]
+    view.payload = {"close": "n/a"}
+    view.symbol = "GOOG"
+    view.quality_score = 70
+    assert batch[1].payload == {"close": "n/a"}
+    assert batch[1].symbol == "GOOG" and batch.quality_score[1] == 70
+    assert batch[0].payload["close"] == 1.5
+
+
+def test_clean_matches_per_point_clean():
+    points = sample_points()
+    expected = PassThrough().clean(copy.deepcopy(points))
+    clean = DataPointBatch.from_points(points).clean()
+
+    assert clean.tier == "silver"
+    assert clean.symbol_list() == [p.symbol for p in expected]
+    assert clean.ts_datetimes() == [p.ts for p in expected]
+    assert list(clean.source_hash) == [p.source_hash for p in expected]
+    assert clean.payload_dicts() == [p.payload for p in expected]
+    assert clean.quality_score.tolist() == [50, 50]
+
+
+def test_compute_on_batch_matches_point_path():
+    points = sample_points()[:2]
+    via_points = PassThrough()
+    via_points.module_id = 9
+    via_points.fetch = lambda symbols=None: copy.deepcopy(points)
+    via_batch = PassThrough()
+    via_batch.module_id = 9
+    via_batch.fetch = lambda symbols=None: DataPointBatch.from_points(points)
+
+    a, b = via_points.compute(), via_batch.compute()
+    # the point path stores bronze timestamps as given; naive ones are UTC either way
+    normalise = lambda rows: [(pd.to_datetime(r[0], utc=True),) + r[1:] for r in rows]
+    assert normalise(a.bronze_rows()) == normalise(b.bronze_rows())
+    assert normalise(a.tier_rows()) == normalise(b.tier_rows())
+    assert a.latest == b.latest
+    assert (a.rows_in, a.rows_clean) == (b.rows_in, b.rows_clean)
+
+
+def test_from_frame_follows_v1_conversion_rules():
+    df = pd.DataFrame({
+        "date": ["2026-01-02", "garbage", None],
+        "ticker": ["A", None, 7],
+        "close": [1.0, np.nan, 3.0],
+        "when": pd.to_datetime(["2026-01-01", None, "2026-01-03"], utc=True),
+    })
+    batch = DataPointBatch.from_frame(df, ts_col="date", symbol_col="ticker", default_ts=NOW)
+
+    assert batch.ts_datetimes() == [datetime(2026, 1, 2, tzinfo=timezone.utc), NOW, NOW]
+    assert batch.symbol_list() == ["A", None, "7"]
+    assert batch.payload_dicts() == [
+        {"close": 1.0, "when": "2026-01-01T00:00:00+00:00"},
+        {},
+        {"close": 3.0, "when": "2026-01-03T00:00:00+00:00"},
+    ]
+
+
+def test_row_columns_round_trip_and_latest():
+    batch = DataPointBatch.from_points(sample_points()).clean()
+    rows = ModuleOutput.to_rows(batch.to_row_columns(4))
+    assert [r[2] for r in rows] == ["AAPL", "MSFT"]
+    assert {r[1] for r in rows} == {4} and {r[4] for r in rows} == {"silver"}
+    assert rows[0][6] == '{"close": 1.5, "volume": 10, "name": "Apple"}'
+    assert batch.latest_payloads() == {"AAPL": {"close": 1.5, "volume": 10, "name": "Apple"},
+                                       "MSFT": {"close": 2.5, "tags": ["a"]}}
+    assert [p.symbol for p in batch.to_points()] == ["AAPL", "MSFT"]
+
+
+def test_clean_dedup_matches_digests_for_tricky_payloads():
+    payloads = [{"v": 0.0}, {"v": -0.0}, {"v": 0.0}, {"m": 1}, {"m": 1.0}, {"m": True}, {"m": 1},
+                {"d": {"a": 1, "b": 2}}, {"d": {"b": 2, "a": 1}}, {"s": "x"}, {"s": "x"}]
+    points = [DataPoint(ts=NOW, symbol="S", payload=p) for p in payloads]
+    expected = PassThrough().clean(copy.deepcopy(points))
+    clean = DataPointBatch.from_points(points).clean()
+
+    assert pd.isna(clean._source_hash).all()  # digests are left for first use
+    assert list(clean.source_hash) == [p.source_hash for p in expected]
+    assert len(clean) == 7
+
+
+def test_encode_payloads_matches_separate_hash_and_json():
+    df = pd.DataFrame({
+        "close": [1.5, np.inf, np.nan, -np.inf],
+        "name": ["x", None, "é", 'q"'],
+        "nested": [{"z": 1, "a": 2}, None, [1, 2], float("nan")],
+        "volume": [1, 2, 3, 4],
+        "flag": [True, False, True, False],
+        "sector": pd.Categorical(["k", "k", None, "m"]),
+    })
+    batch = DataPointBatch(np.arange(4), list("ABCD"), df)
+    expected = copy.deepcopy(batch)
+    payload_json = batch.encode_payloads()
+
+    assert list(batch._source_hash) == list(expected.compute_hashes())
+    assert payload_json == expected.payload_json() == [db.encode_payload(p) for p in expected.payload_dicts()]
+    empty = DataPointBatch(np.arange(2), ["A", "B"], pd.DataFrame(index=range(2)))
+    assert empty.encode_payloads() == ["{}", "{}"]
+    assert list(empty._source_hash) == [DataPoint(NOW).compute_hash()] * 2
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Process-pool execution tests: columnar ModuleOutput and the HybridExecutor round trip.
+Run: python -m pytest tests/test_executor.py -v
+"""
+
+import os
+import pickle
+import sys
+import textwrap
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from qcd_platform.pipeline.base_module import BaseModule, DataPoint, ModuleOutput
+from qcd_platform.pipeline.executor import HybridExecutor, runs_in_process_pool
+
+
+class SampleModule(BaseModule):
+    name = "sample_cpu"
+    execution_class = "cpu"
+
+    def fetch(self, symbols=None):
+        now = datetime.now(timezone.utc)
+        return [DataPoint(ts=now, symbol=f"S{i % 5}", payload={"i": i}) for i in range(50)]
+
+
+def test_compute_output_survives_pickling():
+    module = SampleModule()
+    module.module_id = 3
+    output = pickle.loads(pickle.dumps(module.compute()))
+
+    assert output.rows_in == 50 and output.rows_clean == 50
+    bronze, tier = output.bronze_rows(), output.tier_rows()
+    assert len(bronze) == len(tier) == 50
+    assert {r[4] for r in bronze} == {"bronze"} and {r[4] for r in tier} == {"gold"}
+    assert set(output.latest) == {f"S{i}" for i in range(5)}
+    assert output.latest["S4"] == {"i": 49}
+
+
+def test_columns_round_trip_and_share_values():
+    ts_a, ts_b = "".join(["2026-01-01", "T00:00"]), "".join(["2026-01-01T", "00:00"])
+    rows = [(ts_a, 1, "AAPL", "daily"), (ts_b, 1, "MSFT", "daily")]
+    columns = ModuleOutput.to_columns(rows)
+    assert ModuleOutput.to_rows(columns) == rows
+    assert ts_a is not ts_b and columns[0][0] is columns[0][1]
+
+
+def test_modules_overriding_run_stay_in_thread():
+    class CustomRun(SampleModule):
+        def run(self, symbols=None, run_context=None, compute_fn=None):
+            return {}
+
+    assert runs_in_process_pool(SampleModule())
+    assert not runs_in_process_pool(CustomRun())
+
+
+def test_executor_runs_compute_in_worker_process(tmp_path):
+    (tmp_path / "pid_module.py").write_text(textwrap.dedent('''
+        import os
+        from datetime import datetime, timezone
+        from qcd_platform.pipeline.base_module import BaseModule, DataPoint
+
+        class PidModule(BaseModule):
+            name = "pid_module"
+            execution_class = "cpu"
+
+            def fetch(self, symbols=None):
+                now = datetime.now(timezone.utc)
+                return [DataPoint(ts=now, symbol=s, payload={"pid": os.getpid()}) for s in symbols]
+    '''))
+
+    class Registered:
+        name = "pid_module"
+        module_id = 11
+
+    executor = HybridExecutor(str(tmp_path), process_workers=1, preload=["pid_module"])
+    try:
+        output = executor.compute(Registered(), ["AAPL", "MSFT"])
+    finally:
+        executor.shutdown()
+
+    assert output.rows_in == 2
+    assert output.latest["AAPL"]["pid"] != os.getpid()
+    assert set(output.tier_columns[1]) == {11}
+    assert executor.metrics == {"submitted": 1, "failed": 0}
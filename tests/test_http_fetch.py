@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP fetch layer tests, offline against a local stub server: revalidation, LRU eviction, coalescing.
+Run: python -m pytest tests/test_http_fetch.py -v
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from modules.http_fetch import HttpFetcher, ResponseCache
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    hits = []
+    connections = set()
+
+    def do_GET(self):
+        StubHandler.hits.append(self.path)
+        StubHandler.connections.add(self.client_address)
+        if self.path.startswith("/slow"):
+            time.sleep(0.3)
+        if self.path.startswith("/missing"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/etag") and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({"path": self.path, "pad": "x" * 2000}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.path.startswith("/etag"):
+            self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    StubHandler.hits, StubHandler.connections = [], set()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    httpd.protocol_version = "HTTP/1.1"
+    StubHandler.protocol_version = "HTTP/1.1"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_cache_hit_then_etag_revalidation(server, tmp_path):
+    fetcher = HttpFetcher(ResponseCache(tmp_path))
+    first = fetcher.fetch(f"{server}/etag", params={"b": 2, "a": 1})
+    again = fetcher.fetch(f"{server}/etag", params={"a": 1, "b": 2})
+    stale = fetcher.fetch(f"{server}/etag", params={"a": 1, "b": 2}, ttl=0)
+
+    assert not first.from_cache and again.from_cache and stale.revalidated
+    assert first.json() == again.json() == stale.json()
+    assert len(StubHandler.hits) == 2  # the fresh hit never went upstream
+    assert fetcher.metrics["revalidated"] == 1 and fetcher.metrics["hits"] == 1
+
+
+def test_keep_alive_and_errors_not_cached(server, tmp_path):
+    fetcher = HttpFetcher(ResponseCache(tmp_path))
+    for i in range(5):
+        fetcher.fetch(f"{server}/item/{i}")
+    assert len(StubHandler.connections) == 1
+
+    with pytest.raises(requests.HTTPError):
+        fetcher.fetch(f"{server}/missing")
+    with pytest.raises(requests.HTTPError):
+        fetcher.fetch(f"{server}/missing")
+    assert StubHandler.hits.count("/missing") == 2
+
+
+def test_identical_bodies_stored_once_and_lru_eviction(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10_000)
+    cache.put("a" * 64, 200, {}, b"same body")
+    cache.put("b" * 64, 200, {}, b"same body")
+    assert len(list((tmp_path / "objects").glob("*/*"))) == 1
+
+    noise = lambda i: random.Random(i).randbytes(3000)  # incompressible
+    for i in range(3):
+        cache.put(f"{i:064d}", 200, {}, noise(i))
+        time.sleep(0.01)
+    cache.get("0" * 64)  # recently used: survives
+    cache.put("f" * 64, 200, {}, noise(9))
+
+    assert cache.get("0" * 64) is not None and cache.get("f" * 64) is not None
+    assert cache.get(f"{1:064d}") is None
+    assert cache._stored_bytes() <= 10_000
+
+
+def test_concurrent_identical_fetches_coalesce(server, tmp_path):
+    fetcher = HttpFetcher(ResponseCache(tmp_path))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetcher.fetch(f"{server}/slow", ttl=0)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == 8 and len({r.content for r in results}) == 1
+    assert StubHandler.hits.count("/slow") == 1
+    assert fetcher.metrics["coalesced"] == 7
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Indicator library tests: vectorised indicators match the loop and pandas versions they replace.
+Run: python -m pytest tests/test_indicators.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from modules import indicators
+
+
+def loop_sma(prices, period):
+    sma = np.full(len(prices), np.nan)
+    for i in range(period - 1, len(prices)):
+        sma[i] = np.mean(prices[i - period + 1:i + 1])
+    return sma
+
+
+def loop_std(prices, period):
+    std = np.full(len(prices), np.nan)
+    for i in range(period - 1, len(prices)):
+        std[i] = np.std(prices[i - period + 1:i + 1])
+    return std
+
+
+def loop_ema(prices, period):
+    ema = np.full(len(prices), np.nan)
+    multiplier = 2 / (period + 1)
+    ema[period - 1] = np.mean(prices[:period])
+    for i in range(period, len(prices)):
+        ema[i] = (prices[i] - ema[i-1]) * multiplier + ema[i-1]
+    return ema
+
+
+def loop_wilder_rsi(prices, period):
+    deltas = np.diff(prices)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+    avg_gains = np.full(len(prices), np.nan)
+    avg_losses = np.full(len(prices), np.nan)
+    avg_gains[period] = np.mean(gains[:period])
+    avg_losses[period] = np.mean(losses[:period])
+    for i in range(period + 1, len(prices)):
+        avg_gains[i] = (avg_gains[i-1] * (period - 1) + gains[i-1]) / period
+        avg_losses[i] = (avg_losses[i-1] * (period - 1) + losses[i-1]) / period
+    return 100 - (100 / (1 + avg_gains / (avg_losses + 1e-10)))
+
+
+def pandas_rsi(prices, period):
+    delta = prices.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+def close(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    prices[300:340] = prices[299]
+    return prices
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    indicators.clear_cache()
+
+
+@pytest.mark.parametrize("period", [1, 5, 20, 200, 2000, 2500])
+def test_windowed_indicators_equal_the_loops(period):
+    x = close()
+    np.testing.assert_array_equal(indicators.sma(x, period), loop_sma(x, period))
+    np.testing.assert_array_equal(indicators.rolling_std(x, period), loop_std(x, period))
+
+
+@pytest.mark.parametrize("period", [2, 9, 14, 26, 200])
+def test_recursive_indicators_match_the_loops(period):
+    x = close()
+    np.testing.assert_allclose(indicators.ema(x, period), loop_ema(x, period), rtol=1e-12)
+    np.testing.assert_allclose(indicators.wilder_rsi(x, period), loop_wilder_rsi(x, period), rtol=1e-10)
+    macd = loop_ema(x, 12) - loop_ema(x, 26)
+    assert np.isnan(indicators.ema(macd, period)).all()  # NaN seed carries forward, as before
+    with pytest.raises(ValueError):
+        indicators.wilder_rsi(x[:period], period)
+
+
+@pytest.mark.parametrize("period", [3, 14, 50])
+def test_pandas_indicators_match_pandas(period):
+    x = pd.Series(close())
+    x.iloc[[0, 1, 700, 701, 900]] = np.nan
+    np.testing.assert_allclose(indicators.rsi(x, period), pandas_rsi(x, period), rtol=1e-10)
+    np.testing.assert_allclose(indicators.ema(x, period, seed="first"),
+                               x.ewm(span=period, adjust=False, ignore_na=True).mean(), rtol=1e-12)
+    np.testing.assert_allclose(indicators.rolling_mean(x, period, min_periods=1),
+                               x.rolling(period, min_periods=1).mean(), rtol=1e-10)
+    np.testing.assert_allclose(indicators.rolling_sum(x, period), x.rolling(period).sum(), rtol=1e-10)
+    np.testing.assert_allclose(indicators.momentum(x, period), x / x.shift(period) - 1, rtol=1e-12)
+
+
+def test_memo_cache_is_keyed_by_series_and_params():
+    x = close()
+    first = indicators.sma(x, 20)
+    assert indicators.sma(x, 20) is first
+    data = np.column_stack([x, x])
+    assert indicators.sma(data[:, 1], 20) is indicators.sma(data[:, 1], 20)  # same buffer, new view
+    series = pd.Series(x)
+    assert indicators.sma(series, 20) is indicators.sma(series, 20)
+    assert indicators.sma(x[:-1], 20) is not first
+    assert indicators.sma(x, 21) is not first
+    assert indicators.ema(x, 20) is not indicators.ema(x, 20, seed="first")
+    assert indicators.cache_info()["hits"] == 3
+    with pytest.raises(ValueError):
+        first[0] = 1.0
+
+
+def test_strategies_use_the_library():
+    from modules.backtesting_engine import BollingerBand_Breakout, MACD_Signal, RSI_MeanReversion, SMA_Crossover
+    x = close()
+    assert SMA_Crossover._sma(x, 10) is indicators.sma(x, 10)
+    assert BollingerBand_Breakout._rolling_std(x, 10) is indicators.rolling_std(x, 10)
+    assert MACD_Signal._ema(x, 12) is indicators.ema(x, 12)
+    assert RSI_MeanReversion._rsi(x, 14) is indicators.wilder_rsi(x, 14)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Kafka event publisher tests against an in-memory fake producer.
+Run: python -m pytest tests/test_kafka_publisher.py -v
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from qcd_platform.pipeline import kafka_producer
+from qcd_platform.pipeline.kafka_producer import EventPublisher
+
+
+class FakeFuture:
+    def __init__(self):
+        self._callbacks, self._errbacks = [], []
+
+    def add_callback(self, fn, *args):
+        self._callbacks.append((fn, args))
+        return self
+
+    def add_errback(self, fn, *args):
+        self._errbacks.append((fn, args))
+        return self
+
+    def succeed(self, metadata=None):
+        for fn, args in self._callbacks:
+            fn(*args, metadata)
+
+    def fail(self, exc):
+        for fn, args in self._errbacks:
+            fn(*args, exc)
+
+
+class FakeProducer:
+    """Buffers sends until flush(), like a batching producer; topics in fail_topics error out."""
+
+    def __init__(self, fail_topics=()):
+        self.fail_topics = set(fail_topics)
+        self.pending = []
+        self.delivered = []
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def send(self, topic, value=None, key=None):
+        future = FakeFuture()
+        with self.lock:
+            self.pending.append((topic, value, key, future))
+        return future
+
+    def flush(self, timeout=None):
+        with self.lock:
+            batch, self.pending = self.pending, []
+        for topic, value, key, future in batch:
+            if topic in self.fail_topics:
+                future.fail(RuntimeError("broker rejected"))
+            else:
+                self.delivered.append((topic, value, key))
+                future.succeed()
+
+    def close(self):
+        self.closed = True
+
+
+def test_publish_does_not_block_and_flush_delivers_everything():
+    producer = FakeProducer()
+    publisher = EventPublisher(producer)
+    for i in range(100):
+        assert publisher.publish("quantclaw.pipeline.bronze.macro", {"i": i})
+
+    assert publisher.flush(timeout=5)
+    assert len(producer.delivered) == 100
+    stats = publisher.stats()
+    assert stats["delivered"] == 100 and stats["failed"] == 0 and stats["in_flight"] == 0
+    publisher.close()
+    assert producer.closed
+
+
+def test_delivery_failures_feed_metrics():
+    producer = FakeProducer(fail_topics={"quantclaw.pipeline.errors"})
+    publisher = EventPublisher(producer)
+    publisher.publish("quantclaw.pipeline.gold.fx", {"ok": True})
+    publisher.publish("quantclaw.pipeline.errors", {"ok": False})
+
+    assert publisher.flush(timeout=5)
+    stats = publisher.stats()
+    assert stats["delivered"] == 1
+    assert stats["failed"] == 1
+    assert stats["failures_by_topic"] == {"quantclaw.pipeline.errors": 1}
+    publisher.close()
+
+
+def test_full_queue_drops_instead_of_blocking():
+    gate = threading.Event()
+
+    class StuckProducer(FakeProducer):
+        def send(self, topic, value=None, key=None):
+            gate.wait()
+            return super().send(topic, value, key)
+
+    producer = StuckProducer()
+    publisher = EventPublisher(producer, max_queue=2)
+    accepted = [publisher.publish("t", {"i": i}) for i in range(10)]
+    assert accepted.count(False) >= 7
+    assert publisher.stats()["dropped"] == accepted.count(False)
+
+    gate.set()
+    assert publisher.flush(timeout=5)
+    assert len(producer.delivered) == accepted.count(True)
+    publisher.close()
+
+
+def test_module_level_api_with_fake_producer():
+    producer = FakeProducer()
+    kafka_producer.set_producer(producer)
+    try:
+        kafka_producer.publish_event("quantclaw.pipeline.silver.crypto", {"count": 3}, key="m")
+        assert kafka_producer.flush(timeout=5)
+        assert producer.delivered == [("quantclaw.pipeline.silver.crypto", {"count": 3}, "m")]
+        assert kafka_producer.get_stats()["delivered"] == 1
+
+        before = kafka_producer.get_stats()
+        for n in range(2):
+            kafka_producer.publish_event("quantclaw.pipeline.gold.crypto", {"count": n})
+        assert kafka_producer.flush(timeout=5)
+        assert kafka_producer.stats_since(before) == {"queued": 2, "sent": 2, "delivered": 2, "failed": 0,
+                                                       "dropped": 0}
+    finally:
+        kafka_producer.set_producer(None)
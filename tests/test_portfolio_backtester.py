@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Portfolio backtester tests: array-backed simulation matches a position-by-position loop,
+panels load aligned from the price store, and parallel grids match serial runs.
+Run: python -m pytest tests/test_portfolio_backtester.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from modules.backtesting_engine import (EXIT_REASONS, PORTFOLIO_PARAMS, PYRAMIDS, PortfolioBacktester,
+                                        PricePanel, portfolio_metrics)
+from modules.price_store import PriceStore
+
+SETTINGS = {'initial_cash': 120000, 'position_size': 5000, 'commission': 1.0, 'slippage': 0.001}
+
+PARAM_SETS = [
+    {},
+    {'stop_loss': -0.10, 'take_profit': 0.30, 'score_exit_threshold': 20, 'max_hold_days': 90,
+     'max_positions': 10, 'max_per_sector': 3, 'min_entry_score': 30, 'cash_reserve_pct': 0.10},
+    {'stop_loss': -0.20, 'take_profit': 1.00, 'score_exit_threshold': 15, 'max_hold_days': 180,
+     'pyramid': 'add_2.5k_at_15pct', 'max_positions': 20, 'max_per_sector': 5},
+    {'trailing_stop': -0.10, 'score_exit_threshold': 15, 'max_positions': 15, 'max_per_sector': 2,
+     'min_entry_score': 35, 'cash_reserve_pct': 0.10},
+    {'stop_loss': -0.15, 'pyramid': 'add_2.5k_at_15_and_30pct', 'max_positions': 30, 'min_entry_score': 20},
+    {'take_profit': 0.15, 'pyramid': 'double_down_5k_at_20pct', 'max_positions': 25, 'cash_reserve_pct': 0.5},
+]
+
+
+def reference(close, days, rows, scores, eligible, sectors, params, initial_cash, position_size, commission, slippage):
+    """The same rules with one dict per position, as scripts/backtest/optimized_backtest_v3.py kept them"""
+    p = {**PORTFOLIO_PARAMS, **params}
+    tiers = PYRAMIDS[p['pyramid']]
+    cash, positions, trades, states = float(initial_cash), {}, [], []
+
+    def close_out(j, bar, price, reason, costs=True):
+        nonlocal cash
+        pos = positions.pop(j)
+        proceeds = pos['shares'] * price * (1 - slippage) - commission if costs else pos['shares'] * price
+        cash += proceeds
+        trades.append((j, pos['entry'], bar, proceeds - pos['cost'], reason))
+
+    for r, bar in enumerate(rows):
+        price, score = close[bar], scores[r]
+        for j in sorted(positions):
+            pos = positions[j]
+            ret = price[j] / (pos['cost'] / pos['shares']) - 1
+            pos['peak'] = max(pos['peak'], price[j])
+            checks = [p['stop_loss'] and ret <= p['stop_loss'],
+                      p['take_profit'] and ret >= p['take_profit'],
+                      p['score_exit_threshold'] and score[j] < p['score_exit_threshold'],
+                      p['max_hold_days'] and days[bar] - days[pos['entry']] >= p['max_hold_days'],
+                      p['trailing_stop'] and price[j] / pos['peak'] - 1 <= p['trailing_stop']]
+            if any(checks):
+                close_out(j, bar, price[j], checks.index(True))
+        for j in sorted(positions):
+            pos = positions[j]
+            ret = price[j] / (pos['cost'] / pos['shares']) - 1
+            if pos['adds'] < len(tiers) and ret >= tiers[pos['adds']][0] and score[j] > p['pyramid_min_score']:
+                amount = tiers[pos['adds']][1]
+                if amount + commission > cash:
+                    break
+                pos['shares'] += amount / (price[j] * (1 + slippage))
+                pos['cost'] += amount + commission
+                pos['adds'] += 1
+                cash -= amount + commission
+        slots = p['max_positions'] - len(positions)
+        value = cash + sum(pos['shares'] * price[j] for j, pos in positions.items())
+        n_new = min(slots, int(max(0.0, cash - value * p['cash_reserve_pct']) / (position_size + commission)))
+        per_sector = {}
+        for j in positions:
+            per_sector[sectors[j]] = per_sector.get(sectors[j], 0) + 1
+        candidates = [j for j in range(len(price)) if eligible[r, j] and j not in positions
+                      and score[j] >= p['min_entry_score'] and price[j] > 0]
+        opened = 0
+        for j in sorted(candidates, key=lambda j: -score[j]):
+            if opened >= n_new:
+                break
+            if per_sector.get(sectors[j], 0) >= p['max_per_sector']:
+                continue
+            positions[j] = {'shares': position_size / (price[j] * (1 + slippage)), 'cost': position_size + commission,
+                            'entry': bar, 'peak': price[j], 'adds': 0}
+            cash -= position_size + commission
+            per_sector[sectors[j]] = per_sector.get(sectors[j], 0) + 1
+            opened += 1
+        states.append((cash, {j: pos['shares'] for j, pos in positions.items()}))
+    for j in sorted(positions):
+        close_out(j, len(close) - 1, close[-1, j], len(EXIT_REASONS) - 1, costs=False)
+
+    equity = np.full(len(close), float(initial_cash))
+    for r, bar in enumerate(rows):
+        for b in range(bar, rows[r + 1] if r + 1 < len(rows) else len(close)):
+            equity[b] = states[r][0] + sum(q * close[b, j] for j, q in states[r][1].items())
+    return trades, equity
+
+
+def market(n_bars=400, n_tickers=40, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2021-01-04', periods=n_bars)
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0005, 0.025, (n_bars, n_tickers)), axis=0))
+    close[:rng.integers(0, 150), 3] = np.nan            # listed late
+    close[rng.random((n_bars, n_tickers)) < 0.02] = np.nan  # missing bars
+    tickers = [f"T{j:02d}" for j in range(n_tickers)]
+    panel = PricePanel(dates.to_numpy(), tickers, close)
+
+    rebalance = pd.date_range('2021-01-01', periods=40, freq='SMS')  # 1st and 15th, some on weekends
+    scores = pd.DataFrame(rng.uniform(0, 60, (len(rebalance), n_tickers)), index=rebalance, columns=tickers)
+    scores[scores < 8] = np.nan
+    eligible = pd.DataFrame(rng.random(scores.shape) < 0.6, index=rebalance, columns=tickers)
+    sectors = {t: ['Tech', 'Energy', 'Health', 'Financials'][j % 4] for j, t in enumerate(tickers)}
+    return panel, scores, eligible, sectors
+
+
+@pytest.fixture(scope="module")
+def backtester():
+    panel, scores, eligible, sectors = market()
+    return PortfolioBacktester(panel, scores, eligible, sectors, **SETTINGS)
+
+
+@pytest.mark.parametrize("params", PARAM_SETS)
+def test_simulation_matches_position_loop(backtester, params):
+    result = backtester.run(params)
+    trades, equity = reference(params=params, **backtester.arrays, **SETTINGS)
+
+    got = list(zip(result.trades['ticker'], result.trades['entry_row'], result.trades['exit_row'], result.trades['reason']))
+    assert got == [t[:3] + (t[4],) for t in trades]
+    np.testing.assert_allclose(result.trades['pnl'], [t[3] for t in trades], rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(result.equity, equity, rtol=1e-12)
+    assert result.metrics['num_trades'] == len(trades) > 0
+    assert result.metrics['final_value'] == pytest.approx(equity[-1])
+
+
+def test_rules_bind(backtester):
+    limited = backtester.run(PARAM_SETS[1])
+    records = limited.trade_records()
+    assert {r['exit_reason'] for r in records} >= {'stop_loss', 'take_profit', 'score_exit', 'backtest_end'}
+    assert max(r['hold_days'] for r in records) <= 90 + 14
+    sectors = backtester.arrays['sectors']
+    for r in range(len(backtester.arrays['rows'])):
+        bar = backtester.arrays['rows'][r]
+        open_ = (limited.trades['entry_row'] <= bar) & (limited.trades['exit_row'] > bar)
+        assert open_.sum() <= 10
+        assert np.bincount(sectors[limited.trades['ticker'][open_].astype(int)], minlength=4).max() <= 3
+    assert (limited.equity > 0).all() and limited.invested.max() <= limited.equity.max()
+
+
+def test_parallel_grid_over_shared_panel_matches_serial(backtester):
+    grid = {'stop_loss': [None, -0.15], 'take_profit': [None, 0.5], 'max_positions': [10, 20],
+            'pyramid': ['none', 'add_2.5k_at_15pct']}
+    best, results = backtester.grid_search(grid, 'total_return', workers=2)
+    serial = backtester.evaluate([r['params'] for r in results], 'total_return', workers=1)
+
+    assert len(results) == 16
+    assert [r['metrics'] for r in results] == [r['metrics'] for r in serial]
+    assert best == max(results, key=lambda r: r['score'])['params']
+    single = backtester.run(results[5]['params'])
+    assert results[5]['metrics'] == portfolio_metrics(
+        {**single.trades, 'equity': single.equity, 'invested': single.invested},
+        backtester.arrays['days'], SETTINGS['initial_cash'])
+
+
+def test_panel_from_store_aligns_and_carries_gaps(tmp_path):
+    store = PriceStore(tmp_path)
+    idx = pd.bdate_range('2024-01-01', periods=10)
+    store.append('AAA', pd.DataFrame({'Close': np.arange(10.0) + 100}, index=idx))
+    store.append('BBB', pd.DataFrame({'Close': [1.0, 2.0, 3.0]}, index=idx[[2, 3, 7]]))
+
+    panel = PricePanel.from_store(['aaa', 'BBB', 'NOPE'], '2024-01-01', '2024-02-01', store=store, download=False)
+    assert panel.tickers == ['AAA', 'BBB', 'NOPE'] and len(panel.dates) == 10
+    filled = panel.filled()
+    assert np.isnan(filled[:2, 1]).all() and filled[2:, 1].tolist() == [1, 2, 2, 2, 2, 3, 3, 3]
+    assert np.isnan(filled[:, 2]).all()
+    assert panel.rows_at(pd.to_datetime(['2023-12-31', '2024-01-06', '2024-01-08'])).tolist() == [-1, 4, 5]
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Price store tests: memmapped columns, atomic appends, aligned panels, missing-range downloads,
+and the note of tickers Yahoo had no bars for.
+Run: python -m pytest tests/test_price_store.py -v
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from modules import price_store
+from modules.price_store import PriceStore, import_pickle
+
+
+def bars(start, n, base=100.0, freq="B"):
+    idx = pd.date_range(start, periods=n, freq=freq, tz="America/New_York")
+    close = base + np.arange(n, dtype=float)
+    return pd.DataFrame({"Open": close - 1, "High": close + 1, "Low": close - 2, "Close": close,
+                         "Volume": np.full(n, 1e6), "Dividends": 0.0}, index=idx)
+
+
+def test_append_read_and_aligned_load(tmp_path):
+    store = PriceStore(tmp_path)
+    assert store.append("aapl", bars("2024-01-01", 10)) == 10
+    assert store.append("AAPL", bars("2024-01-08", 10)) == 5          # only bars after the last one
+    store.append("MSFT", bars("2024-01-03", 3, base=300.0))
+
+    aapl = store.read("AAPL")
+    assert len(aapl) == 15 and list(aapl.columns) == list(price_store.FIELDS)
+    assert aapl.index.tz is None and aapl.index.is_monotonic_increasing and aapl.index.is_unique
+
+    panel = store.load(["AAPL", "MSFT", "NOPE"], "2024-01-02", "2024-01-05")
+    assert list(panel.index.strftime("%m-%d")) == ["01-02", "01-03", "01-04"]
+    assert panel["Close"]["AAPL"].tolist() == [101.0, 102.0, 103.0]
+    assert panel["Close"]["MSFT"].tolist()[1:] == [300.0, 301.0] and np.isnan(panel["Close"]["MSFT"].iloc[0])
+    assert panel["Volume"]["NOPE"].isna().all()
+
+
+def test_uncommitted_tail_is_invisible_and_truncated(tmp_path):
+    store = PriceStore(tmp_path)
+    store.append("SPY", bars("2024-01-01", 5))
+    meta = store.meta("SPY")
+    for name in ("ts", "Close"):   # a writer died after writing part of an append
+        with open(store._path("SPY", name, meta["gen"]), "ab") as f:
+            f.write(b"\x00" * 24)
+
+    assert len(store.read("SPY")) == 5
+    store.append("SPY", bars("2024-01-08", 2, base=200.0))
+    assert store.read("SPY")["Close"].tolist() == [100, 101, 102, 103, 104, 200, 201]
+
+
+def test_rewrite_frames_and_legacy_pickle(tmp_path):
+    store = PriceStore(tmp_path / "store")
+    legacy = bars("2023-06-01", 4)
+    with open(tmp_path / "cache.pkl", "wb") as f:
+        pickle.dump({("IWM", c): legacy[c] for c in ("Open", "High", "Low", "Close", "Volume")}, f)
+    assert import_pickle(store, tmp_path / "cache.pkl") == 1
+
+    frames = store.frames()
+    assert "IWM" in frames and len(frames) == 1
+    frames["GLD"] = bars("2022-01-03", 3)
+    frames["GLD"] = bars("2021-01-04", 6)      # earlier history: new generation replaces the old
+    assert len(frames["GLD"]) == 6 and store.meta("GLD")["gen"] == 2 and sorted(frames) == ["GLD", "IWM"]
+
+
+def test_ensure_downloads_only_missing_ranges(tmp_path, monkeypatch):
+    calls = []
+    full = bars("2024-01-01", 40)
+
+    def download(ticker, start, end):
+        calls.append((pd.Timestamp(start).date().isoformat(), pd.Timestamp(end).date().isoformat()))
+        return full[(full.index.tz_localize(None) >= start) & (full.index.tz_localize(None) < end)]
+
+    monkeypatch.setattr(price_store, "_download", download)
+    store = PriceStore(tmp_path)
+    assert store.ensure("QQQ", "2024-01-10", "2024-02-01")
+    assert store.ensure("QQQ", "2024-01-15", "2024-01-25")       # covered: no download
+    assert store.ensure("QQQ", "2024-01-10", "2024-02-10")       # tail only
+    assert store.ensure("QQQ", "2024-01-03", "2024-02-10")       # earlier history: rewrite
+
+    assert calls == [("2024-01-10", "2024-02-01"), ("2024-02-01", "2024-02-10"),
+                     ("2024-01-03", "2024-02-10")]
+    assert len(store.read("QQQ")) == len(full[(full.index >= "2024-01-03") & (full.index < "2024-02-10")])
+
+
+def test_refresh_fetches_gaps_in_batches_and_rebases_splits(tmp_path, monkeypatch):
+    today = pd.Timestamp.now().normalize()
+    source = {t: bars(today - pd.Timedelta(days=60), 40, base=b, freq="D").tz_localize(None)
+              for t, b in (("AAA", 10.0), ("BBB", 50.0), ("CCC", 90.0))}
+    calls = []
+
+    def download_batch(tickers, start, end):
+        calls.append((tuple(tickers), None if start is None else start.date()))
+        lo = pd.Timestamp.min if start is None else start
+        return {t: source[t][(source[t].index >= lo) & (source[t].index < end)] for t in tickers if t in source}
+
+    monkeypatch.setattr(price_store, "_download_batch", download_batch)
+    store = PriceStore(tmp_path)
+    first = store.refresh(["AAA", "BBB", "CCC", "ZZZ"], batch_size=2, workers=2)
+    assert first.new == 3 and first.failed == ["ZZZ"] and first.bars_added == 120
+    assert first.bytes_written == 120 * price_store.ROW_BYTES
+
+    # 20 more days arrive; AAA splits 2:1, so Yahoo now reports its whole history halved
+    for t in source:
+        source[t] = bars(today - pd.Timedelta(days=60), 60, base=source[t]["Close"].iloc[0], freq="D").tz_localize(None)
+    source["AAA"].iloc[:-5, :4] *= 0.5
+    source["AAA"].iloc[:-5, 4] *= 2
+    for t in ("AAA", "BBB", "CCC"):   # pretend the first refresh ran 20 days ago
+        meta = store.meta(t)
+        meta["through"] = meta["last"] + 1
+        store._commit(t, meta)
+    calls.clear()
+    second = store.refresh(["AAA", "BBB", "CCC"], batch_size=2, workers=2)
+
+    last_day = (today - pd.Timedelta(days=21)).date()
+    assert sorted(calls) == [(("AAA", "BBB"), last_day), (("CCC",), last_day)]   # one gap, two batches
+    assert second.rebased == ["AAA"] and second.bars_added == 3 * 20 and second.new == 0
+    assert second.bytes_written == (60 + 20 + 20) * price_store.ROW_BYTES
+    for t in source:
+        stored = store.read(t)
+        expected = source[t][source[t].index < today][list(price_store.FIELDS)]
+        assert np.allclose(stored.to_numpy(), expected.to_numpy()) and stored.index.equals(expected.index)
+    assert store.refresh(["AAA", "BBB", "CCC"]).current == 3
+
+
+def test_refresh_notes_tickers_without_bars(tmp_path, monkeypatch):
+    today = pd.Timestamp.now().normalize()
+    source = {"AAA": bars(today - pd.Timedelta(days=30), 20, freq="D").tz_localize(None)}
+    monkeypatch.setattr(price_store, "_download_batch",
+                        lambda tickers, start, end: {t: source[t] for t in tickers if t in source})
+    store = PriceStore(tmp_path)
+    report = store.refresh(["AAA", "gone", "OLD"])
+    assert sorted(report.failed) == ["GONE", "OLD"] and sorted(report.unavailable) == ["GONE", "OLD"]
+    assert store.unavailable(["AAA", "gone", "OLD", "NEW"]) == ["gone", "OLD"]
+    assert store.unavailable(["OLD"], max_age_days=0) == []
+
+    source["OLD"] = source["AAA"]   # listed again under the old name
+    store.refresh(["OLD"])
+    assert store.unavailable(["gone", "OLD"]) == ["gone"] and "OLD" in store
+
+    def fail(tickers, start, end):
+        raise ConnectionError("network down")
+
+    monkeypatch.setattr(price_store, "_download_batch", fail)
+    assert store.refresh(["NEW"]).failed == ["NEW"]   # a failed request is not a missing ticker
+    assert store.unavailable(["gone", "NEW"]) == ["gone"]
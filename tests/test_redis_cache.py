@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Latest-value cache tests. Encoding tests run anywhere; the rest need a local
+redis-server (QCD_REDIS_HOST/PORT/DB) and are skipped without one.
+Run: python -m pytest tests/test_redis_cache.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from qcd_platform.pipeline import redis_cache
+
+
+@pytest.mark.parametrize("encoding", ["json", "zlib", "msgpack"])
+def test_encoding_round_trip(encoding):
+    payload = {"close": 189.5, "volume": 1200000, "note": "é", "nested": {"a": [1, 2]}}
+    assert redis_cache.decode_value(redis_cache.encode_value(payload, encoding)) == payload
+
+
+def test_plain_json_values_stay_readable():
+    assert redis_cache.decode_value('{"a": 1}') == {"a": 1}
+    assert redis_cache.decode_value(b'{"a": 1}') == {"a": 1}
+
+
+@pytest.fixture
+def live_redis():
+    redis_cache._client = None
+    redis_cache._raw_client = None
+    if not redis_cache._get_redis():
+        redis_cache._client = None
+        pytest.skip("no local redis-server")
+    client = redis_cache._get_raw_redis()
+    yield client
+    for key in client.scan_iter("qcd:latest:__test_module:*"):
+        client.delete(key)
+
+
+def test_pipelined_write_and_read_through(live_redis, monkeypatch):
+    items = [(f"SYM{i}", {"i": i}) for i in range(2500)] + [("SYM0", {"i": "last"})]
+    assert redis_cache.cache_latest_many("__test_module", items, encoding="zlib", chunk_size=1000) == 2500
+
+    db_calls = []
+
+    def fake_db(module_name, symbols):
+        db_calls.append(list(symbols))
+        return {"FROM_DB": {"i": -1}}
+
+    monkeypatch.setattr(redis_cache, "_latest_from_db", fake_db)
+    before = redis_cache.get_cache_stats()
+    got = redis_cache.get_latest_many("__test_module", ["SYM0", "SYM7", "FROM_DB", "NOWHERE"])
+    after = redis_cache.get_cache_stats()
+
+    assert got == {"SYM0": {"i": "last"}, "SYM7": {"i": 7}, "FROM_DB": {"i": -1}}
+    assert db_calls == [["FROM_DB", "NOWHERE"]]
+    assert after["hits"] - before["hits"] == 2
+    assert after["misses"] - before["misses"] == 2
+    assert after["fallback_hits"] - before["fallback_hits"] == 1
+    # the fallback hit was written back
+    assert redis_cache.get_latest("__test_module", "FROM_DB") == {"i": -1}
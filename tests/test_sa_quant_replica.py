@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+SA Quant replica tests: batch scoring matches score_at_date pair by pair, the momentum
+grade matches the per-date pandas version, and pool workers and the memo agree.
+Run: python -m pytest tests/test_sa_quant_replica.py -v
+"""
+
+import json
+import pickle
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+pytest.importorskip("tqdm")
+from modules import sa_quant_replica
+from modules.price_store import PriceStore
+
+SECTORS = ['Technology', 'Healthcare', 'Energy']
+DATES = ['2021-03-01', '2022-01-15', '2022-06-30', '2023-01-02', '2023-07-15', '2024-02-29', '2024-12-31']
+
+
+def cache_rows(ticker, j, rng):
+    """quarterly_financials / earnings_history / upgrades_downgrades / ticker_info values for a ticker"""
+    quarters = pd.date_range(end='2024-12-31', periods=12, freq='QE')[::-1]
+    revenue = rng.uniform(1e8, 1e9) * (1 + rng.normal(0.03, 0.08, 5)).cumprod()
+    income = pd.DataFrame([revenue, revenue * rng.uniform(0.2, 0.7), revenue * rng.normal(0.12, 0.1, 5),
+                           revenue * rng.normal(0.08, 0.1, 5)],
+                          index=['Total Revenue', 'Gross Profit', 'EBIT', 'Net Income'], columns=quarters[:5])
+    balance = pd.DataFrame([[rng.uniform(1e6, 1e8)] * 5, rng.normal(5e8, 4e8, 5), rng.uniform(1e9, 5e9, 5)],
+                           index=['Ordinary Shares Number', 'Stockholders Equity', 'Total Assets'], columns=quarters[:5])
+    cashflow = pd.DataFrame([revenue * rng.normal(0.1, 0.1, 5)], index=['Free Cash Flow'], columns=quarters[:5])
+    if j % 7 == 3:
+        income = income.iloc[:, :3]  # too few quarters
+    earnings = pd.DataFrame({'surprisePercent': rng.normal(0.03, 0.08, 12)}, index=quarters)
+    actions = pd.DataFrame({'Action': rng.choice(['up', 'down', 'main', 'init', 'reit'], 60)},
+                           index=pd.DatetimeIndex(np.sort(rng.choice(pd.date_range('2021-01-01', '2024-12-31'), 60))[::-1]))
+    return ((ticker, pickle.dumps(income), pickle.dumps(balance), pickle.dumps(cashflow)),
+            (ticker, pickle.dumps(earnings.iloc[:0] if j % 5 == 4 else earnings)),
+            (ticker, pickle.dumps(actions)),
+            (ticker, json.dumps({'sector': SECTORS[j % 3]} if j % 6 else {})))
+
+
+@pytest.fixture
+def scorer(tmp_path, monkeypatch):
+    """SAQuantReplica over a synthetic price store and a pre-filled yfinance cache"""
+    rng = np.random.default_rng(5)
+    store = PriceStore(tmp_path / 'prices')
+    dates = pd.bdate_range('2021-01-04', '2024-12-31')
+    tickers = [f"T{j:02d}" for j in range(18)]
+    now = datetime.now().isoformat()
+    rows = [cache_rows(t, j, rng) for j, t in enumerate(tickers)]
+    for j, ticker in enumerate(tickers[:-1]):  # the last one has no prices
+        close = 30 * np.exp(np.cumsum(rng.normal(rng.normal(0.0008, 0.001), 0.02, len(dates))))
+        close[rng.random(len(dates)) < 0.02] = np.nan
+        start = int(rng.integers(100, 500)) if j % 4 == 1 else 0
+        store.append(ticker, pd.DataFrame({'Close': close[start:]}, index=dates[start:]))
+    monkeypatch.setattr(sa_quant_replica, 'get_price_store', lambda: store)
+
+    replica = sa_quant_replica.SAQuantReplica(cache_dir=tmp_path / 'cache')
+    conn = sqlite3.connect(replica.cache_db)
+    conn.executemany('INSERT INTO quarterly_financials VALUES (?, ?, ?, ?, ?)', [r[0] + (now,) for r in rows])
+    conn.executemany('INSERT INTO earnings_history VALUES (?, ?, ?)', [r[1] + (now,) for r in rows])
+    conn.executemany('INSERT INTO upgrades_downgrades VALUES (?, ?, ?)', [r[2] + (now,) for r in rows])
+    conn.executemany('INSERT INTO ticker_info VALUES (?, ?, ?)', [r[3] + (now,) for r in rows])
+    conn.commit()
+    conn.close()
+    replica.tickers = tickers
+    return replica
+
+
+def reference_momentum(replica, prices):
+    """The momentum grade as _score_momentum computed it with pandas, one date at a time"""
+    if prices is None or len(prices) < 50:
+        return 0.0, {'error': 'Not enough price data'}
+    close, grade, details, scores = prices['Close'], replica._grade_to_score, {}, []
+    ladders = [('return_3m_pct', 63, (30, 15, 5, 0, -10)), ('return_6m_pct', 126, (40, 20, 8, 0, -15)),
+               ('return_12m_pct', 252, (50, 25, 10, 0, -20))]
+    for key, bars, bounds in ladders:
+        if len(close) >= bars:
+            ret = (close.iloc[-1] / close.iloc[-bars] - 1) * 100
+            details[key] = round(ret, 2)
+            scores.append(grade(next((g for g, b in zip(['A+', 'A', 'B', 'C', 'D'], bounds) if ret > b), 'F')))
+    if len(close) >= 20:
+        delta = close.diff()
+        rsi = (100 - 100 / (1 + delta.where(delta > 0, 0).rolling(14).mean()
+                            / -delta.where(delta < 0, 0).rolling(14).mean())).iloc[-1]
+        if not np.isnan(rsi):
+            details['rsi'] = round(rsi, 2)
+            scores.append(grade('A' if 50 <= rsi <= 70 else 'B' if 40 <= rsi <= 80 else
+                                'D' if rsi > 80 or rsi < 30 else 'C'))
+    if len(close) >= 200:
+        pct = (close.iloc[-1] / close.rolling(200).mean().iloc[-1] - 1) * 100
+        details['pct_above_200ma'] = round(pct, 2)
+        scores.append(grade(next((g for g, b in zip(['A+', 'A', 'B', 'C', 'D'], (10, 5, 0, -5, -10)) if pct > b), 'F')))
+    if not scores:
+        return 0.0, details
+    details['score'] = round(np.mean(scores), 2)
+    return np.mean(scores), details
+
+
+def test_momentum_matches_the_pandas_version(scorer):
+    for ticker in scorer.tickers:
+        for date in DATES + ['2021-04-15', '2021-11-30']:
+            score, details = scorer._score_momentum(ticker, date)
+            expected_score, expected = reference_momentum(scorer, scorer._get_price_history_before_date(ticker, date))
+            assert score == pytest.approx(expected_score) and details.keys() == expected.keys()
+            assert [details[k] for k in details] == pytest.approx([expected[k] for k in expected], nan_ok=True, abs=0.011)
+
+
+def test_batch_equals_score_at_date(scorer):
+    grades = scorer.score_batch(scorer.tickers, DATES, workers=1)
+    assert len(grades) == len(scorer.tickers) * len(DATES)
+    assert list(zip(grades['date'], grades['ticker'])) == [(d, t) for d in DATES for t in scorer.tickers]
+    for row in grades.to_dict('records'):
+        expected = scorer.score_at_date(row['ticker'], row['date'])
+        assert row['composite_score'] == expected['composite_score'] and row['rating'] == expected['rating']
+        assert {f: row[f] for f in expected['factors']} == {f: v['score'] for f, v in expected['factors'].items()}
+    assert set(grades['rating']) >= {'Buy', 'Hold'}
+    assert (grades['sector'] == 'Unknown').any()
+
+    for column in ['momentum', 'composite_score']:
+        ranks = grades.groupby(['date', 'sector'])[column].rank(pct=True)
+        assert grades[f'{column}_sector_pct'].tolist() == ranks.tolist()
+
+
+def test_repeated_pairs_do_not_skew_sector_ranks(scorer):
+    unique = scorer.score_batch(scorer.tickers, DATES[:2], workers=1)
+    pairs = [(t, d) for d in DATES[:2] for t in scorer.tickers]
+    repeated = scorer.score_pairs(pairs + pairs[:3] + [pairs[0]], workers=1)
+    assert len(repeated) == len(pairs) + 4
+    pd.testing.assert_frame_equal(repeated.iloc[:len(pairs)], unique)
+    pd.testing.assert_frame_equal(repeated.iloc[len(pairs):].reset_index(drop=True),
+                                  unique.iloc[[0, 1, 2, 0]].reset_index(drop=True))
+
+
+def test_memo_and_pool_workers(scorer, monkeypatch):
+    serial = scorer.score_batch(scorer.tickers, DATES[:4], workers=1)
+    parallel = sa_quant_replica.SAQuantReplica.__new__(sa_quant_replica.SAQuantReplica)
+    parallel.__dict__.update(scorer.__getstate__())
+    pd.testing.assert_frame_equal(parallel.score_batch(scorer.tickers, DATES[:4], workers=2), serial)
+
+    graded = []
+    grade = scorer._grade_ticker
+    monkeypatch.setattr(scorer, '_grade_ticker', lambda ticker, dates: graded.append((ticker, dates)) or grade(ticker, dates))
+    again = scorer.score_batch(scorer.tickers, DATES[2:], workers=1)
+    assert graded == [(t, DATES[4:]) for t in scorer.tickers]
+    pd.testing.assert_frame_equal(again.iloc[:2 * len(scorer.tickers), :10], serial.iloc[2 * len(scorer.tickers):, :10]
+                                  .reset_index(drop=True))
+
+
+def test_find_strong_buys_ranks_like_the_loop(scorer):
+    for date in DATES:
+        loop = [r for r in (scorer.score_at_date(t, date) for t in scorer.tickers) if r['composite_score'] >= 3.5]
+        loop.sort(key=lambda x: x['composite_score'], reverse=True)
+        assert scorer.find_strong_buys(scorer.tickers, date, n=3, workers=1) == loop[:3]
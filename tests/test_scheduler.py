@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Batch scheduler tests: priority order, per-host caps and requeued retries.
+Run: python -m pytest tests/test_scheduler.py -v
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from qcd_platform.pipeline.scheduler import BatchScheduler, ScheduledTask, upstream_host
+
+
+def test_upstream_host_prefers_api_hosts():
+    assert upstream_host("https://42matters.com/docs", "https://api.42matters.com/v2") == "api.42matters.com"
+    assert upstream_host(None, "") is None
+
+
+def test_priority_order_with_single_worker():
+    now = datetime.now(timezone.utc)
+    order = []
+    tasks = [
+        ScheduledTask("weekly_late", next_run_at=now - timedelta(hours=1), cadence="weekly"),
+        ScheduledTask("daily_fast", next_run_at=now - timedelta(hours=5), cadence="daily", avg_duration_ms=10),
+        ScheduledTask("daily_slow", next_run_at=now - timedelta(hours=5), cadence="daily", avg_duration_ms=9000),
+        ScheduledTask("never_run", next_run_at=None),
+    ]
+    scheduler = BatchScheduler(lambda t: order.append(t.name) or {"module": t.name, "status": "success"},
+                               max_workers=1)
+    scheduler.run(tasks)
+    assert order == ["never_run", "daily_slow", "daily_fast", "weekly_late"]
+
+
+def test_host_cap_limits_concurrency():
+    lock = threading.Lock()
+    active = {"api.x.com": 0}
+    peak = {"api.x.com": 0}
+
+    def run(task):
+        with lock:
+            active[task.host] += 1
+            peak[task.host] = max(peak[task.host], active[task.host])
+        time.sleep(0.02)
+        with lock:
+            active[task.host] -= 1
+        return {"module": task.name, "status": "success"}
+
+    tasks = [ScheduledTask(f"m{i}", host="api.x.com") for i in range(8)]
+    scheduler = BatchScheduler(run, max_workers=4, host_limit=2)
+    assert len(scheduler.run(tasks)) == 8
+    assert peak["api.x.com"] == 2
+
+
+def test_failed_task_is_requeued_without_blocking_workers():
+    attempts = {}
+    exhausted = []
+
+    def run(task):
+        attempts[task.name] = attempts.get(task.name, 0) + 1
+        if task.name == "flaky" and task.attempt < 2:
+            return {"module": task.name, "status": "failed", "error": "boom"}
+        if task.name == "dead":
+            return {"module": task.name, "status": "failed", "error": "down"}
+        return {"module": task.name, "status": "success"}
+
+    tasks = [ScheduledTask("flaky"), ScheduledTask("dead"), ScheduledTask("ok")]
+    scheduler = BatchScheduler(run, max_workers=2, max_attempts=3, retry_delay=0.01,
+                               on_exhausted=lambda t, r: exhausted.append(t.name))
+    results = {r["module"]: r["status"] for r in scheduler.run(tasks)}
+
+    assert results == {"flaky": "success", "dead": "failed", "ok": "success"}
+    assert attempts == {"flaky": 2, "dead": 3, "ok": 1}
+    assert exhausted == ["dead"]
+    metrics = scheduler.metrics()
+    assert metrics["retries"] == 3
+    assert 0 <= metrics["worker_utilisation"] <= 1
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Smart alerts tests: the indexed engine triggers exactly what checking every rule on
+every tick triggers, and its journal and history logs reload to the same state.
+Run: python -m pytest tests/test_smart_alerts.py -v
+"""
+
+import sys
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from modules import smart_alerts
+from modules.smart_alerts import AlertEngine, AlertRule
+
+SYMBOLS = ['AAA', 'BBB', 'CCC', 'DDD', 'EEE']
+FIELDS = ['price', 'volume', 'rsi']
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(smart_alerts, 'ALERTS_DIR', tmp_path)
+    monkeypatch.setattr(smart_alerts, 'ALERTS_FILE', tmp_path / 'alerts.json')
+    monkeypatch.setattr(smart_alerts, 'ALERTS_JOURNAL', tmp_path / 'alerts_journal.jsonl')
+    monkeypatch.setattr(smart_alerts, 'HISTORY_FILE', tmp_path / 'alert_history.jsonl')
+    monkeypatch.setattr(smart_alerts, 'LEGACY_HISTORY_FILE', tmp_path / 'alert_history.json')
+    monkeypatch.setattr(smart_alerts, 'JOURNAL_COMPACT_MIN', 50)
+    return AlertEngine()
+
+
+def reference_check(engine, rules, market_data, now):
+    """check_alerts as it was: every active rule evaluated on every tick"""
+    fired = []
+    for alert in rules:
+        if not alert.active or alert.symbol not in market_data:
+            continue
+        hit, value = engine.evaluate_condition(alert.condition, market_data[alert.symbol])
+        if not hit or not engine.can_trigger(alert, now)[0]:
+            continue
+        alert.last_triggered = now.isoformat()
+        alert.trigger_count_hour += 1
+        alert.trigger_count_total += 1
+        fired.append((alert.id, value))
+    return fired
+
+
+def random_rule(engine, rng):
+    op = rng.choice(['>', '<', '>=', '<=', '==', '!='])
+    field = rng.choice(FIELDS)
+    condition = f"{field}{op}{rng.integers(0, 20) / 2}"
+    if rng.random() < 0.05:
+        condition = rng.choice(['price>>5', 'RSI < 4', ' Volume >= 6.5 ', 'price'])
+    alert = engine.create_alert(rng.choice(SYMBOLS), condition, channels=[],
+                                cooldown_minutes=int(rng.integers(0, 40)), max_per_hour=int(rng.integers(0, 4)))
+    return alert
+
+
+def random_tick(rng):
+    tick = {}
+    for symbol in SYMBOLS:
+        if rng.random() < 0.8:
+            values = {f: float(rng.integers(0, 20) / 2) for f in FIELDS if rng.random() < 0.9}
+            if rng.random() < 0.05:
+                values['price'] = float('nan')
+            tick[symbol] = values
+    return tick
+
+
+def test_indexed_engine_triggers_like_the_full_scan(engine, capsys):
+    rng = np.random.default_rng(4)
+    for _ in range(150):
+        random_rule(engine, rng)
+    engine.save_alerts()
+    rules = [AlertRule(**asdict(a)) for a in engine.alerts]
+    now = datetime(2025, 3, 3, 14, 30)
+    total = 0
+    for step in range(400):
+        now += timedelta(minutes=int(rng.integers(1, 12)))
+        if step % 40 == 39:   # rules change between ticks
+            alert = random_rule(engine, rng)
+            rules.append(AlertRule(**asdict(alert)))
+            victim = rules[int(rng.integers(0, len(rules)))]
+            engine.toggle_alert(victim.id)
+            victim.active = not victim.active
+            if step % 80 == 79:
+                gone = rules.pop(int(rng.integers(0, len(rules))))
+                assert engine.delete_alert(gone.id)
+        tick = random_tick(rng)
+        got = [(t.alert_id, t.triggered_value) for t in engine.check_alerts(tick, now=now)]
+        expected = reference_check(engine, rules, tick, now)
+        assert got == expected
+        total += len(got)
+    assert total > 300
+    assert [asdict(a) for a in engine.alerts] == [asdict(a) for a in rules]
+
+    reloaded = AlertEngine()
+    assert [asdict(a) for a in reloaded.alerts] == [asdict(a) for a in rules]
+    assert [asdict(t) for t in reloaded.history] == [asdict(t) for t in engine.history]
+    assert len(reloaded.history) == total
+
+
+def test_only_crossed_rules_are_tested(engine, monkeypatch):
+    for threshold in range(100):
+        engine.create_alert('AAA', f"price>{threshold}", channels=[])
+    engine.create_alert('AAA', 'volume<5', channels=[])
+    now = datetime(2025, 1, 2, 10)
+    assert len(engine.check_alerts({'AAA': {'price': 50.5, 'volume': 9}}, now=now)) == 51
+
+    tested = []
+    test = smart_alerts.Condition.test
+    monkeypatch.setattr(smart_alerts.Condition, 'test', lambda self, value: tested.append(self) or test(self, value))
+    fired = engine.check_alerts({'AAA': {'price': 55.5, 'volume': 9}}, now=now + timedelta(minutes=1))
+    assert [t.condition for t in fired] == [f"price>{t}" for t in range(51, 56)]
+    assert len(tested) < 20
+
+
+def test_legacy_history_is_read_and_migrated(engine):
+    trigger = smart_alerts.AlertTrigger('x', 'AAA', 'price>1', '2024-01-01T00:00:00', 2.0, [], {}, 'm')
+    smart_alerts.LEGACY_HISTORY_FILE.write_text(smart_alerts.json.dumps([asdict(trigger)]))
+    engine.load_history()
+    engine.create_alert('AAA', 'price>1', channels=[])
+    engine.check_alerts({'AAA': {'price': 3.0}})
+    assert [t.alert_id for t in AlertEngine().history][0] == 'x' and len(AlertEngine().history) == 2
+    engine.save_history()
+    assert not smart_alerts.LEGACY_HISTORY_FILE.exists() and len(AlertEngine().history) == 2
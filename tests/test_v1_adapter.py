@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+V1 adapter conversion tests: untruncated, chunked conversion and per-chunk persistence in run().
+Run: python -m pytest tests/test_v1_adapter.py -v
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from qcd_platform.pipeline import base_module
+from qcd_platform.pipeline.datapoint_batch import DataPointBatch
+from qcd_platform.pipeline.run_context import RunContext
+from qcd_platform.pipeline.v1_adapter import V1ModuleAdapter
+
+YESTERDAY = datetime.now(timezone.utc) - timedelta(days=1)
+
+
+class FakeV1(V1ModuleAdapter):
+    def __init__(self, result, chunk_rows):
+        super().__init__("fake_v1")
+        self.module_id = 5
+        self.chunk_rows = chunk_rows
+        self._result = result
+
+    def _call_v1(self, symbols=None):
+        return self._result() if callable(self._result) else self._result
+
+
+def records(n):
+    for i in range(n):
+        yield {"ticker": f"T{i % 7}", "date": (YESTERDAY - timedelta(minutes=i)).isoformat(), "i": i % 900}
+
+
+def test_dataframe_is_chunked_not_truncated():
+    df = pd.DataFrame({"date": pd.date_range("2026-01-01", periods=1200, freq="h"), "close": range(1200)})
+    chunks = list(FakeV1(df, chunk_rows=500).fetch_chunks())
+
+    assert [len(c) for c in chunks] == [500, 500, 200]
+    assert all(isinstance(c, DataPointBatch) for c in chunks)
+    assert chunks[2].payload_dicts()[-1] == {"close": 1199}
+    assert len(FakeV1(df, chunk_rows=500).fetch()) == 1200
+
+
+def test_record_chunks_match_per_item_conversion():
+    adapter = FakeV1(None, chunk_rows=None)
+    items = [
+        {"symbol": "AAPL", "ticker": "X", "date": "2026-01-02", "period": "bad", "v": 1},
+        {"ticker": 7, "timestamp": "2026-01-03T05:00:00+00:00", "v": 2.5, "s": "a"},
+        {"v": 3},
+    ]
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    expected = adapter._convert_items([dict(i) for i in items], now)
+    batch = next(adapter._convert_list(items, now))
+
+    assert batch.symbol_list() == [p.symbol for p in expected]
+    assert batch.ts_datetimes() == [p.ts for p in expected]
+    assert batch.payload_dicts() == [p.payload for p in expected]
+
+
+def test_generator_result_runs_chunk_by_chunk(monkeypatch):
+    stored = []
+    monkeypatch.setattr(base_module.db, "insert_data_point_rows", lambda rows: stored.append(len(rows)))
+    monkeypatch.setattr(base_module, "cache_latest_many", lambda name, items: None)
+    monkeypatch.setattr(base_module, "publish_event", lambda topic, event: None)
+
+    result = FakeV1(lambda: records(2500), chunk_rows=1000).run(run_context=RunContext())
+
+    assert result["status"] == "success"
+    assert stored == [1000, 1000, 500] * 2  # bronze per chunk, then the spooled tier rows
+    assert result["rows_in"] == 2500 and result["rows_out"] == 2500 and result["rows_dropped"] == 0
+    assert result["rows_written"] == 5000
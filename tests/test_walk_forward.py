@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Walk-forward module tests: shared-signal windows equal per-window signals, and
+reruns reuse the per-window cache.
+Run: python -m pytest tests/test_walk_forward.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from modules import walk_forward as wf
+
+
+@pytest.fixture
+def prices(monkeypatch):
+    rng = np.random.default_rng(3)
+    index = pd.bdate_range('2019-01-01', periods=900)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, 900))), index=index)
+    monkeypatch.setattr(wf, 'fetch_data', lambda symbol, start, end: pd.DataFrame({'Close': close}))
+    return close
+
+
+@pytest.mark.parametrize("fast, slow", [(5, 20), (27, 113), (60, 40), (199, 200)])
+def test_window_signals_equal_signals_on_the_window(prices, fast, slow):
+    objective = wf.WindowObjective(prices, wf.SMAStrategy)
+    strategy = wf.SMAStrategy(fast, slow)
+    for start, end in [(0, 252), (63, 315), (500, 563), (700, 900)]:
+        expected = strategy.generate_signals(prices.iloc[start:end])
+        pd.testing.assert_series_equal(objective.signals(strategy, start, end), expected)
+        assert objective.sharpe({'fast_period': fast, 'slow_period': slow}, start, end) == \
+            wf.calculate_sharpe_ratio(wf.calculate_returns(prices.iloc[start:end], expected))
+    assert list(objective._signals) == [(fast, slow)]
+
+
+def test_rerun_optimises_only_new_windows(prices, tmp_path, monkeypatch):
+    optimised = []
+    optimize = wf._optimize_window
+    monkeypatch.setattr(wf, '_optimize_window', lambda objective, bounds, start, end:
+                        optimised.append(start) or optimize(objective, bounds, start, end))
+    monkeypatch.setattr(wf, 'fetch_data', lambda symbol, start, end: pd.DataFrame({'Close': prices.iloc[:700]}))
+    first = wf.walk_forward_optimize('TEST', step_days=42, workers=1, cache_dir=tmp_path)
+    assert len(optimised) == len(first.windows) == 10
+
+    optimised.clear()
+    monkeypatch.setattr(wf, 'fetch_data', lambda symbol, start, end: pd.DataFrame({'Close': prices}))
+    extended = wf.walk_forward_optimize('TEST', step_days=42, workers=1, cache_dir=tmp_path)
+    assert len(optimised) == len(extended.windows) - 10 == 4
+    assert [w.params for w in extended.windows[:10]] == [w.params for w in first.windows]
+
+    optimised.clear()
+    again = wf.walk_forward_optimize('TEST', step_days=42, workers=2, cache_dir=tmp_path)
+    assert optimised == []
+    pd.testing.assert_series_equal(again.combined_returns, extended.combined_returns)
+
+    wf.walk_forward_optimize('TEST', step_days=42, workers=1, cache_dir=tmp_path,
+                             param_bounds={'fast_period': (5, 40), 'slow_period': (20, 200)})
+    assert len(optimised) == 14